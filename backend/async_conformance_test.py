@@ -0,0 +1,273 @@
+#Author: Vodohleb04
+import asyncio
+import inspect
+import os
+import threading
+from concurrent.futures import Executor
+from datetime import date
+import pytest
+from sqlalchemy.orm import sessionmaker
+from backend.data_layer.engine_registry import to_async_url
+from backend.data_layer.mapped_database import KnowledgeStatus
+from backend.data_layer.sqlite_stand_in import create_sqlite_stand_in_engine, create_async_sqlite_stand_in_engine
+from backend.data_access_layer.batch_write import WriteOutcome
+from backend.data_access_layer.load_profile import LoadProfile
+from backend.data_access_layer.user_dal.user_dal import SQLAlchemyUserDAL
+from backend.data_access_layer.user_dal.save_user_dto import SaveUserDTO
+from backend.data_access_layer.user_dal.login_user_dto import LoginUserDTO
+from backend.data_access_layer.user_dal.async_user_dal import AsyncUserDAL
+from backend.data_access_layer.knowledge_dal.knowledge_dal import SQLAlchemyKnowledgeDAL
+from backend.data_access_layer.knowledge_dal.save_knowledge_dto import SaveKnowledgeDTO
+from backend.data_access_layer.knowledge_dal.async_knowledge_dal import AsyncKnowledgeDAL
+from backend.data_access_layer.discussion_dal.discussion_dal import SQLAlchemyDiscussionDAL
+from backend.data_access_layer.discussion_dal.save_discussion_dto import SaveDiscussionDTO
+from backend.data_access_layer.discussion_dal.async_discussion_dal import AsyncDiscussionDAL
+from backend.data_access_layer.comment_dal.comment_dal import SQLAlchemyCommentDAL
+from backend.data_access_layer.comment_dal.save_comment_dto import SaveCommentDTO
+from backend.data_access_layer.comment_dal.async_comment_dal import AsyncCommentDAL
+from backend.service_layer.authentication_service.authentication_service_impl import AuthenticationServiceImpl
+from backend.service_layer.authentication_service.async_authentication_service import AsyncAuthenticationService
+from backend.service_layer.authentication_service.password_hasher import PasswordHasher
+from backend.service_layer.knowledge_service.knowledge_service_impl import KnowledgeServiceImpl
+from backend.service_layer.knowledge_service.async_knowledge_service import AsyncKnowledgeService
+from backend.service_layer.discussion_service.discussion_service_impl import DiscussionServiceImpl
+from backend.service_layer.discussion_service.async_discussion_service import AsyncDiscussionService
+from backend.conftest import (
+    TEST_COST, create_postgres_engine, create_test_password_hasher, create_test_token_signer
+)
+
+ASYNC_COUNTERPARTS = (
+    AsyncUserDAL, AsyncKnowledgeDAL, AsyncDiscussionDAL, AsyncCommentDAL,
+    AsyncAuthenticationService, AsyncKnowledgeService, AsyncDiscussionService
+)
+CONCURRENT_READS = 50
+
+
+class SyncStack:
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.session_maker = sessionmaker(engine, expire_on_commit=False)
+        self.user_dal = SQLAlchemyUserDAL()
+        self.knowledge_dal = SQLAlchemyKnowledgeDAL()
+        self.discussion_dal = SQLAlchemyDiscussionDAL()
+        self.comment_dal = SQLAlchemyCommentDAL()
+        token_signer = create_test_token_signer()
+        self.authentication_service = AuthenticationServiceImpl(
+            self.user_dal, token_signer, create_test_password_hasher()
+        )
+        self.knowledge_service = KnowledgeServiceImpl(self.knowledge_dal, token_signer)
+        self.discussion_service = DiscussionServiceImpl(self.discussion_dal, self.comment_dal, token_signer)
+
+    def call(self, method, *args, **kwargs):
+        # The caller owns the transaction, DAL writes are only staged until it commits.
+        with self.session_maker() as session:
+            result = method(*args, db_session=session, **kwargs)
+            session.commit()
+            return result
+
+    def close(self):
+        self.engine.dispose()
+
+
+class AsyncStack(SyncStack):
+
+    def __init__(self, engine, loop):
+        from sqlalchemy.ext.asyncio import async_sessionmaker
+        super().__init__(engine.sync_engine)
+        self.async_engine = engine
+        self.loop = loop
+        self.session_maker = async_sessionmaker(engine, expire_on_commit=False)
+        self.user_dal = AsyncUserDAL(self.user_dal)
+        self.knowledge_dal = AsyncKnowledgeDAL(self.knowledge_dal)
+        self.discussion_dal = AsyncDiscussionDAL(self.discussion_dal)
+        self.comment_dal = AsyncCommentDAL(self.comment_dal)
+        self.authentication_service = AsyncAuthenticationService(self.authentication_service)
+        self.knowledge_service = AsyncKnowledgeService(self.knowledge_service)
+        self.discussion_service = AsyncDiscussionService(self.discussion_service)
+
+    async def _call(self, method, *args, **kwargs):
+        async with self.session_maker() as session:
+            result = await method(*args, db_session=session, **kwargs)
+            await session.commit()
+            return result
+
+    def call(self, method, *args, **kwargs):
+        return self.loop.run_until_complete(self._call(method, *args, **kwargs))
+
+    def close(self):
+        self.loop.run_until_complete(self.async_engine.dispose())
+        self.loop.close()
+
+
+@pytest.fixture(params=["sync-sqlite", "async-sqlite", "sync-postgresql", "async-postgresql"])
+def stack(request):
+    mode, database = request.param.split("-")
+    if mode == "async":
+        pytest.importorskip("greenlet")
+        pytest.importorskip("aiosqlite" if database == "sqlite" else "asyncpg")
+    if database == "sqlite":
+        if mode == "sync":
+            stack = SyncStack(create_sqlite_stand_in_engine())
+        else:
+            loop = asyncio.new_event_loop()
+            stack = AsyncStack(loop.run_until_complete(create_async_sqlite_stand_in_engine()), loop)
+    elif "OMIS_TEST_DATABASE_URL" not in os.environ:
+        pytest.skip("OMIS_TEST_DATABASE_URL is not set")
+    elif mode == "sync":
+        stack = SyncStack(create_postgres_engine())
+    else:
+        from sqlalchemy.ext.asyncio import create_async_engine
+        create_postgres_engine().dispose()
+        stack = AsyncStack(
+            create_async_engine(to_async_url(os.environ["OMIS_TEST_DATABASE_URL"])), asyncio.new_event_loop()
+        )
+    yield stack
+    stack.close()
+
+
+def test_async_counterparts_keep_the_interface_contracts():
+    for counterpart in ASYNC_COUNTERPARTS:
+        assert counterpart.interface.__abstractmethods__
+        for name in counterpart.interface.__abstractmethods__:
+            method = getattr(counterpart, name)
+            assert inspect.iscoroutinefunction(method), f"{counterpart.__name__}.{name}"
+            assert inspect.signature(method) == inspect.signature(getattr(counterpart.interface, name))
+    with pytest.raises(TypeError):
+        AsyncKnowledgeDAL(SQLAlchemyUserDAL())
+
+
+def test_data_access_layer_conformance(stack):
+    user = SaveUserDTO(False, "user", "user name", "hash", "user@mail.ru", date(2000, 1, 1))
+    assert stack.call(stack.user_dal.save, user) == WriteOutcome.WRITTEN
+    assert stack.call(stack.user_dal.save, user) == WriteOutcome.ALREADY_EXISTS
+    assert [found.login for found in stack.call(stack.user_dal.get_by_username_list, ["user name"])] == ["user"]
+
+    outcomes = stack.call(
+        stack.knowledge_dal.save_many,
+        [SaveKnowledgeDTO(f"knowledge {i}", "description", "link", f"category {i % 2}", "user") for i in range(3)]
+    )
+    assert outcomes == [WriteOutcome.WRITTEN] * 3
+    knowledge = stack.call(stack.knowledge_dal.get_by_title, "knowledge 1", load_profile=LoadProfile.WITH_SENDER)
+    assert (knowledge.category, knowledge.knowledge_sender.username) == ("category 1", "user name")
+    assert stack.call(stack.knowledge_dal.get_by_id, knowledge.id).title == "knowledge 1"
+    page = stack.call(stack.knowledge_dal.get_by_category, "category 0", page_size=1)
+    assert [item.title for item in page.items] == ["knowledge 0"]
+    next_page = stack.call(stack.knowledge_dal.get_by_category, "category 0", cursor=page.next_cursor)
+    assert [item.title for item in next_page.items] == ["knowledge 2"]
+    assert dict(stack.call(stack.knowledge_dal.get_category_counts)) == {"category 0": 2, "category 1": 1}
+
+    discussion = SaveDiscussionDTO("discussion", "description", "category", "user")
+    assert stack.call(stack.discussion_dal.save, discussion) == WriteOutcome.WRITTEN
+    discussion_id = stack.call(stack.discussion_dal.get_by_title, "discussion").id
+    for number in range(3):
+        comment = SaveCommentDTO(f"comment {number}", "user", "discussion")
+        assert stack.call(stack.comment_dal.save, comment) == WriteOutcome.WRITTEN
+    assert stack.call(stack.comment_dal.save, SaveCommentDTO("lost", "user", "missing")) == WriteOutcome.NOT_FOUND
+    comment_page = stack.call(stack.comment_dal.get_page_for_discussion, discussion_id, page_size=2)
+    assert [row.sender_username for row in comment_page.items] == ["user name"] * 2
+    assert stack.call(stack.comment_dal.count_for_discussion, discussion_id) == 3
+
+    stack.call(stack.discussion_dal.delete_by_id, discussion_id)
+    assert stack.call(stack.discussion_dal.get_by_title, "discussion") is None
+    assert stack.call(stack.comment_dal.count_for_discussion, discussion_id) == 0
+
+
+def test_service_layer_conformance(stack):
+    admin_token = stack.call(
+        stack.authentication_service.register,
+        SaveUserDTO(True, "admin", "admin name", "admin hash", "admin@mail.ru", date(2000, 1, 1))
+    )
+    user_token = stack.call(
+        stack.authentication_service.register,
+        SaveUserDTO(False, "user", "user name", "hash", "user@mail.ru", date(2000, 1, 1))
+    )
+    assert stack.call(stack.authentication_service.login, LoginUserDTO("user", "hash")).get_login() == "user"
+    assert stack.call(stack.authentication_service.get_user_by_login, "admin").is_admin
+    with pytest.raises(ValueError):
+        stack.call(
+            stack.authentication_service.register,
+            SaveUserDTO(False, "user", "other name", "hash", "other@mail.ru", date(2000, 1, 1))
+        )
+
+    knowledge = SaveKnowledgeDTO("knowledge", "description", "link", "category", "user")
+    assert stack.call(stack.knowledge_service.save_knowledge, knowledge, user_token) == WriteOutcome.WRITTEN
+    assert stack.call(stack.knowledge_service.get_published_knowledge).items == []
+    assert stack.call(stack.knowledge_service.accept_knowledge_publishing, "knowledge", user_token) == \
+        WriteOutcome.FORBIDDEN
+    assert stack.call(stack.knowledge_service.accept_knowledge_publishing, "knowledge", admin_token) == \
+        WriteOutcome.WRITTEN
+    assert [item.title for item in stack.call(stack.knowledge_service.get_published_knowledge).items] == ["knowledge"]
+    view = stack.call(stack.knowledge_service.get_knowledge_by_title, "knowledge")
+    assert (view.status, view.sender_username) == (KnowledgeStatus.PUBLISHED, "user name")
+    assert stack.call(stack.knowledge_service.get_knowledge_categories, status=KnowledgeStatus.PUBLISHED) == \
+        ["category"]
+
+    discussion = SaveDiscussionDTO("discussion", "description", "category", "user")
+    assert stack.call(stack.discussion_service.save_discussion, discussion, user_token) == WriteOutcome.WRITTEN
+    comment = SaveCommentDTO("comment", "user", "discussion")
+    assert stack.call(stack.discussion_service.save_comment, comment, user_token) == WriteOutcome.WRITTEN
+    discussion_view = stack.call(stack.discussion_service.get_discussion_by_title, "discussion")
+    assert [(item.description, item.sender_username) for item in discussion_view.comments] == \
+        [("comment", "user name")]
+    assert discussion_view.comment_count == 1
+
+
+def test_concurrent_reads_share_one_event_loop(stack):
+    if not isinstance(stack, AsyncStack) or stack.async_engine.dialect.name != "postgresql":
+        pytest.skip("Concurrent sessions need the pooled async postgres engine")
+    stack.call(
+        stack.authentication_service.register,
+        SaveUserDTO(False, "user", "user name", "hash", "user@mail.ru", date(2000, 1, 1))
+    )
+
+    async def read_concurrently():
+        return await asyncio.gather(
+            *(stack._call(stack.authentication_service.get_user_by_login, "user") for _ in range(CONCURRENT_READS))
+        )
+
+    views = stack.loop.run_until_complete(read_concurrently())
+    assert {view.username for view in views} == {"user name"}
+
+
+class GateExecutor(Executor):
+    # Holds every key derivation until the gate is opened, for at most five seconds.
+
+    def __init__(self):
+        self.started = threading.Event()
+        self.gate = threading.Event()
+        self.opened = []
+
+    def map(self, fn, *iterables, timeout=None, chunksize=1):
+        self.started.set()
+        self.opened.append(self.gate.wait(5))
+        return map(fn, *iterables)
+
+
+def test_reads_progress_while_a_login_derives_keys(stack):
+    if not isinstance(stack, AsyncStack):
+        pytest.skip("Only the async adapters share an event loop")
+    executor = GateExecutor()
+    token_signer = create_test_token_signer()
+    authentication_service = AsyncAuthenticationService(
+        AuthenticationServiceImpl(SQLAlchemyUserDAL(), token_signer, PasswordHasher(TEST_COST, executor))
+    )
+    stack.call(
+        stack.authentication_service.register,
+        SaveUserDTO(False, "user", "user name", "hash", "user@mail.ru", date(2000, 1, 1))
+    )
+
+    async def read_while_logging_in():
+        login = asyncio.ensure_future(stack._call(authentication_service.login, LoginUserDTO("user", "hash")))
+        await asyncio.to_thread(executor.started.wait, 5)
+        # A login that blocked the event loop would let this read run only after the gate timed out.
+        view = await stack._call(stack.authentication_service.get_user_by_login, "user")
+        executor.gate.set()
+        token = await login
+        await authentication_service.logout(token)
+        return view, token
+
+    view, token = stack.loop.run_until_complete(read_while_logging_in())
+    assert (view.username, token.get_login()) == ("user name", "user")
+    assert executor.opened == [True]
+    assert not token_signer.verify(token)
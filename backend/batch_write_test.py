@@ -0,0 +1,174 @@
+#Author: Vodohleb04
+from datetime import date
+import pytest
+from backend.data_layer.mapped_database import KnowledgeStatus
+from backend.data_access_layer.batch_write import WriteOutcome
+from backend.data_access_layer.load_profile import LoadProfile
+from backend.data_access_layer.user_dal.user_dal import SQLAlchemyUserDAL
+from backend.data_access_layer.user_dal.save_user_dto import SaveUserDTO
+from backend.data_access_layer.user_dal.patch_user_dto import PatchUserDTO
+from backend.data_access_layer.knowledge_dal.knowledge_dal import SQLAlchemyKnowledgeDAL
+from backend.data_access_layer.knowledge_dal.save_knowledge_dto import SaveKnowledgeDTO
+from backend.data_access_layer.knowledge_dal.patch_knowledge_dto import PatchKnowledgeDTO
+from backend.data_access_layer.discussion_dal.discussion_dal import SQLAlchemyDiscussionDAL
+from backend.data_access_layer.discussion_dal.save_discussion_dto import SaveDiscussionDTO
+from backend.data_access_layer.discussion_dal.patch_discussion_dto import PatchDiscussionDTO
+from backend.data_access_layer.comment_dal.comment_dal import SQLAlchemyCommentDAL
+from backend.data_access_layer.comment_dal.save_comment_dto import SaveCommentDTO
+from backend.data_access_layer.comment_dal.patch_comment_dto import PatchCommentDTO
+from backend.service_layer.authentication_service.authentication_service_impl import AuthenticationServiceImpl
+from backend.service_layer.cache.in_memory_cache_backend import InMemoryCacheBackend
+from backend.service_layer.knowledge_service.cached_knowledge_service import CachedKnowledgeService
+from backend.service_layer.knowledge_service.knowledge_service_impl import KnowledgeServiceImpl
+from backend.conftest import count_statements, create_test_password_hasher, create_test_token_signer
+
+WRITTEN, UNCHANGED, ALREADY_EXISTS, NOT_FOUND, FORBIDDEN, FAILED = (
+    WriteOutcome.WRITTEN, WriteOutcome.UNCHANGED, WriteOutcome.ALREADY_EXISTS, WriteOutcome.NOT_FOUND,
+    WriteOutcome.FORBIDDEN, WriteOutcome.FAILED
+)
+
+
+@pytest.fixture
+def session_maker(empty_session_maker):
+    with empty_session_maker() as session:
+        outcomes = SQLAlchemyUserDAL().save_many(
+            [
+                SaveUserDTO(False, "user", "user name", "hash", "user@mail.ru", date.today()),
+                SaveUserDTO(True, "admin", "admin name", "hash", "admin@mail.ru", date.today()),
+                SaveUserDTO(False, "twin", "user name", "hash", "twin@mail.ru", date.today()),
+                SaveUserDTO(False, "user", "other name", "hash", "user@mail.ru", date.today())
+            ],
+            session
+        )
+        assert outcomes == [WRITTEN, WRITTEN, ALREADY_EXISTS, ALREADY_EXISTS]
+        session.commit()
+    return empty_session_maker
+
+
+def test_users_are_saved_with_roles_and_patched(session_maker):
+    user_dal = SQLAlchemyUserDAL()
+    with session_maker() as session:
+        assert user_dal.get_by_login("admin", session).is_admin()
+        assert user_dal.get_by_login("user", session).get_role() == "user"
+        outcomes = user_dal.patch_many(
+            [
+                PatchUserDTO("user", new_hashed_password="new hash"),
+                PatchUserDTO("admin"),
+                PatchUserDTO("ghost", stack="")
+            ],
+            session
+        )
+        assert outcomes == [WRITTEN, UNCHANGED, NOT_FOUND]
+        session.expire_all()
+        assert user_dal.get_by_login("user", session).hashed_password == "new hash"
+
+
+def test_knowledge_batches_report_outcomes_per_item(session_maker):
+    knowledge_dal = SQLAlchemyKnowledgeDAL()
+    with session_maker() as session:
+        with count_statements(session_maker) as statements:
+            outcomes = knowledge_dal.save_many(
+                [
+                    SaveKnowledgeDTO("A", "description", "link", "Databases", "user"),
+                    SaveKnowledgeDTO("B", "description", "link", "Databases", "user"),
+                    SaveKnowledgeDTO("A", "description", "link", "Networks", "user"),
+                    SaveKnowledgeDTO("C", "description", "link", "Networks", "admin")
+                ],
+                session
+            )
+        assert outcomes == [WRITTEN, WRITTEN, ALREADY_EXISTS, NOT_FOUND]
+        assert len(statements) <= 3
+        assert knowledge_dal.save_many([SaveKnowledgeDTO("B", "d", "l", "c", "user")], session) == [ALREADY_EXISTS]
+
+        assert knowledge_dal.accept_publishing_many(["A", "Z"], session) == [WRITTEN, NOT_FOUND]
+        assert knowledge_dal.accept_publishing_many(["A", "B"], session) == [UNCHANGED, WRITTEN]
+        assert knowledge_dal.get_category_counts(session, status=KnowledgeStatus.PUBLISHED) == [("Databases", 2)]
+
+        outcomes = knowledge_dal.patch_many(
+            [
+                PatchKnowledgeDTO("A", category="Networks"),
+                PatchKnowledgeDTO("B", new_title="B2", status=KnowledgeStatus.IN_PROCESSING),
+                PatchKnowledgeDTO("A", link="other"),
+                PatchKnowledgeDTO("Z", link="other")
+            ],
+            session
+        )
+        assert outcomes == [WRITTEN, WRITTEN, FAILED, NOT_FOUND]
+        assert knowledge_dal.get_by_title("B2", session).status == KnowledgeStatus.IN_PROCESSING
+        assert knowledge_dal.get_category_counts(session, status=KnowledgeStatus.PUBLISHED) == [("Networks", 1)]
+        assert knowledge_dal.get_category_counts(session, status=KnowledgeStatus.IN_PROCESSING) == [("Databases", 1)]
+
+        assert knowledge_dal.patch_many([PatchKnowledgeDTO("A", new_title="B2")], session) == [ALREADY_EXISTS]
+        assert knowledge_dal.get_by_title("A", session) is not None
+
+
+def test_discussion_and_comment_batches(session_maker):
+    discussion_dal, comment_dal = SQLAlchemyDiscussionDAL(), SQLAlchemyCommentDAL()
+    with session_maker() as session:
+        outcomes = discussion_dal.save_many(
+            [
+                SaveDiscussionDTO("A", "description", "Databases", "user"),
+                SaveDiscussionDTO("B", "description", "Networks", "user")
+            ],
+            session
+        )
+        assert outcomes == [WRITTEN, WRITTEN]
+        assert discussion_dal.patch_many(
+            [PatchDiscussionDTO("B", category="Databases"), PatchDiscussionDTO("Z", category="Databases")], session
+        ) == [WRITTEN, NOT_FOUND]
+        assert discussion_dal.get_category_counts(session) == [("Databases", 2)]
+
+        outcomes = comment_dal.save_many(
+            [
+                SaveCommentDTO("first", "user", "A"), SaveCommentDTO("second", "user", "A"),
+                SaveCommentDTO("lost", "user", "Z"), SaveCommentDTO("stranger", "admin", "A")
+            ],
+            session
+        )
+        assert outcomes == [WRITTEN, WRITTEN, NOT_FOUND, NOT_FOUND]
+        discussion = discussion_dal.get_by_title("A", session, LoadProfile.WITH_COMMENTS)
+        comments = sorted(discussion.connected_comments, key=lambda comment: comment.id)
+        assert [comment.description for comment in comments] == ["first", "second"]
+        outcomes = comment_dal.patch_many(
+            [PatchCommentDTO(comments[0].id, description="edited"), PatchCommentDTO(comments[1].id)], session
+        )
+        assert outcomes == [WRITTEN, UNCHANGED]
+        session.expire_all()
+        assert comment_dal.get_by_id(comments[0].id, session).description == "edited"
+
+
+def test_services_check_rights_per_item_and_invalidate_cache(session_maker):
+    token_signer = create_test_token_signer()
+    service = CachedKnowledgeService(
+        KnowledgeServiceImpl(SQLAlchemyKnowledgeDAL(), token_signer),
+        InMemoryCacheBackend(ttl_seconds=60, max_entries=100)
+    )
+    user = token_signer.issue("user", False)
+    admin = token_signer.issue("admin", True)
+    with session_maker() as session:
+        assert service.get_knowledge_by_title("A", session) is None
+        outcomes = service.save_knowledge_many(
+            [
+                SaveKnowledgeDTO("A", "description", "link", "Databases", "user"),
+                SaveKnowledgeDTO("B", "description", "link", "Databases", "admin")
+            ],
+            user,
+            session
+        )
+        assert outcomes == [WRITTEN, FORBIDDEN]
+        assert service.get_knowledge_by_title("A", session).status == KnowledgeStatus.IN_PROCESSING
+
+        assert service.accept_knowledge_publishing_many(["A"], user, session) == [FORBIDDEN]
+        assert service.accept_knowledge_publishing_many(["A"], admin, session) == [WRITTEN]
+        assert service.get_knowledge_by_title("A", session).status == KnowledgeStatus.PUBLISHED
+        assert service.get_knowledge_categories(session, status=KnowledgeStatus.PUBLISHED) == ["Databases"]
+
+        assert service.patch_knowledge_many([PatchKnowledgeDTO("A", new_title="A2")], admin, session) == [WRITTEN]
+        assert service.get_knowledge_by_title("A", session) is None
+
+        authentication_service = AuthenticationServiceImpl(
+            SQLAlchemyUserDAL(), token_signer, create_test_password_hasher()
+        )
+        request = SaveUserDTO(False, "new", "new name", "hash", "new@mail.ru", date.today())
+        assert authentication_service.register_many([request], user, session) == [FORBIDDEN]
+        assert authentication_service.register_many([request], admin, session) == [WRITTEN]
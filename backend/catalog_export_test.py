@@ -0,0 +1,135 @@
+#Author: Vodohleb04
+import csv
+import json
+import os
+from datetime import date
+import pytest
+from sqlalchemy.orm import sessionmaker
+from backend.data_layer.sqlite_stand_in import create_sqlite_stand_in_engine
+from backend.data_layer.mapped_database import KnowledgeStatus
+from backend.data_access_layer.catalog_export import ExportFilter, export_chunks, CSV, COPY, NDJSON
+from backend.data_access_layer.user_dal.user_dal import SQLAlchemyUserDAL
+from backend.data_access_layer.user_dal.save_user_dto import SaveUserDTO
+from backend.data_access_layer.knowledge_dal.knowledge_dal import SQLAlchemyKnowledgeDAL
+from backend.data_access_layer.knowledge_dal.save_knowledge_dto import SaveKnowledgeDTO
+from backend.data_access_layer.discussion_dal.discussion_dal import SQLAlchemyDiscussionDAL
+from backend.data_access_layer.discussion_dal.save_discussion_dto import SaveDiscussionDTO
+from backend.data_access_layer.comment_dal.comment_dal import SQLAlchemyCommentDAL
+from backend.data_access_layer.comment_dal.save_comment_dto import SaveCommentDTO
+import backend.export_catalog as export_catalog_module
+from backend.export_catalog import export_catalog, CHECKPOINT_SUFFIX
+
+
+@pytest.fixture
+def session_maker():
+    engine = create_sqlite_stand_in_engine()
+    session_maker = sessionmaker(engine, expire_on_commit=False)
+    with session_maker() as session:
+        knowledge_dal, discussion_dal = SQLAlchemyKnowledgeDAL(), SQLAlchemyDiscussionDAL()
+        SQLAlchemyUserDAL().save(SaveUserDTO(False, "user", "user name", "hash", "user@mail.ru", date.today()), session)
+        for i in range(7):
+            category = "even" if i % 2 == 0 else "odd"
+            # Values with the separators of every format.
+            description = f"line {i}\nwith\ttab, comma and \"quotes\" \\"
+            knowledge_dal.save(SaveKnowledgeDTO(f"knowledge {i}", description, "link", category, "user"), session)
+            if i < 3:
+                knowledge_dal.accept_publishing(f"knowledge {i}", session)
+            discussion_dal.save(SaveDiscussionDTO(f"discussion {i}", description, category, "user"), session)
+            SQLAlchemyCommentDAL().save(SaveCommentDTO(f"comment {i}", "user", f"discussion {i}"), session)
+        session.commit()
+    yield session_maker
+    engine.dispose()
+
+
+def export_text(session_maker, entity, export_format, export_filter=ExportFilter(), after_id=0):
+    with session_maker() as session:
+        return "".join(
+            text for _, _, text in export_chunks(
+                entity, session, export_format, export_filter, after_id, chunk_size=2, include_header=after_id == 0
+            )
+        )
+
+
+def copy_rows(text):
+    # Reverses the escapes of the COPY text format.
+    escapes = {"\\\\": "\\", "\\t": "\t", "\\n": "\n", "\\r": "\r"}
+    rows = []
+    for line in text.splitlines():
+        fields = []
+        for field in line.split("\t"):
+            value, position = "", 0
+            while position < len(field):
+                if field[position:position + 2] in escapes:
+                    value += escapes[field[position:position + 2]]
+                    position += 2
+                else:
+                    value += field[position]
+                    position += 1
+            fields.append(value)
+        rows.append(fields)
+    return rows
+
+
+def test_formats_hold_the_same_rows(session_maker):
+    lines = export_text(session_maker, "knowledge", NDJSON).splitlines()
+    records = [json.loads(line) for line in lines]
+    assert [record["title"] for record in records] == [f"knowledge {i}" for i in range(7)]
+    assert records[0]["status"] == "published" and records[0]["description"].startswith("line 0\nwith\ttab")
+
+    csv_rows = list(csv.reader(export_text(session_maker, "knowledge", CSV).splitlines(keepends=True)))
+    assert csv_rows[0] == list(records[0])
+    assert [dict(zip(csv_rows[0], row)) for row in csv_rows[1:]] == [
+        {key: str(value) for key, value in record.items()} for record in records
+    ]
+    # COPY loads the enum members by the names the database keeps.
+    status = csv_rows[0].index("status")
+    assert copy_rows(export_text(session_maker, "knowledge", COPY)) == [
+        row[:status] + [KnowledgeStatus(row[status]).name] + row[status + 1:] for row in csv_rows[1:]
+    ]
+
+
+def test_filters_and_resuming_after_an_id(session_maker):
+    published = export_text(session_maker, "knowledge", NDJSON, ExportFilter(status=KnowledgeStatus.PUBLISHED))
+    assert [json.loads(line)["title"] for line in published.splitlines()] == [
+        "knowledge 0", "knowledge 1", "knowledge 2"
+    ]
+    odd_comments = export_text(session_maker, "comment", NDJSON, ExportFilter(category="odd"))
+    assert [json.loads(line)["description"] for line in odd_comments.splitlines()] == [
+        "comment 1", "comment 3", "comment 5"
+    ]
+    discussions = [json.loads(line) for line in export_text(session_maker, "discussion", NDJSON).splitlines()]
+    assert export_text(session_maker, "discussion", NDJSON, after_id=discussions[3]["id"]) == "".join(
+        json.dumps(discussion, ensure_ascii=False) + "\n" for discussion in discussions[4:]
+    )
+    with pytest.raises(ValueError):
+        export_text(session_maker, "comment", NDJSON, ExportFilter(status=KnowledgeStatus.PUBLISHED))
+    with pytest.raises(ValueError):
+        export_text(session_maker, "user", NDJSON)
+
+
+def test_interrupted_file_export_continues_from_its_checkpoint(session_maker, tmp_path, monkeypatch):
+    complete_path = str(tmp_path / "complete.csv")
+    assert export_catalog("discussion", complete_path, session_maker, CSV, chunk_size=2) == 7
+    assert not os.path.exists(complete_path + CHECKPOINT_SUFFIX)
+
+    path = str(tmp_path / "discussion.csv")
+    synced = []
+
+    def fail_on_the_third_chunk(file_descriptor):
+        synced.append(file_descriptor)
+        # The header and two chunks are checkpointed, the third one is written but not recorded.
+        if len(synced) == 7:
+            raise OSError("disk was unplugged")
+
+    monkeypatch.setattr(export_catalog_module.os, "fsync", fail_on_the_third_chunk)
+    with pytest.raises(OSError):
+        export_catalog("discussion", path, session_maker, CSV, chunk_size=2)
+    monkeypatch.undo()
+    checkpoint = json.loads((tmp_path / "discussion.csv.checkpoint").read_text())
+    assert checkpoint["rows"] == 4 and checkpoint["offset"] < os.path.getsize(path)
+    with pytest.raises(ValueError):
+        export_catalog("discussion", path, session_maker, NDJSON, chunk_size=2)
+
+    assert export_catalog("discussion", path, session_maker, CSV, chunk_size=2) == 7
+    assert (tmp_path / "discussion.csv").read_bytes() == (tmp_path / "complete.csv").read_bytes()
+    assert not os.path.exists(path + CHECKPOINT_SUFFIX)
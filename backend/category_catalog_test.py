@@ -0,0 +1,148 @@
+#Author: Vodohleb04
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+import pytest
+from sqlalchemy import select, update, func, create_engine, text
+from sqlalchemy.orm import sessionmaker
+from backend.data_layer.declarative_base import Base
+from backend.data_layer.sqlite_stand_in import create_sqlite_stand_in_engine
+from backend.data_layer.mapped_database import Knowledge, KnowledgeStatus, KnowledgeCategory, Discussion
+from backend.data_access_layer.user_dal.user_dal import SQLAlchemyUserDAL
+from backend.data_access_layer.user_dal.save_user_dto import SaveUserDTO
+from backend.data_access_layer.knowledge_dal.knowledge_dal import SQLAlchemyKnowledgeDAL
+from backend.data_access_layer.knowledge_dal.save_knowledge_dto import SaveKnowledgeDTO
+from backend.data_access_layer.knowledge_dal.patch_knowledge_dto import PatchKnowledgeDTO
+from backend.data_access_layer.discussion_dal.discussion_dal import SQLAlchemyDiscussionDAL
+from backend.data_access_layer.discussion_dal.save_discussion_dto import SaveDiscussionDTO
+from backend.data_access_layer.discussion_dal.patch_discussion_dto import PatchDiscussionDTO
+from backend.service_layer.unit_of_work import UnitOfWork
+from backend.rebuild_category_catalog import rebuild_category_catalog
+
+WRITERS = 8
+WRITES_PER_WRITER = 25
+
+
+def save_users(session_maker):
+    with session_maker() as session:
+        SQLAlchemyUserDAL().save(SaveUserDTO(False, "user", "user name", "hash", "user@mail.ru", date.today()), session)
+        SQLAlchemyUserDAL().save(SaveUserDTO(False, "other", "other name", "hash", "other@mail.ru", date.today()), session)
+        session.commit()
+
+
+@pytest.fixture
+def session_maker():
+    engine = create_sqlite_stand_in_engine()
+    session_maker = sessionmaker(engine, expire_on_commit=False)
+    save_users(session_maker)
+    yield session_maker
+    engine.dispose()
+
+
+def grouped_knowledge_counts(session, status):
+    return sorted(
+        session.execute(
+            select(Knowledge.category, func.count()).where(Knowledge.status == status).group_by(Knowledge.category)
+        )
+    )
+
+
+def test_knowledge_counts_follow_writes(session_maker):
+    knowledge_dal = SQLAlchemyKnowledgeDAL()
+    with session_maker() as session:
+        for title, category in (("A", "Databases"), ("B", "Databases"), ("C", "Networks")):
+            knowledge_dal.save(SaveKnowledgeDTO(title, "description", "link", category, "user"), session)
+        knowledge_dal.save(SaveKnowledgeDTO("D", "description", "link", "Networks", "other"), session)
+        assert knowledge_dal.get_category_counts(session) == [("Databases", 2), ("Networks", 2)]
+
+        knowledge_dal.patch(PatchKnowledgeDTO("B", category="Networks"), session)
+        knowledge_dal.accept_publishing("C", session)
+        assert knowledge_dal.get_category_counts(session, status=KnowledgeStatus.IN_PROCESSING) == [
+            ("Databases", 1), ("Networks", 2)
+        ]
+        assert knowledge_dal.get_category_counts(session, status=KnowledgeStatus.PUBLISHED) == [("Networks", 1)]
+
+        knowledge_dal.delete_by_title("A", session)
+        assert knowledge_dal.get_categories(session) == ["Networks"]
+
+        SQLAlchemyUserDAL().delete_by_login("other", session)
+        assert knowledge_dal.get_category_counts(session) == [("Networks", 2)]
+        assert knowledge_dal.get_categories(session, status=KnowledgeStatus.IN_PROCESSING) == ["Networks"]
+
+
+def test_discussion_counts_follow_writes(session_maker):
+    discussion_dal = SQLAlchemyDiscussionDAL()
+    with session_maker() as session:
+        discussion_dal.save(SaveDiscussionDTO("A", "description", "Databases", "user"), session)
+        discussion_dal.save(SaveDiscussionDTO("B", "description", "Databases", "other"), session)
+        discussion_dal.patch(PatchDiscussionDTO("A", category="Networks"), session)
+        assert discussion_dal.get_category_counts(session) == [("Databases", 1), ("Networks", 1)]
+
+        SQLAlchemyUserDAL().delete_by_username("other name", session)
+        discussion_dal.delete_by_title_list(["A"], session)
+        assert discussion_dal.get_category_counts(session) == []
+        assert discussion_dal.get_categories(session) == []
+
+
+def test_rebuild_repairs_drift(session_maker):
+    knowledge_dal = SQLAlchemyKnowledgeDAL()
+    with session_maker() as session:
+        knowledge_dal.save(SaveKnowledgeDTO("A", "description", "link", "Databases", "user"), session)
+        SQLAlchemyDiscussionDAL().save(SaveDiscussionDTO("A", "description", "Databases", "user"), session)
+        session.execute(update(KnowledgeCategory).values(in_processing_count=7))
+        session.execute(update(Discussion).values(category="Networks"))
+        session.commit()
+
+    rebuild_category_catalog(session_maker)
+    with session_maker() as session:
+        assert knowledge_dal.get_category_counts(session) == [("Databases", 1)]
+        assert SQLAlchemyDiscussionDAL().get_category_counts(session) == [("Networks", 1)]
+
+
+def save_concurrently(session_maker):
+    def write(writer):
+        knowledge_dal = SQLAlchemyKnowledgeDAL()
+        with session_maker() as session:
+            for number in range(WRITES_PER_WRITER):
+                title = f"{writer}-{number}"
+                with UnitOfWork(session):
+                    knowledge_dal.save(
+                        SaveKnowledgeDTO(title, "description", "link", f"category {number % 3}", "user"), session
+                    )
+                if number % 2:
+                    with UnitOfWork(session):
+                        knowledge_dal.accept_publishing(title, session)
+                if number % 5 == 0:
+                    with UnitOfWork(session):
+                        knowledge_dal.patch(PatchKnowledgeDTO(title, category=f"category {writer % 4}"), session)
+
+    with ThreadPoolExecutor(WRITERS) as executor:
+        list(executor.map(write, range(WRITERS)))
+
+    with session_maker() as session:
+        assert session.scalar(select(func.count()).select_from(Knowledge)) > 0
+        for status in KnowledgeStatus:
+            assert SQLAlchemyKnowledgeDAL().get_category_counts(session, status=status) == grouped_knowledge_counts(
+                session, status
+            )
+
+
+def test_concurrent_writers_keep_counts_exact(tmp_path):
+    engine = create_sqlite_stand_in_engine(str(tmp_path / "catalog.db"))
+    session_maker = sessionmaker(engine, expire_on_commit=False)
+    save_users(session_maker)
+    save_concurrently(session_maker)
+    engine.dispose()
+
+
+@pytest.mark.skipif("OMIS_TEST_DATABASE_URL" not in os.environ, reason="OMIS_TEST_DATABASE_URL is not set")
+def test_concurrent_writers_keep_counts_exact_on_postgres():
+    engine = create_engine(os.environ["OMIS_TEST_DATABASE_URL"], pool_size=WRITERS)
+    with engine.begin() as connection:
+        connection.execute(text("DROP SCHEMA IF EXISTS omis2 CASCADE"))
+        connection.execute(text("CREATE SCHEMA omis2"))
+    Base.metadata.create_all(engine)
+    session_maker = sessionmaker(engine, expire_on_commit=False)
+    save_users(session_maker)
+    save_concurrently(session_maker)
+    engine.dispose()
@@ -0,0 +1,82 @@
+#Author: Vodohleb04
+from datetime import date, datetime, timedelta, timezone
+import pytest
+from sqlalchemy import insert
+from backend.data_layer.mapped_database import Comment
+from backend.data_access_layer.page import DEFAULT_PAGE_SIZE, encode_cursor
+from backend.data_access_layer.user_dal.user_dal import SQLAlchemyUserDAL
+from backend.data_access_layer.user_dal.save_user_dto import SaveUserDTO
+from backend.data_access_layer.discussion_dal.discussion_dal import SQLAlchemyDiscussionDAL
+from backend.data_access_layer.discussion_dal.save_discussion_dto import SaveDiscussionDTO
+from backend.data_access_layer.comment_dal.comment_dal import SQLAlchemyCommentDAL
+from backend.service_layer.discussion_service.discussion_service_impl import DiscussionServiceImpl
+from backend.conftest import count_statements
+
+COMMENTS = DEFAULT_PAGE_SIZE + 13
+PAGE_SIZE = 20
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def session_maker(empty_session_maker):
+    with empty_session_maker() as session:
+        SQLAlchemyUserDAL().save(SaveUserDTO(False, "user", "user name", "hash", "user@mail.ru", date.today()), session)
+        for title in ("popular", "quiet"):
+            SQLAlchemyDiscussionDAL().save(SaveDiscussionDTO(title, "description", "category", "user"), session)
+        popular = SQLAlchemyDiscussionDAL().get_by_title("popular", session)
+        # Comments are inserted newest first and pairs share a timestamp, so ids alone would give another order.
+        session.execute(
+            insert(Comment),
+            [
+                {
+                    "discussion_id": popular.id, "description": f"comment {number}", "sender_login": "user",
+                    "created_at": START + timedelta(minutes=number // 2)
+                } for number in reversed(range(COMMENTS))
+            ]
+        )
+        session.commit()
+    return empty_session_maker
+
+
+def test_comments_are_paged_in_creation_order(session_maker):
+    comment_dal = SQLAlchemyCommentDAL()
+    with session_maker() as session:
+        popular = SQLAlchemyDiscussionDAL().get_by_title("popular", session)
+        descriptions, cursor = [], None
+        while True:
+            with count_statements(session_maker) as statements:
+                page = comment_dal.get_page_for_discussion(popular.id, session, cursor=cursor, page_size=PAGE_SIZE)
+            assert len(statements) == 1
+            assert '"user"' not in statements[0] and "general_user" in statements[0]
+            descriptions.extend(row.description for row in page.items)
+            cursor = page.next_cursor
+            if cursor is None:
+                break
+        assert len(descriptions) == COMMENTS
+        assert [int(description.split()[1]) // 2 for description in descriptions] == sorted(
+            number // 2 for number in range(COMMENTS)
+        )
+        assert comment_dal.count_for_discussion(popular.id, session) == COMMENTS
+        with pytest.raises(ValueError):
+            comment_dal.get_page_for_discussion(popular.id, session, cursor="bm90IGEgY3Vyc29y")
+        # Well formed, but not comparable with the (created_at, id) key of the page.
+        with pytest.raises(ValueError):
+            comment_dal.get_page_for_discussion(
+                popular.id, session, cursor=encode_cursor([datetime.now().isoformat(), "not an id"])
+            )
+
+
+def test_discussion_view_holds_first_page_and_count(session_maker):
+    service = DiscussionServiceImpl(SQLAlchemyDiscussionDAL(), SQLAlchemyCommentDAL())
+    with session_maker() as session:
+        with count_statements(session_maker) as statements:
+            quiet = service.get_discussion_by_title("quiet", session)
+        assert (quiet.comments, quiet.comment_count, quiet.next_comments_cursor) == ((), 0, None)
+        assert len(statements) == 2
+
+        popular = service.get_discussion_by_title("popular", session)
+        assert (len(popular.comments), popular.comment_count) == (DEFAULT_PAGE_SIZE, COMMENTS)
+        next_page = service.get_discussion_comments(popular.id, session, cursor=popular.next_comments_cursor)
+        assert len(popular.comments) + len(next_page.items) == COMMENTS
+        assert popular.comments[-1].created_at <= next_page.items[0].created_at
+        assert [comment.description for comment in popular.comments[:2]] == ["comment 1", "comment 0"]
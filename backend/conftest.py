@@ -0,0 +1,85 @@
+#Author: Vodohleb04
+import os
+from contextlib import contextmanager
+import pytest
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import sessionmaker
+from backend.data_layer.declarative_base import Base
+from backend.data_layer.sqlite_stand_in import create_sqlite_stand_in_engine
+from backend.service_layer.authentication_service.password_hasher import PasswordHasher, ScryptCost
+from backend.service_layer.authentication_service.revocation_list import InMemoryRevocationList
+from backend.service_layer.authentication_service.token_signer import TokenSigner
+
+# Importing the broker builds its services with the signer of the environment, the tests inject their own signers.
+os.environ.setdefault("OMIS_TOKEN_SECRET", "test secret")
+
+TEST_SECRET_KEY = b"test secret key"
+TEST_COST = ScryptCost(n=2 ** 4, r=1, p=1)
+SAVEPOINT_STATEMENTS = ("SAVEPOINT", "RELEASE SAVEPOINT", "ROLLBACK TO SAVEPOINT")
+
+
+def create_test_token_signer(clock=None) -> TokenSigner:
+    # The default signer of the services needs the redis revocation list, tests keep revocations in memory.
+    if clock is None:
+        return TokenSigner(TEST_SECRET_KEY, 3600, InMemoryRevocationList())
+    return TokenSigner(TEST_SECRET_KEY, 3600, InMemoryRevocationList(clock), clock)
+
+
+def create_test_password_hasher(cost: ScryptCost = TEST_COST) -> PasswordHasher:
+    # The production cost takes tens of milliseconds per hash, tests derive the keys cheaply and in process.
+    return PasswordHasher(cost)
+
+
+@contextmanager
+def count_statements(session_maker):
+    statements = []
+    engine = session_maker.kw["bind"]
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        # Savepoints of the DAL writes are not round trips of the queries themselves, they are not counted.
+        if not statement.startswith(SAVEPOINT_STATEMENTS):
+            statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def create_postgres_engine():
+    engine = create_engine(os.environ["OMIS_TEST_DATABASE_URL"])
+    with engine.begin() as connection:
+        connection.execute(text("DROP SCHEMA IF EXISTS omis2 CASCADE"))
+        connection.execute(text("CREATE SCHEMA omis2"))
+    Base.metadata.create_all(engine)
+    return engine
+
+
+@pytest.fixture(params=["sqlite", "postgresql"])
+def empty_session_maker(request, tmp_path):
+    # A file database on SQLite, concurrent sessions would share the single connection of an in-memory one.
+    if request.param == "sqlite":
+        engine = create_sqlite_stand_in_engine(str(tmp_path / "omis.db"))
+    elif "OMIS_TEST_DATABASE_URL" in os.environ:
+        engine = create_postgres_engine()
+    else:
+        pytest.skip("OMIS_TEST_DATABASE_URL is not set")
+    yield sessionmaker(engine, expire_on_commit=False)
+    engine.dispose()
+
+
+@pytest.fixture
+def postgres_search_engine():
+    # The search vectors and the trigram indexes are created by Base.create_from_metadata only, not by create_all.
+    if "OMIS_TEST_DATABASE_URL" not in os.environ:
+        pytest.skip("OMIS_TEST_DATABASE_URL is not set")
+    engine = create_engine(os.environ["OMIS_TEST_DATABASE_URL"])
+    with engine.begin() as connection:
+        if connection.execute(text("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")).first() is None:
+            engine.dispose()
+            pytest.skip("The pg_trgm extension is not available")
+        connection.execute(text("DROP SCHEMA IF EXISTS omis2 CASCADE"))
+    Base.create_from_metadata(engine)
+    yield engine
+    engine.dispose()
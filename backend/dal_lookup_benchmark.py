@@ -0,0 +1,92 @@
+#Author: Vodohleb04
+import sys
+import timeit
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.orm import sessionmaker
+from backend.data_layer.declarative_base import Base
+from backend.data_layer.mapped_database import GeneralUser, Knowledge, Discussion, Comment
+from backend.data_layer.sqlite_stand_in import create_sqlite_stand_in_engine
+from backend.data_access_layer.comment_dal.comment_dal import SQLAlchemyCommentDAL
+from backend.data_access_layer.discussion_dal.discussion_dal import SQLAlchemyDiscussionDAL
+from backend.data_access_layer.knowledge_dal.knowledge_dal import SQLAlchemyKnowledgeDAL
+from backend.data_access_layer.load_profile import LoadProfile, loader_options
+from backend.data_access_layer.user_dal.user_dal import SQLAlchemyUserDAL
+from backend.read_model_benchmark import fill_database
+
+CALLS = 2000
+
+
+def built_per_call(dal, entity, key_column, key, load_profile):
+    # How the lookups were written before KeyLookup: the statement is built and its cache key computed every call.
+    def lookup(session):
+        return session.scalar(
+            select(entity)
+            .where(key_column == key)
+            .options(*loader_options(load_profile, dal._options_by_profile))
+            .limit(1)
+        )
+
+    return lookup
+
+
+def report(name, built_seconds, cached_seconds):
+    print(
+        f"{name:<40} built per call {built_seconds * 1e6:>8.1f} us  cached {cached_seconds * 1e6:>8.1f} us  "
+        f"x{built_seconds / cached_seconds:>5.2f}"
+    )
+
+
+def measure(session, lookup):
+    lookup(session)
+    return timeit.timeit(lambda: lookup(session), number=CALLS) / CALLS
+
+
+def run(session_maker):
+    user_dal, knowledge_dal = SQLAlchemyUserDAL(), SQLAlchemyKnowledgeDAL()
+    discussion_dal, comment_dal = SQLAlchemyDiscussionDAL(), SQLAlchemyCommentDAL()
+    with session_maker() as session:
+        knowledge_id = knowledge_dal.get_by_title("knowledge user_0 0", session).id
+        discussion_id = discussion_dal.get_by_title("discussion user_0 0", session).id
+        comment_id = session.scalar(select(Comment.id).limit(1))
+    lookups = (
+        ("user get_by_login", user_dal, GeneralUser, GeneralUser.login, "user_0", LoadProfile.BARE,
+         lambda session: user_dal.get_by_login("user_0", session)),
+        ("knowledge get_by_title", knowledge_dal, Knowledge, Knowledge.title, "knowledge user_0 0", LoadProfile.BARE,
+         lambda session: knowledge_dal.get_by_title("knowledge user_0 0", session)),
+        ("knowledge get_by_title WITH_SENDER", knowledge_dal, Knowledge, Knowledge.title, "knowledge user_0 0",
+         LoadProfile.WITH_SENDER,
+         lambda session: knowledge_dal.get_by_title("knowledge user_0 0", session, LoadProfile.WITH_SENDER)),
+        ("knowledge get_by_id", knowledge_dal, Knowledge, Knowledge.id, knowledge_id, LoadProfile.BARE,
+         lambda session: knowledge_dal.get_by_id(knowledge_id, session)),
+        ("discussion get_by_title", discussion_dal, Discussion, Discussion.title, "discussion user_0 0",
+         LoadProfile.BARE, lambda session: discussion_dal.get_by_title("discussion user_0 0", session)),
+        ("discussion get_by_id", discussion_dal, Discussion, Discussion.id, discussion_id, LoadProfile.BARE,
+         lambda session: discussion_dal.get_by_id(discussion_id, session)),
+        ("comment get_by_id WITH_SENDER", comment_dal, Comment, Comment.id, comment_id, LoadProfile.WITH_SENDER,
+         lambda session: comment_dal.get_by_id(comment_id, session, LoadProfile.WITH_SENDER))
+    )
+    with session_maker() as session:
+        for name, dal, entity, key_column, key, load_profile, cached in lookups:
+            report(
+                name,
+                measure(session, built_per_call(dal, entity, key_column, key, load_profile)),
+                measure(session, cached)
+            )
+
+
+if __name__ == "__main__":
+    # Usage: python -m backend.dal_lookup_benchmark [scratch postgres database url], an in-memory SQLite by default.
+    # The difference of both columns is the Python side of a lookup, the database round trip is the same in both.
+    if len(sys.argv) > 1:
+        engine = create_engine(sys.argv[1])
+        with engine.begin() as connection:
+            connection.execute(text("DROP SCHEMA IF EXISTS omis2 CASCADE"))
+            connection.execute(text("CREATE SCHEMA omis2"))
+        Base.create_from_metadata(engine)
+    else:
+        engine = create_sqlite_stand_in_engine()
+    session_maker = sessionmaker(engine, expire_on_commit=False)
+    with session_maker() as session:
+        fill_database(session)
+    run(session_maker)
+    engine.dispose()
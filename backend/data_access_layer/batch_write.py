@@ -0,0 +1,99 @@
+#Author: Vodohleb04
+from enum import Enum
+from typing import Any, Dict, Iterable, List, Set, Tuple
+from sqlalchemy import select, update, bindparam
+from sqlalchemy.orm import Session
+
+
+class WriteOutcome(Enum):
+    WRITTEN = "written"
+    UNCHANGED = "unchanged"
+    ALREADY_EXISTS = "already_exists"
+    NOT_FOUND = "not_found"
+    FORBIDDEN = "forbidden"
+    FAILED = "failed"
+
+    def __str__(self) -> str:
+        return self.value
+
+
+def written_items(items: List[Any], outcomes: List[WriteOutcome]) -> List[Any]:
+    return [item for item, outcome in zip(items, outcomes) if outcome == WriteOutcome.WRITTEN]
+
+
+def existing_keys(key_column, keys: Iterable, db_session: Session) -> Set:
+    keys = set(keys)
+    if not keys:
+        return set()
+    return set(db_session.scalars(select(key_column).where(key_column.in_(keys))))
+
+
+def key_owners(unique_column, owner_column, keys: Iterable, db_session: Session) -> Dict:
+    # Rows that hold the unique keys a batch renames its rows to, by key. A rename to a key of another row would
+    # make the database reject the whole batch.
+    keys = {key for key in keys if key is not None}
+    if not keys:
+        return {}
+    return dict(db_session.execute(select(unique_column, owner_column).where(unique_column.in_(keys))).all())
+
+
+def repeated_positions(keys: List) -> Set[int]:
+    seen_keys, repeated = set(), set()
+    for position, key in enumerate(keys):
+        if key in seen_keys:
+            repeated.add(position)
+        else:
+            seen_keys.add(key)
+    return repeated
+
+
+def execute_grouped_updates(key_column, updates: List[Tuple[Any, Dict]], db_session: Session) -> None:
+    # Patches that set the same columns share one executemany instead of a statement and a commit per row.
+    table = key_column.class_.__table__
+    key = table.c[key_column.key]
+    grouped_parameters = {}
+    for key_value, values in updates:
+        grouped_parameters.setdefault(tuple(sorted(values)), []).append(
+            {"b_key": key_value, **{f"b_{name}": value for name, value in values.items()}}
+        )
+    for column_names, parameters in grouped_parameters.items():
+        db_session.connection().execute(
+            update(table)
+            .where(key == bindparam("b_key"))
+            .values({name: bindparam(f"b_{name}") for name in column_names}),
+            parameters
+        )
+
+
+_STAGED_WRITES_KEY = "omis_staged_writes"
+
+
+class _FirstWrite:
+    # Nothing was staged in the transaction before this write, a failure rolls the transaction back.
+
+    def __init__(self, db_session: Session):
+        self.__db_session = db_session
+
+    def commit(self) -> None:
+        # Remembers the transaction itself, the mark is stale once that transaction has ended.
+        self.__db_session.info[_STAGED_WRITES_KEY] = self.__db_session.get_transaction()
+
+    def rollback(self) -> None:
+        self.__db_session.rollback()
+
+
+def has_staged_writes(db_session: Session) -> bool:
+    transaction = db_session.get_transaction()
+    return transaction is not None and db_session.info.get(_STAGED_WRITES_KEY) is transaction
+
+
+def begin_write(db_session: Session):
+    # A failed write is undone alone: the statements staged before it in the unit of work are kept by a savepoint.
+    # Until the first write of a transaction there is nothing to keep, reads only autobegin it, so the write needs no
+    # SAVEPOINT and RELEASE round trips and its rollback loses nothing. A savepoint of a nested unit of work has to
+    # survive the failure, the write gets one of its own there.
+    if db_session.in_nested_transaction() or has_staged_writes(db_session):
+        # Marked before the write, the transaction may keep it once the nested unit of work is released.
+        db_session.info[_STAGED_WRITES_KEY] = db_session.get_transaction()
+        return db_session.begin_nested()
+    return _FirstWrite(db_session)
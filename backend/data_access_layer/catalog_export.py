@@ -0,0 +1,137 @@
+#Author: Vodohleb04
+import csv
+import io
+import json
+from dataclasses import dataclass
+from datetime import date, datetime
+from enum import Enum
+from typing import Iterator, Sequence, Tuple
+from sqlalchemy import Row, Select, select
+from sqlalchemy.orm import Session
+from backend.data_layer.mapped_database import Knowledge, KnowledgeStatus, Discussion, Comment
+
+NDJSON = "ndjson"
+CSV = "csv"
+COPY = "copy"
+EXPORT_FORMATS = (NDJSON, CSV, COPY)
+EXPORT_CONTENT_TYPES = {NDJSON: "application/x-ndjson", CSV: "text/csv", COPY: "text/tab-separated-values"}
+EXPORT_FILE_EXTENSIONS = {NDJSON: "ndjson", CSV: "csv", COPY: "tsv"}
+DEFAULT_EXPORT_CHUNK_SIZE = 1000
+
+# The id goes first: it orders the export, and the last id written is where an interrupted export continues.
+_EXPORT_COLUMNS = {
+    "knowledge": (
+        Knowledge.id, Knowledge.title, Knowledge.description, Knowledge.link, Knowledge.category, Knowledge.status,
+        Knowledge.sender_login
+    ),
+    "discussion": (
+        Discussion.id, Discussion.title, Discussion.description, Discussion.category, Discussion.sender_login
+    ),
+    "comment": (Comment.id, Comment.discussion_id, Comment.description, Comment.sender_login, Comment.created_at)
+}
+EXPORT_ENTITIES = tuple(_EXPORT_COLUMNS)
+
+
+@dataclass(frozen=True, slots=True)
+class ExportFilter:
+    # Comments are filtered by the category of their discussion, only knowledge has a status.
+    category: str | None = None
+    status: KnowledgeStatus | None = None
+
+
+def check_export(entity: str, export_format: str, export_filter: ExportFilter) -> None:
+    if entity not in _EXPORT_COLUMNS:
+        raise ValueError(f"Unsupported export entity: {entity}")
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {export_format}")
+    if export_filter.status is not None and entity != "knowledge":
+        raise ValueError(f"Export of {entity} can not be filtered by status")
+
+
+def export_statement(entity: str, export_filter: ExportFilter, after_id: int = 0) -> Select:
+    columns = _EXPORT_COLUMNS[entity]
+    statement = select(*columns).where(columns[0] > after_id).order_by(columns[0])
+    if export_filter.status is not None:
+        statement = statement.where(Knowledge.status == export_filter.status)
+    if export_filter.category is not None:
+        if entity == "comment":
+            statement = statement.join(Discussion, Discussion.id == Comment.discussion_id)
+            statement = statement.where(Discussion.category == export_filter.category)
+        else:
+            statement = statement.where(columns[0].class_.category == export_filter.category)
+    return statement
+
+
+def stream_rows(
+        entity: str,
+        db_session: Session,
+        export_filter: ExportFilter = ExportFilter(),
+        after_id: int = 0,
+        chunk_size: int = DEFAULT_EXPORT_CHUNK_SIZE
+) -> Iterator[Sequence[Row]]:
+    # yield_per makes psycopg2 and asyncpg read through a server-side cursor, chunk_size rows at a time, instead of
+    # buffering the whole result in the process.
+    result = db_session.execute(
+        export_statement(entity, export_filter, after_id), execution_options={"yield_per": chunk_size}
+    )
+    yield from result.partitions()
+
+
+def _plain(value):
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def _copy_field(value) -> str:
+    # Text format of COPY ... FROM: tab separated, \N for NULL, backslash escapes in values.
+    if value is None:
+        return "\\N"
+    if isinstance(value, Enum):
+        # The database keeps the names of the enum members, COPY has to load them back.
+        value = value.name
+    return (
+        str(_plain(value))
+        .replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+    )
+
+
+def _csv_lines(rows) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\n").writerows(rows)
+    return buffer.getvalue()
+
+
+def export_header(entity: str, export_format: str) -> str:
+    if export_format == CSV:
+        return _csv_lines([[column.key for column in _EXPORT_COLUMNS[entity]]])
+    return ""
+
+
+def encode_chunk(rows: Sequence[Row], export_format: str) -> str:
+    if export_format == NDJSON:
+        keys = rows[0]._fields
+        return "".join(json.dumps(dict(zip(keys, map(_plain, row))), ensure_ascii=False) + "\n" for row in rows)
+    if export_format == CSV:
+        return _csv_lines([[_plain(value) for value in row] for row in rows])
+    return "".join("\t".join(_copy_field(value) for value in row) + "\n" for row in rows)
+
+
+def export_chunks(
+        entity: str,
+        db_session: Session,
+        export_format: str = NDJSON,
+        export_filter: ExportFilter = ExportFilter(),
+        after_id: int = 0,
+        chunk_size: int = DEFAULT_EXPORT_CHUNK_SIZE,
+        include_header: bool = True
+) -> Iterator[Tuple[int, int, str]]:
+    # (id of the last row, rows, text) of every chunk; only one chunk of rows is held at a time.
+    check_export(entity, export_format, export_filter)
+    header = export_header(entity, export_format)
+    if include_header and header:
+        yield after_id, 0, header
+    for rows in stream_rows(entity, db_session, export_filter, after_id, chunk_size):
+        yield rows[-1].id, len(rows), encode_chunk(rows, export_format)
@@ -0,0 +1,95 @@
+#Author: Vodohleb04
+from collections import Counter
+from typing import Dict, Iterable, Tuple
+from sqlalchemy import select, delete, insert, func, case, text
+from sqlalchemy.orm import Session
+from backend.data_access_layer.dialect_insert import dialect_insert
+from backend.data_layer.mapped_database import (
+    Knowledge, KnowledgeStatus, KnowledgeCategory, Discussion, DiscussionCategory
+)
+
+DISCUSSION_COUNT_COLUMN = "discussion_count"
+
+
+def knowledge_count_column(status: KnowledgeStatus) -> str:
+    return f"{status.value}_count"
+
+
+def apply_category_deltas(catalog_entity, deltas: Dict[Tuple[str, str], int], db_session: Session) -> None:
+    # Counters are changed by single-statement upserts, so concurrent writers never lose an increment.
+    # Rows are touched in a fixed order to keep two transactions from locking the same rows crosswise.
+    for (category, count_column), delta in sorted(deltas.items()):
+        if delta == 0:
+            continue
+        statement = dialect_insert(catalog_entity, db_session).values({"category": category, count_column: delta})
+        db_session.execute(
+            statement.on_conflict_do_update(
+                index_elements=[catalog_entity.category],
+                set_={count_column: getattr(catalog_entity, count_column) + statement.excluded[count_column]}
+            )
+        )
+
+
+def knowledge_deltas(rows: Iterable[Tuple[str, KnowledgeStatus]], sign: int) -> Counter:
+    deltas = Counter()
+    for category, status in rows:
+        deltas[(category, knowledge_count_column(status))] += sign
+    return deltas
+
+
+def discussion_deltas(categories: Iterable[str], sign: int) -> Counter:
+    deltas = Counter()
+    for category in categories:
+        deltas[(category, DISCUSSION_COUNT_COLUMN)] += sign
+    return deltas
+
+
+def release_sender_categories(sender_login_clause, db_session: Session) -> None:
+    # Users' knowledge and discussions are removed by ON DELETE CASCADE, which the DAL counters do not see.
+    apply_category_deltas(
+        KnowledgeCategory,
+        knowledge_deltas(
+            db_session.execute(select(Knowledge.category, Knowledge.status).where(sender_login_clause(Knowledge))),
+            -1
+        ),
+        db_session
+    )
+    apply_category_deltas(
+        DiscussionCategory,
+        discussion_deltas(
+            db_session.scalars(select(Discussion.category).where(sender_login_clause(Discussion))), -1
+        ),
+        db_session
+    )
+
+
+def _lock_for_rebuild(entity, db_session: Session) -> None:
+    # Writers are blocked until the rebuild commits, so no increment can fall between the count and the swap.
+    if db_session.get_bind().dialect.name == "postgresql":
+        db_session.execute(text(f"LOCK TABLE {entity.__table__.fullname} IN SHARE MODE"))
+
+
+def rebuild_knowledge_catalog(db_session: Session) -> None:
+    _lock_for_rebuild(Knowledge, db_session)
+    db_session.execute(delete(KnowledgeCategory))
+    db_session.execute(
+        insert(KnowledgeCategory).from_select(
+            ["category", "in_processing_count", "published_count"],
+            select(
+                Knowledge.category,
+                func.count(case((Knowledge.status == KnowledgeStatus.IN_PROCESSING, 1))),
+                func.count(case((Knowledge.status == KnowledgeStatus.PUBLISHED, 1)))
+            ).group_by(Knowledge.category)
+        )
+    )
+
+
+def rebuild_discussion_catalog(db_session: Session) -> None:
+    _lock_for_rebuild(Discussion, db_session)
+    db_session.execute(delete(DiscussionCategory))
+    db_session.execute(
+        insert(DiscussionCategory).from_select(
+            ["category", "discussion_count"],
+            select(Discussion.category, func.count()).group_by(Discussion.category)
+        )
+    )
@@ -0,0 +1,7 @@
+#Author: Vodohleb04
+from backend.data_layer.run_sync_adapter import RunSyncAdapter
+from backend.data_access_layer.comment_dal.comment_dal_interface import CommentDALInterface
+
+
+class AsyncCommentDAL(RunSyncAdapter, interface=CommentDALInterface):
+    pass
@@ -1,10 +1,16 @@
 #Author: Vodohleb04
 import logging
-from typing import List, Dict, Sequence
-from sqlalchemy import insert, select, update, delete
+from typing import Iterable, List, Dict, Sequence
+from sqlalchemy import insert, select, update, delete, literal, func, Row
 from sqlalchemy.exc import DBAPIError
-from sqlalchemy.orm import Session
-from backend.data_layer.mapped_database import Comment
+from sqlalchemy.orm import Session, joinedload
+from backend.data_access_layer.batch_write import (
+    WriteOutcome, existing_keys, repeated_positions, execute_grouped_updates, begin_write
+)
+from backend.data_access_layer.key_lookup import KeyLookup
+from backend.data_access_layer.load_profile import LoadProfile, loader_options
+from backend.data_access_layer.page import Page, DEFAULT_PAGE_SIZE, fetch_keyset_row_page
+from backend.data_layer.mapped_database import Comment, Discussion, User, GeneralUser
 from backend.data_access_layer.comment_dal.comment_dal_interface import CommentDALInterface
 from backend.data_access_layer.comment_dal.save_comment_dto import SaveCommentDTO
 from backend.data_access_layer.comment_dal.patch_comment_dto import PatchCommentDTO
@@ -14,35 +20,122 @@ logger = logging.getLogger(__name__)
 
 class SQLAlchemyCommentDAL(CommentDALInterface):
 
-    def get_by_id(self, id: int, db_session: Session) -> Comment | None:
-        return db_session.scalar(
-            select(Comment)
-            .where(Comment.id == id)
-            .limit(1)
+    _options_by_profile = {
+        LoadProfile.BARE: (),
+        # Comments only know their discussion id, the title shown with them comes from the joined discussion.
+        LoadProfile.WITH_SENDER: (
+            joinedload(Comment.comment_sender), joinedload(Comment.connected_discussion).load_only(Discussion.title)
         )
+    }
+    _by_id = KeyLookup(Comment.id, _options_by_profile)
+
+    def get_by_id(
+            self,
+            id: int,
+            db_session: Session,
+            load_profile: LoadProfile = LoadProfile.BARE
+    ) -> Comment | None:
+        return self._by_id.get(id, db_session, load_profile)
 
-    def get_by_id_list(self, id_list: List[id], db_session: Session) -> Sequence[Comment] | None:
+    def get_by_id_list(
+            self,
+            id_list: List[id],
+            db_session: Session,
+            load_profile: LoadProfile = LoadProfile.BARE
+    ) -> Sequence[Comment] | None:
         return db_session.scalars(
             select(Comment)
             .where(Comment.id.in_(id_list))
+            .options(*loader_options(load_profile, self._options_by_profile))
         ).all()
 
-    def save(self, comment: SaveCommentDTO, db_session: Session) -> None:
+    def get_page_for_discussion(
+            self,
+            discussion_id: int,
+            db_session: Session,
+            cursor: str = None,
+            page_size: int = DEFAULT_PAGE_SIZE
+    ) -> Page[Row]:
+        # Only the sender's username is joined, the rest of the sender's graph is never needed by a thread.
+        return fetch_keyset_row_page(
+            select(Comment.id, Comment.description, Comment.created_at, GeneralUser.username.label("sender_username"))
+            .join(GeneralUser, GeneralUser.login == Comment.sender_login)
+            .where(Comment.discussion_id == discussion_id),
+            (Comment.created_at, Comment.id),
+            cursor,
+            page_size,
+            db_session
+        )
+
+    def count_for_discussion(self, discussion_id: int, db_session: Session) -> int:
+        return db_session.scalar(select(func.count()).where(Comment.discussion_id == discussion_id))
+
+    def save(self, comment: SaveCommentDTO, db_session: Session) -> WriteOutcome:
+        write = begin_write(db_session)
         try:
-            db_session.execute(
+            # The discussion id is resolved by the insert itself, a missing discussion inserts no row.
+            saved_id = db_session.scalar(
                 insert(Comment)
-                .values(
-                    description=comment.description,
-                    sender_login=comment.sender_login,
-                    discussion_title=comment.discussion_title
+                .from_select(
+                    ["description", "sender_login", "discussion_id"],
+                    select(literal(comment.description), literal(comment.sender_login), Discussion.id)
+                    .where(Discussion.title == comment.discussion_title)
                 )
+                .returning(Comment.id)
+            )
+            write.commit()
+        except DBAPIError as ex:
+            write.rollback()
+            logger.error(
+                f"In save error was occurred: {ex.args[0]}. Comment was not saved, write was rolled back."
             )
-            db_session.commit()
+            return WriteOutcome.FAILED
+        return WriteOutcome.NOT_FOUND if saved_id is None else WriteOutcome.WRITTEN
+
+    @staticmethod
+    def _discussion_ids_by_title(titles: Iterable[str], db_session: Session) -> Dict[str, int]:
+        titles = set(titles)
+        if not titles:
+            return {}
+        return dict(
+            db_session.execute(select(Discussion.title, Discussion.id).where(Discussion.title.in_(titles))).all()
+        )
+
+    def save_many(self, comment_list: List[SaveCommentDTO], db_session: Session) -> List[WriteOutcome]:
+        senders = existing_keys(User.login, (comment.sender_login for comment in comment_list), db_session)
+        discussion_ids = self._discussion_ids_by_title(
+            (comment.discussion_title for comment in comment_list), db_session
+        )
+        comments_to_save = [
+            comment for comment in comment_list
+            if comment.sender_login in senders and comment.discussion_title in discussion_ids
+        ]
+        write = begin_write(db_session)
+        try:
+            if comments_to_save:
+                db_session.execute(
+                    insert(Comment)
+                    .values([
+                        {
+                            "description": comment.description,
+                            "sender_login": comment.sender_login,
+                            "discussion_id": discussion_ids[comment.discussion_title]
+                        }
+                        for comment in comments_to_save
+                    ])
+                )
+            write.commit()
         except DBAPIError as ex:
-            db_session.rollback()
+            write.rollback()
             logger.error(
-                f"In save error was occurred: {ex.args[0]}. Comment was not saved, transaction was rolled back."
+                f"In save_many error was occurred: {ex.args[0]}. Comments were not saved, write was rolled back."
             )
+            return [WriteOutcome.FAILED] * len(comment_list)
+        return [
+            WriteOutcome.WRITTEN if comment.sender_login in senders and comment.discussion_title in discussion_ids
+            else WriteOutcome.NOT_FOUND
+            for comment in comment_list
+        ]
 
     @staticmethod
     def _define_dict_to_update(comment: PatchCommentDTO) -> Dict:
@@ -51,47 +144,86 @@ class SQLAlchemyCommentDAL(CommentDALInterface):
             dict_to_update["description"] = comment.description
         return dict_to_update
 
-    def patch(self, comment: PatchCommentDTO, db_session: Session) -> None:
-        if self.get_by_id(comment.id, db_session):
-            try:
-                db_session.execute(
-                    update(Comment)
-                    .where(Comment.id == comment.id)
-                    .values(**self._define_dict_to_update(comment))
-                )
-                db_session.commit()
-            except DBAPIError as ex:
-                db_session.rollback()
-                logger.error(
-                    f"In patch error was occurred: {ex.args[0]}. Comment was not patched, transaction "
-                    f"was rolled back."
-                )
+    def patch(self, comment: PatchCommentDTO, db_session: Session) -> WriteOutcome:
+        values = self._define_dict_to_update(comment)
+        if not values:
+            if self.get_by_id(comment.id, db_session) is None:
+                return WriteOutcome.NOT_FOUND
+            return WriteOutcome.UNCHANGED
+        write = begin_write(db_session)
+        try:
+            patched_id = db_session.scalar(
+                update(Comment)
+                .where(Comment.id == comment.id)
+                .values(**values)
+                .returning(Comment.id)
+            )
+            write.commit()
+        except DBAPIError as ex:
+            write.rollback()
+            logger.error(
+                f"In patch error was occurred: {ex.args[0]}. Comment was not patched, write "
+                f"was rolled back."
+            )
+            return WriteOutcome.FAILED
+        return WriteOutcome.NOT_FOUND if patched_id is None else WriteOutcome.WRITTEN
+
+    def patch_many(self, comment_list: List[PatchCommentDTO], db_session: Session) -> List[WriteOutcome]:
+        repeated = repeated_positions([comment.id for comment in comment_list])
+        outcomes, updates = [], []
+        write = begin_write(db_session)
+        try:
+            comment_ids = existing_keys(Comment.id, (comment.id for comment in comment_list), db_session)
+            for position, comment in enumerate(comment_list):
+                values = self._define_dict_to_update(comment)
+                if comment.id not in comment_ids:
+                    outcomes.append(WriteOutcome.NOT_FOUND)
+                elif position in repeated:
+                    logger.error(f"In patch_many error was occurred: Comment {comment.id} is patched twice.")
+                    outcomes.append(WriteOutcome.FAILED)
+                elif not values:
+                    outcomes.append(WriteOutcome.UNCHANGED)
+                else:
+                    updates.append((comment.id, values))
+                    outcomes.append(WriteOutcome.WRITTEN)
+            execute_grouped_updates(Comment.id, updates, db_session)
+            write.commit()
+        except DBAPIError as ex:
+            write.rollback()
+            logger.error(
+                f"In patch_many error was occurred: {ex.args[0]}. Comments were not patched, write "
+                f"was rolled back."
+            )
+            return [WriteOutcome.FAILED] * len(comment_list)
+        return outcomes
 
     def delete_by_id(self, id: int, db_session: Session) -> None:
+        write = begin_write(db_session)
         try:
             db_session.execute(
                 delete(Comment)
                 .where(Comment.id == id)
             )
-            db_session.commit()
+            write.commit()
         except DBAPIError as ex:
-            db_session.rollback()
+            write.rollback()
             logger.error(
-                f"In delete_by_id error was occurred: {ex.args[0]}. Comment was not deleted, transaction "
+                f"In delete_by_id error was occurred: {ex.args[0]}. Comment was not deleted, write "
                 f"was rolled back."
             )
 
     def delete_by_id_list(self, id_list: List[id], db_session: Session) -> None:
+        write = begin_write(db_session)
         try:
             db_session.execute(
                 delete(Comment)
                 .where(Comment.id.in_(id_list))
             )
-            db_session.commit()
+            write.commit()
         except DBAPIError as ex:
-            db_session.rollback()
+            write.rollback()
             logger.error(
-                f"In delete_by_id_list error was occurred: {ex.args[0]}. Comments were not deleted, transaction "
+                f"In delete_by_id_list error was occurred: {ex.args[0]}. Comments were not deleted, write "
                 f"was rolled back."
             )
 
@@ -110,6 +242,8 @@ if __name__ == "__main__":
 
         )
         comment_dal.save(user_save, session)
+        # The DAL only stages the writes, they are committed by the caller.
+        session.commit()
         #comment = comment_dal.get_by_id()
         #print(comment)
         #comment_dal.patch(PatchCommentDTO(comment.id, description="Hello!"))
@@ -1,7 +1,11 @@
 #Author: Vodohleb04
 from abc import ABC, abstractmethod
 from typing import List, Sequence
+from sqlalchemy import Row
 from sqlalchemy.orm import Session
+from backend.data_access_layer.batch_write import WriteOutcome
+from backend.data_access_layer.load_profile import LoadProfile
+from backend.data_access_layer.page import Page, DEFAULT_PAGE_SIZE
 from backend.data_layer.mapped_database import Comment
 from backend.data_access_layer.comment_dal.save_comment_dto import SaveCommentDTO
 from backend.data_access_layer.comment_dal.patch_comment_dto import PatchCommentDTO
@@ -10,19 +14,51 @@ from backend.data_access_layer.comment_dal.patch_comment_dto import PatchComment
 class CommentDALInterface(ABC):
 
     @abstractmethod
-    def get_by_id(self, id: int, db_session: Session) -> Comment | None:
+    def get_by_id(
+            self,
+            id: int,
+            db_session: Session,
+            load_profile: LoadProfile = LoadProfile.BARE
+    ) -> Comment | None:
         raise NotImplementedError
 
     @abstractmethod
-    def get_by_id_list(self, id_list: List[id], db_session: Session) -> Sequence[Comment] | None:
+    def get_by_id_list(
+            self,
+            id_list: List[id],
+            db_session: Session,
+            load_profile: LoadProfile = LoadProfile.BARE
+    ) -> Sequence[Comment] | None:
         raise NotImplementedError
 
     @abstractmethod
-    def save(self, comment: SaveCommentDTO, db_session: Session) -> None:
+    def get_page_for_discussion(
+            self,
+            discussion_id: int,
+            db_session: Session,
+            cursor: str = None,
+            page_size: int = DEFAULT_PAGE_SIZE
+    ) -> Page[Row]:
         raise NotImplementedError
 
     @abstractmethod
-    def patch(self, comment: PatchCommentDTO, db_session: Session) -> None:
+    def count_for_discussion(self, discussion_id: int, db_session: Session) -> int:
+        raise NotImplementedError
+
+    @abstractmethod
+    def save(self, comment: SaveCommentDTO, db_session: Session) -> WriteOutcome:
+        raise NotImplementedError
+
+    @abstractmethod
+    def save_many(self, comment_list: List[SaveCommentDTO], db_session: Session) -> List[WriteOutcome]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def patch(self, comment: PatchCommentDTO, db_session: Session) -> WriteOutcome:
+        raise NotImplementedError
+
+    @abstractmethod
+    def patch_many(self, comment_list: List[PatchCommentDTO], db_session: Session) -> List[WriteOutcome]:
         raise NotImplementedError
 
     @abstractmethod
@@ -0,0 +1,14 @@
+#Author: Vodohleb04
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+
+def dialect_insert(entity, db_session: Session):
+    # Both dialect inserts support on_conflict_do_update / on_conflict_do_nothing with the same signature.
+    dialect_name = db_session.get_bind().dialect.name
+    if dialect_name == "postgresql":
+        return postgresql.insert(entity)
+    elif dialect_name == "sqlite":
+        return sqlite.insert(entity)
+    else:
+        raise ValueError(f"Upsert is not supported for dialect {dialect_name}")
@@ -0,0 +1,7 @@
+#Author: Vodohleb04
+from backend.data_layer.run_sync_adapter import RunSyncAdapter
+from backend.data_access_layer.discussion_dal.discussion_dal_interface import DiscussionDALInterface
+
+
+class AsyncDiscussionDAL(RunSyncAdapter, interface=DiscussionDALInterface):
+    pass
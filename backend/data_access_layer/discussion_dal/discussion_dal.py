@@ -1,10 +1,24 @@
 #Author: Vodohleb04
 import logging
-from typing import List, Dict, Sequence
-from sqlalchemy import insert, select, update, delete
-from sqlalchemy.exc import DBAPIError
-from sqlalchemy.orm import Session
-from backend.data_layer.mapped_database import Discussion
+from collections import Counter
+from operator import attrgetter
+from typing import List, Dict, Sequence, Tuple
+from sqlalchemy import Row, select, update, delete
+from sqlalchemy.exc import DBAPIError, IntegrityError
+from sqlalchemy.orm import Session, joinedload, selectinload
+from backend.data_access_layer.batch_write import (
+    WriteOutcome, existing_keys, key_owners, repeated_positions, execute_grouped_updates, begin_write
+)
+from backend.data_access_layer.category_catalog import (
+    apply_category_deltas, discussion_deltas, rebuild_discussion_catalog
+)
+from backend.data_access_layer.dialect_insert import dialect_insert
+from backend.data_access_layer.key_lookup import KeyLookup
+from backend.data_access_layer.load_profile import LoadProfile, loader_options
+from backend.data_access_layer.page import Page, DEFAULT_PAGE_SIZE, fetch_keyset_page, fetch_keyset_row_page
+from backend.data_access_layer.search.full_text_search import fetch_search_page
+from backend.data_access_layer.search.similar_titles import fetch_similar_titles, DEFAULT_SIMILAR_TITLES_LIMIT
+from backend.data_layer.mapped_database import Discussion, DiscussionCategory, Comment, User
 from backend.data_access_layer.discussion_dal.discussion_dal_interface import DiscussionDALInterface
 from backend.data_access_layer.discussion_dal.save_discussion_dto import SaveDiscussionDTO
 from backend.data_access_layer.discussion_dal.patch_discussion_dto import PatchDiscussionDTO
@@ -14,61 +28,254 @@ logger = logging.getLogger(__name__)
 
 class SQLAlchemyDiscussionDAL(DiscussionDALInterface):
 
+    _options_by_profile = {
+        LoadProfile.BARE: (),
+        LoadProfile.WITH_SENDER: (joinedload(Discussion.discussion_sender),),
+        LoadProfile.WITH_COMMENTS: (
+            joinedload(Discussion.discussion_sender),
+            selectinload(Discussion.connected_comments).joinedload(Comment.comment_sender)
+        )
+    }
+    _by_id = KeyLookup(Discussion.id, _options_by_profile)
+    _by_title = KeyLookup(Discussion.title, _options_by_profile)
+
     def get_categories(self, db_session: Session) -> Sequence[str] | None:
         return db_session.scalars(
-            select(Discussion.category).distinct(Discussion.category)
+            select(DiscussionCategory.category)
+            .where(DiscussionCategory.discussion_count > 0)
+            .order_by(DiscussionCategory.category)
         ).all()
 
-    def get_all(self, db_session: Session) -> Sequence[Discussion] | None:
+    def get_category_counts(self, db_session: Session) -> Sequence[Tuple[str, int]]:
+        return db_session.execute(
+            select(DiscussionCategory.category, DiscussionCategory.discussion_count)
+            .where(DiscussionCategory.discussion_count > 0)
+            .order_by(DiscussionCategory.category)
+        ).all()
+
+    def get_all(
+            self,
+            db_session: Session,
+            load_profile: LoadProfile = LoadProfile.BARE,
+            cursor: str = None,
+            page_size: int = DEFAULT_PAGE_SIZE
+    ) -> Page[Discussion]:
+        return fetch_keyset_page(
+            select(Discussion).options(*loader_options(load_profile, self._options_by_profile)),
+            (Discussion.category, Discussion.title),
+            cursor,
+            page_size,
+            db_session
+        )
+
+    def get_by_id(
+            self,
+            id: int,
+            db_session: Session,
+            load_profile: LoadProfile = LoadProfile.BARE
+    ) -> Discussion | None:
+        return self._by_id.get(id, db_session, load_profile)
+
+    def get_by_id_list(
+            self,
+            id_list: List[int],
+            db_session: Session,
+            load_profile: LoadProfile = LoadProfile.BARE
+    ) -> Sequence[Discussion] | None:
         return db_session.scalars(
             select(Discussion)
+            .where(Discussion.id.in_(id_list))
+            .options(*loader_options(load_profile, self._options_by_profile))
         ).all()
 
-    def get_by_title(self, title: str, db_session: Session) -> Discussion | None:
-        return db_session.scalar(
-            select(Discussion)
-            .where(Discussion.title == title)
-            .limit(1)
-        )
+    def get_by_title(
+            self,
+            title: str,
+            db_session: Session,
+            load_profile: LoadProfile = LoadProfile.BARE
+    ) -> Discussion | None:
+        return self._by_title.get(title, db_session, load_profile)
 
-    def get_by_title_list(self, title_list: List[str], db_session: Session) -> Sequence[Discussion] | None:
+    def get_by_title_list(
+            self,
+            title_list: List[str],
+            db_session: Session,
+            load_profile: LoadProfile = LoadProfile.BARE
+    ) -> Sequence[Discussion] | None:
         return db_session.scalars(
             select(Discussion)
             .where(Discussion.title.in_(title_list))
+            .options(*loader_options(load_profile, self._options_by_profile))
         ).all()
 
-    def get_by_category(self, category: str, db_session: Session) -> Sequence[Discussion] | None:
-        return db_session.scalars(
+    def get_by_category(
+            self,
+            category: str,
+            db_session: Session,
+            load_profile: LoadProfile = LoadProfile.BARE,
+            cursor: str = None,
+            page_size: int = DEFAULT_PAGE_SIZE
+    ) -> Page[Discussion]:
+        return fetch_keyset_page(
             select(Discussion)
             .where(Discussion.category == category)
-        ).all()
+            .options(*loader_options(load_profile, self._options_by_profile)),
+            (Discussion.title,),
+            cursor,
+            page_size,
+            db_session
+        )
 
-    def get_by_category_list(self, category_list: List[str], db_session: Session) -> Sequence[Discussion] | None:
-        return db_session.scalars(
+    def get_by_category_list(
+            self,
+            category_list: List[str],
+            db_session: Session,
+            load_profile: LoadProfile = LoadProfile.BARE,
+            cursor: str = None,
+            page_size: int = DEFAULT_PAGE_SIZE
+    ) -> Page[Discussion]:
+        return fetch_keyset_page(
             select(Discussion)
             .where(Discussion.category.in_(category_list))
-        ).all()
+            .options(*loader_options(load_profile, self._options_by_profile)),
+            (Discussion.category, Discussion.title),
+            cursor,
+            page_size,
+            db_session
+        )
 
-    def save(self, discussion: SaveDiscussionDTO, db_session: Session) -> None:
-        if self.get_by_title(discussion.title, db_session) is None:
-            try:
-                db_session.execute(
-                    insert(Discussion)
-                    .values(
-                        title=discussion.title, description=discussion.description, category=discussion.category,
-                        sender_login=discussion.sender_login
-                    )
+    @staticmethod
+    def _list_rows(
+            db_session: Session,
+            category_list: List[str] | None,
+            cursor: str | None,
+            page_size: int
+    ) -> Page[Row]:
+        # Plain rows of the listed columns: no Discussion instance is built or put into the identity map.
+        statement = select(Discussion.title, Discussion.category)
+        if category_list is not None:
+            statement = statement.where(Discussion.category.in_(category_list))
+        if category_list is not None and len(category_list) == 1:
+            key_columns = (Discussion.title,)
+        else:
+            key_columns = (Discussion.category, Discussion.title)
+        return fetch_keyset_row_page(statement, key_columns, cursor, page_size, db_session)
+
+    def list_titles(
+            self,
+            db_session: Session,
+            category_list: List[str] = None,
+            cursor: str = None,
+            page_size: int = DEFAULT_PAGE_SIZE
+    ) -> Page[str]:
+        return self._list_rows(db_session, category_list, cursor, page_size).map(attrgetter("title"))
+
+    def list_summaries(
+            self,
+            db_session: Session,
+            category_list: List[str] = None,
+            cursor: str = None,
+            page_size: int = DEFAULT_PAGE_SIZE
+    ) -> Page[Row]:
+        return self._list_rows(db_session, category_list, cursor, page_size)
+
+    def search(
+            self,
+            query: str,
+            db_session: Session,
+            load_profile: LoadProfile = LoadProfile.BARE,
+            cursor: str = None,
+            page_size: int = DEFAULT_PAGE_SIZE
+    ) -> Page[Discussion]:
+        return fetch_search_page(
+            Discussion,
+            query,
+            (),
+            loader_options(load_profile, self._options_by_profile),
+            cursor,
+            page_size,
+            db_session
+        )
+
+    def find_similar_titles(
+            self,
+            prefix_or_text: str,
+            db_session: Session,
+            limit: int = DEFAULT_SIMILAR_TITLES_LIMIT
+    ) -> List[str]:
+        return fetch_similar_titles(Discussion.title, prefix_or_text, (), limit, db_session)
+
+    def save(self, discussion: SaveDiscussionDTO, db_session: Session) -> WriteOutcome:
+        write = begin_write(db_session)
+        try:
+            saved_title = db_session.scalar(
+                dialect_insert(Discussion, db_session)
+                .values(
+                    title=discussion.title, description=discussion.description, category=discussion.category,
+                    sender_login=discussion.sender_login
                 )
-                db_session.commit()
-            except DBAPIError as ex:
-                db_session.rollback()
-                logger.error(
-                    f"In save error was occurred: {ex.args[0]}. Discussion wes not saved, transaction "
-                    f"was rolled back."
+                .on_conflict_do_nothing(index_elements=[Discussion.title])
+                .returning(Discussion.title)
+            )
+            if saved_title is None:
+                write.rollback()
+                logger.warning(f"In save: Discussion with title {discussion.title} already exists.")
+                return WriteOutcome.ALREADY_EXISTS
+            apply_category_deltas(DiscussionCategory, discussion_deltas([discussion.category], 1), db_session)
+            write.commit()
+            return WriteOutcome.WRITTEN
+        except DBAPIError as ex:
+            write.rollback()
+            logger.error(
+                f"In save error was occurred: {ex.args[0]}. Discussion wes not saved, write "
+                f"was rolled back."
+            )
+            return WriteOutcome.FAILED
+
+    def save_many(self, discussion_list: List[SaveDiscussionDTO], db_session: Session) -> List[WriteOutcome]:
+        senders = existing_keys(User.login, (discussion.sender_login for discussion in discussion_list), db_session)
+        repeated = repeated_positions([discussion.title for discussion in discussion_list])
+        discussions_to_save = [
+            discussion for position, discussion in enumerate(discussion_list)
+            if position not in repeated and discussion.sender_login in senders
+        ]
+        saved_titles = set()
+        write = begin_write(db_session)
+        try:
+            if discussions_to_save:
+                saved_rows = db_session.execute(
+                    dialect_insert(Discussion, db_session)
+                    .values([
+                        {
+                            "title": discussion.title, "description": discussion.description,
+                            "category": discussion.category, "sender_login": discussion.sender_login
+                        }
+                        for discussion in discussions_to_save
+                    ])
+                    .on_conflict_do_nothing(index_elements=[Discussion.title])
+                    .returning(Discussion.title, Discussion.category)
+                ).all()
+                saved_titles = {row.title for row in saved_rows}
+                apply_category_deltas(
+                    DiscussionCategory, discussion_deltas([row.category for row in saved_rows], 1), db_session
                 )
-        else:
-            logger.error(f"In save error was occurred: Discussion with title {discussion.title} already exists.")
-            raise ValueError("Discussion already exists")
+            write.commit()
+        except DBAPIError as ex:
+            write.rollback()
+            logger.error(
+                f"In save_many error was occurred: {ex.args[0]}. Discussions were not saved, write "
+                f"was rolled back."
+            )
+            return [WriteOutcome.FAILED] * len(discussion_list)
+        outcomes = []
+        for position, discussion in enumerate(discussion_list):
+            if discussion.sender_login not in senders:
+                outcomes.append(WriteOutcome.NOT_FOUND)
+            elif position not in repeated and discussion.title in saved_titles:
+                outcomes.append(WriteOutcome.WRITTEN)
+            else:
+                outcomes.append(WriteOutcome.ALREADY_EXISTS)
+        return outcomes
 
     @staticmethod
     def _define_dict_to_update(discussion: PatchDiscussionDTO) -> Dict:
@@ -81,50 +288,182 @@ class SQLAlchemyDiscussionDAL(DiscussionDALInterface):
             dict_to_update["category"] = discussion.category
         return dict_to_update
 
-    def patch(self, discussion: PatchDiscussionDTO, db_session: Session) -> None:
-        if self.get_by_title(discussion.old_title, db_session):
-            try:
+    def patch(self, discussion: PatchDiscussionDTO, db_session: Session) -> WriteOutcome:
+        values = self._define_dict_to_update(discussion)
+        if "category" in values:
+            # The catalog has to know the category being replaced, the locked batch path reads it.
+            return self.patch_many([discussion], db_session)[0]
+        if not values:
+            if self.get_by_title(discussion.old_title, db_session) is None:
+                return WriteOutcome.NOT_FOUND
+            return WriteOutcome.UNCHANGED
+        write = begin_write(db_session)
+        try:
+            patched_title = db_session.scalar(
+                update(Discussion)
+                .where(Discussion.title == discussion.old_title)
+                .values(**values)
+                .returning(Discussion.title)
+            )
+            write.commit()
+        except IntegrityError:
+            write.rollback()
+            logger.warning(f"In patch: Discussion with title {discussion.new_title} already exists.")
+            return WriteOutcome.ALREADY_EXISTS
+        except DBAPIError as ex:
+            write.rollback()
+            logger.error(
+                f"In patch error was occurred: {ex.args[0]}. Discussion was not patched, write "
+                f"was rolled back."
+            )
+            return WriteOutcome.FAILED
+        return WriteOutcome.NOT_FOUND if patched_title is None else WriteOutcome.WRITTEN
+
+    def patch_many(self, discussion_list: List[PatchDiscussionDTO], db_session: Session) -> List[WriteOutcome]:
+        try:
+            return self._patch_many(discussion_list, db_session, raise_title_conflict=True)
+        except IntegrityError:
+            # A new title was taken by a concurrent write after the check, the check of the second run sees it.
+            return self._patch_many(discussion_list, db_session, raise_title_conflict=False)
+
+    def _patch_many(
+            self,
+            discussion_list: List[PatchDiscussionDTO],
+            db_session: Session,
+            raise_title_conflict: bool
+    ) -> List[WriteOutcome]:
+        repeated = repeated_positions([discussion.old_title for discussion in discussion_list])
+        outcomes, updates, deltas = [], [], Counter()
+        write = begin_write(db_session)
+        try:
+            # Rows are locked in title order, so two batches touching the same discussions cannot deadlock.
+            old_categories = dict(
                 db_session.execute(
-                    update(Discussion)
-                    .where(Discussion.title == discussion.old_title)
-                    .values(**self._define_dict_to_update(discussion))
-                )
-                db_session.commit()
-            except DBAPIError as ex:
-                db_session.rollback()
-                logger.error(
-                    f"In patch error was occurred: {ex.args[0]}. Discussion was not patched, transaction "
-                    f"was rolled back."
-                )
+                    select(Discussion.title, Discussion.category)
+                    .where(Discussion.title.in_({discussion.old_title for discussion in discussion_list}))
+                    .order_by(Discussion.title)
+                    .with_for_update()
+                ).all()
+            )
+            title_owners = key_owners(
+                Discussion.title, Discussion.title, (discussion.new_title for discussion in discussion_list), db_session
+            )
+            for position, discussion in enumerate(discussion_list):
+                old_category = old_categories.get(discussion.old_title)
+                values = self._define_dict_to_update(discussion)
+                if old_category is None:
+                    outcomes.append(WriteOutcome.NOT_FOUND)
+                elif position in repeated:
+                    logger.error(
+                        f"In patch_many error was occurred: Discussion {discussion.old_title} is patched twice."
+                    )
+                    outcomes.append(WriteOutcome.FAILED)
+                elif not values:
+                    outcomes.append(WriteOutcome.UNCHANGED)
+                elif title_owners.get(discussion.new_title, discussion.old_title) != discussion.old_title:
+                    logger.warning(f"In patch_many: Discussion with title {discussion.new_title} already exists.")
+                    outcomes.append(WriteOutcome.ALREADY_EXISTS)
+                else:
+                    if discussion.new_title is not None:
+                        title_owners[discussion.new_title] = discussion.old_title
+                    updates.append((discussion.old_title, values))
+                    deltas.update(discussion_deltas([old_category], -1))
+                    deltas.update(discussion_deltas([discussion.category or old_category], 1))
+                    outcomes.append(WriteOutcome.WRITTEN)
+            execute_grouped_updates(Discussion.title, updates, db_session)
+            apply_category_deltas(DiscussionCategory, deltas, db_session)
+            write.commit()
+        except DBAPIError as ex:
+            write.rollback()
+            if raise_title_conflict and isinstance(ex, IntegrityError):
+                raise
+            logger.error(
+                f"In patch_many error was occurred: {ex.args[0]}. Discussions were not patched, write "
+                f"was rolled back."
+            )
+            return [WriteOutcome.FAILED] * len(discussion_list)
+        return outcomes
+
+    def delete_by_id(self, id: int, db_session: Session) -> None:
+        write = begin_write(db_session)
+        try:
+            deleted_categories = db_session.scalars(
+                delete(Discussion)
+                .where(Discussion.id == id)
+                .returning(Discussion.category)
+            )
+            apply_category_deltas(DiscussionCategory, discussion_deltas(deleted_categories, -1), db_session)
+            write.commit()
+        except DBAPIError as ex:
+            write.rollback()
+            logger.error(
+                f"In delete_by_id error was occurred: {ex.args[0]}. Discussion was not deleted, write "
+                f"was rolled back."
+            )
+
+    def delete_by_id_list(self, id_list: List[int], db_session: Session) -> None:
+        write = begin_write(db_session)
+        try:
+            deleted_categories = db_session.scalars(
+                delete(Discussion)
+                .where(Discussion.id.in_(id_list))
+                .returning(Discussion.category)
+            )
+            apply_category_deltas(DiscussionCategory, discussion_deltas(deleted_categories, -1), db_session)
+            write.commit()
+        except DBAPIError as ex:
+            write.rollback()
+            logger.error(
+                f"In delete_by_id_list error was occurred: {ex.args[0]}. Discussions were not deleted, write "
+                f"was rolled back."
+            )
 
     def delete_by_title(self, title: str, db_session: Session) -> None:
+        write = begin_write(db_session)
         try:
-            db_session.execute(
+            deleted_categories = db_session.scalars(
                 delete(Discussion)
                 .where(Discussion.title == title)
+                .returning(Discussion.category)
             )
-            db_session.commit()
+            apply_category_deltas(DiscussionCategory, discussion_deltas(deleted_categories, -1), db_session)
+            write.commit()
         except DBAPIError as ex:
-            db_session.rollback()
+            write.rollback()
             logger.error(
-                f"In delete_by_title error was occurred: {ex.args[0]}. Discussion was not deleted, transaction "
+                f"In delete_by_title error was occurred: {ex.args[0]}. Discussion was not deleted, write "
                 f"was rolled back."
             )
 
     def delete_by_title_list(self, title_list: List[str], db_session: Session) -> None:
+        write = begin_write(db_session)
         try:
-            db_session.execute(
+            deleted_categories = db_session.scalars(
                 delete(Discussion)
                 .where(Discussion.title.in_(title_list))
+                .returning(Discussion.category)
             )
-            db_session.commit()
+            apply_category_deltas(DiscussionCategory, discussion_deltas(deleted_categories, -1), db_session)
+            write.commit()
         except DBAPIError as ex:
-            db_session.rollback()
+            write.rollback()
             logger.error(
-                f"In delete_by_title_list error was occurred: {ex.args[0]}. Discussions were not deleted, transaction "
+                f"In delete_by_title_list error was occurred: {ex.args[0]}. Discussions were not deleted, write "
                 f"was rolled back."
             )
 
+    def rebuild_categories(self, db_session: Session) -> None:
+        write = begin_write(db_session)
+        try:
+            rebuild_discussion_catalog(db_session)
+            write.commit()
+        except DBAPIError as ex:
+            write.rollback()
+            logger.error(
+                f"In rebuild_categories error was occurred: {ex.args[0]}. Discussion categories were not rebuilt, "
+                f"write was rolled back."
+            )
+
 
 if __name__ == "__main__":
     from sqlalchemy import create_engine
@@ -149,4 +488,6 @@ if __name__ == "__main__":
         discussion = discussion_dal.get_by_title("Fready Fazber discussion", session)
         print(discussion)
         print(discussion_dal.get_by_title("Fready Fazber discussion", session))
+        # The DAL only stages the writes, they are committed by the caller.
+        session.commit()
         #discussion_dal.delete_by_title_list(["Fready Fazber discussion"])
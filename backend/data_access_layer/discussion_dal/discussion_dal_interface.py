@@ -1,7 +1,12 @@
 #Author: Vodohleb04
 from abc import ABC, abstractmethod
-from typing import List, Sequence
+from typing import List, Sequence, Tuple
+from sqlalchemy import Row
 from sqlalchemy.orm import Session
+from backend.data_access_layer.batch_write import WriteOutcome
+from backend.data_access_layer.load_profile import LoadProfile
+from backend.data_access_layer.page import Page, DEFAULT_PAGE_SIZE
+from backend.data_access_layer.search.similar_titles import DEFAULT_SIMILAR_TITLES_LIMIT
 from backend.data_layer.mapped_database import Discussion
 from backend.data_access_layer.discussion_dal.save_discussion_dto import SaveDiscussionDTO
 from backend.data_access_layer.discussion_dal.patch_discussion_dto import PatchDiscussionDTO
@@ -14,31 +19,139 @@ class DiscussionDALInterface(ABC):
         raise NotImplementedError
 
     @abstractmethod
-    def get_all(self, db_session: Session) -> Sequence[Discussion] | None:
+    def get_category_counts(self, db_session: Session) -> Sequence[Tuple[str, int]]:
         raise NotImplementedError
 
     @abstractmethod
-    def get_by_title(self, title: str, db_session: Session) -> Discussion | None:
+    def get_all(
+            self,
+            db_session: Session,
+            load_profile: LoadProfile = LoadProfile.BARE,
+            cursor: str = None,
+            page_size: int = DEFAULT_PAGE_SIZE
+    ) -> Page[Discussion]:
         raise NotImplementedError
 
     @abstractmethod
-    def get_by_title_list(self, title_list: List[str], db_session: Session) -> Sequence[Discussion] | None:
+    def get_by_id(
+            self,
+            id: int,
+            db_session: Session,
+            load_profile: LoadProfile = LoadProfile.BARE
+    ) -> Discussion | None:
         raise NotImplementedError
 
     @abstractmethod
-    def get_by_category(self, category: str, db_session: Session) -> Sequence[Discussion] | None:
+    def get_by_id_list(
+            self,
+            id_list: List[int],
+            db_session: Session,
+            load_profile: LoadProfile = LoadProfile.BARE
+    ) -> Sequence[Discussion] | None:
         raise NotImplementedError
 
     @abstractmethod
-    def get_by_category_list(self, category_list: List[str], db_session: Session) -> Sequence[Discussion] | None:
+    def get_by_title(
+            self,
+            title: str,
+            db_session: Session,
+            load_profile: LoadProfile = LoadProfile.BARE
+    ) -> Discussion | None:
         raise NotImplementedError
 
     @abstractmethod
-    def save(self, discussion: SaveDiscussionDTO, db_session: Session) -> None:
+    def get_by_title_list(
+            self,
+            title_list: List[str],
+            db_session: Session,
+            load_profile: LoadProfile = LoadProfile.BARE
+    ) -> Sequence[Discussion] | None:
         raise NotImplementedError
 
     @abstractmethod
-    def patch(self, discussion: PatchDiscussionDTO, db_session: Session) -> None:
+    def get_by_category(
+            self,
+            category: str,
+            db_session: Session,
+            load_profile: LoadProfile = LoadProfile.BARE,
+            cursor: str = None,
+            page_size: int = DEFAULT_PAGE_SIZE
+    ) -> Page[Discussion]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_by_category_list(
+            self,
+            category_list: List[str],
+            db_session: Session,
+            load_profile: LoadProfile = LoadProfile.BARE,
+            cursor: str = None,
+            page_size: int = DEFAULT_PAGE_SIZE
+    ) -> Page[Discussion]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def list_titles(
+            self,
+            db_session: Session,
+            category_list: List[str] = None,
+            cursor: str = None,
+            page_size: int = DEFAULT_PAGE_SIZE
+    ) -> Page[str]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def list_summaries(
+            self,
+            db_session: Session,
+            category_list: List[str] = None,
+            cursor: str = None,
+            page_size: int = DEFAULT_PAGE_SIZE
+    ) -> Page[Row]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def search(
+            self,
+            query: str,
+            db_session: Session,
+            load_profile: LoadProfile = LoadProfile.BARE,
+            cursor: str = None,
+            page_size: int = DEFAULT_PAGE_SIZE
+    ) -> Page[Discussion]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def find_similar_titles(
+            self,
+            prefix_or_text: str,
+            db_session: Session,
+            limit: int = DEFAULT_SIMILAR_TITLES_LIMIT
+    ) -> List[str]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def save(self, discussion: SaveDiscussionDTO, db_session: Session) -> WriteOutcome:
+        raise NotImplementedError
+
+    @abstractmethod
+    def save_many(self, discussion_list: List[SaveDiscussionDTO], db_session: Session) -> List[WriteOutcome]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def patch(self, discussion: PatchDiscussionDTO, db_session: Session) -> WriteOutcome:
+        raise NotImplementedError
+
+    @abstractmethod
+    def patch_many(self, discussion_list: List[PatchDiscussionDTO], db_session: Session) -> List[WriteOutcome]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def delete_by_id(self, id: int, db_session: Session) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def delete_by_id_list(self, id_list: List[int], db_session: Session) -> None:
         raise NotImplementedError
 
     @abstractmethod
@@ -48,3 +161,7 @@ class DiscussionDALInterface(ABC):
     @abstractmethod
     def delete_by_title_list(self, title_list: List[str], db_session: Session) -> None:
         raise NotImplementedError
+
+    @abstractmethod
+    def rebuild_categories(self, db_session: Session) -> None:
+        raise NotImplementedError
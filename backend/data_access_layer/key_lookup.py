@@ -0,0 +1,30 @@
+#Author: Vodohleb04
+from typing import Any, Dict, Sequence
+from sqlalchemy import Select, bindparam, select
+from sqlalchemy.orm import Session
+from backend.data_access_layer.load_profile import LoadProfile
+
+KEY_PARAMETER = "key"
+
+
+class KeyLookup:
+    # select(entity).where(key == :key).limit(1) of every load profile, built once when the DAL class is defined.
+    # A call only binds the key: the construct, its loader options and its cache key are not rebuilt, and the SQL
+    # text is the same for every key, which lets drivers with statement caches (asyncpg, psycopg 3) prepare it.
+
+    def __init__(self, key_column, options_by_profile: Dict[LoadProfile, Sequence]):
+        self.__statements = {
+            load_profile: select(key_column.class_)
+            .where(key_column == bindparam(KEY_PARAMETER))
+            .options(*options)
+            .limit(1)
+            for load_profile, options in options_by_profile.items()
+        }
+
+    def statement(self, load_profile: LoadProfile) -> Select:
+        if load_profile not in self.__statements:
+            raise ValueError(f"Load profile {load_profile} is not supported here")
+        return self.__statements[load_profile]
+
+    def get(self, key: Any, db_session: Session, load_profile: LoadProfile = LoadProfile.BARE) -> Any:
+        return db_session.scalar(self.statement(load_profile), {KEY_PARAMETER: key})
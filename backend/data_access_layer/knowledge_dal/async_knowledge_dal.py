@@ -0,0 +1,7 @@
+#Author: Vodohleb04
+from backend.data_layer.run_sync_adapter import RunSyncAdapter
+from backend.data_access_layer.knowledge_dal.knowledge_dal_interface import KnowledgeDALInterface
+
+
+class AsyncKnowledgeDAL(RunSyncAdapter, interface=KnowledgeDALInterface):
+    pass
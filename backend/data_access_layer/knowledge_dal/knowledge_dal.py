@@ -1,43 +1,102 @@
 #Author: Vodohleb04
 import logging
-from typing import Sequence, List, Dict
-from sqlalchemy import insert, select, update, delete, and_
-from sqlalchemy.exc import DBAPIError
-from sqlalchemy.orm import Session
+from collections import Counter
+from operator import attrgetter
+from typing import Sequence, List, Dict, Tuple
+from sqlalchemy import Row, select, update, delete, and_
+from sqlalchemy.exc import DBAPIError, IntegrityError
+from sqlalchemy.orm import Session, joinedload
+from backend.data_access_layer.batch_write import (
+    WriteOutcome, existing_keys, key_owners, repeated_positions, execute_grouped_updates, begin_write
+)
+from backend.data_access_layer.category_catalog import (
+    apply_category_deltas, knowledge_deltas, knowledge_count_column, rebuild_knowledge_catalog
+)
+from backend.data_access_layer.dialect_insert import dialect_insert
+from backend.data_access_layer.key_lookup import KeyLookup
+from backend.data_access_layer.load_profile import LoadProfile, loader_options
+from backend.data_access_layer.page import Page, DEFAULT_PAGE_SIZE, fetch_keyset_page, fetch_keyset_row_page
+from backend.data_access_layer.search.full_text_search import fetch_search_page
+from backend.data_access_layer.search.similar_titles import fetch_similar_titles, DEFAULT_SIMILAR_TITLES_LIMIT
 from backend.data_access_layer.knowledge_dal.patch_knowledge_dto import PatchKnowledgeDTO
 from backend.data_access_layer.knowledge_dal.save_knowledge_dto import SaveKnowledgeDTO
 from backend.data_access_layer.knowledge_dal.knowledge_dal_interface import KnowledgeDALInterface
-from backend.data_layer.mapped_database import Knowledge, KnowledgeStatus
+from backend.data_layer.mapped_database import Knowledge, KnowledgeStatus, KnowledgeCategory, User
 
 logger = logging.getLogger(__name__)
 
 
 class SQLAlchemyKnowledgeDAL(KnowledgeDALInterface):
 
-    def get_categories(self, db_session: Session, status: KnowledgeStatus = None) -> Sequence[str] | None:
+    _options_by_profile = {
+        LoadProfile.BARE: (),
+        LoadProfile.WITH_SENDER: (joinedload(Knowledge.knowledge_sender),)
+    }
+    _by_id = KeyLookup(Knowledge.id, _options_by_profile)
+    _by_title = KeyLookup(Knowledge.title, _options_by_profile)
+
+    @staticmethod
+    def _category_count(status: KnowledgeStatus | None):
         if status is None:
-            return db_session.scalars(
-                select(Knowledge.category).distinct(Knowledge.category)
-            ).all()
+            return KnowledgeCategory.in_processing_count + KnowledgeCategory.published_count
         else:
-            return db_session.scalars(
-                select(Knowledge.category).where(Knowledge.status == status).distinct(Knowledge.category)
-            ).all()
+            return getattr(KnowledgeCategory, knowledge_count_column(status))
 
-    def get_by_title(self, title: str, db_session: Session) -> Knowledge | None:
-        return db_session.scalar(
-            select(Knowledge).where(Knowledge.title == title).limit(1)
-        )
+    def get_categories(self, db_session: Session, status: KnowledgeStatus = None) -> Sequence[str] | None:
+        return db_session.scalars(
+            select(KnowledgeCategory.category)
+            .where(self._category_count(status) > 0)
+            .order_by(KnowledgeCategory.category)
+        ).all()
+
+    def get_category_counts(self, db_session: Session, status: KnowledgeStatus = None) -> Sequence[Tuple[str, int]]:
+        count = self._category_count(status)
+        return db_session.execute(
+            select(KnowledgeCategory.category, count)
+            .where(count > 0)
+            .order_by(KnowledgeCategory.category)
+        ).all()
+
+    def get_by_id(
+            self,
+            id: int,
+            db_session: Session,
+            load_profile: LoadProfile = LoadProfile.BARE
+    ) -> Knowledge | None:
+        return self._by_id.get(id, db_session, load_profile)
+
+    def get_by_id_list(
+            self,
+            id_list: List[int],
+            db_session: Session,
+            load_profile: LoadProfile = LoadProfile.BARE
+    ) -> Sequence[Knowledge] | None:
+        return db_session.scalars(
+            select(Knowledge)
+            .where(Knowledge.id.in_(id_list))
+            .options(*loader_options(load_profile, self._options_by_profile))
+        ).all()
+
+    def get_by_title(
+            self,
+            title: str,
+            db_session: Session,
+            load_profile: LoadProfile = LoadProfile.BARE
+    ) -> Knowledge | None:
+        return self._by_title.get(title, db_session, load_profile)
 
     def get_by_title_list(
             self,
             title_list: List[str],
             db_session: Session,
-            status: KnowledgeStatus = None
+            status: KnowledgeStatus = None,
+            load_profile: LoadProfile = LoadProfile.BARE
     ) -> Sequence[Knowledge] | None:
         if status is None:
             return db_session.scalars(
-                select(Knowledge).where(Knowledge.title.in_(title_list))
+                select(Knowledge)
+                .where(Knowledge.title.in_(title_list))
+                .options(*loader_options(load_profile, self._options_by_profile))
             ).all()
         else:
             return db_session.scalars(
@@ -48,80 +107,247 @@ class SQLAlchemyKnowledgeDAL(KnowledgeDALInterface):
                         Knowledge.status == status
                     )
                 )
+                .options(*loader_options(load_profile, self._options_by_profile))
             ).all()
 
     def get_by_category(
             self,
             category: str,
             db_session: Session,
-            status: KnowledgeStatus = None
-    ) -> Sequence[Knowledge] | None:
-        if status is None:
-            return db_session.scalars(
-                select(Knowledge).where(Knowledge.category == category)
-            ).all()
-        else:
-            return db_session.scalars(
-                select(Knowledge)
-                .where(
-                    and_(Knowledge.category == category, Knowledge.status == status)
-                )
-            ).all()
+            status: KnowledgeStatus = None,
+            load_profile: LoadProfile = LoadProfile.BARE,
+            cursor: str = None,
+            page_size: int = DEFAULT_PAGE_SIZE
+    ) -> Page[Knowledge]:
+        statement = (
+            select(Knowledge)
+            .where(Knowledge.category == category)
+            .options(*loader_options(load_profile, self._options_by_profile))
+        )
+        if status is not None:
+            statement = statement.where(Knowledge.status == status)
+        return fetch_keyset_page(statement, (Knowledge.title,), cursor, page_size, db_session)
 
     def get_by_category_list(
             self,
             category_list: List[str],
             db_session: Session,
-            status: KnowledgeStatus = None
-    ) -> Sequence[Knowledge] | None:
-        if status is None:
-            return db_session.scalars(
-                select(Knowledge).where(Knowledge.category.in_(category_list))
-            ).all()
+            status: KnowledgeStatus = None,
+            load_profile: LoadProfile = LoadProfile.BARE,
+            cursor: str = None,
+            page_size: int = DEFAULT_PAGE_SIZE
+    ) -> Page[Knowledge]:
+        statement = (
+            select(Knowledge)
+            .where(Knowledge.category.in_(category_list))
+            .options(*loader_options(load_profile, self._options_by_profile))
+        )
+        if status is not None:
+            statement = statement.where(Knowledge.status == status)
+        return fetch_keyset_page(statement, (Knowledge.category, Knowledge.title), cursor, page_size, db_session)
+
+    def get_all(
+            self,
+            db_session: Session,
+            load_profile: LoadProfile = LoadProfile.BARE,
+            cursor: str = None,
+            page_size: int = DEFAULT_PAGE_SIZE
+    ) -> Page[Knowledge]:
+        return fetch_keyset_page(
+            select(Knowledge).options(*loader_options(load_profile, self._options_by_profile)),
+            (Knowledge.category, Knowledge.title),
+            cursor,
+            page_size,
+            db_session
+        )
+
+    def _get_by_status(
+            self,
+            status: KnowledgeStatus,
+            db_session: Session,
+            load_profile: LoadProfile,
+            cursor: str | None,
+            page_size: int
+    ) -> Page[Knowledge]:
+        return fetch_keyset_page(
+            select(Knowledge)
+            .where(Knowledge.status == status)
+            .options(*loader_options(load_profile, self._options_by_profile)),
+            (Knowledge.category, Knowledge.title),
+            cursor,
+            page_size,
+            db_session
+        )
+
+    def get_published(
+            self,
+            db_session: Session,
+            load_profile: LoadProfile = LoadProfile.BARE,
+            cursor: str = None,
+            page_size: int = DEFAULT_PAGE_SIZE
+    ) -> Page[Knowledge]:
+        return self._get_by_status(KnowledgeStatus.PUBLISHED, db_session, load_profile, cursor, page_size)
+
+    def get_in_processing(
+            self,
+            db_session: Session,
+            load_profile: LoadProfile = LoadProfile.BARE,
+            cursor: str = None,
+            page_size: int = DEFAULT_PAGE_SIZE
+    ) -> Page[Knowledge]:
+        return self._get_by_status(KnowledgeStatus.IN_PROCESSING, db_session, load_profile, cursor, page_size)
+
+    @staticmethod
+    def _list_rows(
+            db_session: Session,
+            status: KnowledgeStatus | None,
+            category_list: List[str] | None,
+            cursor: str | None,
+            page_size: int
+    ) -> Page[Row]:
+        # Plain rows of the listed columns: no Knowledge instance is built or put into the identity map.
+        statement = select(Knowledge.title, Knowledge.category)
+        if status is not None:
+            statement = statement.where(Knowledge.status == status)
+        if category_list is not None:
+            statement = statement.where(Knowledge.category.in_(category_list))
+        if category_list is not None and len(category_list) == 1:
+            key_columns = (Knowledge.title,)
         else:
-            return db_session.scalars(
-                select(Knowledge)
-                .where(
-                    and_(
-                        Knowledge.category.in_(category_list),
-                        Knowledge.status == status
-                    )
-                )
-            ).all()
+            key_columns = (Knowledge.category, Knowledge.title)
+        return fetch_keyset_row_page(statement, key_columns, cursor, page_size, db_session)
 
-    def get_all(self, db_session: Session) -> Sequence[Knowledge] | None:
-        return db_session.scalars(select(Knowledge)).all()
+    def list_titles(
+            self,
+            db_session: Session,
+            status: KnowledgeStatus = None,
+            category_list: List[str] = None,
+            cursor: str = None,
+            page_size: int = DEFAULT_PAGE_SIZE
+    ) -> Page[str]:
+        return self._list_rows(db_session, status, category_list, cursor, page_size).map(attrgetter("title"))
 
-    def get_published(self, db_session: Session) -> Sequence[Knowledge] | None:
-        return db_session.scalars(
-            select(Knowledge).where(Knowledge.status == KnowledgeStatus.PUBLISHED)
-        ).all()
+    def list_summaries(
+            self,
+            db_session: Session,
+            status: KnowledgeStatus = None,
+            category_list: List[str] = None,
+            cursor: str = None,
+            page_size: int = DEFAULT_PAGE_SIZE
+    ) -> Page[Row]:
+        return self._list_rows(db_session, status, category_list, cursor, page_size)
 
-    def get_in_processing(self, db_session: Session) -> Sequence[Knowledge] | None:
-        return db_session.scalars(
-            select(Knowledge).where(Knowledge.status == KnowledgeStatus.IN_PROCESSING)
-        ).all()
+    def search(
+            self,
+            query: str,
+            db_session: Session,
+            status: KnowledgeStatus = None,
+            load_profile: LoadProfile = LoadProfile.BARE,
+            cursor: str = None,
+            page_size: int = DEFAULT_PAGE_SIZE
+    ) -> Page[Knowledge]:
+        return fetch_search_page(
+            Knowledge,
+            query,
+            () if status is None else (Knowledge.status == status,),
+            loader_options(load_profile, self._options_by_profile),
+            cursor,
+            page_size,
+            db_session
+        )
 
-    def save(self, knowledge: SaveKnowledgeDTO, db_session: Session) -> None:
-        if self.get_by_title(knowledge.title, db_session) is None:
-            try:
-                db_session.execute(
-                    insert(Knowledge)
-                    .values(
-                        title=knowledge.title, description=knowledge.description, link=knowledge.link,
-                        category=knowledge.category, sender_login=knowledge.sender_login
-                    )
+    def find_similar_titles(
+            self,
+            prefix_or_text: str,
+            db_session: Session,
+            status: KnowledgeStatus = None,
+            limit: int = DEFAULT_SIMILAR_TITLES_LIMIT
+    ) -> List[str]:
+        return fetch_similar_titles(
+            Knowledge.title,
+            prefix_or_text,
+            () if status is None else (Knowledge.status == status,),
+            limit,
+            db_session
+        )
+
+    def save(self, knowledge: SaveKnowledgeDTO, db_session: Session) -> WriteOutcome:
+        write = begin_write(db_session)
+        try:
+            saved_title = db_session.scalar(
+                dialect_insert(Knowledge, db_session)
+                .values(
+                    title=knowledge.title, description=knowledge.description, link=knowledge.link,
+                    category=knowledge.category, sender_login=knowledge.sender_login
                 )
-                db_session.commit()
-            except DBAPIError as ex:
-                db_session.rollback()
-                logger.error(
-                    f"In save error was occurred: {ex.args[0]}. Knowledge was not saved, transaction "
-                    f"was rolled back."
+                .on_conflict_do_nothing(index_elements=[Knowledge.title])
+                .returning(Knowledge.title)
+            )
+            if saved_title is None:
+                write.rollback()
+                logger.warning(f"In save: Knowledge with title {knowledge.title} already exists.")
+                return WriteOutcome.ALREADY_EXISTS
+            apply_category_deltas(
+                KnowledgeCategory,
+                knowledge_deltas([(knowledge.category, KnowledgeStatus.IN_PROCESSING)], 1),
+                db_session
+            )
+            write.commit()
+            return WriteOutcome.WRITTEN
+        except DBAPIError as ex:
+            write.rollback()
+            logger.error(
+                f"In save error was occurred: {ex.args[0]}. Knowledge was not saved, write "
+                f"was rolled back."
+            )
+            return WriteOutcome.FAILED
+
+    def save_many(self, knowledge_list: List[SaveKnowledgeDTO], db_session: Session) -> List[WriteOutcome]:
+        senders = existing_keys(User.login, (knowledge.sender_login for knowledge in knowledge_list), db_session)
+        repeated = repeated_positions([knowledge.title for knowledge in knowledge_list])
+        knowledge_to_save = [
+            knowledge for position, knowledge in enumerate(knowledge_list)
+            if position not in repeated and knowledge.sender_login in senders
+        ]
+        saved_titles = set()
+        write = begin_write(db_session)
+        try:
+            if knowledge_to_save:
+                saved_rows = db_session.execute(
+                    dialect_insert(Knowledge, db_session)
+                    .values([
+                        {
+                            "title": knowledge.title, "description": knowledge.description, "link": knowledge.link,
+                            "category": knowledge.category, "sender_login": knowledge.sender_login
+                        }
+                        for knowledge in knowledge_to_save
+                    ])
+                    .on_conflict_do_nothing(index_elements=[Knowledge.title])
+                    .returning(Knowledge.title, Knowledge.category)
+                ).all()
+                saved_titles = {row.title for row in saved_rows}
+                apply_category_deltas(
+                    KnowledgeCategory,
+                    knowledge_deltas([(row.category, KnowledgeStatus.IN_PROCESSING) for row in saved_rows], 1),
+                    db_session
                 )
-        else:
-            logger.error(f"In save error was occurred: Knowledge with title {knowledge.title} already exists.")
-            raise ValueError("Knowledge already exists")
+            write.commit()
+        except DBAPIError as ex:
+            write.rollback()
+            logger.error(
+                f"In save_many error was occurred: {ex.args[0]}. Knowledge were not saved, write "
+                f"was rolled back."
+            )
+            return [WriteOutcome.FAILED] * len(knowledge_list)
+        outcomes = []
+        for position, knowledge in enumerate(knowledge_list):
+            if knowledge.sender_login not in senders:
+                outcomes.append(WriteOutcome.NOT_FOUND)
+            elif position not in repeated and knowledge.title in saved_titles:
+                outcomes.append(WriteOutcome.WRITTEN)
+            else:
+                outcomes.append(WriteOutcome.ALREADY_EXISTS)
+        return outcomes
 
     @staticmethod
     def _define_dict_to_update(knowledge: PatchKnowledgeDTO) -> Dict:
@@ -138,53 +364,217 @@ class SQLAlchemyKnowledgeDAL(KnowledgeDALInterface):
             dict_to_update["category"] = knowledge.category
         return dict_to_update
 
-    def patch(self, knowledge: PatchKnowledgeDTO, db_session: Session) -> None:
-        if self.get_by_title(knowledge.old_title, db_session):
-            try:
-                db_session.execute(
-                    update(Knowledge)
-                    .where(Knowledge.title == knowledge.old_title)
-                    .values(**self._define_dict_to_update(knowledge))
-                )
-                db_session.commit()
-            except DBAPIError as ex:
-                db_session.rollback()
-                logger.error(
-                    f"In patch error was occurred: {ex.args[0]}. Knowledge was not patched, transaction "
-                    f"was rolled back."
+    def patch(self, knowledge: PatchKnowledgeDTO, db_session: Session) -> WriteOutcome:
+        values = self._define_dict_to_update(knowledge)
+        if "category" in values or "status" in values:
+            # The catalog has to know the category and status being replaced, the locked batch path reads them.
+            return self.patch_many([knowledge], db_session)[0]
+        if not values:
+            if self.get_by_title(knowledge.old_title, db_session) is None:
+                return WriteOutcome.NOT_FOUND
+            return WriteOutcome.UNCHANGED
+        write = begin_write(db_session)
+        try:
+            patched_title = db_session.scalar(
+                update(Knowledge)
+                .where(Knowledge.title == knowledge.old_title)
+                .values(**values)
+                .returning(Knowledge.title)
+            )
+            write.commit()
+        except IntegrityError:
+            write.rollback()
+            logger.warning(f"In patch: Knowledge with title {knowledge.new_title} already exists.")
+            return WriteOutcome.ALREADY_EXISTS
+        except DBAPIError as ex:
+            write.rollback()
+            logger.error(
+                f"In patch error was occurred: {ex.args[0]}. Knowledge was not patched, write "
+                f"was rolled back."
+            )
+            return WriteOutcome.FAILED
+        return WriteOutcome.NOT_FOUND if patched_title is None else WriteOutcome.WRITTEN
+
+    def patch_many(self, knowledge_list: List[PatchKnowledgeDTO], db_session: Session) -> List[WriteOutcome]:
+        try:
+            return self._patch_many(knowledge_list, db_session, raise_title_conflict=True)
+        except IntegrityError:
+            # A new title was taken by a concurrent write after the check, the check of the second run sees it.
+            return self._patch_many(knowledge_list, db_session, raise_title_conflict=False)
+
+    def _patch_many(
+            self,
+            knowledge_list: List[PatchKnowledgeDTO],
+            db_session: Session,
+            raise_title_conflict: bool
+    ) -> List[WriteOutcome]:
+        repeated = repeated_positions([knowledge.old_title for knowledge in knowledge_list])
+        outcomes, updates, deltas = [], [], Counter()
+        write = begin_write(db_session)
+        try:
+            # Rows are locked in title order, so two batches touching the same knowledge cannot deadlock.
+            old_rows = {
+                row.title: row for row in db_session.execute(
+                    select(Knowledge.title, Knowledge.category, Knowledge.status)
+                    .where(Knowledge.title.in_({knowledge.old_title for knowledge in knowledge_list}))
+                    .order_by(Knowledge.title)
+                    .with_for_update()
                 )
+            }
+            title_owners = key_owners(
+                Knowledge.title, Knowledge.title, (knowledge.new_title for knowledge in knowledge_list), db_session
+            )
+            for position, knowledge in enumerate(knowledge_list):
+                old_row = old_rows.get(knowledge.old_title)
+                values = self._define_dict_to_update(knowledge)
+                if old_row is None:
+                    outcomes.append(WriteOutcome.NOT_FOUND)
+                elif position in repeated:
+                    logger.error(f"In patch_many error was occurred: Knowledge {knowledge.old_title} is patched twice.")
+                    outcomes.append(WriteOutcome.FAILED)
+                elif not values:
+                    outcomes.append(WriteOutcome.UNCHANGED)
+                elif title_owners.get(knowledge.new_title, knowledge.old_title) != knowledge.old_title:
+                    logger.warning(f"In patch_many: Knowledge with title {knowledge.new_title} already exists.")
+                    outcomes.append(WriteOutcome.ALREADY_EXISTS)
+                else:
+                    if knowledge.new_title is not None:
+                        title_owners[knowledge.new_title] = knowledge.old_title
+                    updates.append((knowledge.old_title, values))
+                    deltas.update(knowledge_deltas([(old_row.category, old_row.status)], -1))
+                    new_row = (knowledge.category or old_row.category, knowledge.status or old_row.status)
+                    deltas.update(knowledge_deltas([new_row], 1))
+                    outcomes.append(WriteOutcome.WRITTEN)
+            execute_grouped_updates(Knowledge.title, updates, db_session)
+            apply_category_deltas(KnowledgeCategory, deltas, db_session)
+            write.commit()
+        except DBAPIError as ex:
+            write.rollback()
+            if raise_title_conflict and isinstance(ex, IntegrityError):
+                raise
+            logger.error(
+                f"In patch_many error was occurred: {ex.args[0]}. Knowledge were not patched, write "
+                f"was rolled back."
+            )
+            return [WriteOutcome.FAILED] * len(knowledge_list)
+        return outcomes
+
+    def delete_by_id(self, id: int, db_session: Session) -> None:
+        write = begin_write(db_session)
+        try:
+            deleted_rows = db_session.execute(
+                delete(Knowledge)
+                .where(Knowledge.id == id)
+                .returning(Knowledge.category, Knowledge.status)
+            )
+            apply_category_deltas(KnowledgeCategory, knowledge_deltas(deleted_rows, -1), db_session)
+            write.commit()
+        except DBAPIError as ex:
+            write.rollback()
+            logger.error(
+                f"In delete_by_id error was occurred: {ex.args[0]}. Knowledge was not deleted, write "
+                f"was rolled back."
+            )
+
+    def delete_by_id_list(self, id_list: List[int], db_session: Session) -> None:
+        write = begin_write(db_session)
+        try:
+            deleted_rows = db_session.execute(
+                delete(Knowledge)
+                .where(Knowledge.id.in_(id_list))
+                .returning(Knowledge.category, Knowledge.status)
+            )
+            apply_category_deltas(KnowledgeCategory, knowledge_deltas(deleted_rows, -1), db_session)
+            write.commit()
+        except DBAPIError as ex:
+            write.rollback()
+            logger.error(
+                f"In delete_by_id_list error was occurred: {ex.args[0]}. Knowledge were not deleted, write "
+                f"was rolled back."
+            )
 
     def delete_by_title(self, title: str, db_session: Session) -> None:
+        write = begin_write(db_session)
         try:
-            db_session.execute(
+            deleted_rows = db_session.execute(
                 delete(Knowledge)
                 .where(Knowledge.title == title)
+                .returning(Knowledge.category, Knowledge.status)
             )
-            db_session.commit()
+            apply_category_deltas(KnowledgeCategory, knowledge_deltas(deleted_rows, -1), db_session)
+            write.commit()
         except DBAPIError as ex:
-            db_session.rollback()
+            write.rollback()
             logger.error(
-                f"In delete_by_title error was occurred: {ex.args[0]}. Knowledge was not deleted, transaction "
+                f"In delete_by_title error was occurred: {ex.args[0]}. Knowledge was not deleted, write "
                 f"was rolled back."
             )
 
     def delete_by_title_list(self, title_list: List[str], db_session: Session) -> None:
+        write = begin_write(db_session)
         try:
-            db_session.execute(
+            deleted_rows = db_session.execute(
                 delete(Knowledge)
                 .where(Knowledge.title.in_(title_list))
+                .returning(Knowledge.category, Knowledge.status)
             )
-            db_session.commit()
+            apply_category_deltas(KnowledgeCategory, knowledge_deltas(deleted_rows, -1), db_session)
+            write.commit()
         except DBAPIError as ex:
-            db_session.rollback()
+            write.rollback()
             logger.error(
-                f"In delete_by_title_list error was occurred: {ex.args[0]}. Knowledge were not deleted, transaction "
+                f"In delete_by_title_list error was occurred: {ex.args[0]}. Knowledge were not deleted, write "
                 f"was rolled back."
             )
 
-    def accept_publishing(self, knowledge_title: str, db_session: Session) -> None:
-        patch_knowledge_dto = PatchKnowledgeDTO(knowledge_title, status=KnowledgeStatus.PUBLISHED)
-        self.patch(patch_knowledge_dto, db_session)
+    def accept_publishing(self, knowledge_title: str, db_session: Session) -> WriteOutcome:
+        return self.accept_publishing_many([knowledge_title], db_session)[0]
+
+    def accept_publishing_many(self, knowledge_title_list: List[str], db_session: Session) -> List[WriteOutcome]:
+        write = begin_write(db_session)
+        try:
+            published_rows = db_session.execute(
+                update(Knowledge)
+                .where(Knowledge.title.in_(knowledge_title_list), Knowledge.status == KnowledgeStatus.IN_PROCESSING)
+                .values(status=KnowledgeStatus.PUBLISHED)
+                .returning(Knowledge.title, Knowledge.category)
+            ).all()
+            published_titles = {row.title for row in published_rows}
+            deltas = knowledge_deltas([(row.category, KnowledgeStatus.IN_PROCESSING) for row in published_rows], -1)
+            deltas.update(knowledge_deltas([(row.category, KnowledgeStatus.PUBLISHED) for row in published_rows], 1))
+            apply_category_deltas(KnowledgeCategory, deltas, db_session)
+            already_published = existing_keys(
+                Knowledge.title, set(knowledge_title_list) - published_titles, db_session
+            )
+            write.commit()
+        except DBAPIError as ex:
+            write.rollback()
+            logger.error(
+                f"In accept_publishing_many error was occurred: {ex.args[0]}. Knowledge were not published, "
+                f"write was rolled back."
+            )
+            return [WriteOutcome.FAILED] * len(knowledge_title_list)
+        outcomes = []
+        for title in knowledge_title_list:
+            if title in published_titles:
+                outcomes.append(WriteOutcome.WRITTEN)
+            elif title in already_published:
+                outcomes.append(WriteOutcome.UNCHANGED)
+            else:
+                outcomes.append(WriteOutcome.NOT_FOUND)
+        return outcomes
+
+    def rebuild_categories(self, db_session: Session) -> None:
+        write = begin_write(db_session)
+        try:
+            rebuild_knowledge_catalog(db_session)
+            write.commit()
+        except DBAPIError as ex:
+            write.rollback()
+            logger.error(
+                f"In rebuild_categories error was occurred: {ex.args[0]}. Knowledge categories were not rebuilt, "
+                f"write was rolled back."
+            )
 
 
 if __name__ == "__main__":
@@ -213,4 +603,6 @@ if __name__ == "__main__":
         print(knowledge_dal.get_categories(session))
         knowledge_dal.accept_publishing(knowledge.title, session)
         print(knowledge_dal.get_by_title("Fready Fazber knowledge", session))
+        # The DAL only stages the writes, they are committed by the caller.
+        session.commit()
         #knowledge_dal.delete_by_title_list(["Fready Fazber knowledge"])
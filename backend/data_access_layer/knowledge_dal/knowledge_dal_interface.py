@@ -1,7 +1,12 @@
 #Author: Vodohleb04
 from abc import ABC, abstractmethod
-from typing import List
+from typing import List, Tuple
+from sqlalchemy import Row
 from sqlalchemy.orm import Session
+from backend.data_access_layer.batch_write import WriteOutcome
+from backend.data_access_layer.load_profile import LoadProfile
+from backend.data_access_layer.page import Page, DEFAULT_PAGE_SIZE
+from backend.data_access_layer.search.similar_titles import DEFAULT_SIMILAR_TITLES_LIMIT
 from backend.data_layer.mapped_database import Knowledge, KnowledgeStatus
 from backend.data_access_layer.knowledge_dal.save_knowledge_dto import SaveKnowledgeDTO
 from backend.data_access_layer.knowledge_dal.patch_knowledge_dto import PatchKnowledgeDTO
@@ -14,7 +19,34 @@ class KnowledgeDALInterface(ABC):
         raise NotImplementedError
 
     @abstractmethod
-    def get_by_title(self, title: str, db_session: Session) -> Knowledge | None:
+    def get_category_counts(self, db_session: Session, status: KnowledgeStatus = None) -> List[Tuple[str, int]]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_by_id(
+            self,
+            id: int,
+            db_session: Session,
+            load_profile: LoadProfile = LoadProfile.BARE
+    ) -> Knowledge | None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_by_id_list(
+            self,
+            id_list: List[int],
+            db_session: Session,
+            load_profile: LoadProfile = LoadProfile.BARE
+    ) -> List[Knowledge] | None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_by_title(
+            self,
+            title: str,
+            db_session: Session,
+            load_profile: LoadProfile = LoadProfile.BARE
+    ) -> Knowledge | None:
         raise NotImplementedError
 
     @abstractmethod
@@ -22,7 +54,8 @@ class KnowledgeDALInterface(ABC):
             self,
             title_list: List[str],
             db_session: Session,
-            status: KnowledgeStatus = None
+            status: KnowledgeStatus = None,
+            load_profile: LoadProfile = LoadProfile.BARE
     ) -> List[Knowledge] | None:
         raise NotImplementedError
 
@@ -31,8 +64,11 @@ class KnowledgeDALInterface(ABC):
             self,
             category: str,
             db_session: Session,
-            status: KnowledgeStatus = None
-    ) -> List[Knowledge] | None:
+            status: KnowledgeStatus = None,
+            load_profile: LoadProfile = LoadProfile.BARE,
+            cursor: str = None,
+            page_size: int = DEFAULT_PAGE_SIZE
+    ) -> Page[Knowledge]:
         raise NotImplementedError
 
     @abstractmethod
@@ -40,28 +76,109 @@ class KnowledgeDALInterface(ABC):
             self,
             category_list: List[str],
             db_session: Session,
-            status: KnowledgeStatus = None
-    ) -> List[Knowledge] | None:
+            status: KnowledgeStatus = None,
+            load_profile: LoadProfile = LoadProfile.BARE,
+            cursor: str = None,
+            page_size: int = DEFAULT_PAGE_SIZE
+    ) -> Page[Knowledge]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_all(
+            self,
+            db_session: Session,
+            load_profile: LoadProfile = LoadProfile.BARE,
+            cursor: str = None,
+            page_size: int = DEFAULT_PAGE_SIZE
+    ) -> Page[Knowledge]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_published(
+            self,
+            db_session: Session,
+            load_profile: LoadProfile = LoadProfile.BARE,
+            cursor: str = None,
+            page_size: int = DEFAULT_PAGE_SIZE
+    ) -> Page[Knowledge]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_in_processing(
+            self,
+            db_session: Session,
+            load_profile: LoadProfile = LoadProfile.BARE,
+            cursor: str = None,
+            page_size: int = DEFAULT_PAGE_SIZE
+    ) -> Page[Knowledge]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def list_titles(
+            self,
+            db_session: Session,
+            status: KnowledgeStatus = None,
+            category_list: List[str] = None,
+            cursor: str = None,
+            page_size: int = DEFAULT_PAGE_SIZE
+    ) -> Page[str]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def list_summaries(
+            self,
+            db_session: Session,
+            status: KnowledgeStatus = None,
+            category_list: List[str] = None,
+            cursor: str = None,
+            page_size: int = DEFAULT_PAGE_SIZE
+    ) -> Page[Row]:
         raise NotImplementedError
 
     @abstractmethod
-    def get_all(self, db_session: Session) -> List[Knowledge] | None:
+    def search(
+            self,
+            query: str,
+            db_session: Session,
+            status: KnowledgeStatus = None,
+            load_profile: LoadProfile = LoadProfile.BARE,
+            cursor: str = None,
+            page_size: int = DEFAULT_PAGE_SIZE
+    ) -> Page[Knowledge]:
         raise NotImplementedError
 
     @abstractmethod
-    def get_published(self, db_session: Session) -> List[Knowledge] | None:
+    def find_similar_titles(
+            self,
+            prefix_or_text: str,
+            db_session: Session,
+            status: KnowledgeStatus = None,
+            limit: int = DEFAULT_SIMILAR_TITLES_LIMIT
+    ) -> List[str]:
         raise NotImplementedError
 
     @abstractmethod
-    def get_in_processing(self, db_session: Session) -> List[Knowledge] | None:
+    def save(self, knowledge: SaveKnowledgeDTO, db_session: Session) -> WriteOutcome:
         raise NotImplementedError
 
     @abstractmethod
-    def save(self, knowledge: SaveKnowledgeDTO, db_session: Session) -> None:
+    def save_many(self, knowledge_list: List[SaveKnowledgeDTO], db_session: Session) -> List[WriteOutcome]:
         raise NotImplementedError
 
     @abstractmethod
-    def patch(self, knowledge: PatchKnowledgeDTO, db_session: Session) -> None:
+    def patch(self, knowledge: PatchKnowledgeDTO, db_session: Session) -> WriteOutcome:
+        raise NotImplementedError
+
+    @abstractmethod
+    def patch_many(self, knowledge_list: List[PatchKnowledgeDTO], db_session: Session) -> List[WriteOutcome]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def delete_by_id(self, id: int, db_session: Session) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def delete_by_id_list(self, id_list: List[int], db_session: Session) -> None:
         raise NotImplementedError
 
     @abstractmethod
@@ -73,5 +190,13 @@ class KnowledgeDALInterface(ABC):
         raise NotImplementedError
 
     @abstractmethod
-    def accept_publishing(self, knowledge_title: str, db_session: Session) -> None:
+    def accept_publishing(self, knowledge_title: str, db_session: Session) -> WriteOutcome:
+        raise NotImplementedError
+
+    @abstractmethod
+    def accept_publishing_many(self, knowledge_title_list: List[str], db_session: Session) -> List[WriteOutcome]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def rebuild_categories(self, db_session: Session) -> None:
         raise NotImplementedError
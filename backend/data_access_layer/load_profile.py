@@ -0,0 +1,18 @@
+#Author: Vodohleb04
+from enum import Enum
+from typing import Dict, Sequence
+
+
+class LoadProfile(Enum):
+    BARE = "bare"
+    WITH_SENDER = "with_sender"
+    WITH_COMMENTS = "with_comments"
+
+    def __str__(self) -> str:
+        return self.value
+
+
+def loader_options(load_profile: LoadProfile, options_by_profile: Dict[LoadProfile, Sequence]) -> Sequence:
+    if load_profile not in options_by_profile:
+        raise ValueError(f"Load profile {load_profile} is not supported here")
+    return options_by_profile[load_profile]
@@ -0,0 +1,116 @@
+#Author: Vodohleb04
+from __future__ import annotations
+import json
+from base64 import urlsafe_b64encode, urlsafe_b64decode
+from binascii import Error as Base64Error
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Generic, List, Sequence, TypeVar
+from sqlalchemy import Select, tuple_
+from sqlalchemy.orm import Session, InstrumentedAttribute
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+@dataclass(frozen=True, slots=True)
+class Page(Generic[T]):
+    items: Sequence[T]
+    next_cursor: str | None
+
+    def map(self, function: Callable[[T], R]) -> Page[R]:
+        return Page([function(item) for item in self.items], self.next_cursor)
+
+    def __reduce__(self):
+        return Page, (self.items, self.next_cursor)
+
+
+def _encode_key_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} can not be a cursor key")
+
+
+def encode_cursor(key_values: Sequence) -> str:
+    return urlsafe_b64encode(
+        json.dumps(list(key_values), ensure_ascii=False, default=_encode_key_value).encode()
+    ).decode()
+
+
+def decode_cursor(cursor: str, key_length: int) -> List:
+    try:
+        key_values = json.loads(urlsafe_b64decode(cursor.encode()))
+    except (Base64Error, UnicodeError, ValueError):
+        raise ValueError("Cursor is malformed")
+    if not isinstance(key_values, list) or len(key_values) != key_length:
+        raise ValueError("Cursor does not match the page ordering")
+    return key_values
+
+
+def check_page_size(page_size: int) -> None:
+    if not 0 < page_size <= MAX_PAGE_SIZE:
+        raise ValueError(f"Page size must be between 1 and {MAX_PAGE_SIZE}")
+
+
+def _decode_key_values(key_columns: Sequence[InstrumentedAttribute], key_values: List) -> List:
+    # JSON keeps timestamps as text, they are compared as timestamps again.
+    try:
+        key_values = [
+            datetime.fromisoformat(value) if column.type.python_type is datetime else value
+            for column, value in zip(key_columns, key_values)
+        ]
+    except (TypeError, ValueError):
+        raise ValueError("Cursor is malformed")
+    # A tampered cursor would fail in the database otherwise.
+    if not all(isinstance(value, column.type.python_type) for column, value in zip(key_columns, key_values)):
+        raise ValueError("Cursor is malformed")
+    return key_values
+
+
+def _fetch_keyset_page(
+        statement: Select,
+        key_columns: Sequence[InstrumentedAttribute],
+        cursor: str | None,
+        page_size: int,
+        fetch: Callable[[Select], Sequence]
+) -> Page:
+    check_page_size(page_size)
+    if cursor is not None:
+        key_values = _decode_key_values(key_columns, decode_cursor(cursor, len(key_columns)))
+        if len(key_columns) == 1:
+            statement = statement.where(key_columns[0] > key_values[0])
+        else:
+            statement = statement.where(tuple_(*key_columns) > tuple_(*key_values))
+    items = fetch(statement.order_by(*key_columns).limit(page_size + 1))
+    if len(items) <= page_size:
+        return Page(items, None)
+    items = items[:page_size]
+    return Page(items, encode_cursor([getattr(items[-1], column.key) for column in key_columns]))
+
+
+def fetch_keyset_page(
+        statement: Select,
+        key_columns: Sequence[InstrumentedAttribute],
+        cursor: str | None,
+        page_size: int,
+        db_session: Session
+) -> Page:
+    return _fetch_keyset_page(
+        statement, key_columns, cursor, page_size, lambda page_statement: db_session.scalars(page_statement).all()
+    )
+
+
+def fetch_keyset_row_page(
+        statement: Select,
+        key_columns: Sequence[InstrumentedAttribute],
+        cursor: str | None,
+        page_size: int,
+        db_session: Session
+) -> Page:
+    # Rows have to select the key columns under their own names, the cursor is read from them.
+    return _fetch_keyset_page(
+        statement, key_columns, cursor, page_size, lambda page_statement: db_session.execute(page_statement).all()
+    )
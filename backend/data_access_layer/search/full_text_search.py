@@ -0,0 +1,66 @@
+#Author: Vodohleb04
+from typing import Sequence
+from sqlalchemy import select, func, cast, literal_column, or_, and_, Double
+from sqlalchemy.orm import Session
+from backend.data_access_layer.page import Page, check_page_size, encode_cursor, decode_cursor
+from backend.data_access_layer.search.in_memory_search_index import InMemorySearchIndex
+from backend.data_access_layer.search.search_tokens import to_prefix_tsquery
+
+
+def fetch_search_page(
+        entity,
+        query: str,
+        where_clauses: Sequence,
+        options: Sequence,
+        cursor: str | None,
+        page_size: int,
+        db_session: Session
+) -> Page:
+    check_page_size(page_size)
+    if db_session.get_bind().dialect.name == "postgresql":
+        return _fetch_full_text_page(entity, query, where_clauses, options, cursor, page_size, db_session)
+    return _fetch_in_memory_page(entity, query, where_clauses, options, cursor, page_size, db_session)
+
+
+def _fetch_full_text_page(entity, query, where_clauses, options, cursor, page_size, db_session) -> Page:
+    ts_query_text = to_prefix_tsquery(query)
+    if not ts_query_text:
+        return Page([], None)
+    # search_vector is a generated column created in Base.create_from_metadata, it is not mapped.
+    search_vector = literal_column(f"{entity.__table__.fullname}.search_vector")
+    ts_query = func.to_tsquery("simple", ts_query_text)
+    rank = cast(func.ts_rank_cd(search_vector, ts_query), Double)
+    statement = (
+        select(entity, rank)
+        .where(search_vector.op("@@")(ts_query), *where_clauses)
+        .options(*options)
+    )
+    if cursor is not None:
+        last_rank, last_title = decode_cursor(cursor, 2)
+        if not isinstance(last_rank, (int, float)) or not isinstance(last_title, str):
+            raise ValueError("Cursor is malformed")
+        statement = statement.where(or_(rank < last_rank, and_(rank == last_rank, entity.title > last_title)))
+    rows = db_session.execute(statement.order_by(rank.desc(), entity.title).limit(page_size + 1)).all()
+    if len(rows) <= page_size:
+        return Page([item for item, _ in rows], None)
+    last_item, last_rank = rows[page_size - 1]
+    return Page([item for item, _ in rows[:page_size]], encode_cursor([last_rank, last_item.title]))
+
+
+def _fetch_in_memory_page(entity, query, where_clauses, options, cursor, page_size, db_session) -> Page:
+    # The stand-in of the tests on SQLite, which has no search vectors: the index is built from the whole table on
+    # every call, so it never answers from rows that were changed since. PostgreSQL is searched by the GIN index.
+    search_index = InMemorySearchIndex()
+    for title, description, category in db_session.execute(
+            select(entity.title, entity.description, entity.category).where(*where_clauses)
+    ):
+        search_index.add(title, title, description, category)
+    title_page = search_index.search(query, cursor=cursor, page_size=page_size)
+    if not title_page.items:
+        return Page([], None)
+    items_by_title = {
+        item.title: item for item in db_session.scalars(
+            select(entity).where(entity.title.in_(title_page.items)).options(*options)
+        )
+    }
+    return Page([items_by_title[title] for title in title_page.items], title_page.next_cursor)
@@ -0,0 +1,88 @@
+#Author: Vodohleb04
+from bisect import bisect_left
+from typing import Dict, List, Tuple
+from backend.data_access_layer.page import Page, DEFAULT_PAGE_SIZE, check_page_size, encode_cursor, decode_cursor
+from backend.data_access_layer.search.search_tokens import tokenize
+
+# Same relative weights as setweight A/B/C in the Postgres search_vector.
+TITLE_WEIGHT = 1.0
+CATEGORY_WEIGHT = 0.4
+DESCRIPTION_WEIGHT = 0.2
+
+
+class InMemorySearchIndex:
+
+    def __init__(self):
+        self.__postings: Dict[str, Dict[str, float]] = {}
+        self.__document_tokens: Dict[str, List[str]] = {}
+        self.__vocabulary: List[str] = []
+        self.__vocabulary_is_sorted = True
+
+    def __len__(self) -> int:
+        return len(self.__document_tokens)
+
+    def add(self, key: str, title: str, description: str, category: str) -> None:
+        if key in self.__document_tokens:
+            self.remove(key)
+        weights: Dict[str, float] = {}
+        for text, weight in ((title, TITLE_WEIGHT), (category, CATEGORY_WEIGHT), (description, DESCRIPTION_WEIGHT)):
+            for token in tokenize(text or ""):
+                weights[token] = weights.get(token, 0.0) + weight
+        for token, weight in weights.items():
+            if token not in self.__postings:
+                self.__postings[token] = {}
+                self.__vocabulary.append(token)
+                self.__vocabulary_is_sorted = False
+            self.__postings[token][key] = weight
+        self.__document_tokens[key] = list(weights)
+
+    def remove(self, key: str) -> None:
+        for token in self.__document_tokens.pop(key, ()):
+            postings = self.__postings[token]
+            del postings[key]
+            if not postings:
+                del self.__postings[token]
+                self.__vocabulary.remove(token)
+
+    def _expand_prefix(self, prefix: str) -> List[str]:
+        if not self.__vocabulary_is_sorted:
+            self.__vocabulary.sort()
+            self.__vocabulary_is_sorted = True
+        expansions = []
+        position = bisect_left(self.__vocabulary, prefix)
+        while position < len(self.__vocabulary) and self.__vocabulary[position].startswith(prefix):
+            expansions.append(self.__vocabulary[position])
+            position += 1
+        return expansions
+
+    def _rank(self, query: str) -> List[Tuple[float, str]]:
+        ranks: Dict[str, float] | None = None
+        for token in tokenize(query):
+            token_ranks: Dict[str, float] = {}
+            for expansion in self._expand_prefix(token):
+                for key, weight in self.__postings[expansion].items():
+                    token_ranks[key] = max(token_ranks.get(key, 0.0), weight)
+            if ranks is None:
+                ranks = token_ranks
+            else:
+                ranks = {key: rank + token_ranks[key] for key, rank in ranks.items() if key in token_ranks}
+            if not ranks:
+                return []
+        if ranks is None:
+            return []
+        return sorted(((rank, key) for key, rank in ranks.items()), key=lambda item: (-item[0], item[1]))
+
+    def search(self, query: str, cursor: str = None, page_size: int = DEFAULT_PAGE_SIZE) -> Page[str]:
+        check_page_size(page_size)
+        ranked = self._rank(query)
+        if cursor is not None:
+            last_rank, last_key = decode_cursor(cursor, 2)
+            if not isinstance(last_rank, (int, float)) or not isinstance(last_key, str):
+                raise ValueError("Cursor is malformed")
+            ranked = [
+                (rank, key) for rank, key in ranked if rank < last_rank or (rank == last_rank and key > last_key)
+            ]
+        if len(ranked) <= page_size:
+            return Page([key for _, key in ranked], None)
+        last_rank, last_key = ranked[page_size - 1]
+        return Page([key for _, key in ranked[:page_size]], encode_cursor([last_rank, last_key]))
@@ -0,0 +1,14 @@
+#Author: Vodohleb04
+import re
+from typing import List
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_PATTERN.findall(text.lower())
+
+
+def to_prefix_tsquery(query: str) -> str:
+    # Tokens are \w+ only, so the user input can not inject tsquery operators.
+    return " & ".join(f"{token}:*" for token in tokenize(query))
@@ -0,0 +1,56 @@
+#Author: Vodohleb04
+from typing import List, Sequence
+from sqlalchemy import select, func, or_
+from sqlalchemy.orm import Session
+from backend.data_access_layer.page import check_page_size
+from backend.data_access_layer.search.trigram_index import TrigramIndex
+
+DEFAULT_SIMILAR_TITLES_LIMIT = 5
+
+
+def fetch_similar_titles(
+        title_column,
+        prefix_or_text: str,
+        where_clauses: Sequence,
+        limit: int,
+        db_session: Session
+) -> List[str]:
+    check_page_size(limit)
+    prefix_or_text = prefix_or_text.strip()
+    if not prefix_or_text:
+        return []
+    if db_session.get_bind().dialect.name == "postgresql":
+        return _fetch_trigram_titles(title_column, prefix_or_text, where_clauses, limit, db_session)
+    return _fetch_in_memory_titles(title_column, prefix_or_text, where_clauses, limit, db_session)
+
+
+def _escape_like(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _fetch_trigram_titles(title_column, prefix_or_text, where_clauses, limit, db_session) -> List[str]:
+    # Both the % operator and ILIKE are served by the gin_trgm_ops indexes from Base.create_from_metadata.
+    similarity = func.similarity(title_column, prefix_or_text)
+    return list(
+        db_session.scalars(
+            select(title_column)
+            .where(
+                or_(
+                    title_column.op("%")(prefix_or_text),
+                    title_column.ilike(f"{_escape_like(prefix_or_text)}%", escape="\\")
+                ),
+                *where_clauses
+            )
+            .order_by(similarity.desc(), title_column)
+            .limit(limit)
+        )
+    )
+
+
+def _fetch_in_memory_titles(title_column, prefix_or_text, where_clauses, limit, db_session) -> List[str]:
+    # The stand-in of the tests on SQLite, which has no pg_trgm: the index is built from the whole table on every
+    # call, so it never answers from titles that were changed since. PostgreSQL is served by the gin_trgm_ops index.
+    trigram_index = TrigramIndex()
+    for title in db_session.scalars(select(title_column).where(*where_clauses)):
+        trigram_index.add(title)
+    return trigram_index.find_similar(prefix_or_text, limit)
@@ -0,0 +1,91 @@
+#Author: Vodohleb04
+from array import array
+from collections import Counter
+from itertools import chain
+from bisect import bisect_left
+from typing import Dict, List, Set, Tuple
+from backend.data_access_layer.search.search_tokens import tokenize
+
+# Default pg_trgm.similarity_threshold, so both backends return the same matches.
+SIMILARITY_THRESHOLD = 0.3
+
+
+def trigrams(text: str) -> Set[str]:
+    # Same extraction as pg_trgm: every word is padded with two spaces in front and one behind.
+    result = set()
+    for word in tokenize(text):
+        padded = f"  {word} "
+        result.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return result
+
+
+class TrigramIndex:
+
+    def __init__(self):
+        self.__keys: List[str] = []
+        self.__trigram_counts = array("I")
+        self.__postings: Dict[str, array] = {}
+        self.__ids_by_key: Dict[str, int] = {}
+        self.__sorted_lower_keys: List[Tuple[str, int]] = []
+        self.__lower_keys_are_sorted = True
+
+    def __len__(self) -> int:
+        return len(self.__ids_by_key)
+
+    def add(self, key: str) -> None:
+        if key in self.__ids_by_key:
+            return
+        key_id = len(self.__keys)
+        key_trigrams = trigrams(key)
+        self.__keys.append(key)
+        self.__trigram_counts.append(len(key_trigrams))
+        for trigram in key_trigrams:
+            postings = self.__postings.get(trigram)
+            if postings is None:
+                postings = self.__postings[trigram] = array("I")
+            postings.append(key_id)
+        self.__ids_by_key[key] = key_id
+        self.__sorted_lower_keys.append((key.lower(), key_id))
+        self.__lower_keys_are_sorted = False
+
+    def remove(self, key: str) -> None:
+        # Postings are append only, ids of removed keys are skipped while matching.
+        self.__ids_by_key.pop(key, None)
+
+    def _is_alive(self, key_id: int) -> bool:
+        return self.__ids_by_key.get(self.__keys[key_id]) == key_id
+
+    def _prefix_matches(self, prefix: str, limit: int) -> List[int]:
+        if not self.__lower_keys_are_sorted:
+            self.__sorted_lower_keys.sort()
+            self.__lower_keys_are_sorted = True
+        prefix = prefix.lower()
+        matches = []
+        position = bisect_left(self.__sorted_lower_keys, (prefix, -1))
+        while (
+                len(matches) < limit and position < len(self.__sorted_lower_keys)
+                and self.__sorted_lower_keys[position][0].startswith(prefix)
+        ):
+            key_id = self.__sorted_lower_keys[position][1]
+            if self._is_alive(key_id):
+                matches.append(key_id)
+            position += 1
+        return matches
+
+    def _similarity(self, shared: int, query_trigram_count: int, key_id: int) -> float:
+        union = query_trigram_count + self.__trigram_counts[key_id] - shared
+        return shared / union if union else 0.0
+
+    def find_similar(self, text: str, limit: int) -> List[str]:
+        query_trigrams = trigrams(text)
+        shared_counts = Counter(chain.from_iterable(self.__postings.get(trigram, ()) for trigram in query_trigrams))
+        scored = {}
+        for key_id, shared in shared_counts.items():
+            similarity = self._similarity(shared, len(query_trigrams), key_id)
+            if similarity >= SIMILARITY_THRESHOLD and self._is_alive(key_id):
+                scored[key_id] = similarity
+        for key_id in self._prefix_matches(text.strip(), limit):
+            if key_id not in scored:
+                scored[key_id] = self._similarity(shared_counts.get(key_id, 0), len(query_trigrams), key_id)
+        ranked = sorted((-similarity, self.__keys[key_id]) for key_id, similarity in scored.items())
+        return [key for _, key in ranked[:limit]]
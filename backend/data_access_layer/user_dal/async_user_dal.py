@@ -0,0 +1,7 @@
+#Author: Vodohleb04
+from backend.data_layer.run_sync_adapter import RunSyncAdapter
+from backend.data_access_layer.user_dal.user_dal_interface import UserDALInterface
+
+
+class AsyncUserDAL(RunSyncAdapter, interface=UserDALInterface):
+    pass
@@ -2,8 +2,15 @@
 import logging
 from typing import Sequence, List, Dict
 from sqlalchemy import insert, select, update, delete
-from sqlalchemy.exc import DBAPIError
+from sqlalchemy.exc import DBAPIError, IntegrityError
 from sqlalchemy.orm import Session
+from backend.data_access_layer.batch_write import (
+    WriteOutcome, existing_keys, key_owners, repeated_positions, execute_grouped_updates, begin_write
+)
+from backend.data_access_layer.category_catalog import release_sender_categories
+from backend.data_access_layer.dialect_insert import dialect_insert
+from backend.data_access_layer.key_lookup import KeyLookup
+from backend.data_access_layer.load_profile import LoadProfile, loader_options
 from backend.data_access_layer.user_dal.patch_user_dto import PatchUserDTO
 from backend.data_access_layer.user_dal.save_user_dto import SaveUserDTO
 from backend.data_access_layer.user_dal.user_dal_interface import UserDALInterface
@@ -14,80 +21,126 @@ logger = logging.getLogger(__name__)
 
 class SQLAlchemyUserDAL(UserDALInterface):
 
-    def get_by_login(self, user_login: str, db_session: Session) -> GeneralUser | None:
-        return db_session.scalar(
-            select(GeneralUser)
-            .where(GeneralUser.login == user_login)
-            .limit(1)
-        )
+    _options_by_profile = {
+        LoadProfile.BARE: ()
+    }
+    _by_login = KeyLookup(GeneralUser.login, _options_by_profile)
+    _by_username = KeyLookup(GeneralUser.username, _options_by_profile)
 
-    def get_by_login_list(self, user_login_list: List[str], db_session: Session) -> Sequence[GeneralUser]:
+    def get_by_login(
+            self,
+            user_login: str,
+            db_session: Session,
+            load_profile: LoadProfile = LoadProfile.BARE
+    ) -> GeneralUser | None:
+        return self._by_login.get(user_login, db_session, load_profile)
+
+    def get_by_login_list(
+            self,
+            user_login_list: List[str],
+            db_session: Session,
+            load_profile: LoadProfile = LoadProfile.BARE
+    ) -> Sequence[GeneralUser]:
         return db_session.scalars(
             select(GeneralUser)
             .where(
                 GeneralUser.login.in_(user_login_list)
             )
+            .options(*loader_options(load_profile, self._options_by_profile))
         ).all()
 
-    def get_by_username(self, username: str, db_session: Session) -> GeneralUser:
-        return db_session.scalar(
-            select(GeneralUser)
-            .where(GeneralUser.username == username)
-            .limit(1)
-        )
+    def get_by_username(
+            self,
+            username: str,
+            db_session: Session,
+            load_profile: LoadProfile = LoadProfile.BARE
+    ) -> GeneralUser:
+        return self._by_username.get(username, db_session, load_profile)
 
-    def get_by_username_list(self, username_list: List[str], db_session: Session) -> Sequence[GeneralUser]:
+    def get_by_username_list(
+            self,
+            username_list: List[str],
+            db_session: Session,
+            load_profile: LoadProfile = LoadProfile.BARE
+    ) -> Sequence[GeneralUser]:
         return db_session.scalars(
             select(GeneralUser)
             .where(
                 GeneralUser.username.in_(username_list)
             )
+            .options(*loader_options(load_profile, self._options_by_profile))
         ).all()
 
-    def _save_general_user(self, user: SaveUserDTO, db_session: Session) -> None:
-        db_session.execute(
-            insert(GeneralUser)
-            .values(
-                login=user.login, username=user.username, hashed_password=user.hashed_password, email=user.email,
-                birthdate=user.birthdate, stack=user.stack, _role="admin" if user.is_admin else "user"
-            )
-        )
-
-    def _save_admin(self, user: SaveUserDTO, db_session: Session) -> None:
+    def save(self, user: SaveUserDTO, db_session: Session) -> WriteOutcome:
+        write = begin_write(db_session)
         try:
-            self._save_general_user(user, db_session)
+            # A conflict on login or on username skips the row, both mean the user already exists.
+            saved_login = db_session.scalar(
+                dialect_insert(GeneralUser, db_session)
+                .values(
+                    login=user.login, username=user.username, hashed_password=user.hashed_password, email=user.email,
+                    birthdate=user.birthdate, stack=user.stack, _role="admin" if user.is_admin else "user"
+                )
+                .on_conflict_do_nothing()
+                .returning(GeneralUser.login)
+            )
+            if saved_login is None:
+                write.rollback()
+                logger.warning(f"In save: user with login {user.login} or username {user.username} already exists.")
+                return WriteOutcome.ALREADY_EXISTS
             db_session.execute(
-                insert(Admin)
+                insert(Admin if user.is_admin else User)
                 .values(login=user.login)
             )
-            db_session.commit()
+            write.commit()
+            return WriteOutcome.WRITTEN
         except DBAPIError as ex:
-            db_session.rollback()
-            logger.error(f"In _save_admin error was occurred: {ex.args[0]}. Admin was not saved, transaction was"
+            write.rollback()
+            logger.error(f"In save error was occurred: {ex.args[0]}. User was not saved, write was "
                          f"rolled back.")
+            return WriteOutcome.FAILED
 
-    def _save_user(self, user: SaveUserDTO, db_session: Session) -> None:
+    def save_many(self, user_list: List[SaveUserDTO], db_session: Session) -> List[WriteOutcome]:
+        repeated = repeated_positions([user.login for user in user_list])
+        users_to_save = [user for position, user in enumerate(user_list) if position not in repeated]
+        saved_logins = set()
+        write = begin_write(db_session)
         try:
-            self._save_general_user(user, db_session)
-            db_session.execute(
-                insert(User)
-                .values(login=user.login)
-            )
-            db_session.commit()
+            if users_to_save:
+                # Conflicts on login or on username both skip the row, the outcome is reported as already existing.
+                saved_logins = set(
+                    db_session.scalars(
+                        dialect_insert(GeneralUser, db_session)
+                        .values([
+                            {
+                                "login": user.login, "username": user.username, "hashed_password": user.hashed_password,
+                                "email": user.email, "birthdate": user.birthdate, "stack": user.stack,
+                                "_role": "admin" if user.is_admin else "user"
+                            }
+                            for user in users_to_save
+                        ])
+                        .on_conflict_do_nothing()
+                        .returning(GeneralUser.login)
+                    )
+                )
+                for role_entity, is_admin in ((Admin, True), (User, False)):
+                    role_logins = [
+                        {"login": user.login} for user in users_to_save
+                        if user.login in saved_logins and user.is_admin == is_admin
+                    ]
+                    if role_logins:
+                        db_session.execute(insert(role_entity).values(role_logins))
+            write.commit()
         except DBAPIError as ex:
-            db_session.rollback()
-            logger.error(f"In _save_user error was occurred: {ex.args[0]}. User was not saved, transaction was"
+            write.rollback()
+            logger.error(f"In save_many error was occurred: {ex.args[0]}. Users were not saved, write was "
                          f"rolled back.")
-
-    def save(self, user: SaveUserDTO, db_session: Session) -> None:
-        if self.get_by_login(user.login, db_session) is None:
-            if user.is_admin:
-                self._save_admin(user, db_session)
-            else:
-                self._save_user(user, db_session)
-        else:
-            logger.error(f"In save error was occurred: user with login {user.login} already exists.")
-            raise ValueError("User already exists")
+            return [WriteOutcome.FAILED] * len(user_list)
+        return [
+            WriteOutcome.WRITTEN if position not in repeated and user.login in saved_logins
+            else WriteOutcome.ALREADY_EXISTS
+            for position, user in enumerate(user_list)
+        ]
 
     @staticmethod
     def _define_dict_to_update(user: PatchUserDTO) -> Dict:
@@ -95,7 +148,7 @@ class SQLAlchemyUserDAL(UserDALInterface):
         if user.username is not None:
             dict_to_update["username"] = user.username
         if user.new_hashed_password is not None:
-            dict_to_update["new_hashed_password"] = user.new_hashed_password
+            dict_to_update["hashed_password"] = user.new_hashed_password
         if user.email is not None:
             dict_to_update["email"] = user.email
         if user.birthdate is not None:
@@ -104,71 +157,150 @@ class SQLAlchemyUserDAL(UserDALInterface):
             dict_to_update["stack"] = user.stack
         return dict_to_update
 
-    def patch(self, user: PatchUserDTO, db_session: Session) -> None:
-        if self.get_by_login(user.login, db_session):
-            try:
-                db_session.execute(
-                    update(GeneralUser)
-                    .where(GeneralUser.login == user.login)
-                    .values(**self._define_dict_to_update(user))
-                )
-                db_session.commit()
-            except DBAPIError as ex:
-                db_session.rollback()
-                logger.error(f"In patch error was occurred: {ex.args[0]}. User was not patched, transaction was"
-                             f"rolled back.")
+    def patch(self, user: PatchUserDTO, db_session: Session) -> WriteOutcome:
+        values = self._define_dict_to_update(user)
+        if not values:
+            if self.get_by_login(user.login, db_session) is None:
+                return WriteOutcome.NOT_FOUND
+            return WriteOutcome.UNCHANGED
+        write = begin_write(db_session)
+        try:
+            patched_login = db_session.scalar(
+                update(GeneralUser)
+                .where(GeneralUser.login == user.login)
+                .values(**values)
+                .returning(GeneralUser.login)
+            )
+            write.commit()
+        except IntegrityError:
+            write.rollback()
+            logger.warning(f"In patch: User with username {user.username} already exists.")
+            return WriteOutcome.ALREADY_EXISTS
+        except DBAPIError as ex:
+            write.rollback()
+            logger.error(f"In patch error was occurred: {ex.args[0]}. User was not patched, write was "
+                         f"rolled back.")
+            return WriteOutcome.FAILED
+        return WriteOutcome.NOT_FOUND if patched_login is None else WriteOutcome.WRITTEN
+
+    def patch_many(self, user_list: List[PatchUserDTO], db_session: Session) -> List[WriteOutcome]:
+        try:
+            return self._patch_many(user_list, db_session, raise_username_conflict=True)
+        except IntegrityError:
+            # A new username was taken by a concurrent write after the check, the check of the second run sees it.
+            return self._patch_many(user_list, db_session, raise_username_conflict=False)
+
+    def _patch_many(
+            self,
+            user_list: List[PatchUserDTO],
+            db_session: Session,
+            raise_username_conflict: bool
+    ) -> List[WriteOutcome]:
+        repeated = repeated_positions([user.login for user in user_list])
+        outcomes, updates = [], []
+        write = begin_write(db_session)
+        try:
+            user_logins = existing_keys(GeneralUser.login, (user.login for user in user_list), db_session)
+            username_owners = key_owners(
+                GeneralUser.username, GeneralUser.login, (user.username for user in user_list), db_session
+            )
+            for position, user in enumerate(user_list):
+                values = self._define_dict_to_update(user)
+                if user.login not in user_logins:
+                    outcomes.append(WriteOutcome.NOT_FOUND)
+                elif position in repeated:
+                    logger.error(f"In patch_many error was occurred: User {user.login} is patched twice.")
+                    outcomes.append(WriteOutcome.FAILED)
+                elif not values:
+                    outcomes.append(WriteOutcome.UNCHANGED)
+                elif username_owners.get(user.username, user.login) != user.login:
+                    logger.warning(f"In patch_many: User with username {user.username} already exists.")
+                    outcomes.append(WriteOutcome.ALREADY_EXISTS)
+                else:
+                    if user.username is not None:
+                        username_owners[user.username] = user.login
+                    updates.append((user.login, values))
+                    outcomes.append(WriteOutcome.WRITTEN)
+            execute_grouped_updates(GeneralUser.login, updates, db_session)
+            write.commit()
+        except DBAPIError as ex:
+            write.rollback()
+            if raise_username_conflict and isinstance(ex, IntegrityError):
+                raise
+            logger.error(f"In patch_many error was occurred: {ex.args[0]}. Users were not patched, write was "
+                         f"rolled back.")
+            return [WriteOutcome.FAILED] * len(user_list)
+        return outcomes
 
     def delete_by_login(self, user_login: str, db_session: Session) -> None:
+        write = begin_write(db_session)
         try:
+            release_sender_categories(lambda entity: entity.sender_login == user_login, db_session)
             db_session.execute(
                 delete(GeneralUser)
                 .where(GeneralUser.login == user_login)
             )
-            db_session.commit()
+            write.commit()
         except DBAPIError as ex:
-            db_session.rollback()
-            logger.error(f"In delete_by_login error was occurred: {ex.args[0]}. User was not deleted, transaction was"
+            write.rollback()
+            logger.error(f"In delete_by_login error was occurred: {ex.args[0]}. User was not deleted, write was"
                          f"rolled back.")
 
     def delete_by_login_list(self, user_login_list: List[str], db_session: Session) -> None:
+        write = begin_write(db_session)
         try:
+            release_sender_categories(lambda entity: entity.sender_login.in_(user_login_list), db_session)
             db_session.execute(
                 delete(GeneralUser)
                 .where(
                     GeneralUser.login.in_(user_login_list)
                 )
             )
-            db_session.commit()
+            write.commit()
         except DBAPIError as ex:
-            db_session.rollback()
+            write.rollback()
             logger.error(f"In delete_by_login_list error was occurred: {ex.args[0]}. Users were not deleted, "
-                         f"transaction was rolled back.")
+                         f"write was rolled back.")
 
     def delete_by_username(self, username: str, db_session: Session) -> None:
+        write = begin_write(db_session)
         try:
+            release_sender_categories(
+                lambda entity: entity.sender_login.in_(
+                    select(GeneralUser.login).where(GeneralUser.username == username)
+                ),
+                db_session
+            )
             db_session.execute(
                 delete(GeneralUser)
                 .where(GeneralUser.username == username)
             )
-            db_session.commit()
+            write.commit()
         except DBAPIError as ex:
-            db_session.rollback()
-            logger.error(f"In delete_by_username error was occurred: {ex.args[0]}. User was not deleted, transaction "
+            write.rollback()
+            logger.error(f"In delete_by_username error was occurred: {ex.args[0]}. User was not deleted, write "
                          f"was rolled back.")
 
     def delete_by_username_list(self, username_list: List[str], db_session: Session) -> None:
+        write = begin_write(db_session)
         try:
+            release_sender_categories(
+                lambda entity: entity.sender_login.in_(
+                    select(GeneralUser.login).where(GeneralUser.username.in_(username_list))
+                ),
+                db_session
+            )
             db_session.execute(
                 delete(GeneralUser)
                 .where(
                     GeneralUser.username.in_(username_list)
                 )
             )
-            db_session.commit()
+            write.commit()
         except DBAPIError as ex:
-            db_session.rollback()
+            write.rollback()
             logger.error(
-                f"In delete_by_username_list error was occurred: {ex.args[0]}. Users were not deleted, transaction was"
+                f"In delete_by_username_list error was occurred: {ex.args[0]}. Users were not deleted, write was"
                 f"rolled back."
             )
 
@@ -195,4 +327,6 @@ if __name__ == "__main__":
         print(user_dal.get_by_login("user", session))
         user_dal.patch(PatchUserDTO("user", username="Purple Man", email="5nights@mail.us"), session)
         print(user_dal.get_by_login("user", session))
+        # The DAL only stages the writes, they are committed by the caller.
+        session.commit()
         #user_dal.delete_by_username_list(["Ura Klinskih"], session)
@@ -2,6 +2,8 @@
 from typing import List, Sequence
 from abc import ABC, abstractmethod
 from sqlalchemy.orm import Session
+from backend.data_access_layer.batch_write import WriteOutcome
+from backend.data_access_layer.load_profile import LoadProfile
 from backend.data_layer.mapped_database import GeneralUser
 from backend.data_access_layer.user_dal.save_user_dto import SaveUserDTO
 from backend.data_access_layer.user_dal.patch_user_dto import PatchUserDTO
@@ -10,27 +12,55 @@ from backend.data_access_layer.user_dal.patch_user_dto import PatchUserDTO
 class UserDALInterface(ABC):
 
     @abstractmethod
-    def get_by_login(self, user_login: str, db_session: Session) -> GeneralUser:
+    def get_by_login(
+            self,
+            user_login: str,
+            db_session: Session,
+            load_profile: LoadProfile = LoadProfile.BARE
+    ) -> GeneralUser:
         raise NotImplementedError
 
     @abstractmethod
-    def get_by_login_list(self, user_login_list: List[str], db_session: Session) -> Sequence[GeneralUser]:
+    def get_by_login_list(
+            self,
+            user_login_list: List[str],
+            db_session: Session,
+            load_profile: LoadProfile = LoadProfile.BARE
+    ) -> Sequence[GeneralUser]:
         raise NotImplementedError
 
     @abstractmethod
-    def get_by_username(self, username: str, db_session: Session) -> GeneralUser:
+    def get_by_username(
+            self,
+            username: str,
+            db_session: Session,
+            load_profile: LoadProfile = LoadProfile.BARE
+    ) -> GeneralUser:
         raise NotImplementedError
 
     @abstractmethod
-    def get_by_username_list(self, username_list: List[str], db_session: Session) -> Sequence[GeneralUser]:
+    def get_by_username_list(
+            self,
+            username_list: List[str],
+            db_session: Session,
+            load_profile: LoadProfile = LoadProfile.BARE
+    ) -> Sequence[GeneralUser]:
         raise NotImplementedError
 
     @abstractmethod
-    def save(self, user: SaveUserDTO, db_session: Session) -> None:
+    def save(self, user: SaveUserDTO, db_session: Session) -> WriteOutcome:
         raise NotImplementedError
 
     @abstractmethod
-    def patch(self, user: PatchUserDTO, db_session: Session) -> None:
+    def save_many(self, user_list: List[SaveUserDTO], db_session: Session) -> List[WriteOutcome]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def patch(self, user: PatchUserDTO, db_session: Session) -> WriteOutcome:
+        raise NotImplementedError
+
+    @abstractmethod
+    def patch_many(self, user_list: List[PatchUserDTO], db_session: Session) -> List[WriteOutcome]:
         raise NotImplementedError
 
     @abstractmethod
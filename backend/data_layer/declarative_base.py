@@ -10,6 +10,7 @@ class Base(DeclarativeBase):
     def create_from_metadata(cls, engine):
         with Session(engine) as session:
             session.execute(text("""CREATE SCHEMA IF NOT EXISTS omis2;"""))
+            session.execute(text("""CREATE EXTENSION IF NOT EXISTS pg_trgm;"""))
             session.commit()
             cls.metadata.create_all(engine)
             session.execute(
@@ -27,6 +28,36 @@ class Base(DeclarativeBase):
                     CREATE INDEX IF NOT EXISTS
                         omis2_discussion_title_hash_index ON omis2.discussion
                         USING HASH (title);
+                    CREATE INDEX IF NOT EXISTS
+                        omis2_knowledge_category_title_index ON omis2.knowledge (category, title);
+                    CREATE INDEX IF NOT EXISTS
+                        omis2_knowledge_status_category_title_index ON omis2.knowledge (status, category, title);
+                    CREATE INDEX IF NOT EXISTS
+                        omis2_discussion_category_title_index ON omis2.discussion (category, title);
+                    ALTER TABLE omis2.knowledge ADD COLUMN IF NOT EXISTS
+                        search_vector tsvector GENERATED ALWAYS AS (
+                            setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+                            setweight(to_tsvector('simple', coalesce(category, '')), 'B') ||
+                            setweight(to_tsvector('simple', coalesce(description, '')), 'C')
+                        ) STORED;
+                    CREATE INDEX IF NOT EXISTS
+                        omis2_knowledge_search_vector_gin_index ON omis2.knowledge
+                        USING GIN (search_vector);
+                    ALTER TABLE omis2.discussion ADD COLUMN IF NOT EXISTS
+                        search_vector tsvector GENERATED ALWAYS AS (
+                            setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+                            setweight(to_tsvector('simple', coalesce(category, '')), 'B') ||
+                            setweight(to_tsvector('simple', coalesce(description, '')), 'C')
+                        ) STORED;
+                    CREATE INDEX IF NOT EXISTS
+                        omis2_discussion_search_vector_gin_index ON omis2.discussion
+                        USING GIN (search_vector);
+                    CREATE INDEX IF NOT EXISTS
+                        omis2_knowledge_title_trigram_index ON omis2.knowledge
+                        USING GIN (title gin_trgm_ops);
+                    CREATE INDEX IF NOT EXISTS
+                        omis2_discussion_title_trigram_index ON omis2.discussion
+                        USING GIN (title gin_trgm_ops);
                     """
                 )
             )
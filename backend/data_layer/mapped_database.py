@@ -1,12 +1,20 @@
 #Author: Vodohleb04
 from __future__ import annotations
 from typing import List
-from datetime import date
+from datetime import date, datetime
 from enum import Enum
-from sqlalchemy import UniqueConstraint, ForeignKey
+from sqlalchemy import UniqueConstraint, ForeignKey, Index, Identity, BigInteger, Integer, DateTime, func
+from sqlalchemy.dialects.sqlite import DATETIME as SQLITE_DATETIME
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from backend.data_layer.declarative_base import Base
 
+# SQLite only generates keys for INTEGER PRIMARY KEY columns, Postgres gets bigint identity columns.
+SurrogateKey = BigInteger().with_variant(Integer, "sqlite")
+# SQLite compares timestamps as text, bound values have to be stored in the format of CURRENT_TIMESTAMP.
+Timestamp = DateTime(timezone=True).with_variant(
+    SQLITE_DATETIME(storage_format="%(year)04d-%(month)02d-%(day)02d %(hour)02d:%(minute)02d:%(second)02d"), "sqlite"
+)
+
 
 class GeneralUser(Base):
     __tablename__ = 'general_user'
@@ -49,13 +57,13 @@ class User(GeneralUser):
         "polymorphic_identity": "user"
     }
     sent_knowledge: Mapped[List[Knowledge]] = relationship(
-        back_populates="knowledge_sender", cascade='all, delete', passive_deletes=True, lazy='selectin'
+        back_populates="knowledge_sender", cascade='all, delete', passive_deletes=True, lazy='raise'
     )
     sent_discussions: Mapped[List[Discussion]] = relationship(
-        back_populates="discussion_sender", cascade='all, delete', passive_deletes=True, lazy='selectin'
+        back_populates="discussion_sender", cascade='all, delete', passive_deletes=True, lazy='raise'
     )
     sent_comments: Mapped[List[Comment]] = relationship(
-        back_populates="comment_sender", cascade='all, delete', passive_deletes=True, lazy='selectin'
+        back_populates="comment_sender", cascade='all, delete', passive_deletes=True, lazy='raise'
     )
 
 
@@ -80,61 +88,103 @@ class KnowledgeStatus(Enum):
 class Knowledge(Base):
     __tablename__ = 'knowledge'
 
+    id: Mapped[int] = mapped_column(SurrogateKey, Identity(), primary_key=True)
     status: Mapped[KnowledgeStatus] = mapped_column(default=KnowledgeStatus.IN_PROCESSING)
-    title: Mapped[str] = mapped_column(primary_key=True)
+    title: Mapped[str]
     description: Mapped[str]
     link: Mapped[str]
     category: Mapped[str]
-    sender_login: Mapped[str] = mapped_column(ForeignKey("user.login", ondelete='CASCADE'), nullable=False)
+    sender_login: Mapped[str] = mapped_column(
+        ForeignKey("user.login", ondelete='CASCADE'), nullable=False, index=True
+    )
 
-    knowledge_sender: Mapped[User] = relationship(back_populates="sent_knowledge", lazy='selectin')
+    knowledge_sender: Mapped[User] = relationship(back_populates="sent_knowledge", lazy='raise')
+
+    __table_args__ = (
+        UniqueConstraint("title", name="unique_knowledge_title"),
+        Index("knowledge_category_status_index", "category", "status"),
+    )
 
     def __repr__(self) -> str:
-        return (f"Knowledge(title={self.title}, description={self.description}, link={self.link}, "
+        return (f"Knowledge(id={self.id}, title={self.title}, description={self.description}, link={self.link}, "
                 f"category={self.category}, sender_login={self.sender_login})")
 
     def __str__(self) -> str:
-        return (f"Knowledge(title: {self.title}, link: {self.link}, category: {self.category}, "
+        return (f"Knowledge(id: {self.id}, title: {self.title}, link: {self.link}, category: {self.category}, "
                 f"sender_login: {self.sender_login})")
 
 
+class KnowledgeCategory(Base):
+    __tablename__ = 'knowledge_category'
+
+    category: Mapped[str] = mapped_column(primary_key=True)
+    in_processing_count: Mapped[int] = mapped_column(default=0)
+    published_count: Mapped[int] = mapped_column(default=0)
+
+    def __repr__(self) -> str:
+        return (f"KnowledgeCategory(category={self.category}, in_processing_count={self.in_processing_count}, "
+                f"published_count={self.published_count})")
+
+
 class Discussion(Base):
     __tablename__ = 'discussion'
 
-    title: Mapped[str] = mapped_column(primary_key=True)
+    id: Mapped[int] = mapped_column(SurrogateKey, Identity(), primary_key=True)
+    title: Mapped[str]
     description: Mapped[str]
     category: Mapped[str]
-    sender_login: Mapped[str] = mapped_column(ForeignKey("user.login", ondelete='CASCADE'), nullable=False)
+    sender_login: Mapped[str] = mapped_column(
+        ForeignKey("user.login", ondelete='CASCADE'), nullable=False, index=True
+    )
 
     connected_comments: Mapped[List[Comment]] = relationship(
-        back_populates="connected_discussion", lazy='selectin', cascade="all, delete", passive_deletes=True
+        back_populates="connected_discussion", lazy='raise', cascade="all, delete", passive_deletes=True
     )
-    discussion_sender: Mapped[User] = relationship(back_populates="sent_discussions", lazy='selectin')
+    discussion_sender: Mapped[User] = relationship(back_populates="sent_discussions", lazy='raise')
+
+    __table_args__ = (UniqueConstraint("title", name="unique_discussion_title"),)
 
     def __repr__(self) -> str:
-        return (f"Discussion(title={self.title}, description={self.description}, category={self.category}"
+        return (f"Discussion(id={self.id}, title={self.title}, description={self.description}, category={self.category}"
                 f", sender_login={self.sender_login})")
 
     def __str__(self) -> str:
-        return (f"Discussion(title: {self.title}, category: {self.category}, sender_login: "
+        return (f"Discussion(id: {self.id}, title: {self.title}, category: {self.category}, sender_login: "
                 f"{self.sender_login})")
 
 
+class DiscussionCategory(Base):
+    __tablename__ = 'discussion_category'
+
+    category: Mapped[str] = mapped_column(primary_key=True)
+    discussion_count: Mapped[int] = mapped_column(default=0)
+
+    def __repr__(self) -> str:
+        return f"DiscussionCategory(category={self.category}, discussion_count={self.discussion_count})"
+
+
 class Comment(Base):
     __tablename__ = 'comment'
 
-    id: Mapped[int] = mapped_column(primary_key=True)
-    discussion_title: Mapped[int] = mapped_column(
-        ForeignKey("discussion.title", ondelete='CASCADE'), nullable=False
+    id: Mapped[int] = mapped_column(SurrogateKey, Identity(), primary_key=True)
+    discussion_id: Mapped[int] = mapped_column(
+        SurrogateKey, ForeignKey("discussion.id", ondelete='CASCADE'), nullable=False
     )
     description: Mapped[str]
-    sender_login: Mapped[str] = mapped_column(ForeignKey("user.login", ondelete='CASCADE'), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(Timestamp, server_default=func.now())
+    sender_login: Mapped[str] = mapped_column(
+        ForeignKey("user.login", ondelete='CASCADE'), nullable=False, index=True
+    )
+
+    connected_discussion: Mapped[Discussion] = relationship(back_populates="connected_comments", lazy='raise')
+    comment_sender: Mapped[User] = relationship(back_populates="sent_comments", lazy='raise')
 
-    connected_discussion: Mapped[Discussion] = relationship(back_populates="connected_comments", lazy='selectin')
-    comment_sender: Mapped[User] = relationship(back_populates="sent_comments", lazy='selectin')
+    # Serves the foreign key as well as the pages of a discussion's comments in creation order.
+    __table_args__ = (Index("comment_discussion_created_at_index", "discussion_id", "created_at", "id"),)
 
     def __repr__(self) -> str:
-        return f"Comment(id={self.id}, discussion_title={self.discussion_title}, sender_login={self.sender_login})"
+        return (f"Comment(id={self.id}, discussion_id={self.discussion_id}, created_at={self.created_at}, "
+                f"sender_login={self.sender_login})")
 
     def __str__(self) -> str:
-        return f"Comment(id: {self.id}, discussion_title: {self.discussion_title}, sender_login: {self.sender_login})"
+        return f"Comment(id: {self.id}, discussion_id: {self.discussion_id}, sender_login: {self.sender_login})"
@@ -0,0 +1,143 @@
+#Author: Vodohleb04
+import itertools
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Sequence
+from sqlalchemy import Engine, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+ROUND_ROBIN = "round_robin"
+LEAST_CONNECTIONS = "least_connections"
+BALANCING_STRATEGIES = (ROUND_ROBIN, LEAST_CONNECTIONS)
+PRIMARY_READS_HEADER = "omis_primary_reads"
+
+# Zero on a replica that replayed everything it received, and on a database that is not a replica at all.
+_POSTGRES_LAG_QUERY = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+_primary_reads: ContextVar[bool] = ContextVar("omis_primary_reads", default=False)
+
+
+@contextmanager
+def primary_reads(enabled: bool = True):
+    # Reads of a user who has just written are sent to the primary, a replica may not have replayed the write yet.
+    token = _primary_reads.set(enabled)
+    try:
+        yield
+    finally:
+        _primary_reads.reset(token)
+
+
+def reads_from_primary() -> bool:
+    return _primary_reads.get()
+
+
+def set_primary_reads(enabled: bool) -> None:
+    # For the task body that runs next in this thread, when there is no block to wrap it in.
+    _primary_reads.set(enabled)
+
+
+def measure_replication_lag(engine: Engine) -> float:
+    if engine.dialect.name != "postgresql":
+        # SQLite stand-ins are never behind.
+        return 0.0
+    with engine.connect() as connection:
+        return float(connection.scalar(_POSTGRES_LAG_QUERY))
+
+
+class ReplicaSet:
+    # Replicas that serve the reads, each replica behind by more than max_lag_seconds is left out until it catches
+    # up. The lag is measured at most once per lag_check_interval, not per read.
+
+    def __init__(
+            self,
+            primary: Engine,
+            replicas: Sequence[Engine],
+            balancing: str = ROUND_ROBIN,
+            max_lag_seconds: float = 5.0,
+            lag_check_interval: float = 1.0,
+            measure_lag: Callable[[Engine], float] = measure_replication_lag,
+            clock: Callable[[], float] = time.monotonic
+    ):
+        if balancing not in BALANCING_STRATEGIES:
+            raise ValueError(f"Unsupported replica balancing: {balancing}")
+        self.__primary = primary
+        self.__replicas = tuple(replicas)
+        self.__balancing = balancing
+        self.__max_lag_seconds = max_lag_seconds
+        self.__lag_check_interval = lag_check_interval
+        self.__measure_lag = measure_lag
+        self.__clock = clock
+        self.__lock = threading.Lock()
+        self.__round_robin = itertools.count()
+        self.__lags: Dict[Engine, float] = {}
+        self.__measured_at: Dict[Engine, float] = {}
+
+    @property
+    def primary(self) -> Engine:
+        return self.__primary
+
+    @property
+    def replicas(self) -> Sequence[Engine]:
+        return self.__replicas
+
+    def lag_seconds(self, replica: Engine) -> float:
+        now = self.__clock()
+        with self.__lock:
+            if now - self.__measured_at.get(replica, float("-inf")) < self.__lag_check_interval:
+                return self.__lags[replica]
+            # Other readers keep the last value meanwhile instead of probing the same replica too.
+            self.__measured_at[replica] = now
+            self.__lags.setdefault(replica, 0.0)
+        try:
+            lag = self.__measure_lag(replica)
+        except DBAPIError as ex:
+            logger.error(f"In lag_seconds error was occurred: {ex.args[0]}. Replica {replica.url} is left out.")
+            lag = float("inf")
+        with self.__lock:
+            self.__lags[replica] = lag
+        return lag
+
+    def choose(self) -> Engine:
+        healthy = [replica for replica in self.__replicas if self.lag_seconds(replica) <= self.__max_lag_seconds]
+        if not healthy:
+            return self.__primary
+        if self.__balancing == LEAST_CONNECTIONS:
+            return min(healthy, key=lambda replica: replica.pool.checkedout())
+        return healthy[next(self.__round_robin) % len(healthy)]
+
+    def dispose(self, close: bool = True) -> None:
+        for replica in self.__replicas:
+            replica.dispose(close=close)
+
+
+class RoutingSession(Session):
+    # Session of the read tasks: queries go to one replica chosen for the session, writes, SELECT ... FOR UPDATE
+    # and reads made inside primary_reads() go to the primary. After its first write the session stays on the
+    # primary, its later reads have to see that write.
+
+    def __init__(self, *args, replica_set: ReplicaSet, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.__replica_set = replica_set
+        self.__replica = None
+        self.__on_primary = False
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self._flushing or (clause is not None and (
+                clause.is_dml or getattr(clause, "_for_update_arg", None) is not None
+        )):
+            self.__on_primary = True
+        if self.__on_primary or _primary_reads.get() or (mapper is None and clause is None):
+            # Bare connection() calls are made by the batch writes, they belong to the primary as well.
+            return self.__replica_set.primary
+        if self.__replica is None:
+            self.__replica = self.__replica_set.choose()
+        return self.__replica
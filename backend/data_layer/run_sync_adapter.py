@@ -0,0 +1,66 @@
+#Author: Vodohleb04
+import asyncio
+import inspect
+from functools import wraps
+from typing import Callable
+from sqlalchemy.util.concurrency import await_only, in_greenlet
+
+DB_SESSION_PARAMETER = "db_session"
+
+
+def run_blocking(function: Callable, *args, **kwargs):
+    # Blocking work of the synchronous implementations: key derivations, round trips to redis. In the greenlet of an
+    # async adapter it runs in a thread and is awaited there, so the event loop keeps serving the other requests.
+    if in_greenlet():
+        return await_only(asyncio.to_thread(function, *args, **kwargs))
+    return function(*args, **kwargs)
+
+
+def _coroutine_for(interface_method: Callable) -> Callable:
+    name = interface_method.__name__
+    parameters = [parameter for parameter in inspect.signature(interface_method).parameters if parameter != "self"]
+    if DB_SESSION_PARAMETER not in parameters:
+        @wraps(interface_method)
+        async def call_without_session(self, *args, **kwargs):
+            # Token checks and revocations without a session may wait for redis, the event loop does not.
+            return await asyncio.to_thread(getattr(self._implementation, name), *args, **kwargs)
+
+        return call_without_session
+
+    db_session_position = parameters.index(DB_SESSION_PARAMETER)
+
+    @wraps(interface_method)
+    async def call_in_session(self, *args, **kwargs):
+        method = getattr(self._implementation, name)
+        if DB_SESSION_PARAMETER in kwargs:
+            db_session = kwargs[DB_SESSION_PARAMETER]
+
+            def run(sync_session):
+                return method(*args, **{**kwargs, DB_SESSION_PARAMETER: sync_session})
+        else:
+            db_session = args[db_session_position]
+
+            def run(sync_session):
+                return method(*args[:db_session_position], sync_session, *args[db_session_position + 1:], **kwargs)
+        # The synchronous implementation runs in a greenlet, every query it sends is awaited on the async driver.
+        return await db_session.run_sync(run)
+
+    return call_in_session
+
+
+class RunSyncAdapter:
+    # Async counterpart of a DAL or service interface: every abstract method becomes a coroutine with the same
+    # parameters that takes an AsyncSession as db_session and delegates to a synchronous implementation.
+    interface: type
+
+    def __init_subclass__(cls, interface: type, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.interface = interface
+        for name in interface.__abstractmethods__:
+            if name not in cls.__dict__:
+                setattr(cls, name, _coroutine_for(getattr(interface, name)))
+
+    def __init__(self, implementation):
+        if not isinstance(implementation, self.interface):
+            raise TypeError(f"{type(implementation).__name__} does not implement {self.interface.__name__}")
+        self._implementation = implementation
@@ -0,0 +1,52 @@
+#Author: Vodohleb04
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import StaticPool
+from backend.data_layer.declarative_base import Base
+import backend.data_layer.mapped_database
+
+
+def _attach_omis2_schema_on_connect(engine: Engine, omis2_path: str) -> None:
+    @event.listens_for(engine, "connect")
+    def attach_omis2_schema(dbapi_connection, connection_record):
+        # A cursor works for both sqlite3 and the aiosqlite adapter, only sqlite3 connections have execute.
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"ATTACH DATABASE '{omis2_path}' AS omis2")
+        cursor.execute("PRAGMA foreign_keys = ON")
+        cursor.close()
+        # The driver would begin its own transactions lazily, before DML only, and a SAVEPOINT before any DML would
+        # start an outer transaction that its RELEASE commits. The transactions are begun by the engine instead.
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def begin_transaction(connection):
+        # Emitted on the driver connection, so BEGIN is not counted as a statement of the DAL.
+        cursor = connection.connection.dbapi_connection.cursor()
+        cursor.execute("BEGIN")
+        cursor.close()
+
+
+def create_sqlite_stand_in_engine(database_path: str = None) -> Engine:
+    # SQLite has no schemas, the omis2 schema is emulated by an attached database.
+    if database_path is None:
+        engine = create_engine(
+            "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+        )
+        omis2_path = ":memory:"
+    else:
+        engine = create_engine(f"sqlite:///{database_path}", connect_args={"check_same_thread": False})
+        omis2_path = f"{database_path}.omis2"
+    _attach_omis2_schema_on_connect(engine, omis2_path)
+
+    Base.metadata.create_all(engine)
+    return engine
+
+
+async def create_async_sqlite_stand_in_engine():
+    # In memory only: the single connection of the StaticPool keeps the database alive.
+    from sqlalchemy.ext.asyncio import create_async_engine
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    _attach_omis2_schema_on_connect(engine.sync_engine, ":memory:")
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    return engine
@@ -2,7 +2,8 @@
 import broker
 
 
-from backend.service_layer.authentication_service.authorization_token import AuthorizationToken
+from hashlib import sha256
+from backend.data_access_layer.user_dal.login_user_dto import LoginUserDTO
 from broker.discussion_tasks import DiscussionTasks
 
 
@@ -25,9 +26,16 @@ print(result.get())
 
 
 
-this_token = AuthorizationToken("user", "<PASSWORD>", False)
-other_token = AuthorizationToken("other_user", "pppp", False)
-admin_token = AuthorizationToken("admin", "plan", True)
+def log_in(login, password):
+    # Tokens are signed by the workers now, they are obtained by logging in like the web process does.
+    return broker.AuthenticationTasks.login_task.delay(
+        LoginUserDTO(login=login, hashed_password=sha256(password.encode()).hexdigest())
+    ).get()
+
+
+this_token = log_in("user", "<PASSWORD>")
+other_token = log_in("other_user", "pppp")
+admin_token = log_in("admin", "plan")
 
 
 from backend.data_access_layer.discussion_dal.save_discussion_dto import SaveDiscussionDTO
@@ -0,0 +1,69 @@
+#Author: Vodohleb04
+import asyncio
+import threading
+import pytest
+from sqlalchemy import text
+from backend.data_layer.engine_registry import EngineRegistry, EngineSettings, to_async_url
+
+
+def test_settings_from_environment():
+    settings = EngineSettings.from_environment(
+        {
+            "OMIS_DATABASE_URL": "postgresql+psycopg2://omis@db/omis",
+            "OMIS_DB_POOL_SIZE": "3",
+            "OMIS_DB_MAX_OVERFLOW": "0",
+            "OMIS_DB_POOL_PRE_PING": "false",
+        }
+    )
+    assert settings == EngineSettings(
+        database_url="postgresql+psycopg2://omis@db/omis", pool_size=3, max_overflow=0, pool_pre_ping=False
+    )
+    assert EngineSettings.from_environment({}) == EngineSettings()
+
+
+def test_pool_statistics(tmp_path):
+    registry = EngineRegistry(
+        EngineSettings(database_url=f"sqlite:///{tmp_path / 'pool.db'}", pool_size=1, max_overflow=0)
+    )
+    holding = threading.Event()
+    release = threading.Event()
+
+    def hold_connection():
+        with registry.engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+            holding.set()
+            release.wait()
+
+    holder = threading.Thread(target=hold_connection)
+    holder.start()
+    holding.wait()
+    assert registry.pool_statistics().checked_out == 1
+    threading.Timer(0.2, release.set).start()
+    with registry.sessionmaker() as session:
+        session.execute(text("SELECT 1"))
+    holder.join()
+
+    statistics = registry.pool_statistics()
+    assert statistics.checkouts == 2
+    assert statistics.checked_out == 0
+    assert statistics.max_wait_seconds >= 0.15
+
+    registry.dispose()
+    assert registry.pool_statistics().checkouts == 0
+
+
+def test_async_sessionmaker(tmp_path):
+    assert to_async_url("postgresql+psycopg2://omis@db/omis").render_as_string() == "postgresql+asyncpg://omis@db/omis"
+    with pytest.raises(ValueError):
+        to_async_url("mysql://omis@db/omis")
+    pytest.importorskip("greenlet")
+    pytest.importorskip("aiosqlite")
+    registry = EngineRegistry(EngineSettings(database_url=f"sqlite:///{tmp_path / 'async.db'}"))
+
+    async def select_one():
+        async with registry.async_sessionmaker() as session:
+            return await session.scalar(text("SELECT 1"))
+
+    assert asyncio.run(select_one()) == 1
+    assert registry.async_sessionmaker is registry.async_sessionmaker
+    registry.dispose()
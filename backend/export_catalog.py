@@ -0,0 +1,107 @@
+#Author: Vodohleb04
+import argparse
+import json
+import os
+import sys
+from backend.data_layer.engine_registry import engine_registry
+from backend.data_layer.mapped_database import KnowledgeStatus
+from backend.data_access_layer.catalog_export import (
+    ExportFilter, export_chunks, check_export, EXPORT_ENTITIES, EXPORT_FORMATS, NDJSON, DEFAULT_EXPORT_CHUNK_SIZE
+)
+
+CHECKPOINT_SUFFIX = ".checkpoint"
+
+
+def _read_checkpoint(checkpoint_path: str) -> dict | None:
+    if not os.path.exists(checkpoint_path):
+        return None
+    with open(checkpoint_path) as checkpoint_file:
+        return json.load(checkpoint_file)
+
+
+def _write_checkpoint(checkpoint_path: str, checkpoint: dict) -> None:
+    # Replaced in one step, an interruption leaves either the old checkpoint or the new one.
+    temporary_path = f"{checkpoint_path}.tmp"
+    with open(temporary_path, "w") as checkpoint_file:
+        json.dump(checkpoint, checkpoint_file)
+        checkpoint_file.flush()
+        os.fsync(checkpoint_file.fileno())
+    os.replace(temporary_path, checkpoint_path)
+
+
+def export_catalog(
+        entity: str,
+        output_path: str,
+        session_maker,
+        export_format: str = NDJSON,
+        export_filter: ExportFilter = ExportFilter(),
+        chunk_size: int = DEFAULT_EXPORT_CHUNK_SIZE,
+        checkpoint_path: str = None
+) -> int:
+    # After every chunk is on disk the checkpoint records the id of its last row and the size of the file. Run again
+    # after an interruption, the export cuts the file back to that size and continues after that id. The checkpoint
+    # is removed once the export is complete.
+    check_export(entity, export_format, export_filter)
+    if checkpoint_path is None:
+        checkpoint_path = output_path + CHECKPOINT_SUFFIX
+    job = {
+        "entity": entity, "format": export_format, "category": export_filter.category,
+        "status": None if export_filter.status is None else export_filter.status.value
+    }
+    checkpoint = _read_checkpoint(checkpoint_path)
+    if checkpoint is None:
+        checkpoint = {"job": job, "after_id": 0, "offset": 0, "rows": 0}
+        mode = "wb"
+    elif checkpoint["job"] != job:
+        raise ValueError(f"Checkpoint {checkpoint_path} belongs to another export: {checkpoint['job']}")
+    else:
+        mode = "r+b"
+    with open(output_path, mode) as output, session_maker() as session:
+        output.seek(checkpoint["offset"])
+        output.truncate()
+        for last_id, rows, text in export_chunks(
+                entity, session, export_format, export_filter, checkpoint["after_id"], chunk_size,
+                include_header=checkpoint["offset"] == 0
+        ):
+            output.write(text.encode())
+            output.flush()
+            os.fsync(output.fileno())
+            checkpoint.update(after_id=last_id, offset=output.tell(), rows=checkpoint["rows"] + rows)
+            _write_checkpoint(checkpoint_path, checkpoint)
+    os.remove(checkpoint_path)
+    return checkpoint["rows"]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        prog="python -m backend.export_catalog",
+        description="Streams knowledge, discussions or comments to a file or to the standard output."
+    )
+    parser.add_argument("entity", choices=EXPORT_ENTITIES)
+    parser.add_argument("output", help="file path, - for the standard output (not resumable)")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default=NDJSON)
+    parser.add_argument("--category")
+    parser.add_argument("--status", choices=[status.value for status in KnowledgeStatus])
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_EXPORT_CHUNK_SIZE)
+    parser.add_argument("--checkpoint", help=f"checkpoint path, the output path with {CHECKPOINT_SUFFIX} by default")
+    arguments = parser.parse_args()
+    export_filter = ExportFilter(
+        arguments.category, None if arguments.status is None else KnowledgeStatus(arguments.status)
+    )
+    try:
+        check_export(arguments.entity, arguments.format, export_filter)
+    except ValueError as ex:
+        parser.error(str(ex))
+    # Exports read from the replicas when there are any.
+    if arguments.output == "-":
+        with engine_registry.read_sessionmaker() as session:
+            for _, _, text in export_chunks(
+                    arguments.entity, session, arguments.format, export_filter, chunk_size=arguments.chunk_size
+            ):
+                sys.stdout.write(text)
+    else:
+        exported_rows = export_catalog(
+            arguments.entity, arguments.output, engine_registry.read_sessionmaker, arguments.format, export_filter,
+            arguments.chunk_size, arguments.checkpoint
+        )
+        print(f"{exported_rows} rows of {arguments.entity} were exported to {arguments.output}", file=sys.stderr)
@@ -0,0 +1,129 @@
+#Author: Vodohleb04
+from datetime import date
+import pytest
+from sqlalchemy.orm import sessionmaker
+from backend.data_layer.sqlite_stand_in import create_sqlite_stand_in_engine
+from backend.data_layer.mapped_database import KnowledgeStatus
+from backend.data_access_layer.user_dal.user_dal import SQLAlchemyUserDAL
+from backend.data_access_layer.user_dal.save_user_dto import SaveUserDTO
+from backend.data_access_layer.knowledge_dal.knowledge_dal import SQLAlchemyKnowledgeDAL
+from backend.data_access_layer.knowledge_dal.save_knowledge_dto import SaveKnowledgeDTO
+from backend.data_access_layer.discussion_dal.discussion_dal import SQLAlchemyDiscussionDAL
+from backend.data_access_layer.discussion_dal.save_discussion_dto import SaveDiscussionDTO
+from backend.data_access_layer.search.in_memory_search_index import InMemorySearchIndex
+
+
+@pytest.fixture
+def search_index():
+    search_index = InMemorySearchIndex()
+    search_index.add("Python basics", "Python basics", "Variables and loops", "Programming")
+    search_index.add("Python packaging", "Python packaging", "Wheels and sdists", "Programming")
+    search_index.add("Snakes", "Snakes", "Python is a snake", "Biology")
+    search_index.add("Databases", "Databases", "Postgres indexes", "Programming")
+    return search_index
+
+
+def test_title_match_ranks_above_description_match(search_index):
+    assert search_index.search("python").items == ["Python basics", "Python packaging", "Snakes"]
+
+
+def test_prefix_and_all_terms_match(search_index):
+    assert search_index.search("pyth pack").items == ["Python packaging"]
+    assert search_index.search("progr").items == ["Databases", "Python basics", "Python packaging"]
+    assert search_index.search("python postgres").items == []
+    assert search_index.search("  ").items == []
+
+
+def test_remove_and_replace(search_index):
+    search_index.remove("Snakes")
+    search_index.add("Python basics", "Python basics", "Lists", "Programming")
+    assert search_index.search("python").items == ["Python basics", "Python packaging"]
+    assert search_index.search("loops").items == []
+    assert len(search_index) == 3
+
+
+def test_index_pages_cover_all_results(search_index):
+    titles, cursor = [], None
+    while True:
+        page = search_index.search("python", cursor=cursor, page_size=1)
+        titles.extend(page.items)
+        cursor = page.next_cursor
+        if cursor is None:
+            break
+    assert titles == ["Python basics", "Python packaging", "Snakes"]
+
+
+@pytest.fixture
+def session_maker():
+    engine = create_sqlite_stand_in_engine()
+    session_maker = sessionmaker(engine, expire_on_commit=False)
+    with session_maker() as session:
+        SQLAlchemyUserDAL().save(SaveUserDTO(False, "user", "user name", "hash", "user@mail.ru", date.today()), session)
+        knowledge_dal = SQLAlchemyKnowledgeDAL()
+        discussion_dal = SQLAlchemyDiscussionDAL()
+        for i in range(7):
+            knowledge_dal.save(SaveKnowledgeDTO(f"Search topic {i}", "description", "link", "category", "user"), session)
+            if i % 2 == 0:
+                knowledge_dal.accept_publishing(f"Search topic {i}", session)
+            discussion_dal.save(SaveDiscussionDTO(f"Discussion {i}", f"about search {i}", "category", "user"), session)
+        session.commit()
+    yield session_maker
+    engine.dispose()
+
+
+def test_knowledge_search_filters_by_status_and_pages(session_maker):
+    knowledge_dal = SQLAlchemyKnowledgeDAL()
+    titles, cursor = [], None
+    with session_maker() as session:
+        while True:
+            page = knowledge_dal.search(
+                "search top", session, status=KnowledgeStatus.PUBLISHED, cursor=cursor, page_size=3
+            )
+            titles.extend(knowledge.title for knowledge in page.items)
+            cursor = page.next_cursor
+            if cursor is None:
+                break
+    assert titles == [f"Search topic {i}" for i in range(0, 7, 2)]
+
+
+def test_discussion_search_matches_description(session_maker):
+    with session_maker() as session:
+        page = SQLAlchemyDiscussionDAL().search("search 3", session)
+    assert [discussion.title for discussion in page.items] == ["Discussion 3"]
+
+
+def test_postgres_full_text_search_ranks_filters_and_pages(postgres_search_engine):
+    session_maker = sessionmaker(postgres_search_engine, expire_on_commit=False)
+    knowledge_dal = SQLAlchemyKnowledgeDAL()
+    with session_maker() as session:
+        SQLAlchemyUserDAL().save(SaveUserDTO(False, "user", "user name", "hash", "user@mail.ru", date.today()), session)
+        for title, description, category in [
+            ("Snakes", "Python is a snake", "Biology"),
+            ("Python packaging", "Wheels and sdists", "Programming"),
+            ("Python basics", "Variables and loops", "Programming"),
+            ("Python drafts", "Not reviewed yet", "Programming"),
+            ("Databases", "Postgres indexes", "Programming")
+        ]:
+            knowledge_dal.save(SaveKnowledgeDTO(title, description, "link", category, "user"), session)
+            if title != "Python drafts":
+                knowledge_dal.accept_publishing(title, session)
+        session.commit()
+
+        def search_titles(query, status=None, page_size=10):
+            titles, cursor = [], None
+            while True:
+                page = knowledge_dal.search(query, session, status=status, cursor=cursor, page_size=page_size)
+                titles.extend(knowledge.title for knowledge in page.items)
+                cursor = page.next_cursor
+                if cursor is None:
+                    return titles
+
+        # Title matches rank above the description match, equal ranks are ordered by title, also across pages.
+        assert search_titles("python", KnowledgeStatus.PUBLISHED, page_size=1) == [
+            "Python basics", "Python packaging", "Snakes"
+        ]
+        assert search_titles("python", page_size=2) == ["Python basics", "Python drafts", "Python packaging", "Snakes"]
+        assert search_titles("pyth pack") == ["Python packaging"]
+        assert search_titles("progr", KnowledgeStatus.PUBLISHED) == ["Databases", "Python basics", "Python packaging"]
+        assert search_titles("python postgres") == []
+        assert search_titles("  ") == []
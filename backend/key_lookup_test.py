@@ -0,0 +1,61 @@
+#Author: Vodohleb04
+from datetime import date
+import pytest
+from sqlalchemy import event
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.orm import sessionmaker
+from backend.data_layer.sqlite_stand_in import create_sqlite_stand_in_engine
+from backend.data_access_layer.load_profile import LoadProfile
+from backend.data_access_layer.user_dal.user_dal import SQLAlchemyUserDAL
+from backend.data_access_layer.user_dal.save_user_dto import SaveUserDTO
+from backend.data_access_layer.knowledge_dal.knowledge_dal import SQLAlchemyKnowledgeDAL
+from backend.data_access_layer.knowledge_dal.save_knowledge_dto import SaveKnowledgeDTO
+
+
+@pytest.fixture
+def session_maker():
+    engine = create_sqlite_stand_in_engine()
+    session_maker = sessionmaker(engine, expire_on_commit=False)
+    with session_maker() as session:
+        for login in ["user", "other_user"]:
+            SQLAlchemyUserDAL().save(
+                SaveUserDTO(False, login, f"{login} name", "hash", f"{login}@mail.ru", date.today()), session
+            )
+            SQLAlchemyKnowledgeDAL().save(
+                SaveKnowledgeDTO(f"{login} knowledge", "description", "link", "category", login), session
+            )
+        session.commit()
+    yield session_maker
+    engine.dispose()
+
+
+def test_lookups_find_rows_by_key(session_maker):
+    user_dal, knowledge_dal = SQLAlchemyUserDAL(), SQLAlchemyKnowledgeDAL()
+    with session_maker() as session:
+        assert user_dal.get_by_login("other_user", session).username == "other_user name"
+        assert user_dal.get_by_username("user name", session).login == "user"
+        assert user_dal.get_by_login("ghost", session) is None
+        knowledge = knowledge_dal.get_by_title("other_user knowledge", session, LoadProfile.WITH_SENDER)
+        assert knowledge.knowledge_sender.login == "other_user"
+        assert knowledge_dal.get_by_id(knowledge.id, session).title == "other_user knowledge"
+        with pytest.raises(InvalidRequestError):
+            knowledge_dal.get_by_title("user knowledge", session).knowledge_sender
+        with pytest.raises(ValueError):
+            user_dal.get_by_login("user", session, LoadProfile.WITH_COMMENTS)
+
+
+def test_every_key_runs_the_same_statement(session_maker):
+    statements = []
+
+    def remember_statement(connection, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = session_maker.kw["bind"]
+    event.listen(engine, "before_cursor_execute", remember_statement)
+    knowledge_dal = SQLAlchemyKnowledgeDAL()
+    with session_maker() as session:
+        for title in ["user knowledge", "other_user knowledge", "ghost knowledge"]:
+            knowledge_dal.get_by_title(title, session)
+    event.remove(engine, "before_cursor_execute", remember_statement)
+    assert len(statements) == 3 and len(set(statements)) == 1
+    assert knowledge_dal._by_title.statement(LoadProfile.BARE) is knowledge_dal._by_title.statement(LoadProfile.BARE)
@@ -0,0 +1,136 @@
+#Author: Vodohleb04
+import sys
+import time
+import tracemalloc
+from datetime import date
+from sqlalchemy import create_engine, insert, select, text
+from sqlalchemy.orm import sessionmaker
+from backend.data_layer.declarative_base import Base
+from backend.data_layer.mapped_database import User, Knowledge, KnowledgeStatus
+from backend.data_layer.sqlite_stand_in import create_sqlite_stand_in_engine
+from backend.data_access_layer.knowledge_dal.knowledge_dal import SQLAlchemyKnowledgeDAL
+from backend.data_access_layer.page import MAX_PAGE_SIZE
+from backend.service_layer.read_model.knowledge_view import KnowledgeSummaryView
+
+ROWS = 100_000
+INSERT_CHUNK = 10_000
+
+
+def fill_database(session):
+    session.execute(
+        insert(User),
+        [{
+            "login": "user", "username": "user name", "hashed_password": "0" * 64, "email": "user@mail.ru",
+            "birthdate": date(2000, 1, 1), "stack": "Python", "_role": "user"
+        }]
+    )
+    for start in range(0, ROWS, INSERT_CHUNK):
+        session.execute(
+            insert(Knowledge),
+            [
+                {
+                    "title": f"knowledge {i:06}", "description": "description " * 20, "link": "http://omis.ru",
+                    "category": f"category {i % 10}", "sender_login": "user", "status": KnowledgeStatus.PUBLISHED
+                } for i in range(start, min(start + INSERT_CHUNK, ROWS))
+            ]
+        )
+    session.commit()
+
+
+def walk_pages(list_page):
+    # Every page of the published catalog, the way the web pages request them one after another.
+    items, cursor = [], None
+    while True:
+        page = list_page(cursor)
+        items.extend(page.items)
+        if page.next_cursor is None:
+            return items
+        cursor = page.next_cursor
+
+
+def measure(name, read, session_maker):
+    with session_maker() as session:
+        started = time.perf_counter()
+        rows = len(read(session))
+        seconds = time.perf_counter() - started
+    with session_maker() as session:
+        tracemalloc.start()
+        result = read(session)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        del result
+    print(f"{name:<46} {rows:>7} rows  {seconds * 1000:>8.1f} ms  peak {peak / 2 ** 20:>7.1f} MiB")
+
+
+def run(session_maker):
+    knowledge_dal = SQLAlchemyKnowledgeDAL()
+    published = KnowledgeStatus.PUBLISHED
+    print("one result of every row")
+    measure(
+        "ORM entities -> KnowledgeSummaryView",
+        lambda session: [
+            KnowledgeSummaryView.from_orm(knowledge)
+            for knowledge in session.scalars(select(Knowledge).where(Knowledge.status == published))
+        ],
+        session_maker
+    )
+    measure(
+        "rows (title, category) -> KnowledgeSummaryView",
+        lambda session: [
+            KnowledgeSummaryView.from_row(row)
+            for row in session.execute(
+                select(Knowledge.title, Knowledge.category).where(Knowledge.status == published)
+            )
+        ],
+        session_maker
+    )
+    measure(
+        "titles",
+        lambda session: session.scalars(select(Knowledge.title).where(Knowledge.status == published)).all(),
+        session_maker
+    )
+    print(f"pages of {MAX_PAGE_SIZE}")
+    measure(
+        "get_published -> KnowledgeSummaryView",
+        lambda session: walk_pages(
+            lambda cursor: knowledge_dal.get_published(
+                session, cursor=cursor, page_size=MAX_PAGE_SIZE
+            ).map(KnowledgeSummaryView.from_orm)
+        ),
+        session_maker
+    )
+    measure(
+        "list_summaries -> KnowledgeSummaryView",
+        lambda session: walk_pages(
+            lambda cursor: knowledge_dal.list_summaries(
+                session, status=published, cursor=cursor, page_size=MAX_PAGE_SIZE
+            ).map(KnowledgeSummaryView.from_row)
+        ),
+        session_maker
+    )
+    measure(
+        "list_titles",
+        lambda session: walk_pages(
+            lambda cursor: knowledge_dal.list_titles(session, status=published, cursor=cursor, page_size=MAX_PAGE_SIZE)
+        ),
+        session_maker
+    )
+
+
+if __name__ == "__main__":
+    # Usage: python -m backend.list_projection_benchmark [scratch postgres database url]
+    # An in-memory SQLite stand-in is used by default.
+    # Time and peak traced Python memory of reading 100k catalog rows as ORM entities, as rows and as titles.
+    if len(sys.argv) > 1:
+        engine = create_engine(sys.argv[1])
+        with engine.begin() as connection:
+            connection.execute(text("DROP SCHEMA IF EXISTS omis2 CASCADE"))
+            connection.execute(text("CREATE SCHEMA omis2"))
+        Base.create_from_metadata(engine)
+    else:
+        engine = create_sqlite_stand_in_engine()
+    session_maker = sessionmaker(engine, expire_on_commit=False)
+    with session_maker() as session:
+        fill_database(session)
+    run(session_maker)
+    engine.dispose()
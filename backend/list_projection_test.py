@@ -0,0 +1,101 @@
+#Author: Vodohleb04
+from datetime import date
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+from backend.data_layer.sqlite_stand_in import create_sqlite_stand_in_engine
+from backend.data_layer.mapped_database import KnowledgeStatus
+from backend.data_access_layer.user_dal.user_dal import SQLAlchemyUserDAL
+from backend.data_access_layer.user_dal.save_user_dto import SaveUserDTO
+from backend.data_access_layer.knowledge_dal.knowledge_dal import SQLAlchemyKnowledgeDAL
+from backend.data_access_layer.knowledge_dal.save_knowledge_dto import SaveKnowledgeDTO
+from backend.data_access_layer.discussion_dal.discussion_dal import SQLAlchemyDiscussionDAL
+from backend.data_access_layer.discussion_dal.save_discussion_dto import SaveDiscussionDTO
+from backend.data_access_layer.comment_dal.comment_dal import SQLAlchemyCommentDAL
+from backend.service_layer.knowledge_service.knowledge_service_impl import KnowledgeServiceImpl
+from backend.service_layer.discussion_service.discussion_service_impl import DiscussionServiceImpl
+from backend.service_layer.read_model.knowledge_view import KnowledgeSummaryView
+from backend.conftest import create_test_token_signer
+
+CATEGORIES = ("b category", "a category")
+
+
+@pytest.fixture
+def session_maker():
+    engine = create_sqlite_stand_in_engine()
+    session_maker = sessionmaker(engine, expire_on_commit=False)
+    with session_maker() as session:
+        knowledge_dal, discussion_dal = SQLAlchemyKnowledgeDAL(), SQLAlchemyDiscussionDAL()
+        SQLAlchemyUserDAL().save(SaveUserDTO(False, "user", "user name", "hash", "user@mail.ru", date.today()), session)
+        for i in range(6):
+            category = CATEGORIES[i % 2]
+            knowledge_dal.save(SaveKnowledgeDTO(f"knowledge {i}", "description", "link", category, "user"), session)
+            if i < 4:
+                knowledge_dal.accept_publishing(f"knowledge {i}", session)
+            discussion_dal.save(SaveDiscussionDTO(f"discussion {i}", "description", category, "user"), session)
+        session.commit()
+    yield session_maker
+    engine.dispose()
+
+
+def walk(list_page, **kwargs):
+    items, cursor = [], None
+    while True:
+        page = list_page(cursor=cursor, page_size=2, **kwargs)
+        items.extend(page.items)
+        if page.next_cursor is None:
+            return items
+        cursor = page.next_cursor
+
+
+def test_lists_keep_the_catalog_order(session_maker):
+    knowledge_dal, discussion_dal = SQLAlchemyKnowledgeDAL(), SQLAlchemyDiscussionDAL()
+    with session_maker() as session:
+        assert walk(knowledge_dal.list_titles, db_session=session, status=KnowledgeStatus.PUBLISHED) == [
+            "knowledge 1", "knowledge 3", "knowledge 0", "knowledge 2"
+        ]
+        assert walk(knowledge_dal.list_titles, db_session=session, category_list=["b category"]) == [
+            "knowledge 0", "knowledge 2", "knowledge 4"
+        ]
+        summaries = walk(discussion_dal.list_summaries, db_session=session)
+        assert [(row.title, row.category) for row in summaries] == [
+            ("discussion 1", "a category"), ("discussion 3", "a category"), ("discussion 5", "a category"),
+            ("discussion 0", "b category"), ("discussion 2", "b category"), ("discussion 4", "b category")
+        ]
+        assert walk(discussion_dal.list_titles, db_session=session, category_list=list(CATEGORIES)) == [
+            row.title for row in summaries
+        ]
+        # Nothing was hydrated into the identity map.
+        assert len(session.identity_map) == 0
+
+
+def test_services_list_titles_and_summaries(session_maker):
+    token_signer = create_test_token_signer()
+    knowledge_service = KnowledgeServiceImpl(SQLAlchemyKnowledgeDAL(), token_signer)
+    discussion_service = DiscussionServiceImpl(SQLAlchemyDiscussionDAL(), SQLAlchemyCommentDAL(), token_signer)
+    statements = []
+
+    def remember_statement(connection, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = session_maker.kw["bind"]
+    event.listen(engine, "before_cursor_execute", remember_statement)
+    with session_maker() as session:
+        page = knowledge_service.get_knowledge_by_category("a category", session, status=KnowledgeStatus.PUBLISHED)
+        assert page.items == [
+            KnowledgeSummaryView("knowledge 1", "a category"), KnowledgeSummaryView("knowledge 3", "a category")
+        ]
+        assert knowledge_service.list_published_knowledge_titles(session, category="a category").items == [
+            "knowledge 1", "knowledge 3"
+        ]
+        assert knowledge_service.list_in_processing_knowledge_titles(
+            token_signer.issue("admin", True), session
+        ).items == ["knowledge 5", "knowledge 4"]
+        assert knowledge_service.list_in_processing_knowledge_titles(token_signer.issue("user", False), session) is None
+        assert discussion_service.list_discussion_titles(session, category="b category", page_size=2).items == [
+            "discussion 0", "discussion 2"
+        ]
+        assert len(discussion_service.get_all_discussions(session).items) == 6
+    event.remove(engine, "before_cursor_execute", remember_statement)
+    # Only the projected columns are read.
+    assert all("description" not in statement for statement in statements)
@@ -0,0 +1,103 @@
+#Author: Vodohleb04
+import pickle
+from datetime import date, datetime, timezone
+import pytest
+from backend.data_layer.mapped_database import KnowledgeStatus
+from backend.data_access_layer.batch_write import WriteOutcome
+from backend.data_access_layer.page import Page
+from backend.data_access_layer.user_dal.save_user_dto import SaveUserDTO
+from backend.data_access_layer.user_dal.patch_user_dto import PatchUserDTO
+from backend.data_access_layer.user_dal.login_user_dto import LoginUserDTO
+from backend.data_access_layer.knowledge_dal.save_knowledge_dto import SaveKnowledgeDTO
+from backend.data_access_layer.knowledge_dal.patch_knowledge_dto import PatchKnowledgeDTO
+from backend.data_access_layer.discussion_dal.save_discussion_dto import SaveDiscussionDTO
+from backend.data_access_layer.discussion_dal.patch_discussion_dto import PatchDiscussionDTO
+from backend.data_access_layer.comment_dal.save_comment_dto import SaveCommentDTO
+from backend.data_access_layer.comment_dal.patch_comment_dto import PatchCommentDTO
+from backend.service_layer.authentication_service.authorization_token import AuthorizationToken
+from backend.service_layer.read_model.category_count_view import CategoryCountView
+from backend.service_layer.read_model.comment_view import CommentView, CommentSummaryView
+from backend.service_layer.read_model.discussion_view import DiscussionView
+from backend.service_layer.read_model.knowledge_view import KnowledgeView, KnowledgeSummaryView
+from backend.service_layer.read_model.user_view import UserView
+
+msgpack = pytest.importorskip("msgpack")
+message_codec = pytest.importorskip("broker.message_codec")
+
+CREATED_AT = datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc)
+
+
+def round_trip(value):
+    return message_codec.decode_message(message_codec.encode_message(value))
+
+
+def test_read_models_round_trip():
+    comment = CommentSummaryView(1, "comment", "user name", CREATED_AT)
+    views = [
+        KnowledgeView(1, "title", "description", "link", "category", KnowledgeStatus.PUBLISHED, "user name"),
+        DiscussionView(2, "title", "description", "category", "user name", (comment,), 1, "cursor"),
+        CommentView(3, "comment", "user name", 2, "title", CREATED_AT),
+        UserView("user", "user name", False),
+        Page([KnowledgeSummaryView("title", "category")], None),
+        Page(["title", "other title"], "cursor"),
+        [CategoryCountView("category", 3)],
+        [WriteOutcome.WRITTEN, WriteOutcome.FORBIDDEN]
+    ]
+    for view in views:
+        assert round_trip(view) == view
+    assert type(round_trip(views[1]).comments) is tuple
+
+
+def test_task_arguments_round_trip():
+    token = AuthorizationToken("admin", True, 1714566600, "token id", "signature")
+    assert round_trip(token).to_json() == token.to_json()
+
+    requests = [
+        SaveUserDTO(False, "user", "user name", "hash", "user@mail.ru", date(2000, 1, 1), "Python"),
+        PatchUserDTO("user", email="other@mail.ru", birthdate=date(2001, 2, 3)),
+        LoginUserDTO("user", "hash"),
+        SaveKnowledgeDTO("title", "description", "link", "category", "user"),
+        PatchKnowledgeDTO("title", status=KnowledgeStatus.PUBLISHED, new_title="new title"),
+        SaveDiscussionDTO("title", "description", "category", "user"),
+        PatchDiscussionDTO("title", description="new description"),
+        SaveCommentDTO("comment", "user", "title"),
+        PatchCommentDTO(1, "new comment")
+    ]
+    # Celery sends the positional arguments as a tuple, the body is (args, kwargs, embed).
+    args, kwargs, embed = round_trip(((requests,), {"status": KnowledgeStatus.IN_PROCESSING}, {"chain": None}))
+    assert (kwargs, embed) == ({"status": KnowledgeStatus.IN_PROCESSING}, {"chain": None})
+    for request, decoded in zip(requests, args[0], strict=True):
+        assert type(decoded) is type(request)
+        assert vars(decoded) == vars(request)
+
+
+def test_message_is_smaller_than_pickle():
+    page = Page(
+        [
+            KnowledgeView(
+                i, f"title {i}", f"description {i} " * 5, f"http://omis.ru/{i}", f"category {i % 10}",
+                KnowledgeStatus.PUBLISHED, f"user {i % 7} name"
+            ) for i in range(50)
+        ],
+        "cursor"
+    )
+    assert len(message_codec.encode_message(page)) < len(pickle.dumps(page))
+
+
+def test_unknown_types_and_schema_versions_are_rejected():
+    with pytest.raises(TypeError):
+        message_codec.encode_message(object())
+    with pytest.raises(message_codec.MessageSchemaError):
+        message_codec.decode_message(msgpack.packb([message_codec.SCHEMA_VERSION + 1, b""]))
+    unknown_code = msgpack.packb(msgpack.ExtType(99, b""))
+    with pytest.raises(message_codec.MessageSchemaError):
+        message_codec.decode_message(msgpack.packb([message_codec.SCHEMA_VERSION, unknown_code]))
+    # Pickle is refused by the workers, a pickled message never reaches pickle.loads.
+    from kombu.exceptions import ContentDisallowed
+    from kombu.serialization import loads
+    from broker.celery_broker import broker_app
+    with pytest.raises(ContentDisallowed):
+        loads(
+            pickle.dumps("payload"), "application/x-python-serialize", "binary",
+            accept=broker_app.conf.accept_content
+        )
@@ -0,0 +1,233 @@
+#Author: Vodohleb04
+import logging
+import sys
+from sqlalchemy import Engine, text
+from backend.data_layer.engine_registry import engine_registry
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 5000
+SWITCH_LOCK_TIMEOUT = "5s"
+TITLED_TABLES = ("knowledge", "discussion")
+
+# Converts an omis2 schema keyed by titles to the bigint surrogate keys of mapped_database without long table locks.
+# expand:   adds and backfills the new columns batch by batch and builds every index concurrently,
+#           the application keeps running on the old schema meanwhile.
+# switch:   swaps the primary keys and the comment foreign key in one short transaction over the prepared indexes.
+# contract: drops comment.discussion_title once no writer of the old schema is left.
+# Each phase can be run again after an interruption, finished steps are skipped.
+
+
+def _column_exists(connection, table: str, column: str) -> bool:
+    return connection.scalar(
+        text(
+            "SELECT EXISTS (SELECT 1 FROM information_schema.columns "
+            "WHERE table_schema = 'omis2' AND table_name = :table AND column_name = :column)"
+        ),
+        {"table": table, "column": column}
+    )
+
+
+def _constraint_exists(connection, table: str, constraint: str) -> bool:
+    return connection.scalar(
+        text(
+            "SELECT EXISTS (SELECT 1 FROM pg_constraint "
+            "WHERE conrelid = CAST(:table AS regclass) AND conname = :constraint)"
+        ),
+        {"table": f"omis2.{table}", "constraint": constraint}
+    )
+
+
+def _create_index_concurrently(engine: Engine, name: str, definition: str, unique: bool = False) -> None:
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        # A concurrent build that was interrupted leaves an invalid index behind, it has to be built anew.
+        is_valid = connection.scalar(
+            text(
+                "SELECT indisvalid FROM pg_index JOIN pg_class ON pg_class.oid = pg_index.indexrelid "
+                "JOIN pg_namespace ON pg_namespace.oid = pg_class.relnamespace "
+                "WHERE nspname = 'omis2' AND relname = :name"
+            ),
+            {"name": name}
+        )
+        if is_valid:
+            return
+        if is_valid is not None:
+            connection.execute(text(f"DROP INDEX CONCURRENTLY omis2.{name}"))
+        unique_clause = "UNIQUE " if unique else ""
+        connection.execute(text(f"CREATE {unique_clause}INDEX CONCURRENTLY {name} ON {definition}"))
+
+
+def _require_not_null(engine: Engine, table: str, column: str) -> None:
+    # A validated check lets SET NOT NULL in the switch skip its full table scan under the exclusive lock.
+    constraint = f"{table}_{column}_not_null"
+    with engine.begin() as connection:
+        if not _constraint_exists(connection, table, constraint):
+            connection.execute(
+                text(f"ALTER TABLE omis2.{table} ADD CONSTRAINT {constraint} CHECK ({column} IS NOT NULL) NOT VALID")
+            )
+    with engine.begin() as connection:
+        connection.execute(text(f"ALTER TABLE omis2.{table} VALIDATE CONSTRAINT {constraint}"))
+
+
+def _backfill_in_batches(engine: Engine, statement: str, batch_size: int) -> int:
+    # Every batch is its own transaction, so rows are locked only for the time of one batch.
+    total = 0
+    while True:
+        with engine.begin() as connection:
+            updated = connection.execute(text(statement), {"batch_size": batch_size}).rowcount
+        total += updated
+        if updated == 0:
+            return total
+
+
+def _expand_titled_table(engine: Engine, table: str, batch_size: int) -> None:
+    with engine.begin() as connection:
+        if _constraint_exists(connection, table, f"unique_{table}_title"):
+            return
+        connection.execute(text(f"ALTER TABLE omis2.{table} ADD COLUMN IF NOT EXISTS id bigint"))
+        connection.execute(text(f"CREATE SEQUENCE IF NOT EXISTS omis2.{table}_id_seq OWNED BY omis2.{table}.id"))
+        connection.execute(
+            text(f"ALTER TABLE omis2.{table} ALTER COLUMN id SET DEFAULT nextval('omis2.{table}_id_seq')")
+        )
+    backfilled = _backfill_in_batches(
+        engine,
+        f"UPDATE omis2.{table} SET id = nextval('omis2.{table}_id_seq') WHERE title IN ("
+        f"SELECT title FROM omis2.{table} WHERE id IS NULL ORDER BY title LIMIT :batch_size FOR UPDATE)",
+        batch_size
+    )
+    logger.info(f"{backfilled} rows of {table} got surrogate keys.")
+    _create_index_concurrently(engine, f"{table}_id_index", f"omis2.{table} (id)", unique=True)
+    _create_index_concurrently(engine, f"unique_{table}_title", f"omis2.{table} (title)", unique=True)
+    _require_not_null(engine, table, "id")
+
+
+def _expand_comment(engine: Engine, batch_size: int) -> None:
+    with engine.begin() as connection:
+        if (
+                not _column_exists(connection, "comment", "discussion_title")
+                or _constraint_exists(connection, "comment", "comment_discussion_id_fkey")
+        ):
+            return
+        connection.execute(text("ALTER TABLE omis2.comment ADD COLUMN IF NOT EXISTS discussion_id bigint"))
+        # Writers of either schema fill in only one of the two discussion references until the contract phase.
+        connection.execute(
+            text(
+                """
+                CREATE OR REPLACE FUNCTION omis2.comment_fill_discussion_reference() RETURNS trigger AS $$
+                BEGIN
+                    IF NEW.discussion_id IS NULL THEN
+                        SELECT id INTO NEW.discussion_id FROM omis2.discussion WHERE title = NEW.discussion_title;
+                    ELSIF NEW.discussion_title IS NULL THEN
+                        SELECT title INTO NEW.discussion_title FROM omis2.discussion WHERE id = NEW.discussion_id;
+                    END IF;
+                    RETURN NEW;
+                END;
+                $$ LANGUAGE plpgsql;
+                DROP TRIGGER IF EXISTS comment_fill_discussion_reference ON omis2.comment;
+                CREATE TRIGGER comment_fill_discussion_reference BEFORE INSERT OR UPDATE ON omis2.comment
+                    FOR EACH ROW EXECUTE FUNCTION omis2.comment_fill_discussion_reference();
+                """
+            )
+        )
+    backfilled = _backfill_in_batches(
+        engine,
+        "UPDATE omis2.comment SET discussion_id = discussion.id FROM omis2.discussion "
+        "WHERE discussion.title = comment.discussion_title AND comment.id IN ("
+        "SELECT id FROM omis2.comment WHERE discussion_id IS NULL ORDER BY id LIMIT :batch_size FOR UPDATE)",
+        batch_size
+    )
+    logger.info(f"{backfilled} comments got discussion ids.")
+    _require_not_null(engine, "comment", "discussion_id")
+
+
+def expand(engine: Engine, batch_size: int = DEFAULT_BATCH_SIZE) -> None:
+    for table in TITLED_TABLES:
+        _expand_titled_table(engine, table, batch_size)
+    _expand_comment(engine, batch_size)
+    with engine.begin() as connection:
+        # now() is evaluated once by ADD COLUMN, so existing comments are not rewritten and share that time.
+        connection.execute(
+            text("ALTER TABLE omis2.comment ADD COLUMN IF NOT EXISTS created_at timestamptz NOT NULL DEFAULT now()")
+        )
+    _create_index_concurrently(
+        engine, "comment_discussion_created_at_index", "omis2.comment (discussion_id, created_at, id)"
+    )
+    for table in ("knowledge", "discussion", "comment"):
+        _create_index_concurrently(engine, f"ix_omis2_{table}_sender_login", f"omis2.{table} (sender_login)")
+    _create_index_concurrently(engine, "knowledge_category_status_index", "omis2.knowledge (category, status)")
+
+
+def _switch_titled_table(connection, table: str) -> None:
+    connection.execute(
+        text(
+            f"""
+            ALTER TABLE omis2.{table} DROP CONSTRAINT {table}_pkey;
+            ALTER TABLE omis2.{table} ALTER COLUMN id SET NOT NULL;
+            ALTER TABLE omis2.{table} DROP CONSTRAINT {table}_id_not_null;
+            ALTER TABLE omis2.{table} ADD CONSTRAINT {table}_pkey PRIMARY KEY USING INDEX {table}_id_index;
+            ALTER TABLE omis2.{table} ADD CONSTRAINT unique_{table}_title UNIQUE USING INDEX unique_{table}_title;
+            ALTER TABLE omis2.{table} ALTER COLUMN id DROP DEFAULT;
+            DROP SEQUENCE omis2.{table}_id_seq;
+            ALTER TABLE omis2.{table} ALTER COLUMN id ADD GENERATED BY DEFAULT AS IDENTITY;
+            SELECT setval(
+                pg_get_serial_sequence('omis2.{table}', 'id'),
+                coalesce((SELECT max(id) FROM omis2.{table}), 1),
+                (SELECT max(id) IS NOT NULL FROM omis2.{table})
+            );
+            """
+        )
+    )
+
+
+def switch(engine: Engine) -> None:
+    with engine.begin() as connection:
+        if _constraint_exists(connection, "knowledge", "unique_knowledge_title"):
+            return
+        # Waiting for the exclusive locks behind long transactions would stall every query queued after the switch.
+        connection.execute(text(f"SET LOCAL lock_timeout = '{SWITCH_LOCK_TIMEOUT}'"))
+        connection.execute(text("ALTER TABLE omis2.comment DROP CONSTRAINT comment_discussion_title_fkey"))
+        for table in TITLED_TABLES:
+            _switch_titled_table(connection, table)
+        connection.execute(
+            text(
+                """
+                ALTER TABLE omis2.comment ALTER COLUMN discussion_id SET NOT NULL;
+                ALTER TABLE omis2.comment DROP CONSTRAINT comment_discussion_id_not_null;
+                ALTER TABLE omis2.comment ALTER COLUMN discussion_title DROP NOT NULL;
+                ALTER TABLE omis2.comment ADD CONSTRAINT comment_discussion_id_fkey FOREIGN KEY (discussion_id)
+                    REFERENCES omis2.discussion (id) ON DELETE CASCADE NOT VALID;
+                """
+            )
+        )
+    with engine.begin() as connection:
+        connection.execute(text("ALTER TABLE omis2.comment VALIDATE CONSTRAINT comment_discussion_id_fkey"))
+
+
+def contract(engine: Engine) -> None:
+    with engine.begin() as connection:
+        connection.execute(text(f"SET LOCAL lock_timeout = '{SWITCH_LOCK_TIMEOUT}'"))
+        connection.execute(
+            text(
+                """
+                DROP TRIGGER IF EXISTS comment_fill_discussion_reference ON omis2.comment;
+                DROP FUNCTION IF EXISTS omis2.comment_fill_discussion_reference();
+                ALTER TABLE omis2.comment DROP COLUMN IF EXISTS discussion_title;
+                """
+            )
+        )
+
+
+def migrate_to_surrogate_keys(engine: Engine, batch_size: int = DEFAULT_BATCH_SIZE) -> None:
+    expand(engine, batch_size)
+    switch(engine)
+    contract(engine)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    phases = {"expand": expand, "switch": switch, "contract": contract, "all": migrate_to_surrogate_keys}
+    phase = sys.argv[1] if len(sys.argv) > 1 else "all"
+    if phase not in phases:
+        sys.exit(f"Usage: python -m backend.migrate_to_surrogate_keys [{'|'.join(phases)}]")
+    phases[phase](engine_registry.engine)
+    print(f"Phase {phase} is finished in {engine_registry.engine.url.render_as_string(hide_password=True)}")
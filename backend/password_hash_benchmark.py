@@ -0,0 +1,61 @@
+#Author: Vodohleb04
+import multiprocessing
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from hashlib import sha256
+from backend.service_layer.authentication_service.password_hasher import PasswordHasher, ScryptCost
+
+COSTS = (
+    ScryptCost(n=2 ** 12, r=8, p=1),
+    ScryptCost(n=2 ** 14, r=8, p=1),
+    ScryptCost(n=2 ** 15, r=8, p=1),
+    ScryptCost(n=2 ** 16, r=8, p=1)
+)
+DURATION_SECONDS = 3
+PASSWORD = sha256(b"password").hexdigest()
+
+
+def report(name, cost, processes, logins, elapsed, latencies):
+    latencies = sorted(latencies)
+    logins_per_second = logins / elapsed
+    memory_mib = 128 * cost.n * cost.r // 2 ** 20
+    print(
+        f"{name:<10} n=2^{cost.n.bit_length() - 1:<2} r={cost.r} p={cost.p} {memory_mib:>4} MiB  "
+        f"{processes:>3} processes  {logins_per_second:>8.1f} logins/s  "
+        f"{logins_per_second / processes:>7.1f} logins/s per core  "
+        f"median {statistics.median(latencies) * 1e3:>7.1f} ms  "
+        f"p95 {latencies[int(len(latencies) * 0.95)] * 1e3:>7.1f} ms"
+    )
+
+
+def measure(hasher, stored_hash, threads):
+    # Each thread stands for a login task of a threads-pool auth worker, it waits for its derivation to finish.
+    def login_until(deadline):
+        latencies = []
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            assert hasher.verify(PASSWORD, stored_hash)
+            latencies.append(time.perf_counter() - start)
+        return latencies
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(threads) as executor:
+        futures = [executor.submit(login_until, start + DURATION_SECONDS) for _ in range(threads)]
+        latencies = [latency for future in futures for latency in future.result()]
+    return len(latencies), time.perf_counter() - start, latencies
+
+
+if __name__ == "__main__":
+    # Usage: python -m backend.password_hash_benchmark [hashing processes], cpu count by default.
+    processes = int(sys.argv[1]) if len(sys.argv) > 1 else os.cpu_count() or 1
+    with ProcessPoolExecutor(processes, mp_context=multiprocessing.get_context("spawn")) as executor:
+        for cost in COSTS:
+            in_process_hasher = PasswordHasher(cost)
+            stored_hash = in_process_hasher.hash(PASSWORD)
+            report("in thread", cost, 1, *measure(in_process_hasher, stored_hash, threads=1))
+            pool_hasher = PasswordHasher(cost, executor)
+            pool_hasher.hash_many([PASSWORD] * processes)
+            report("pool", cost, processes, *measure(pool_hasher, stored_hash, threads=2 * processes))
@@ -0,0 +1,123 @@
+#Author: Vodohleb04
+from concurrent.futures import Executor, ProcessPoolExecutor
+from datetime import date
+from hashlib import sha256
+import pytest
+from sqlalchemy.orm import sessionmaker
+from backend.data_layer.sqlite_stand_in import create_sqlite_stand_in_engine
+from backend.data_access_layer.batch_write import WriteOutcome
+from backend.data_access_layer.user_dal.user_dal import SQLAlchemyUserDAL
+from backend.data_access_layer.user_dal.save_user_dto import SaveUserDTO
+from backend.data_access_layer.user_dal.login_user_dto import LoginUserDTO
+from backend.service_layer.authentication_service.authentication_error import AuthenticationError
+from backend.service_layer.authentication_service.authentication_service_impl import AuthenticationServiceImpl
+from backend.service_layer.authentication_service.password_hasher import PasswordHasher, ScryptCost
+from backend.service_layer.authentication_service.password_hash_settings import (
+    PasswordHashSettings, create_password_hasher
+)
+from backend.conftest import TEST_COST, create_test_password_hasher, create_test_token_signer
+
+PASSWORD = sha256(b"password").hexdigest()
+
+
+def test_hashes_are_salted_and_carry_their_cost():
+    hasher = create_test_password_hasher()
+    first_hash, second_hash = hasher.hash_many([PASSWORD, PASSWORD])
+    assert first_hash != second_hash
+    assert first_hash.startswith("scrypt$16$1$1$")
+    assert hasher.verify(PASSWORD, first_hash) and hasher.verify(PASSWORD, second_hash)
+    assert not hasher.verify(sha256(b"other password").hexdigest(), first_hash)
+    assert not hasher.verify(PASSWORD, "scrypt$16$1$1$not base64$")
+    assert not hasher.needs_rehash(first_hash)
+
+    # Hashes of another cost are still verified, and rehashed on the next login.
+    stronger_hasher = create_test_password_hasher(ScryptCost(n=2 ** 5, r=1, p=1))
+    assert stronger_hasher.verify(PASSWORD, first_hash)
+    assert stronger_hasher.needs_rehash(first_hash)
+    assert stronger_hasher.hash_many([]) == []
+
+
+def test_pool_hashes_are_verified_in_process():
+    with ProcessPoolExecutor(2) as executor:
+        pool_hasher = PasswordHasher(TEST_COST, executor)
+        hashed_passwords = pool_hasher.hash_many([PASSWORD, "other"])
+        assert pool_hasher.verify(PASSWORD, hashed_passwords[0])
+    assert create_test_password_hasher().verify("other", hashed_passwords[1])
+
+
+def test_settings_from_environment():
+    settings = PasswordHashSettings.from_environment(
+        {"OMIS_PASSWORD_SCRYPT_N": "32", "OMIS_PASSWORD_SCRYPT_R": "2", "OMIS_PASSWORD_HASH_WORKERS": "0"}
+    )
+    assert settings == PasswordHashSettings(scrypt_n=32, scrypt_r=2, scrypt_p=1, hash_workers=0)
+    assert create_password_hasher(settings).cost == ScryptCost(32, 2, 1)
+
+
+@pytest.fixture
+def session_maker():
+    engine = create_sqlite_stand_in_engine()
+    yield sessionmaker(engine, expire_on_commit=False)
+    engine.dispose()
+
+
+def test_legacy_passwords_are_rehashed_on_login(session_maker):
+    hasher = create_test_password_hasher()
+    token_signer = create_test_token_signer()
+    service = AuthenticationServiceImpl(SQLAlchemyUserDAL(), token_signer, hasher)
+    user_dal = SQLAlchemyUserDAL()
+    with session_maker() as session:
+        # Rows written before scrypt keep the unsalted digest sent by the web process.
+        user_dal.save(SaveUserDTO(False, "legacy", "legacy name", PASSWORD, "legacy@mail.ru", date.today()), session)
+        with pytest.raises(AuthenticationError):
+            service.login(LoginUserDTO("legacy", sha256(b"wrong").hexdigest()), session)
+        assert user_dal.get_by_login("legacy", session).hashed_password == PASSWORD
+
+        assert service.login(LoginUserDTO("legacy", PASSWORD), session).get_login() == "legacy"
+        stored_hash = user_dal.get_by_login("legacy", session).hashed_password
+        assert not hasher.is_legacy(stored_hash) and hasher.verify(PASSWORD, stored_hash)
+        # Unlike the old digest, a leaked stored hash can not be sent as the password.
+        with pytest.raises(AuthenticationError):
+            service.login(LoginUserDTO("legacy", stored_hash), session)
+        assert service.login(LoginUserDTO("legacy", PASSWORD), session).get_login() == "legacy"
+
+        service.register(SaveUserDTO(False, "new", "new name", PASSWORD, "new@mail.ru", date.today()), session)
+        assert not hasher.is_legacy(user_dal.get_by_login("new", session).hashed_password)
+        assert service.login(LoginUserDTO("new", PASSWORD), session).get_login() == "new"
+        request = SaveUserDTO(False, "other", "other name", PASSWORD, "other@mail.ru", date.today())
+        assert service.register_many([request], token_signer.issue("admin", True), session) == [WriteOutcome.WRITTEN]
+        assert service.login(LoginUserDTO("other", PASSWORD), session).get_login() == "other"
+
+
+class CheckoutRecordingExecutor(Executor):
+    # Derives the keys in the calling thread and records how many connections of the engine are checked out then.
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.checked_out = []
+
+    def map(self, fn, *iterables, timeout=None, chunksize=1):
+        self.checked_out.append(self.engine.pool.checkedout())
+        return map(fn, *iterables)
+
+
+def test_login_derives_keys_without_a_connection(tmp_path):
+    engine = create_sqlite_stand_in_engine(str(tmp_path / "login.db"))
+    executor = CheckoutRecordingExecutor(engine)
+    service = AuthenticationServiceImpl(
+        SQLAlchemyUserDAL(), create_test_token_signer(), PasswordHasher(TEST_COST, executor)
+    )
+    with sessionmaker(engine, expire_on_commit=False)() as session:
+        SQLAlchemyUserDAL().save(
+            SaveUserDTO(False, "legacy", "legacy name", PASSWORD, "legacy@mail.ru", date.today()), session
+        )
+        session.commit()
+        # The rehash of the legacy row, then the verification of the new hash.
+        assert service.login(LoginUserDTO("legacy", PASSWORD), session).get_login() == "legacy"
+        assert service.login(LoginUserDTO("legacy", PASSWORD), session).get_login() == "legacy"
+        assert len(executor.checked_out) == 2
+        # Unknown logins derive a key as well: the hash of the unknown user once, then a verification per login.
+        for _ in range(2):
+            with pytest.raises(ValueError):
+                service.login(LoginUserDTO("unknown", PASSWORD), session)
+    assert executor.checked_out == [0] * 5
+    engine.dispose()
@@ -0,0 +1,88 @@
+#Author: Vodohleb04
+from datetime import date
+import pytest
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.orm import sessionmaker
+from backend.data_layer.sqlite_stand_in import create_sqlite_stand_in_engine
+from backend.data_layer.mapped_database import KnowledgeStatus
+from backend.data_access_layer.user_dal.user_dal import SQLAlchemyUserDAL
+from backend.data_access_layer.user_dal.save_user_dto import SaveUserDTO
+from backend.data_access_layer.user_dal.login_user_dto import LoginUserDTO
+from backend.data_access_layer.knowledge_dal.knowledge_dal import SQLAlchemyKnowledgeDAL
+from backend.data_access_layer.knowledge_dal.save_knowledge_dto import SaveKnowledgeDTO
+from backend.data_access_layer.discussion_dal.discussion_dal import SQLAlchemyDiscussionDAL
+from backend.data_access_layer.discussion_dal.save_discussion_dto import SaveDiscussionDTO
+from backend.data_access_layer.comment_dal.comment_dal import SQLAlchemyCommentDAL
+from backend.data_access_layer.comment_dal.save_comment_dto import SaveCommentDTO
+from backend.service_layer.authentication_service.authentication_service_impl import AuthenticationServiceImpl
+from backend.service_layer.knowledge_service.knowledge_service_impl import KnowledgeServiceImpl
+from backend.service_layer.discussion_service.discussion_service_impl import DiscussionServiceImpl
+from backend.conftest import count_statements, create_test_password_hasher, create_test_token_signer
+
+
+@pytest.fixture
+def session_maker():
+    engine = create_sqlite_stand_in_engine()
+    session_maker = sessionmaker(engine, expire_on_commit=False)
+    with session_maker() as session:
+        user_dal = SQLAlchemyUserDAL()
+        knowledge_dal = SQLAlchemyKnowledgeDAL()
+        discussion_dal = SQLAlchemyDiscussionDAL()
+        comment_dal = SQLAlchemyCommentDAL()
+        for login in ["user", "other_user"]:
+            user_dal.save(SaveUserDTO(False, login, f"{login} name", "hash", f"{login}@mail.ru", date.today()), session)
+        for i in range(10):
+            knowledge_dal.save(SaveKnowledgeDTO(f"knowledge {i}", "description", "link", "category", "user"), session)
+            knowledge_dal.accept_publishing(f"knowledge {i}", session)
+            discussion_dal.save(SaveDiscussionDTO(f"discussion {i}", "description", "category", "user"), session)
+            for j in range(5):
+                comment_dal.save(SaveCommentDTO(f"comment {j}", "other_user", f"discussion {i}"), session)
+        # The DALs only stage the writes, the fixture owns the transaction.
+        session.commit()
+    yield session_maker
+    engine.dispose()
+
+
+def test_login_is_single_statement(session_maker):
+    service = AuthenticationServiceImpl(
+        SQLAlchemyUserDAL(), create_test_token_signer(), create_test_password_hasher()
+    )
+    with session_maker() as session:
+        # The first login rehashes the password stored by the old scheme, the next ones only read the user.
+        service.login(LoginUserDTO("user", "hash"), session)
+    with session_maker() as session, count_statements(session_maker) as statements:
+        service.login(LoginUserDTO("user", "hash"), session)
+    assert len(statements) == 1
+
+
+def test_knowledge_page_statements(session_maker):
+    service = KnowledgeServiceImpl(SQLAlchemyKnowledgeDAL())
+    with session_maker() as session, count_statements(session_maker) as statements:
+        knowledge = service.get_knowledge_by_title("knowledge 0", session)
+    assert knowledge.sender_username == "user name"
+    assert len(statements) == 1
+
+
+def test_discussion_page_statements(session_maker):
+    service = DiscussionServiceImpl(SQLAlchemyDiscussionDAL(), SQLAlchemyCommentDAL())
+    with session_maker() as session, count_statements(session_maker) as statements:
+        discussion = service.get_discussion_by_title("discussion 0", session)
+    assert len(discussion.comments) == 5
+    assert {comment.sender_username for comment in discussion.comments} == {"other_user name"}
+    assert len(statements) == 2
+
+
+def test_catalog_page_statements(session_maker):
+    service = KnowledgeServiceImpl(SQLAlchemyKnowledgeDAL())
+    with session_maker() as session, count_statements(session_maker) as statements:
+        service.get_knowledge_categories(session, status=KnowledgeStatus.PUBLISHED)
+        page = service.get_published_knowledge(session)
+    assert len(page.items) == 10
+    assert len(statements) == 2
+
+
+def test_relationships_are_not_loaded_implicitly(session_maker):
+    with session_maker() as session:
+        knowledge = SQLAlchemyKnowledgeDAL().get_by_title("knowledge 0", session)
+        with pytest.raises(InvalidRequestError):
+            knowledge.knowledge_sender
@@ -0,0 +1,91 @@
+#Author: Vodohleb04
+import pickle
+import timeit
+from datetime import date
+from sqlalchemy import insert, select
+from sqlalchemy.orm import sessionmaker
+from backend.data_layer.mapped_database import User, Knowledge, Discussion, Comment
+from backend.data_layer.sqlite_stand_in import create_sqlite_stand_in_engine
+from backend.data_access_layer.comment_dal.comment_dal import SQLAlchemyCommentDAL
+from backend.data_access_layer.discussion_dal.discussion_dal import SQLAlchemyDiscussionDAL
+from backend.data_access_layer.knowledge_dal.knowledge_dal import SQLAlchemyKnowledgeDAL
+from backend.data_access_layer.load_profile import LoadProfile
+from backend.service_layer.discussion_service.discussion_service_impl import DiscussionServiceImpl
+from backend.service_layer.read_model.discussion_view import DiscussionSummaryView
+from backend.service_layer.read_model.knowledge_view import KnowledgeView
+
+USERS = 10
+ITEMS_PER_USER = 20
+COMMENTS_PER_DISCUSSION = 10
+ROUND_TRIPS = 20
+
+
+def fill_database(session):
+    logins = [f"user_{i}" for i in range(USERS)]
+    session.execute(
+        insert(User),
+        [
+            {
+                "login": login, "username": f"{login} name", "hashed_password": "0" * 64, "email": f"{login}@mail.ru",
+                "birthdate": date(2000, 1, 1), "stack": "Python", "_role": "user"
+            } for login in logins
+        ]
+    )
+    session.execute(
+        insert(Knowledge),
+        [
+            {
+                "title": f"knowledge {login} {i}", "description": "description " * 20, "link": "http://omis.ru",
+                "category": f"category {i % 10}", "sender_login": login
+            } for login in logins for i in range(ITEMS_PER_USER)
+        ]
+    )
+    session.execute(
+        insert(Discussion),
+        [
+            {
+                "title": f"discussion {login} {i}", "description": "description " * 20,
+                "category": f"category {i % 10}", "sender_login": login
+            } for login in logins for i in range(ITEMS_PER_USER)
+        ]
+    )
+    discussion_ids = dict(session.execute(select(Discussion.title, Discussion.id)).all())
+    session.execute(
+        insert(Comment),
+        [
+            {
+                "discussion_id": discussion_ids[f"discussion {login} {i}"], "description": "comment " * 10,
+                "sender_login": logins[(j + 1) % USERS]
+            } for login in logins for i in range(ITEMS_PER_USER) for j in range(COMMENTS_PER_DISCUSSION)
+        ]
+    )
+    session.commit()
+
+
+def measure(name, payload):
+    dumped = pickle.dumps(payload)
+    seconds = timeit.timeit(lambda: pickle.loads(pickle.dumps(payload)), number=ROUND_TRIPS) / ROUND_TRIPS
+    print(f"{name:<40} {len(dumped):>12} bytes {seconds * 1e6:>12.1f} us/round trip")
+
+
+if __name__ == "__main__":
+    engine = create_sqlite_stand_in_engine()
+    session_maker = sessionmaker(engine, expire_on_commit=False)
+    with session_maker() as session:
+        fill_database(session)
+
+    with session_maker() as session:
+        knowledge = SQLAlchemyKnowledgeDAL().get_by_title("knowledge user_0 0", session, LoadProfile.WITH_SENDER)
+        measure("Knowledge ORM graph", knowledge)
+        measure("KnowledgeView", KnowledgeView.from_orm(knowledge))
+
+    with session_maker() as session:
+        discussion = SQLAlchemyDiscussionDAL().get_by_title("discussion user_0 0", session, LoadProfile.WITH_COMMENTS)
+        measure("Discussion ORM graph", discussion)
+        discussion_service = DiscussionServiceImpl(SQLAlchemyDiscussionDAL(), SQLAlchemyCommentDAL())
+        measure("DiscussionView", discussion_service.get_discussion_by_title("discussion user_0 0", session))
+
+    with session_maker() as session:
+        discussions = SQLAlchemyDiscussionDAL().get_by_category("category 0", session).items
+        measure("Discussion list ORM graph", discussions)
+        measure("DiscussionSummaryView list", [DiscussionSummaryView.from_orm(d) for d in discussions])
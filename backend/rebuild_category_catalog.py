@@ -0,0 +1,16 @@
+#Author: Vodohleb04
+from backend.data_layer.engine_registry import engine_registry
+from backend.data_access_layer.knowledge_dal.knowledge_dal import SQLAlchemyKnowledgeDAL
+from backend.data_access_layer.discussion_dal.discussion_dal import SQLAlchemyDiscussionDAL
+
+
+def rebuild_category_catalog(session_maker) -> None:
+    # The DALs only stage the rebuilds, both catalogs are committed together.
+    with session_maker.begin() as session:
+        SQLAlchemyKnowledgeDAL().rebuild_categories(session)
+        SQLAlchemyDiscussionDAL().rebuild_categories(session)
+
+
+if __name__ == "__main__":
+    rebuild_category_catalog(engine_registry.sessionmaker)
+    print(f"Category catalog was rebuilt in {engine_registry.engine.url.render_as_string(hide_password=True)}")
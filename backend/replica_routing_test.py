@@ -0,0 +1,177 @@
+#Author: Vodohleb04
+from datetime import date
+import pytest
+from sqlalchemy import select, text, update
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+from backend.data_layer.engine_registry import EngineRegistry, EngineSettings
+from backend.data_layer.mapped_database import User
+from backend.data_layer.replica_routing import ReplicaSet, RoutingSession, primary_reads, LEAST_CONNECTIONS
+from backend.data_layer.sqlite_stand_in import create_sqlite_stand_in_engine
+from backend.data_access_layer.user_dal.user_dal import SQLAlchemyUserDAL
+from backend.data_access_layer.user_dal.save_user_dto import SaveUserDTO
+from backend.data_access_layer.user_dal.patch_user_dto import PatchUserDTO
+from backend.data_access_layer.knowledge_dal.knowledge_dal import SQLAlchemyKnowledgeDAL
+from backend.data_access_layer.knowledge_dal.save_knowledge_dto import SaveKnowledgeDTO
+from backend.data_access_layer.knowledge_dal.patch_knowledge_dto import PatchKnowledgeDTO
+from backend.service_layer.cache.in_memory_cache_backend import InMemoryCacheBackend
+from backend.service_layer.knowledge_service.cached_knowledge_service import CachedKnowledgeService
+from backend.service_layer.knowledge_service.knowledge_service_impl import KnowledgeServiceImpl
+from backend.service_layer.unit_of_work import UnitOfWork
+from backend.conftest import create_test_token_signer
+
+DATABASES = ("primary", "replica a", "replica b")
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def fill(engine, name):
+    # The same user has the name of its database in every stand-in, so a read tells where it was sent.
+    with sessionmaker(engine)() as session:
+        SQLAlchemyUserDAL().save(SaveUserDTO(False, "user", name, "hash", "user@mail.ru", date.today()), session)
+        session.commit()
+    return engine
+
+
+@pytest.fixture
+def engines(tmp_path):
+    engines = [
+        fill(create_sqlite_stand_in_engine(str(tmp_path / f"{name.replace(' ', '_')}.db")), name)
+        for name in DATABASES
+    ]
+    yield engines
+    for engine in engines:
+        engine.dispose()
+
+
+def routing_sessionmaker(replica_set):
+    return sessionmaker(replica_set.primary, class_=RoutingSession, expire_on_commit=False, replica_set=replica_set)
+
+
+def read_username(session_maker):
+    with session_maker() as session:
+        return session.scalar(select(User.username).where(User.login == "user"))
+
+
+def test_reads_are_balanced_over_replicas(engines):
+    primary, *replicas = engines
+    session_maker = routing_sessionmaker(ReplicaSet(primary, replicas))
+    assert [read_username(session_maker) for _ in range(4)] == ["replica a", "replica b"] * 2
+
+    least_connections = routing_sessionmaker(ReplicaSet(primary, replicas, balancing=LEAST_CONNECTIONS))
+    with replicas[0].connect():
+        assert read_username(least_connections) == "replica b"
+    with replicas[1].connect():
+        assert read_username(least_connections) == "replica a"
+    with pytest.raises(ValueError):
+        ReplicaSet(primary, replicas, balancing="random")
+
+
+def test_writes_and_reads_after_them_stay_on_primary(engines):
+    primary, *replicas = engines
+    session_maker = routing_sessionmaker(ReplicaSet(primary, replicas))
+    user_dal = SQLAlchemyUserDAL()
+    with session_maker() as session:
+        assert user_dal.get_by_login("user", session).username == "replica a"
+        with UnitOfWork(session):
+            user_dal.patch(PatchUserDTO("user", username="primary patched"), session)
+        session.expire_all()
+        assert user_dal.get_by_login("user", session).username == "primary patched"
+    with sessionmaker(replicas[0])() as session:
+        assert user_dal.get_by_login("user", session).username == "replica a"
+
+    with primary_reads():
+        assert read_username(session_maker) == "primary patched"
+        with primary_reads(False):
+            assert read_username(session_maker) == "replica b"
+    assert read_username(session_maker) == "replica a"
+
+
+def test_lagging_replicas_are_left_out(engines):
+    primary, *replicas = engines
+    clock = FakeClock()
+    lags = {replicas[0]: 10.0, replicas[1]: 0.0}
+    probes = []
+
+    def measure_lag(replica):
+        probes.append(replica)
+        if lags[replica] is None:
+            raise OperationalError("SELECT 1", {}, Exception("replica is down"))
+        return lags[replica]
+
+    session_maker = routing_sessionmaker(
+        ReplicaSet(primary, replicas, max_lag_seconds=5, lag_check_interval=1, measure_lag=measure_lag, clock=clock)
+    )
+    assert [read_username(session_maker) for _ in range(3)] == ["replica b"] * 3
+    # Measured once per interval, not per read.
+    assert len(probes) == 2
+
+    lags[replicas[0]] = 0.0
+    assert read_username(session_maker) == "replica b"
+    clock.now = 1
+    assert {read_username(session_maker) for _ in range(2)} == {"replica a", "replica b"}
+
+    lags.update({replicas[0]: 6.0, replicas[1]: None})
+    clock.now = 2
+    assert read_username(session_maker) == "primary"
+
+
+def test_registry_routes_read_sessions(tmp_path):
+    replica_urls = (f"sqlite:///{tmp_path / 'replica_a.db'}", f"sqlite:///{tmp_path / 'replica_b.db'}")
+    settings = EngineSettings.from_environment(
+        {
+            "OMIS_DATABASE_URL": f"sqlite:///{tmp_path / 'primary.db'}",
+            "OMIS_DATABASE_REPLICA_URLS": " , ".join(replica_urls),
+            "OMIS_DB_REPLICA_BALANCING": "least_connections",
+            "OMIS_DB_REPLICA_MAX_LAG": "2.5"
+        }
+    )
+    assert settings.replica_urls == replica_urls
+    assert (settings.replica_balancing, settings.replica_max_lag_seconds) == (LEAST_CONNECTIONS, 2.5)
+    registry = EngineRegistry(settings)
+    with registry.read_sessionmaker() as session:
+        # The engines of the registry do not attach the omis2 schema of the stand-ins, only the binds are checked.
+        assert session.get_bind(clause=select(User.login)).url.database.endswith("replica_a.db")
+        assert session.scalar(text("SELECT 1")) == 1
+        assert session.get_bind(clause=update(User).values(login="other")).url.database.endswith("primary.db")
+    assert [statistics.checkouts for statistics in registry.replica_pool_statistics()] == [1, 0]
+    registry.dispose()
+
+    registry = EngineRegistry(EngineSettings(database_url=f"sqlite:///{tmp_path / 'primary.db'}"))
+    assert registry.read_sessionmaker is registry.sessionmaker
+    registry.dispose()
+
+
+def test_cached_reads_after_a_write_come_from_primary(engines):
+    primary, *replicas = engines
+    for engine, name in zip(engines, DATABASES):
+        with sessionmaker(engine)() as session:
+            SQLAlchemyKnowledgeDAL().save(SaveKnowledgeDTO("Cached", name, "link", "category", "user"), session)
+            session.commit()
+    token_signer = create_test_token_signer()
+    service = CachedKnowledgeService(
+        KnowledgeServiceImpl(SQLAlchemyKnowledgeDAL(), token_signer), InMemoryCacheBackend(60, 100)
+    )
+    session_maker = routing_sessionmaker(ReplicaSet(primary, replicas))
+
+    def read_description():
+        with session_maker() as session:
+            return service.get_knowledge_by_title("Cached", session).description
+
+    assert read_description() == "replica a"
+    with session_maker() as session:
+        service.patch_knowledge_many(
+            [PatchKnowledgeDTO("Cached", description="primary patched")], token_signer.issue("admin", True), session
+        )
+    # Another user reads from a replica that has not replayed the write and caches the old row again.
+    assert read_description() == "replica b"
+    with primary_reads():
+        assert read_description() == "primary patched"
+    assert read_description() == "primary patched"
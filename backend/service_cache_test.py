@@ -0,0 +1,185 @@
+#Author: Vodohleb04
+from datetime import date
+import pytest
+from sqlalchemy.orm import sessionmaker
+from backend.data_layer.sqlite_stand_in import create_sqlite_stand_in_engine
+from backend.data_layer.mapped_database import KnowledgeStatus
+from backend.data_access_layer.user_dal.user_dal import SQLAlchemyUserDAL
+from backend.data_access_layer.user_dal.save_user_dto import SaveUserDTO
+from backend.data_access_layer.knowledge_dal.knowledge_dal import SQLAlchemyKnowledgeDAL
+from backend.data_access_layer.knowledge_dal.save_knowledge_dto import SaveKnowledgeDTO
+from backend.data_access_layer.discussion_dal.discussion_dal import SQLAlchemyDiscussionDAL
+from backend.data_access_layer.discussion_dal.save_discussion_dto import SaveDiscussionDTO
+from backend.data_access_layer.comment_dal.comment_dal import SQLAlchemyCommentDAL
+from backend.data_access_layer.comment_dal.save_comment_dto import SaveCommentDTO
+from backend.service_layer.cache.cache_backend import MISSING
+from backend.service_layer.cache.in_memory_cache_backend import InMemoryCacheBackend
+from backend.service_layer.knowledge_service.cached_knowledge_service import CachedKnowledgeService
+from backend.service_layer.knowledge_service.knowledge_service_impl import KnowledgeServiceImpl
+from backend.service_layer.discussion_service.cached_discussion_service import CachedDiscussionService
+from backend.service_layer.discussion_service.discussion_service_impl import DiscussionServiceImpl
+from backend.conftest import count_statements, create_test_token_signer
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_in_memory_backend_ttl_and_lru():
+    clock = FakeClock()
+    cache = InMemoryCacheBackend(ttl_seconds=10, max_entries=2, clock=clock)
+    cache.set("a", None)
+    cache.set("b", 2)
+    assert cache.get("a") is None
+    cache.set("c", 3)
+    assert cache.get("b") is MISSING
+    clock.now = 10
+    assert cache.get("a") is MISSING
+    assert len(cache) == 1
+    assert (cache.statistics().hits, cache.statistics().misses) == (1, 2)
+
+
+@pytest.fixture
+def session_maker():
+    engine = create_sqlite_stand_in_engine()
+    session_maker = sessionmaker(engine, expire_on_commit=False)
+    with session_maker() as session:
+        SQLAlchemyUserDAL().save(SaveUserDTO(False, "user", "user name", "hash", "user@mail.ru", date.today()), session)
+        SQLAlchemyUserDAL().save(SaveUserDTO(True, "admin", "admin name", "hash", "admin@mail.ru", date.today()), session)
+        session.commit()
+    yield session_maker
+    engine.dispose()
+
+
+def test_knowledge_cache_is_invalidated_by_writes(session_maker):
+    cache = InMemoryCacheBackend(ttl_seconds=60, max_entries=100)
+    token_signer = create_test_token_signer()
+    service = CachedKnowledgeService(KnowledgeServiceImpl(SQLAlchemyKnowledgeDAL(), token_signer), cache)
+    user = token_signer.issue("user", False)
+    admin = token_signer.issue("admin", True)
+    with session_maker() as session:
+        assert service.get_knowledge_categories(session, status=KnowledgeStatus.PUBLISHED) == []
+        assert service.get_knowledge_by_title("Cache", session) is None
+        with count_statements(session_maker) as statements:
+            service.get_knowledge_categories(session, status=KnowledgeStatus.PUBLISHED)
+            service.get_knowledge_by_title("Cache", session)
+        assert statements == []
+
+        service.save_knowledge(SaveKnowledgeDTO("Cache", "description", "link", "category", "user"), user, session)
+        assert service.get_knowledge_by_title("Cache", session).status == KnowledgeStatus.IN_PROCESSING
+        assert service.get_knowledge_categories(session, status=KnowledgeStatus.IN_PROCESSING) == ["category"]
+
+        service.accept_knowledge_publishing("Cache", admin, session)
+        assert service.get_knowledge_by_title("Cache", session).status == KnowledgeStatus.PUBLISHED
+        assert service.get_knowledge_categories(session, status=KnowledgeStatus.PUBLISHED) == ["category"]
+        assert service.get_knowledge_categories(session, status=KnowledgeStatus.IN_PROCESSING) == []
+
+        service.delete_knowledge_by_title("Cache", user, session)
+        assert service.get_knowledge_by_title("Cache", session) is None
+        assert service.get_knowledge_categories(session) == []
+    assert cache.statistics().hits == 2
+
+
+class WriteDuringLoadKnowledgeService(KnowledgeServiceImpl):
+    # Runs a write after the view was loaded and before the cache stores it.
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.write = None
+
+    def get_knowledge_by_title(self, title, db_session):
+        knowledge = super().get_knowledge_by_title(title, db_session)
+        write, self.write = self.write, None
+        if write is not None:
+            write(db_session)
+        return knowledge
+
+
+@pytest.fixture(params=["in_memory", "redis"])
+def cache(request):
+    if request.param == "in_memory":
+        return InMemoryCacheBackend(ttl_seconds=60, max_entries=100)
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+    from backend.service_layer.cache.redis_cache_backend import RedisCacheBackend
+    return RedisCacheBackend(fakeredis.FakeRedis(), ttl_seconds=60)
+
+
+def test_invalidation_during_load_is_not_overwritten(session_maker, cache):
+    token_signer = create_test_token_signer()
+    knowledge_service = WriteDuringLoadKnowledgeService(SQLAlchemyKnowledgeDAL(), token_signer)
+    service = CachedKnowledgeService(knowledge_service, cache)
+    user = token_signer.issue("user", False)
+    admin = token_signer.issue("admin", True)
+    with session_maker() as session:
+        service.save_knowledge(SaveKnowledgeDTO("Cache", "description", "link", "category", "user"), user, session)
+
+    knowledge_service.write = lambda db_session: service.accept_knowledge_publishing("Cache", admin, db_session)
+    with session_maker() as session:
+        assert service.get_knowledge_by_title("Cache", session).status == KnowledgeStatus.IN_PROCESSING
+    # The load read the row before the write committed, its view is not stored over the invalidation.
+    assert cache.get("knowledge:title:Cache") is MISSING
+    with session_maker() as session:
+        assert service.get_knowledge_by_title("Cache", session).status == KnowledgeStatus.PUBLISHED
+    assert cache.get("knowledge:title:Cache").status == KnowledgeStatus.PUBLISHED
+
+
+def test_failed_load_is_not_stored(cache):
+    def fail():
+        raise RuntimeError("load failed")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_load("key", fail)
+    assert cache.get_or_load("key", lambda: 1) == 1
+    cache.delete("key")
+    assert cache.reload("key", lambda: 2) == 2
+    assert cache.get("key") == 2
+
+
+def test_discussion_cache_is_invalidated_by_comments(session_maker):
+    cache = InMemoryCacheBackend(ttl_seconds=60, max_entries=100)
+    token_signer = create_test_token_signer()
+    service = CachedDiscussionService(
+        DiscussionServiceImpl(SQLAlchemyDiscussionDAL(), SQLAlchemyCommentDAL(), token_signer), cache
+    )
+    user = token_signer.issue("user", False)
+    with session_maker() as session:
+        service.save_discussion(SaveDiscussionDTO("Cache", "description", "category", "user"), user, session)
+        assert service.get_discussion_categories(session) == ["category"]
+        assert service.get_discussion_by_title("Cache", session).comments == ()
+
+        service.save_comment(SaveCommentDTO("comment", "user", "Cache"), user, session)
+        comments = service.get_discussion_by_title("Cache", session).comments
+        assert [comment.description for comment in comments] == ["comment"]
+
+        service.delete_comment_by_id(comments[0].id, user, session)
+        assert service.get_discussion_by_title("Cache", session).comments == ()
+
+
+class Exploit:
+    executed = False
+
+    def __reduce__(self):
+        return setattr, (Exploit, "executed", True)
+
+
+def test_redis_entries_are_not_pickled():
+    fakeredis = pytest.importorskip("fakeredis")
+    import pickle
+    from backend.service_layer.cache.redis_cache_backend import RedisCacheBackend
+    from backend.service_layer.read_model.knowledge_view import KnowledgeView
+    redis_client = fakeredis.FakeRedis()
+    cache = RedisCacheBackend(redis_client, ttl_seconds=60)
+    view = KnowledgeView(1, "title", "description", "link", "category", KnowledgeStatus.PUBLISHED, "user name")
+    for key, value in (("view", view), ("none", None), ("categories", ["a", "b"])):
+        cache.set(key, value)
+        assert cache.get(key) == value
+    # An entry written by someone else with access to the redis is dropped instead of being run.
+    redis_client.set("omis:cache:view", pickle.dumps(Exploit()))
+    assert cache.get("view") is MISSING
+    assert not Exploit.executed
@@ -0,0 +1,7 @@
+#Author: Vodohleb04
+from backend.data_layer.run_sync_adapter import RunSyncAdapter
+from backend.service_layer.authentication_service.authentication_service import AuthenticationService
+
+
+class AsyncAuthenticationService(RunSyncAdapter, interface=AuthenticationService):
+    pass
@@ -1,16 +1,18 @@
 #Author: Vodohleb04
 from abc import ABC, abstractmethod
+from typing import List
 from sqlalchemy.orm import Session
-from backend.data_layer.mapped_database import GeneralUser
+from backend.data_access_layer.batch_write import WriteOutcome
 from backend.data_access_layer.user_dal.save_user_dto import SaveUserDTO
 from backend.data_access_layer.user_dal.login_user_dto import LoginUserDTO
 from backend.service_layer.authentication_service.authorization_token import AuthorizationToken
+from backend.service_layer.read_model.user_view import UserView
 
 
 class AuthenticationService(ABC):
 
     @abstractmethod
-    def get_user_by_login(self, user_login: str, db_session: Session) -> GeneralUser | None:
+    def get_user_by_login(self, user_login: str, db_session: Session) -> UserView | None:
         raise NotImplementedError
 
     @abstractmethod
@@ -20,3 +22,16 @@ class AuthenticationService(ABC):
     @abstractmethod
     def register(self, request: SaveUserDTO, db_session: Session) -> AuthorizationToken:
         raise NotImplementedError
+
+    @abstractmethod
+    def logout(self, token: AuthorizationToken) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def register_many(
+            self,
+            request_list: List[SaveUserDTO],
+            token: AuthorizationToken,
+            db_session: Session
+    ) -> List[WriteOutcome]:
+        raise NotImplementedError
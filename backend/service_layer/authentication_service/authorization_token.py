@@ -1,27 +1,18 @@
 #Author: Vodohleb04
+import json
 from typing import Dict
-from backend.service_layer.authentication_service.authentication_error import AuthenticationError
 
 
 class AuthorizationToken:
+    # Signed claims of a logged in user, issued and verified by TokenSigner. Holding a token proves nothing by itself,
+    # services accept it only after checking the signature, the expiration time and the revocation list.
 
-    def __init__(self, login: str, hashed_password: str, is_admin: bool):
+    def __init__(self, login: str, is_admin: bool, expires_at: int, token_id: str, signature: str):
         self.__login = login
-        self.__hashed_password = hashed_password
         self.__is_admin = is_admin
-
-    def __check_password(self, hashed_password_to_check: str) -> bool:
-        return hashed_password_to_check == self.__hashed_password
-
-    def __check_login(self, login_to_check: str) -> bool:
-        return login_to_check == self.__login
-
-    def check_token(self, login_to_check: str, hashed_password_to_check: str) -> bool:
-        if not self.__check_login(login_to_check):
-            raise AuthenticationError("Login is invalid.")
-        if not self.__check_password(hashed_password_to_check):
-            raise AuthenticationError("Invalid password.")
-        return True
+        self.__expires_at = expires_at
+        self.__token_id = token_id
+        self.__signature = signature
 
     def get_login(self) -> str:
         return self.__login
@@ -30,9 +21,28 @@ class AuthorizationToken:
     def is_admin(self) -> bool:
         return self.__is_admin
 
+    @property
+    def expires_at(self) -> int:
+        return self.__expires_at
+
+    @property
+    def token_id(self) -> str:
+        return self.__token_id
+
+    @property
+    def signature(self) -> str:
+        return self.__signature
+
+    def claims(self) -> bytes:
+        return json.dumps(
+            [self.__login, self.__is_admin, self.__expires_at, self.__token_id], separators=(",", ":")
+        ).encode()
+
     def to_json(self) -> Dict:
         return {
             "login": self.__login,
-            "hashed_password": self.__hashed_password,
-            "is_admin": self.__is_admin
+            "is_admin": self.__is_admin,
+            "expires_at": self.__expires_at,
+            "token_id": self.__token_id,
+            "signature": self.__signature
         }
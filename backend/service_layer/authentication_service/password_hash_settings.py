@@ -0,0 +1,41 @@
+#Author: Vodohleb04
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from backend.service_layer.authentication_service.password_hasher import (
+    PasswordHasher, ScryptCost, DEFAULT_SCRYPT_COST
+)
+
+
+@dataclass(frozen=True, slots=True)
+class PasswordHashSettings:
+    scrypt_n: int = DEFAULT_SCRYPT_COST.n
+    scrypt_r: int = DEFAULT_SCRYPT_COST.r
+    scrypt_p: int = DEFAULT_SCRYPT_COST.p
+    # Processes of the hashing pool, at most this many derivations run at a time in one worker process.
+    # 0 derives the keys in the calling thread.
+    hash_workers: int = os.cpu_count() or 1
+
+    @classmethod
+    def from_environment(cls, environment=os.environ) -> "PasswordHashSettings":
+        defaults = cls()
+        return cls(
+            scrypt_n=int(environment.get("OMIS_PASSWORD_SCRYPT_N", defaults.scrypt_n)),
+            scrypt_r=int(environment.get("OMIS_PASSWORD_SCRYPT_R", defaults.scrypt_r)),
+            scrypt_p=int(environment.get("OMIS_PASSWORD_SCRYPT_P", defaults.scrypt_p)),
+            hash_workers=int(environment.get("OMIS_PASSWORD_HASH_WORKERS", defaults.hash_workers))
+        )
+
+
+def create_password_hasher(settings: PasswordHashSettings) -> PasswordHasher:
+    cost = ScryptCost(settings.scrypt_n, settings.scrypt_r, settings.scrypt_p)
+    if settings.hash_workers == 0:
+        return PasswordHasher(cost)
+    # Spawned, not forked: the worker and web processes run threads, a forked child could inherit a held lock.
+    # The pool starts its processes on the first hash.
+    executor = ProcessPoolExecutor(settings.hash_workers, mp_context=multiprocessing.get_context("spawn"))
+    return PasswordHasher(cost, executor)
+
+
+password_hasher = create_password_hasher(PasswordHashSettings.from_environment())
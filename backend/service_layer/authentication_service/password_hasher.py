@@ -0,0 +1,116 @@
+#Author: Vodohleb04
+import base64
+import hashlib
+import hmac
+import os
+from concurrent.futures import Executor
+from dataclasses import dataclass
+from typing import List, Tuple
+from backend.data_layer.run_sync_adapter import run_blocking
+
+SCRYPT_SCHEME = "scrypt"
+KEY_BYTES = 32
+
+
+@dataclass(frozen=True, slots=True)
+class ScryptCost:
+    # Memory of one derivation is about 128 * n * r bytes, the time grows linearly with n, r and p.
+    n: int = 2 ** 14
+    r: int = 8
+    p: int = 1
+
+    @property
+    def max_memory(self) -> int:
+        return 2 * 128 * self.r * (self.n + self.p)
+
+
+DEFAULT_SCRYPT_COST = ScryptCost()
+
+
+def derive_key(password: str, salt: bytes, n: int, r: int, p: int) -> bytes:
+    # Module level, so the process pool can pickle it by reference.
+    cost = ScryptCost(n, r, p)
+    return hashlib.scrypt(
+        password.encode(), salt=salt, n=cost.n, r=cost.r, p=cost.p, maxmem=cost.max_memory, dklen=KEY_BYTES
+    )
+
+
+def _encode(data: bytes) -> str:
+    return base64.b64encode(data).decode()
+
+
+class PasswordHasher:
+    # Stored hashes look like scrypt$n$r$p$salt$key, the cost is kept per row so it can be raised without
+    # invalidating existing passwords. Rows of the old scheme keep the unsalted sha256 digest the web process sends,
+    # they are accepted until the next login rehashes them.
+
+    def __init__(self, cost: ScryptCost, executor: Executor | None = None, salt_bytes: int = 16):
+        self.__cost = cost
+        self.__executor = executor
+        self.__salt_bytes = salt_bytes
+        self.__unknown_user_hash = None
+
+    @property
+    def cost(self) -> ScryptCost:
+        return self.__cost
+
+    def __derive_keys(self, passwords: List[str], salts: List[bytes], costs: List[ScryptCost]) -> List[bytes]:
+        arguments = [
+            (password, salt, cost.n, cost.r, cost.p) for password, salt, cost in zip(passwords, salts, costs)
+        ]
+        return run_blocking(self.__derive, arguments)
+
+    def __derive(self, arguments: List[Tuple]) -> List[bytes]:
+        if self.__executor is None:
+            return [derive_key(*argument) for argument in arguments]
+        # The derivation takes tens of milliseconds of CPU, the pool keeps it off the threads that wait for I/O.
+        return list(self.__executor.map(derive_key, *zip(*arguments)))
+
+    def hash_many(self, passwords: List[str]) -> List[str]:
+        if not passwords:
+            return []
+        salts = [os.urandom(self.__salt_bytes) for _ in passwords]
+        keys = self.__derive_keys(passwords, salts, [self.__cost] * len(passwords))
+        cost = self.__cost
+        return [
+            f"{SCRYPT_SCHEME}${cost.n}${cost.r}${cost.p}${_encode(salt)}${_encode(key)}"
+            for salt, key in zip(salts, keys)
+        ]
+
+    def hash(self, password: str) -> str:
+        return self.hash_many([password])[0]
+
+    @staticmethod
+    def _parse(stored_hash: str) -> Tuple[ScryptCost, bytes, bytes] | None:
+        parts = stored_hash.split("$")
+        if len(parts) != 6 or parts[0] != SCRYPT_SCHEME:
+            return None
+        try:
+            cost = ScryptCost(int(parts[1]), int(parts[2]), int(parts[3]))
+            return cost, base64.b64decode(parts[4]), base64.b64decode(parts[5])
+        except ValueError:
+            return None
+
+    @staticmethod
+    def is_legacy(stored_hash: str) -> bool:
+        return not stored_hash.startswith(f"{SCRYPT_SCHEME}$")
+
+    def verify(self, password: str, stored_hash: str) -> bool:
+        if self.is_legacy(stored_hash):
+            return hmac.compare_digest(stored_hash.encode(), password.encode())
+        parsed = self._parse(stored_hash)
+        if parsed is None:
+            return False
+        cost, salt, key = parsed
+        return hmac.compare_digest(self.__derive_keys([password], [salt], [cost])[0], key)
+
+    def verify_unknown_user(self, password: str) -> None:
+        # A login of an unknown user derives a key like a wrong password does, the answer time does not tell whether
+        # the login exists. The hash is made once, of a random password at the current cost.
+        if self.__unknown_user_hash is None:
+            self.__unknown_user_hash = self.hash(_encode(os.urandom(KEY_BYTES)))
+        self.verify(password, self.__unknown_user_hash)
+
+    def needs_rehash(self, stored_hash: str) -> bool:
+        parsed = self._parse(stored_hash)
+        return parsed is None or parsed[0] != self.__cost
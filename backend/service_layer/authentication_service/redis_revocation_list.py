@@ -0,0 +1,30 @@
+#Author: Vodohleb04
+import logging
+from redis import Redis, RedisError
+from backend.data_layer.run_sync_adapter import run_blocking
+from backend.service_layer.authentication_service.revocation_list import RevocationList
+
+logger = logging.getLogger(__name__)
+
+
+class RedisRevocationList(RevocationList):
+
+    def __init__(self, redis_client: Redis, namespace: str = "omis:revoked:"):
+        self.__redis_client = redis_client
+        self.__namespace = namespace
+
+    def revoke(self, token_id: str, expires_at: int) -> None:
+        try:
+            # Redis drops the entry once the token has expired, the signature check refuses it from then on.
+            run_blocking(self.__redis_client.set, self.__namespace + token_id, 1, exat=expires_at)
+        except RedisError as ex:
+            logger.error(f"In revoke error was occurred: {ex}. Token {token_id} stays valid until it expires.")
+
+    def is_revoked(self, token_id: str) -> bool:
+        try:
+            return run_blocking(self.__redis_client.exists, self.__namespace + token_id) > 0
+        except RedisError as ex:
+            # Refusing every token while the list is unreachable logs users out, accepting them would let revoked
+            # tokens through.
+            logger.error(f"In is_revoked error was occurred: {ex}. Token {token_id} is treated as revoked.")
+            return True
@@ -0,0 +1,38 @@
+#Author: Vodohleb04
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Callable, Dict
+
+
+class RevocationList(ABC):
+    # Ids of tokens revoked before their expiration, an entry is kept until the token would have expired anyway.
+
+    @abstractmethod
+    def revoke(self, token_id: str, expires_at: int) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def is_revoked(self, token_id: str) -> bool:
+        raise NotImplementedError
+
+
+class InMemoryRevocationList(RevocationList):
+    # Seen by one process only, several web or worker processes need the redis revocation list.
+
+    def __init__(self, clock: Callable[[], float] = time.time):
+        self.__clock = clock
+        self.__lock = threading.Lock()
+        self.__expirations: Dict[str, int] = {}
+
+    def revoke(self, token_id: str, expires_at: int) -> None:
+        now = self.__clock()
+        with self.__lock:
+            self.__expirations = {
+                revoked_id: expiration for revoked_id, expiration in self.__expirations.items() if expiration > now
+            }
+            self.__expirations[token_id] = expires_at
+
+    def is_revoked(self, token_id: str) -> bool:
+        with self.__lock:
+            return token_id in self.__expirations
@@ -0,0 +1,48 @@
+#Author: Vodohleb04
+import os
+from dataclasses import dataclass
+from backend.service_layer.authentication_service.revocation_list import InMemoryRevocationList, RevocationList
+from backend.service_layer.authentication_service.token_signer import TokenSigner
+
+REDIS_REVOCATION = "redis"
+IN_MEMORY_REVOCATION = "memory"
+
+
+@dataclass(frozen=True, slots=True)
+class TokenSettings:
+    # Every web and worker process needs the same secret key, tokens signed by another key are refused.
+    secret_key: str | None = None
+    ttl_seconds: float = 3600
+    revocation_backend: str = REDIS_REVOCATION
+    revocation_redis_url: str = "redis://localhost:6379/2"
+
+    @classmethod
+    def from_environment(cls, environment=os.environ) -> "TokenSettings":
+        defaults = cls()
+        return cls(
+            secret_key=environment.get("OMIS_TOKEN_SECRET", defaults.secret_key),
+            ttl_seconds=float(environment.get("OMIS_TOKEN_TTL", defaults.ttl_seconds)),
+            revocation_backend=environment.get("OMIS_TOKEN_REVOCATION_BACKEND", defaults.revocation_backend),
+            revocation_redis_url=environment.get("OMIS_TOKEN_REVOCATION_REDIS_URL", defaults.revocation_redis_url)
+        )
+
+
+def create_revocation_list(settings: TokenSettings) -> RevocationList:
+    if settings.revocation_backend == REDIS_REVOCATION:
+        from redis import Redis
+        from backend.service_layer.authentication_service.redis_revocation_list import RedisRevocationList
+        return RedisRevocationList(Redis.from_url(settings.revocation_redis_url))
+    elif settings.revocation_backend == IN_MEMORY_REVOCATION:
+        return InMemoryRevocationList()
+    else:
+        raise ValueError(f"Unsupported revocation backend: {settings.revocation_backend}")
+
+
+def create_token_signer(settings: TokenSettings) -> TokenSigner:
+    # No key of its own per process: the workers of the other queues and the web processes would refuse its tokens.
+    if settings.secret_key is None:
+        raise ValueError("OMIS_TOKEN_SECRET is not set, every web and worker process needs the same secret key")
+    return TokenSigner(settings.secret_key.encode(), settings.ttl_seconds, create_revocation_list(settings))
+
+
+token_signer = create_token_signer(TokenSettings.from_environment())
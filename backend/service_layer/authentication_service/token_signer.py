@@ -0,0 +1,48 @@
+#Author: Vodohleb04
+import hashlib
+import hmac
+import secrets
+import time
+from typing import Callable
+from backend.service_layer.authentication_service.authorization_token import AuthorizationToken
+from backend.service_layer.authentication_service.revocation_list import RevocationList
+
+
+class TokenSigner:
+    # Tokens are checked without the database: every process that shares the secret key and the revocation list
+    # accepts the tokens issued by any other one.
+
+    def __init__(
+            self,
+            secret_key: bytes,
+            ttl_seconds: float,
+            revocation_list: RevocationList,
+            clock: Callable[[], float] = time.time
+    ):
+        self.__secret_key = secret_key
+        self.__ttl_seconds = ttl_seconds
+        self.__revocation_list = revocation_list
+        self.__clock = clock
+
+    def __sign(self, token: AuthorizationToken) -> str:
+        return hmac.new(self.__secret_key, token.claims(), hashlib.sha256).hexdigest()
+
+    def issue(self, login: str, is_admin: bool) -> AuthorizationToken:
+        expires_at = int(self.__clock() + self.__ttl_seconds)
+        token_id = secrets.token_urlsafe(16)
+        signature = self.__sign(AuthorizationToken(login, is_admin, expires_at, token_id, signature=""))
+        return AuthorizationToken(login, is_admin, expires_at, token_id, signature)
+
+    def __is_authentic(self, token: AuthorizationToken) -> bool:
+        # compare_digest takes the same time wherever the signatures differ, so a forged one can not be guessed
+        # byte by byte from response times.
+        return hmac.compare_digest(self.__sign(token), str(token.signature)) and token.expires_at > self.__clock()
+
+    def verify(self, token: AuthorizationToken | None) -> bool:
+        if token is None or not self.__is_authentic(token):
+            return False
+        return not self.__revocation_list.is_revoked(token.token_id)
+
+    def revoke(self, token: AuthorizationToken) -> None:
+        if self.__is_authentic(token):
+            self.__revocation_list.revoke(token.token_id, token.expires_at)
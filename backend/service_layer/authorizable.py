@@ -5,7 +5,6 @@ from backend.service_layer.authentication_service.authorization_token import Aut
 
 class Authorizable(ABC):
 
-    @staticmethod
     @abstractmethod
-    def check_auth_token(token: AuthorizationToken, require_admin_rights: bool) -> bool:
+    def check_auth_token(self, token: AuthorizationToken, requires_admin_rights: bool) -> bool:
         raise NotImplementedError
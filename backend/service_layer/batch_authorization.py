@@ -0,0 +1,14 @@
+#Author: Vodohleb04
+from typing import Any, Callable, List
+from backend.data_access_layer.batch_write import WriteOutcome
+
+
+def write_permitted(
+        items: List[Any],
+        is_permitted: Callable[[Any], bool],
+        write: Callable[[List[Any]], List[WriteOutcome]]
+) -> List[WriteOutcome]:
+    permissions = [is_permitted(item) for item in items]
+    permitted_items = [item for item, permitted in zip(items, permissions) if permitted]
+    outcomes = iter(write(permitted_items) if permitted_items else ())
+    return [next(outcomes) if permitted else WriteOutcome.FORBIDDEN for permitted in permissions]
@@ -0,0 +1,121 @@
+#Author: Vodohleb04
+import threading
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, Callable
+from backend.service_layer.cache.single_flight import SingleFlight
+
+# Returned by get on a miss, so cached None results are distinguishable from missing entries.
+MISSING = object()
+
+
+@dataclass(frozen=True, slots=True)
+class CacheStatistics:
+    hits: int
+    misses: int
+    # Misses that waited for a load of the same key started by another thread or process instead of loading.
+    coalesced: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        requests = self.hits + self.misses
+        return self.hits / requests if requests else 0.0
+
+
+class CacheBackend(ABC):
+
+    def __init__(self, ttl_seconds: float):
+        self._ttl_seconds = ttl_seconds
+        self.__statistics_lock = threading.Lock()
+        self.__hits = 0
+        self.__misses = 0
+        self.__shared_coalesced = 0
+        self.__single_flight = SingleFlight()
+
+    def get(self, key: str) -> Any:
+        value = self._get(key)
+        with self.__statistics_lock:
+            if value is MISSING:
+                self.__misses += 1
+            else:
+                self.__hits += 1
+        return value
+
+    def get_or_load(self, key: str, load: Callable[[], Any]) -> Any:
+        value = self.get(key)
+        if value is MISSING:
+            value = self.__single_flight.call(key, lambda: self._load(key, load))
+        return value
+
+    def reload(self, key: str, load: Callable[[], Any]) -> Any:
+        # Loads past the cached entry and replaces it, for reads that must not be answered from the cache.
+        return self._load_and_store(key, load)
+
+    def _load(self, key: str, load: Callable[[], Any]) -> Any:
+        # Runs once per key and process at a time, backends shared by several processes coalesce across them here.
+        return self._load_and_store(key, load)
+
+    def _load_and_store(self, key: str, load: Callable[[], Any]) -> Any:
+        # A write may commit and delete the key while the load still reads the old row, the loaded value is stored
+        # only if the key was not deleted since the load began.
+        generation = self._generation(key)
+        try:
+            value = load()
+        except BaseException:
+            self._set_if_generation(key, MISSING, generation)
+            raise
+        self._set_if_generation(key, value, generation)
+        return value
+
+    def _count_shared_coalesced(self) -> None:
+        with self.__statistics_lock:
+            self.__shared_coalesced += 1
+
+    def statistics(self) -> CacheStatistics:
+        local_coalesced = self.__single_flight.statistics().coalesced
+        with self.__statistics_lock:
+            return CacheStatistics(
+                hits=self.__hits, misses=self.__misses, coalesced=local_coalesced + self.__shared_coalesced
+            )
+
+    @abstractmethod
+    def _get(self, key: str) -> Any:
+        raise NotImplementedError
+
+    @abstractmethod
+    def set(self, key: str, value: Any) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def _generation(self, key: str) -> Any:
+        raise NotImplementedError
+
+    @abstractmethod
+    def _set_if_generation(self, key: str, value: Any, generation: Any) -> None:
+        # MISSING ends a failed load without storing anything.
+        raise NotImplementedError
+
+    @abstractmethod
+    def delete(self, *keys: str) -> None:
+        raise NotImplementedError
+
+
+class NullCacheBackend(CacheBackend):
+
+    def __init__(self):
+        super().__init__(ttl_seconds=0)
+
+    def _get(self, key: str) -> Any:
+        return MISSING
+
+    def set(self, key: str, value: Any) -> None:
+        pass
+
+    def _generation(self, key: str) -> Any:
+        return None
+
+    def _set_if_generation(self, key: str, value: Any, generation: Any) -> None:
+        pass
+
+    def delete(self, *keys: str) -> None:
+        pass
@@ -0,0 +1,44 @@
+#Author: Vodohleb04
+import os
+from dataclasses import dataclass
+from backend.service_layer.cache.cache_backend import CacheBackend, NullCacheBackend
+from backend.service_layer.cache.in_memory_cache_backend import InMemoryCacheBackend
+
+REDIS_BACKEND = "redis"
+IN_MEMORY_BACKEND = "memory"
+NO_BACKEND = "none"
+
+
+@dataclass(frozen=True, slots=True)
+class CacheSettings:
+    # Worker processes only share invalidations through redis, the in-memory backend suits single process runs.
+    backend: str = REDIS_BACKEND
+    redis_url: str = "redis://localhost:6379/1"
+    ttl_seconds: float = 60
+    max_entries: int = 10000
+
+    @classmethod
+    def from_environment(cls, environment=os.environ) -> "CacheSettings":
+        defaults = cls()
+        return cls(
+            backend=environment.get("OMIS_CACHE_BACKEND", defaults.backend),
+            redis_url=environment.get("OMIS_CACHE_REDIS_URL", defaults.redis_url),
+            ttl_seconds=float(environment.get("OMIS_CACHE_TTL", defaults.ttl_seconds)),
+            max_entries=int(environment.get("OMIS_CACHE_MAX_ENTRIES", defaults.max_entries))
+        )
+
+
+def create_cache_backend(settings: CacheSettings) -> CacheBackend:
+    if settings.backend == REDIS_BACKEND:
+        from redis import Redis
+        from backend.service_layer.cache.redis_cache_backend import RedisCacheBackend
+        return RedisCacheBackend(Redis.from_url(settings.redis_url), settings.ttl_seconds)
+    elif settings.backend == IN_MEMORY_BACKEND:
+        return InMemoryCacheBackend(settings.ttl_seconds, settings.max_entries)
+    elif settings.backend == NO_BACKEND:
+        return NullCacheBackend()
+    else:
+        raise ValueError(f"Unsupported cache backend: {settings.backend}")
+
+
+cache_backend = create_cache_backend(CacheSettings.from_environment())
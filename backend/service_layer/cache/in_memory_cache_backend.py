@@ -0,0 +1,67 @@
+#Author: Vodohleb04
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Tuple
+from backend.service_layer.cache.cache_backend import CacheBackend, MISSING
+
+
+class InMemoryCacheBackend(CacheBackend):
+
+    def __init__(self, ttl_seconds: float, max_entries: int, clock: Callable[[], float] = time.monotonic):
+        super().__init__(ttl_seconds)
+        self.__max_entries = max_entries
+        self.__clock = clock
+        self.__lock = threading.Lock()
+        self.__entries: OrderedDict[str, Tuple[float, Any]] = OrderedDict()
+        # Only keys with loads in flight are tracked: (loads, deletions since the first of them began).
+        self.__loads: Dict[str, Tuple[int, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def _get(self, key: str) -> Any:
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is None:
+                return MISSING
+            expires_at, value = entry
+            if expires_at <= self.__clock():
+                del self.__entries[key]
+                return MISSING
+            self.__entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any) -> None:
+        with self.__lock:
+            self.__set(key, value)
+
+    def __set(self, key: str, value: Any) -> None:
+        self.__entries[key] = (self.__clock() + self._ttl_seconds, value)
+        self.__entries.move_to_end(key)
+        while len(self.__entries) > self.__max_entries:
+            self.__entries.popitem(last=False)
+
+    def _generation(self, key: str) -> int:
+        with self.__lock:
+            loads, generation = self.__loads.get(key, (0, 0))
+            self.__loads[key] = (loads + 1, generation)
+            return generation
+
+    def _set_if_generation(self, key: str, value: Any, generation: int) -> None:
+        with self.__lock:
+            loads, current_generation = self.__loads[key]
+            if loads == 1:
+                del self.__loads[key]
+            else:
+                self.__loads[key] = (loads - 1, current_generation)
+            if value is not MISSING and current_generation == generation:
+                self.__set(key, value)
+
+    def delete(self, *keys: str) -> None:
+        with self.__lock:
+            for key in keys:
+                self.__entries.pop(key, None)
+                if key in self.__loads:
+                    loads, generation = self.__loads[key]
+                    self.__loads[key] = (loads, generation + 1)
@@ -0,0 +1,160 @@
+#Author: Vodohleb04
+import logging
+import time
+import uuid
+from typing import Any, Callable
+from redis import Redis, RedisError
+from backend.service_layer.cache.cache_backend import CacheBackend, MISSING
+
+logger = logging.getLogger(__name__)
+
+# Deletes the load lock only while it is still held by the caller, an expired lock may belong to another loader.
+RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+# Stores a loaded entry only while the generation of its key is the one read before the load, a delete since then
+# bumped it and the loaded row may be older than the write that deleted the entry.
+SET_IF_GENERATION_SCRIPT = """
+if (redis.call('get', KEYS[2]) or '') == ARGV[2] then
+    return redis.call('set', KEYS[1], ARGV[1], 'PX', ARGV[3])
+end
+return 0
+"""
+
+
+class RedisCacheBackend(CacheBackend):
+    # Entries expire by TTL; LRU eviction is left to the server (maxmemory-policy volatile-lru).
+    # Entries are packed by the message codec like the broker messages: whoever can write to this Redis can only
+    # make the services return wrong views, not run code in them.
+
+    def __init__(
+            self,
+            redis_client: Redis,
+            ttl_seconds: float,
+            namespace: str = "omis:cache:",
+            lock_ttl_seconds: float = 30,
+            load_wait_seconds: float = 5,
+            poll_interval_seconds: float = 0.01
+    ):
+        # Imported here, the broker package builds the cache backend of its services while it is imported itself.
+        from broker.message_codec import encode_message, decode_message
+        super().__init__(ttl_seconds)
+        self.__encode_message = encode_message
+        self.__decode_message = decode_message
+        self.__redis_client = redis_client
+        self.__namespace = namespace
+        self.__lock_ttl_seconds = lock_ttl_seconds
+        self.__load_wait_seconds = load_wait_seconds
+        self.__poll_interval_seconds = poll_interval_seconds
+        self.__release_lock = redis_client.register_script(RELEASE_LOCK_SCRIPT)
+        self.__set_if_generation = redis_client.register_script(SET_IF_GENERATION_SCRIPT)
+
+    def _get(self, key: str) -> Any:
+        try:
+            payload = self.__redis_client.get(self.__namespace + key)
+        except RedisError as ex:
+            logger.error(f"In get error was occurred: {ex}. Cache entry {key} is treated as missing.")
+            return MISSING
+        if payload is None:
+            return MISSING
+        return self.__decode(key, payload)
+
+    def set(self, key: str, value: Any) -> None:
+        try:
+            self.__redis_client.set(
+                self.__namespace + key, self.__encode_message(value), px=int(self._ttl_seconds * 1000)
+            )
+        except RedisError as ex:
+            logger.error(f"In set error was occurred: {ex}. Cache entry {key} was not stored.")
+
+    def _generation(self, key: str) -> Any:
+        # None when it can not be read, the load is not stored then.
+        try:
+            generation = self.__redis_client.get(self.__generation_key(key))
+        except RedisError as ex:
+            logger.error(f"In generation error was occurred: {ex}. Cache entry {key} is loaded without storing.")
+            return None
+        return b"" if generation is None else generation
+
+    def _set_if_generation(self, key: str, value: Any, generation: Any) -> None:
+        if value is MISSING or generation is None:
+            return
+        try:
+            self.__set_if_generation(
+                keys=[self.__namespace + key, self.__generation_key(key)],
+                args=[self.__encode_message(value), generation, int(self._ttl_seconds * 1000)]
+            )
+        except RedisError as ex:
+            logger.error(f"In set error was occurred: {ex}. Cache entry {key} was not stored.")
+
+    def delete(self, *keys: str) -> None:
+        if not keys:
+            return
+        # The generations outlive every load that may have begun before the delete.
+        generation_ttl = int(max(self._ttl_seconds, self.__lock_ttl_seconds) * 1000)
+        try:
+            with self.__redis_client.pipeline(transaction=True) as pipeline:
+                pipeline.delete(*(self.__namespace + key for key in keys))
+                for key in keys:
+                    pipeline.incr(self.__generation_key(key))
+                    pipeline.pexpire(self.__generation_key(key), generation_ttl)
+                pipeline.execute()
+        except RedisError as ex:
+            logger.error(f"In delete error was occurred: {ex}. Cache entries {keys} were not invalidated.")
+
+    def __generation_key(self, key: str) -> str:
+        return f"{self.__namespace}generation:{key}"
+
+    def _load(self, key: str, load: Callable[[], Any]) -> Any:
+        # One process per key loads under a lock, the others wait for the entry it stores.
+        lock_key = f"{self.__namespace}lock:{key}"
+        lock_token = uuid.uuid4().hex
+        try:
+            locked = self.__redis_client.set(lock_key, lock_token, nx=True, px=int(self.__lock_ttl_seconds * 1000))
+        except RedisError as ex:
+            logger.error(f"In load lock error was occurred: {ex}. Cache entry {key} is loaded without the lock.")
+            return super()._load(key, load)
+        if locked:
+            try:
+                return super()._load(key, load)
+            finally:
+                self.__unlock(lock_key, lock_token)
+        value = self.__wait_for_entry(key, lock_key)
+        if value is MISSING:
+            return super()._load(key, load)
+        self._count_shared_coalesced()
+        return value
+
+    def __wait_for_entry(self, key: str, lock_key: str) -> Any:
+        # MISSING when the loader released the lock without storing the entry (it failed) or took too long.
+        deadline = time.monotonic() + self.__load_wait_seconds
+        while time.monotonic() < deadline:
+            time.sleep(self.__poll_interval_seconds)
+            try:
+                payload, lock_token = self.__redis_client.mget(self.__namespace + key, lock_key)
+            except RedisError as ex:
+                logger.error(f"In wait for load error was occurred: {ex}. Cache entry {key} is loaded again.")
+                return MISSING
+            if payload is not None:
+                return self.__decode(key, payload)
+            if lock_token is None:
+                return MISSING
+        return MISSING
+
+    def __decode(self, key: str, payload: bytes) -> Any:
+        # Entries of another schema version, or not written by a backend at all, are loaded again.
+        try:
+            return self.__decode_message(payload)
+        except (ValueError, TypeError) as ex:
+            logger.error(f"In decode error was occurred: {ex}. Cache entry {key} is treated as missing.")
+            return MISSING
+
+    def __unlock(self, lock_key: str, lock_token: str) -> None:
+        try:
+            self.__release_lock(keys=[lock_key], args=[lock_token])
+        except RedisError as ex:
+            logger.error(f"In unlock error was occurred: {ex}. Lock {lock_key} is left to expire.")
@@ -0,0 +1,45 @@
+#Author: Vodohleb04
+import threading
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Any, Callable, Dict
+
+
+@dataclass(frozen=True, slots=True)
+class SingleFlightStatistics:
+    executions: int
+    coalesced: int
+
+
+class SingleFlight:
+    # Concurrent calls with the same key share one execution: the first caller runs the function, the callers that
+    # arrive before it returns wait and receive its result or its exception. Results are shared, not copied.
+
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__flights: Dict[str, Future] = {}
+        self.__executions = 0
+        self.__coalesced = 0
+
+    def call(self, key: str, function: Callable[[], Any]) -> Any:
+        with self.__lock:
+            flight = self.__flights.get(key)
+            is_leader = flight is None
+            if is_leader:
+                flight = self.__flights[key] = Future()
+                self.__executions += 1
+            else:
+                self.__coalesced += 1
+        if is_leader:
+            try:
+                flight.set_result(function())
+            except BaseException as ex:
+                flight.set_exception(ex)
+            finally:
+                with self.__lock:
+                    del self.__flights[key]
+        return flight.result()
+
+    def statistics(self) -> SingleFlightStatistics:
+        with self.__lock:
+            return SingleFlightStatistics(executions=self.__executions, coalesced=self.__coalesced)
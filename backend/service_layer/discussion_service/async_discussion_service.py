@@ -0,0 +1,7 @@
+#Author: Vodohleb04
+from backend.data_layer.run_sync_adapter import RunSyncAdapter
+from backend.service_layer.discussion_service.discussion_service import DiscussionService
+
+
+class AsyncDiscussionService(RunSyncAdapter, interface=DiscussionService):
+    pass
@@ -0,0 +1,193 @@
+#Author: Vodohleb04
+from typing import List, Sequence, Callable, Any
+from sqlalchemy.orm import Session
+from backend.data_layer.replica_routing import reads_from_primary
+from backend.data_access_layer.batch_write import WriteOutcome, written_items
+from backend.data_access_layer.comment_dal.save_comment_dto import SaveCommentDTO
+from backend.data_access_layer.discussion_dal.patch_discussion_dto import PatchDiscussionDTO
+from backend.data_access_layer.discussion_dal.save_discussion_dto import SaveDiscussionDTO
+from backend.data_access_layer.page import Page, DEFAULT_PAGE_SIZE
+from backend.data_access_layer.search.similar_titles import DEFAULT_SIMILAR_TITLES_LIMIT
+from backend.service_layer.authentication_service.authorization_token import AuthorizationToken
+from backend.service_layer.cache.cache_backend import CacheBackend
+from backend.service_layer.discussion_service.discussion_service import DiscussionService
+from backend.service_layer.read_model.category_count_view import CategoryCountView
+from backend.service_layer.read_model.comment_view import CommentView, CommentSummaryView
+from backend.service_layer.read_model.discussion_view import DiscussionView, DiscussionSummaryView
+from backend.service_layer.unit_of_work import after_commit
+
+CATEGORIES_KEY = "discussion:categories"
+
+
+def _title_key(title: str) -> str:
+    return f"discussion:title:{title}"
+
+
+class CachedDiscussionService(DiscussionService):
+
+    def __init__(self, discussion_service: DiscussionService, cache: CacheBackend):
+        self.__discussion_service = discussion_service
+        self.__cache = cache
+
+    def check_auth_token(self, token: AuthorizationToken, requires_admin_rights: bool) -> bool:
+        return self.__discussion_service.check_auth_token(token, requires_admin_rights)
+
+    def _get_or_load(self, key: str, load: Callable[[], Any]) -> Any:
+        if reads_from_primary():
+            # A user who has just written reads past the cache: a lagging replica read of another user may have
+            # cached the old row again after the invalidation. The row of the primary replaces that entry.
+            return self.__cache.reload(key, load)
+        return self.__cache.get_or_load(key, load)
+
+    def _invalidate(self, db_session: Session, *keys: str) -> None:
+        # Deleted only after the commit of the write, a read in between would cache the old rows again.
+        after_commit(db_session, lambda: self.__cache.delete(*keys))
+
+    def get_discussion_categories(self, db_session: Session) -> Sequence[str] | None:
+        return self._get_or_load(
+            CATEGORIES_KEY, lambda: self.__discussion_service.get_discussion_categories(db_session)
+        )
+
+    def get_discussion_category_counts(self, db_session: Session) -> List[CategoryCountView]:
+        return self.__discussion_service.get_discussion_category_counts(db_session)
+
+    def get_all_discussions(
+            self,
+            db_session: Session,
+            cursor: str = None,
+            page_size: int = DEFAULT_PAGE_SIZE
+    ) -> Page[DiscussionSummaryView]:
+        return self.__discussion_service.get_all_discussions(db_session, cursor=cursor, page_size=page_size)
+
+    def get_discussion_by_title(self, title: str, db_session: Session) -> DiscussionView | None:
+        return self._get_or_load(
+            _title_key(title), lambda: self.__discussion_service.get_discussion_by_title(title, db_session)
+        )
+
+    def get_discussion_comments(
+            self,
+            discussion_id: int,
+            db_session: Session,
+            cursor: str = None,
+            page_size: int = DEFAULT_PAGE_SIZE
+    ) -> Page[CommentSummaryView]:
+        return self.__discussion_service.get_discussion_comments(
+            discussion_id, db_session, cursor=cursor, page_size=page_size
+        )
+
+    def get_discussions_by_category(
+            self,
+            category: str,
+            db_session: Session,
+            cursor: str = None,
+            page_size: int = DEFAULT_PAGE_SIZE
+    ) -> Page[DiscussionSummaryView]:
+        return self.__discussion_service.get_discussions_by_category(
+            category, db_session, cursor=cursor, page_size=page_size
+        )
+
+    def get_discussions_by_category_list(
+            self,
+            category_list: List[str],
+            db_session: Session,
+            cursor: str = None,
+            page_size: int = DEFAULT_PAGE_SIZE
+    ) -> Page[DiscussionSummaryView]:
+        return self.__discussion_service.get_discussions_by_category_list(
+            category_list, db_session, cursor=cursor, page_size=page_size
+        )
+
+    def list_discussion_titles(
+            self,
+            db_session: Session,
+            category: str = None,
+            cursor: str = None,
+            page_size: int = DEFAULT_PAGE_SIZE
+    ) -> Page[str]:
+        return self.__discussion_service.list_discussion_titles(
+            db_session, category=category, cursor=cursor, page_size=page_size
+        )
+
+    def search_discussions(
+            self,
+            query: str,
+            db_session: Session,
+            cursor: str = None,
+            page_size: int = DEFAULT_PAGE_SIZE
+    ) -> Page[DiscussionSummaryView]:
+        return self.__discussion_service.search_discussions(query, db_session, cursor=cursor, page_size=page_size)
+
+    def find_similar_discussion_titles(
+            self,
+            prefix_or_text: str,
+            db_session: Session,
+            limit: int = DEFAULT_SIMILAR_TITLES_LIMIT
+    ) -> List[str]:
+        return self.__discussion_service.find_similar_discussion_titles(prefix_or_text, db_session, limit=limit)
+
+    def save_discussion(
+            self,
+            discussion: SaveDiscussionDTO,
+            token: AuthorizationToken,
+            db_session: Session
+    ) -> WriteOutcome:
+        outcome = self.__discussion_service.save_discussion(discussion, token, db_session)
+        self._invalidate(db_session, _title_key(discussion.title), CATEGORIES_KEY)
+        return outcome
+
+    def save_discussion_many(
+            self,
+            discussion_list: List[SaveDiscussionDTO],
+            token: AuthorizationToken,
+            db_session: Session
+    ) -> List[WriteOutcome]:
+        outcomes = self.__discussion_service.save_discussion_many(discussion_list, token, db_session)
+        title_keys = [_title_key(discussion.title) for discussion in written_items(discussion_list, outcomes)]
+        if title_keys:
+            self._invalidate(db_session, *title_keys, CATEGORIES_KEY)
+        return outcomes
+
+    def patch_discussion_many(
+            self,
+            discussion_list: List[PatchDiscussionDTO],
+            token: AuthorizationToken,
+            db_session: Session
+    ) -> List[WriteOutcome]:
+        outcomes = self.__discussion_service.patch_discussion_many(discussion_list, token, db_session)
+        title_keys = [
+            _title_key(title) for discussion in written_items(discussion_list, outcomes)
+            for title in (discussion.old_title, discussion.new_title) if title is not None
+        ]
+        if title_keys:
+            self._invalidate(db_session, *title_keys, CATEGORIES_KEY)
+        return outcomes
+
+    def delete_discussion_by_title(self, title: str, token: AuthorizationToken, db_session: Session) -> None:
+        self.__discussion_service.delete_discussion_by_title(title, token, db_session)
+        self._invalidate(db_session, _title_key(title), CATEGORIES_KEY)
+
+    def get_comment_by_id(self, id: int, db_session: Session) -> CommentView | None:
+        return self.__discussion_service.get_comment_by_id(id, db_session)
+
+    def save_comment(self, comment: SaveCommentDTO, token: AuthorizationToken, db_session: Session) -> WriteOutcome:
+        outcome = self.__discussion_service.save_comment(comment, token, db_session)
+        self._invalidate(db_session, _title_key(comment.discussion_title))
+        return outcome
+
+    def save_comment_many(
+            self,
+            comment_list: List[SaveCommentDTO],
+            token: AuthorizationToken,
+            db_session: Session
+    ) -> List[WriteOutcome]:
+        outcomes = self.__discussion_service.save_comment_many(comment_list, token, db_session)
+        title_keys = {_title_key(comment.discussion_title) for comment in written_items(comment_list, outcomes)}
+        if title_keys:
+            self._invalidate(db_session, *title_keys)
+        return outcomes
+
+    def delete_comment_by_id(self, id: int, token: AuthorizationToken, db_session: Session) -> None:
+        comment = self.__discussion_service.get_comment_by_id(id, db_session)
+        self.__discussion_service.delete_comment_by_id(id, token, db_session)
+        if comment is not None:
+            self._invalidate(db_session, _title_key(comment.discussion_title))
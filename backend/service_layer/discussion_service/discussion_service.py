@@ -2,11 +2,17 @@
 from abc import ABC, abstractmethod
 from typing import List, Sequence
 from sqlalchemy.orm import Session
-from backend.data_layer.mapped_database import Discussion, Comment
+from backend.data_access_layer.batch_write import WriteOutcome
 from backend.data_access_layer.comment_dal.save_comment_dto import SaveCommentDTO
+from backend.data_access_layer.discussion_dal.patch_discussion_dto import PatchDiscussionDTO
 from backend.data_access_layer.discussion_dal.save_discussion_dto import SaveDiscussionDTO
+from backend.data_access_layer.page import Page, DEFAULT_PAGE_SIZE
+from backend.data_access_layer.search.similar_titles import DEFAULT_SIMILAR_TITLES_LIMIT
 from backend.service_layer.authorizable import Authorizable
 from backend.service_layer.authentication_service.authorization_token import AuthorizationToken
+from backend.service_layer.read_model.category_count_view import CategoryCountView
+from backend.service_layer.read_model.comment_view import CommentView, CommentSummaryView
+from backend.service_layer.read_model.discussion_view import DiscussionView, DiscussionSummaryView
 
 
 class DiscussionService(Authorizable, ABC):
@@ -16,27 +22,106 @@ class DiscussionService(Authorizable, ABC):
         raise NotImplementedError
 
     @abstractmethod
-    def get_all_discussions(self, db_session: Session) -> Sequence[Discussion] | None:
+    def get_discussion_category_counts(self, db_session: Session) -> List[CategoryCountView]:
         raise NotImplementedError
 
     @abstractmethod
-    def get_discussion_by_title(self, title: str, db_session: Session) -> Discussion | None:
+    def get_all_discussions(
+            self,
+            db_session: Session,
+            cursor: str = None,
+            page_size: int = DEFAULT_PAGE_SIZE
+    ) -> Page[DiscussionSummaryView]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_discussion_by_title(self, title: str, db_session: Session) -> DiscussionView | None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_discussion_comments(
+            self,
+            discussion_id: int,
+            db_session: Session,
+            cursor: str = None,
+            page_size: int = DEFAULT_PAGE_SIZE
+    ) -> Page[CommentSummaryView]:
         raise NotImplementedError
 
     @abstractmethod
-    def get_discussions_by_category(self, category: str, db_session: Session) -> Sequence[Discussion] | None:
+    def get_discussions_by_category(
+            self,
+            category: str,
+            db_session: Session,
+            cursor: str = None,
+            page_size: int = DEFAULT_PAGE_SIZE
+    ) -> Page[DiscussionSummaryView]:
         raise NotImplementedError
 
     @abstractmethod
     def get_discussions_by_category_list(
             self,
             category_list: List[str],
+            db_session: Session,
+            cursor: str = None,
+            page_size: int = DEFAULT_PAGE_SIZE
+    ) -> Page[DiscussionSummaryView]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def list_discussion_titles(
+            self,
+            db_session: Session,
+            category: str = None,
+            cursor: str = None,
+            page_size: int = DEFAULT_PAGE_SIZE
+    ) -> Page[str]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def search_discussions(
+            self,
+            query: str,
+            db_session: Session,
+            cursor: str = None,
+            page_size: int = DEFAULT_PAGE_SIZE
+    ) -> Page[DiscussionSummaryView]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def find_similar_discussion_titles(
+            self,
+            prefix_or_text: str,
+            db_session: Session,
+            limit: int = DEFAULT_SIMILAR_TITLES_LIMIT
+    ) -> List[str]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def save_discussion(
+            self,
+            discussion: SaveDiscussionDTO,
+            token: AuthorizationToken,
+            db_session: Session
+    ) -> WriteOutcome:
+        raise NotImplementedError
+
+    @abstractmethod
+    def save_discussion_many(
+            self,
+            discussion_list: List[SaveDiscussionDTO],
+            token: AuthorizationToken,
             db_session: Session
-    ) -> Sequence[Discussion] | None:
+    ) -> List[WriteOutcome]:
         raise NotImplementedError
 
     @abstractmethod
-    def save_discussion(self, discussion: SaveDiscussionDTO, token: AuthorizationToken, db_session: Session) -> None:
+    def patch_discussion_many(
+            self,
+            discussion_list: List[PatchDiscussionDTO],
+            token: AuthorizationToken,
+            db_session: Session
+    ) -> List[WriteOutcome]:
         raise NotImplementedError
 
     @abstractmethod
@@ -44,11 +129,20 @@ class DiscussionService(Authorizable, ABC):
         raise NotImplementedError
 
     @abstractmethod
-    def get_comment_by_id(self, id: int, db_session: Session) -> Comment | None:
+    def get_comment_by_id(self, id: int, db_session: Session) -> CommentView | None:
         raise NotImplementedError
 
     @abstractmethod
-    def save_comment(self, comment: SaveCommentDTO, token: AuthorizationToken, db_session: Session) -> None:
+    def save_comment(self, comment: SaveCommentDTO, token: AuthorizationToken, db_session: Session) -> WriteOutcome:
+        raise NotImplementedError
+
+    @abstractmethod
+    def save_comment_many(
+            self,
+            comment_list: List[SaveCommentDTO],
+            token: AuthorizationToken,
+            db_session: Session
+    ) -> List[WriteOutcome]:
         raise NotImplementedError
 
     @abstractmethod
@@ -0,0 +1,7 @@
+#Author: Vodohleb04
+from backend.data_layer.run_sync_adapter import RunSyncAdapter
+from backend.service_layer.knowledge_service.knowledge_service import KnowledgeService
+
+
+class AsyncKnowledgeService(RunSyncAdapter, interface=KnowledgeService):
+    pass
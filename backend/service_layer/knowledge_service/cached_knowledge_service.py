@@ -0,0 +1,240 @@
+#Author: Vodohleb04
+from typing import List, Callable, Any
+from sqlalchemy.orm import Session
+from backend.data_layer.mapped_database import KnowledgeStatus
+from backend.data_layer.replica_routing import reads_from_primary
+from backend.data_access_layer.batch_write import WriteOutcome, written_items
+from backend.data_access_layer.knowledge_dal.patch_knowledge_dto import PatchKnowledgeDTO
+from backend.data_access_layer.knowledge_dal.save_knowledge_dto import SaveKnowledgeDTO
+from backend.data_access_layer.page import Page, DEFAULT_PAGE_SIZE
+from backend.data_access_layer.search.similar_titles import DEFAULT_SIMILAR_TITLES_LIMIT
+from backend.service_layer.authentication_service.authorization_token import AuthorizationToken
+from backend.service_layer.cache.cache_backend import CacheBackend
+from backend.service_layer.knowledge_service.knowledge_service import KnowledgeService
+from backend.service_layer.read_model.category_count_view import CategoryCountView
+from backend.service_layer.read_model.knowledge_view import KnowledgeView, KnowledgeSummaryView
+from backend.service_layer.unit_of_work import after_commit
+
+
+def _categories_key(status: KnowledgeStatus | None) -> str:
+    return f"knowledge:categories:{status or 'all'}"
+
+
+def _title_key(title: str) -> str:
+    return f"knowledge:title:{title}"
+
+
+class CachedKnowledgeService(KnowledgeService):
+
+    def __init__(self, knowledge_service: KnowledgeService, cache: CacheBackend):
+        self.__knowledge_service = knowledge_service
+        self.__cache = cache
+
+    def check_auth_token(self, token: AuthorizationToken, requires_admin_rights: bool) -> bool:
+        return self.__knowledge_service.check_auth_token(token, requires_admin_rights)
+
+    def _get_or_load(self, key: str, load: Callable[[], Any]) -> Any:
+        if reads_from_primary():
+            # A user who has just written reads past the cache: a lagging replica read of another user may have
+            # cached the old row again after the invalidation. The row of the primary replaces that entry.
+            return self.__cache.reload(key, load)
+        return self.__cache.get_or_load(key, load)
+
+    def _invalidate(self, db_session: Session, *keys: str) -> None:
+        # Deleted only after the commit of the write, a read in between would cache the old rows again.
+        after_commit(db_session, lambda: self.__cache.delete(*keys))
+
+    def get_knowledge_categories(self, db_session: Session, status: KnowledgeStatus = None) -> List[str] | None:
+        return self._get_or_load(
+            _categories_key(status),
+            lambda: self.__knowledge_service.get_knowledge_categories(db_session, status=status)
+        )
+
+    def get_knowledge_category_counts(
+            self,
+            db_session: Session,
+            status: KnowledgeStatus = None
+    ) -> List[CategoryCountView]:
+        return self.__knowledge_service.get_knowledge_category_counts(db_session, status=status)
+
+    def get_knowledge_by_title(self, title: str, db_session: Session) -> KnowledgeView | None:
+        return self._get_or_load(
+            _title_key(title), lambda: self.__knowledge_service.get_knowledge_by_title(title, db_session)
+        )
+
+    def get_knowledge_by_category(
+            self,
+            category: str,
+            db_session: Session,
+            status: KnowledgeStatus = None,
+            cursor: str = None,
+            page_size: int = DEFAULT_PAGE_SIZE
+    ) -> Page[KnowledgeSummaryView]:
+        return self.__knowledge_service.get_knowledge_by_category(
+            category, db_session, status=status, cursor=cursor, page_size=page_size
+        )
+
+    def get_knowledge_by_category_list(
+            self,
+            category_list: List[str],
+            db_session: Session,
+            status: KnowledgeStatus = None,
+            cursor: str = None,
+            page_size: int = DEFAULT_PAGE_SIZE
+    ) -> Page[KnowledgeSummaryView]:
+        return self.__knowledge_service.get_knowledge_by_category_list(
+            category_list, db_session, status=status, cursor=cursor, page_size=page_size
+        )
+
+    def search_knowledge(
+            self,
+            query: str,
+            db_session: Session,
+            status: KnowledgeStatus = None,
+            cursor: str = None,
+            page_size: int = DEFAULT_PAGE_SIZE
+    ) -> Page[KnowledgeSummaryView]:
+        return self.__knowledge_service.search_knowledge(
+            query, db_session, status=status, cursor=cursor, page_size=page_size
+        )
+
+    def find_similar_knowledge_titles(
+            self,
+            prefix_or_text: str,
+            db_session: Session,
+            status: KnowledgeStatus = None,
+            limit: int = DEFAULT_SIMILAR_TITLES_LIMIT
+    ) -> List[str]:
+        return self.__knowledge_service.find_similar_knowledge_titles(
+            prefix_or_text, db_session, status=status, limit=limit
+        )
+
+    def get_published_knowledge(
+            self,
+            db_session: Session,
+            cursor: str = None,
+            page_size: int = DEFAULT_PAGE_SIZE
+    ) -> Page[KnowledgeSummaryView]:
+        return self.__knowledge_service.get_published_knowledge(db_session, cursor=cursor, page_size=page_size)
+
+    def get_in_processing_knowledge(
+            self,
+            token: AuthorizationToken,
+            db_session: Session,
+            cursor: str = None,
+            page_size: int = DEFAULT_PAGE_SIZE
+    ) -> Page[KnowledgeSummaryView] | None:
+        return self.__knowledge_service.get_in_processing_knowledge(
+            token, db_session, cursor=cursor, page_size=page_size
+        )
+
+    def list_published_knowledge_titles(
+            self,
+            db_session: Session,
+            category: str = None,
+            cursor: str = None,
+            page_size: int = DEFAULT_PAGE_SIZE
+    ) -> Page[str]:
+        return self.__knowledge_service.list_published_knowledge_titles(
+            db_session, category=category, cursor=cursor, page_size=page_size
+        )
+
+    def list_in_processing_knowledge_titles(
+            self,
+            token: AuthorizationToken,
+            db_session: Session,
+            cursor: str = None,
+            page_size: int = DEFAULT_PAGE_SIZE
+    ) -> Page[str] | None:
+        return self.__knowledge_service.list_in_processing_knowledge_titles(
+            token, db_session, cursor=cursor, page_size=page_size
+        )
+
+    def save_knowledge(
+            self,
+            knowledge: SaveKnowledgeDTO,
+            token: AuthorizationToken,
+            db_session: Session
+    ) -> WriteOutcome:
+        outcome = self.__knowledge_service.save_knowledge(knowledge, token, db_session)
+        # New knowledge is in processing, so the published categories are not affected.
+        self._invalidate(
+            db_session,
+            _title_key(knowledge.title), _categories_key(None), _categories_key(KnowledgeStatus.IN_PROCESSING)
+        )
+        return outcome
+
+    def accept_knowledge_publishing(
+            self,
+            knowledge_title: str,
+            token: AuthorizationToken,
+            db_session: Session
+    ) -> WriteOutcome:
+        outcome = self.__knowledge_service.accept_knowledge_publishing(knowledge_title, token, db_session)
+        self._invalidate(
+            db_session,
+            _title_key(knowledge_title),
+            _categories_key(KnowledgeStatus.PUBLISHED),
+            _categories_key(KnowledgeStatus.IN_PROCESSING)
+        )
+        return outcome
+
+    def save_knowledge_many(
+            self,
+            knowledge_list: List[SaveKnowledgeDTO],
+            token: AuthorizationToken,
+            db_session: Session
+    ) -> List[WriteOutcome]:
+        outcomes = self.__knowledge_service.save_knowledge_many(knowledge_list, token, db_session)
+        title_keys = [_title_key(knowledge.title) for knowledge in written_items(knowledge_list, outcomes)]
+        if title_keys:
+            self._invalidate(
+                db_session, *title_keys, _categories_key(None), _categories_key(KnowledgeStatus.IN_PROCESSING)
+            )
+        return outcomes
+
+    def patch_knowledge_many(
+            self,
+            knowledge_list: List[PatchKnowledgeDTO],
+            token: AuthorizationToken,
+            db_session: Session
+    ) -> List[WriteOutcome]:
+        outcomes = self.__knowledge_service.patch_knowledge_many(knowledge_list, token, db_session)
+        title_keys = [
+            _title_key(title) for knowledge in written_items(knowledge_list, outcomes)
+            for title in (knowledge.old_title, knowledge.new_title) if title is not None
+        ]
+        if title_keys:
+            self._invalidate(
+                db_session,
+                *title_keys,
+                _categories_key(None),
+                _categories_key(KnowledgeStatus.PUBLISHED),
+                _categories_key(KnowledgeStatus.IN_PROCESSING)
+            )
+        return outcomes
+
+    def accept_knowledge_publishing_many(
+            self,
+            knowledge_title_list: List[str],
+            token: AuthorizationToken,
+            db_session: Session
+    ) -> List[WriteOutcome]:
+        outcomes = self.__knowledge_service.accept_knowledge_publishing_many(knowledge_title_list, token, db_session)
+        title_keys = [_title_key(title) for title in written_items(knowledge_title_list, outcomes)]
+        if title_keys:
+            self._invalidate(
+                db_session,
+                *title_keys, _categories_key(KnowledgeStatus.PUBLISHED), _categories_key(KnowledgeStatus.IN_PROCESSING)
+            )
+        return outcomes
+
+    def delete_knowledge_by_title(self, knowledge_title: str, token: AuthorizationToken, db_session: Session) -> None:
+        self.__knowledge_service.delete_knowledge_by_title(knowledge_title, token, db_session)
+        self._invalidate(
+            db_session,
+            _title_key(knowledge_title),
+            _categories_key(None),
+            _categories_key(KnowledgeStatus.PUBLISHED),
+            _categories_key(KnowledgeStatus.IN_PROCESSING)
+        )
@@ -1,12 +1,17 @@
 #Author: Vodohleb04
 from abc import ABC, abstractmethod
-from typing import Sequence, List
+from typing import List
 from sqlalchemy.orm import Session
-from backend.data_layer.mapped_database import Knowledge
+from backend.data_access_layer.batch_write import WriteOutcome
+from backend.data_access_layer.knowledge_dal.patch_knowledge_dto import PatchKnowledgeDTO
 from backend.data_access_layer.knowledge_dal.save_knowledge_dto import SaveKnowledgeDTO
+from backend.data_access_layer.page import Page, DEFAULT_PAGE_SIZE
+from backend.data_access_layer.search.similar_titles import DEFAULT_SIMILAR_TITLES_LIMIT
 from backend.service_layer.authentication_service.authorization_token import AuthorizationToken
 from backend.service_layer.authorizable import Authorizable
 from backend.data_layer.mapped_database import KnowledgeStatus
+from backend.service_layer.read_model.category_count_view import CategoryCountView
+from backend.service_layer.read_model.knowledge_view import KnowledgeView, KnowledgeSummaryView
 
 
 class KnowledgeService(Authorizable, ABC):
@@ -16,7 +21,15 @@ class KnowledgeService(Authorizable, ABC):
         raise NotImplementedError
 
     @abstractmethod
-    def get_knowledge_by_title(self, title: str, db_session: Session) -> Knowledge | None:
+    def get_knowledge_category_counts(
+            self,
+            db_session: Session,
+            status: KnowledgeStatus = None
+    ) -> List[CategoryCountView]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_knowledge_by_title(self, title: str, db_session: Session) -> KnowledgeView | None:
         raise NotImplementedError
 
     @abstractmethod
@@ -24,8 +37,10 @@ class KnowledgeService(Authorizable, ABC):
             self,
             category: str,
             db_session: Session,
-            status: KnowledgeStatus = None
-    ) -> Sequence[Knowledge] | None:
+            status: KnowledgeStatus = None,
+            cursor: str = None,
+            page_size: int = DEFAULT_PAGE_SIZE
+    ) -> Page[KnowledgeSummaryView]:
         raise NotImplementedError
 
     @abstractmethod
@@ -33,24 +48,115 @@ class KnowledgeService(Authorizable, ABC):
             self,
             category_list: List[str],
             db_session: Session,
-            status: KnowledgeStatus = None
-    ) -> Sequence[Knowledge] | None:
+            status: KnowledgeStatus = None,
+            cursor: str = None,
+            page_size: int = DEFAULT_PAGE_SIZE
+    ) -> Page[KnowledgeSummaryView]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def search_knowledge(
+            self,
+            query: str,
+            db_session: Session,
+            status: KnowledgeStatus = None,
+            cursor: str = None,
+            page_size: int = DEFAULT_PAGE_SIZE
+    ) -> Page[KnowledgeSummaryView]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def find_similar_knowledge_titles(
+            self,
+            prefix_or_text: str,
+            db_session: Session,
+            status: KnowledgeStatus = None,
+            limit: int = DEFAULT_SIMILAR_TITLES_LIMIT
+    ) -> List[str]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_published_knowledge(
+            self,
+            db_session: Session,
+            cursor: str = None,
+            page_size: int = DEFAULT_PAGE_SIZE
+    ) -> Page[KnowledgeSummaryView]:
         raise NotImplementedError
 
     @abstractmethod
-    def get_published_knowledge(self, db_session: Session) -> Sequence[Knowledge] | None:
+    def get_in_processing_knowledge(
+            self,
+            token: AuthorizationToken,
+            db_session: Session,
+            cursor: str = None,
+            page_size: int = DEFAULT_PAGE_SIZE
+    ) -> Page[KnowledgeSummaryView] | None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def list_published_knowledge_titles(
+            self,
+            db_session: Session,
+            category: str = None,
+            cursor: str = None,
+            page_size: int = DEFAULT_PAGE_SIZE
+    ) -> Page[str]:
         raise NotImplementedError
 
     @abstractmethod
-    def get_in_processing_knowledge(self, token: AuthorizationToken, db_session: Session) -> Sequence[Knowledge] | None:
+    def list_in_processing_knowledge_titles(
+            self,
+            token: AuthorizationToken,
+            db_session: Session,
+            cursor: str = None,
+            page_size: int = DEFAULT_PAGE_SIZE
+    ) -> Page[str] | None:
         raise NotImplementedError
 
     @abstractmethod
-    def save_knowledge(self, knowledge: SaveKnowledgeDTO, token: AuthorizationToken, db_session: Session) -> None:
+    def save_knowledge(
+            self,
+            knowledge: SaveKnowledgeDTO,
+            token: AuthorizationToken,
+            db_session: Session
+    ) -> WriteOutcome:
         raise NotImplementedError
 
     @abstractmethod
-    def accept_knowledge_publishing(self, knowledge_title: str, token: AuthorizationToken, db_session: Session) -> None:
+    def accept_knowledge_publishing(
+            self,
+            knowledge_title: str,
+            token: AuthorizationToken,
+            db_session: Session
+    ) -> WriteOutcome:
+        raise NotImplementedError
+
+    @abstractmethod
+    def save_knowledge_many(
+            self,
+            knowledge_list: List[SaveKnowledgeDTO],
+            token: AuthorizationToken,
+            db_session: Session
+    ) -> List[WriteOutcome]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def patch_knowledge_many(
+            self,
+            knowledge_list: List[PatchKnowledgeDTO],
+            token: AuthorizationToken,
+            db_session: Session
+    ) -> List[WriteOutcome]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def accept_knowledge_publishing_many(
+            self,
+            knowledge_title_list: List[str],
+            token: AuthorizationToken,
+            db_session: Session
+    ) -> List[WriteOutcome]:
         raise NotImplementedError
 
     @abstractmethod
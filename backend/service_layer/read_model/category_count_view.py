@@ -0,0 +1,17 @@
+#Author: Vodohleb04
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Tuple
+
+
+@dataclass(frozen=True, slots=True)
+class CategoryCountView:
+    category: str
+    count: int
+
+    @classmethod
+    def from_row(cls, row: Tuple[str, int]) -> CategoryCountView:
+        return cls(category=row[0], count=row[1])
+
+    def __reduce__(self):
+        return CategoryCountView, (self.category, self.count)
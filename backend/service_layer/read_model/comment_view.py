@@ -0,0 +1,49 @@
+#Author: Vodohleb04
+from __future__ import annotations
+from dataclasses import dataclass
+from datetime import datetime
+from sqlalchemy import Row
+from backend.data_layer.mapped_database import Comment
+
+
+@dataclass(frozen=True, slots=True)
+class CommentView:
+    id: int
+    description: str
+    sender_username: str
+    discussion_id: int
+    discussion_title: str
+    created_at: datetime
+
+    @classmethod
+    def from_orm(cls, comment: Comment, discussion_title: str) -> CommentView:
+        return cls(
+            id=comment.id,
+            description=comment.description,
+            sender_username=comment.comment_sender.username,
+            discussion_id=comment.discussion_id,
+            discussion_title=discussion_title,
+            created_at=comment.created_at
+        )
+
+    def __reduce__(self):
+        return CommentView, (
+            self.id, self.description, self.sender_username, self.discussion_id, self.discussion_title, self.created_at
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class CommentSummaryView:
+    id: int
+    description: str
+    sender_username: str
+    created_at: datetime
+
+    @classmethod
+    def from_row(cls, row: Row) -> CommentSummaryView:
+        return cls(
+            id=row.id, description=row.description, sender_username=row.sender_username, created_at=row.created_at
+        )
+
+    def __reduce__(self):
+        return CommentSummaryView, (self.id, self.description, self.sender_username, self.created_at)
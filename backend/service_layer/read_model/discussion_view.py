@@ -0,0 +1,62 @@
+#Author: Vodohleb04
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Tuple
+from sqlalchemy import Row
+from backend.data_access_layer.page import Page
+from backend.data_layer.mapped_database import Discussion
+from backend.service_layer.read_model.comment_view import CommentSummaryView
+
+
+@dataclass(frozen=True, slots=True)
+class DiscussionView:
+    id: int
+    title: str
+    description: str
+    category: str
+    sender_username: str
+    comments: Tuple[CommentSummaryView, ...]
+    comment_count: int
+    next_comments_cursor: str | None
+
+    # Only the first page of comments is kept, the following ones are requested by next_comments_cursor.
+    @classmethod
+    def from_orm(
+            cls,
+            discussion: Discussion,
+            comment_page: Page[CommentSummaryView],
+            comment_count: int
+    ) -> DiscussionView:
+        return cls(
+            id=discussion.id,
+            title=discussion.title,
+            description=discussion.description,
+            category=discussion.category,
+            sender_username=discussion.discussion_sender.username,
+            comments=tuple(comment_page.items),
+            comment_count=comment_count,
+            next_comments_cursor=comment_page.next_cursor
+        )
+
+    def __reduce__(self):
+        return DiscussionView, (
+            self.id, self.title, self.description, self.category, self.sender_username, self.comments,
+            self.comment_count, self.next_comments_cursor
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class DiscussionSummaryView:
+    title: str
+    category: str
+
+    @classmethod
+    def from_orm(cls, discussion: Discussion) -> DiscussionSummaryView:
+        return cls(title=discussion.title, category=discussion.category)
+
+    @classmethod
+    def from_row(cls, row: Row) -> DiscussionSummaryView:
+        return cls(title=row.title, category=row.category)
+
+    def __reduce__(self):
+        return DiscussionSummaryView, (self.title, self.category)
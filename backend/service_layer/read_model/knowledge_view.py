@@ -0,0 +1,51 @@
+#Author: Vodohleb04
+from __future__ import annotations
+from dataclasses import dataclass
+from sqlalchemy import Row
+from backend.data_layer.mapped_database import Knowledge, KnowledgeStatus
+
+
+@dataclass(frozen=True, slots=True)
+class KnowledgeView:
+    id: int
+    title: str
+    description: str
+    link: str
+    category: str
+    status: KnowledgeStatus
+    sender_username: str
+
+    @classmethod
+    def from_orm(cls, knowledge: Knowledge) -> KnowledgeView:
+        return cls(
+            id=knowledge.id,
+            title=knowledge.title,
+            description=knowledge.description,
+            link=knowledge.link,
+            category=knowledge.category,
+            status=knowledge.status,
+            sender_username=knowledge.knowledge_sender.username
+        )
+
+    # Positional reduce keeps pickled payload free of field names and per-instance dicts.
+    def __reduce__(self):
+        return KnowledgeView, (
+            self.id, self.title, self.description, self.link, self.category, self.status, self.sender_username
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class KnowledgeSummaryView:
+    title: str
+    category: str
+
+    @classmethod
+    def from_orm(cls, knowledge: Knowledge) -> KnowledgeSummaryView:
+        return cls(title=knowledge.title, category=knowledge.category)
+
+    @classmethod
+    def from_row(cls, row: Row) -> KnowledgeSummaryView:
+        return cls(title=row.title, category=row.category)
+
+    def __reduce__(self):
+        return KnowledgeSummaryView, (self.title, self.category)
@@ -0,0 +1,18 @@
+#Author: Vodohleb04
+from __future__ import annotations
+from dataclasses import dataclass
+from backend.data_layer.mapped_database import GeneralUser
+
+
+@dataclass(frozen=True, slots=True)
+class UserView:
+    login: str
+    username: str
+    is_admin: bool
+
+    @classmethod
+    def from_orm(cls, user: GeneralUser) -> UserView:
+        return cls(login=user.login, username=user.username, is_admin=user.is_admin())
+
+    def __reduce__(self):
+        return UserView, (self.login, self.username, self.is_admin)
@@ -0,0 +1,66 @@
+#Author: Vodohleb04
+from typing import Callable, List
+from sqlalchemy.orm import Session
+from backend.data_access_layer.batch_write import has_staged_writes
+
+_UNIT_OF_WORK_KEY = "omis_unit_of_work"
+
+
+class UnitOfWork:
+    # One transaction per service call: DALs only stage their statements in db_session, the outermost unit of work
+    # commits them together, or rolls all of them back if the call raises. A unit of work opened inside another one
+    # (a service calling other services) is a savepoint of it, so the outer one survives its failure.
+
+    def __init__(self, db_session: Session):
+        self.__db_session = db_session
+        self.__outer: UnitOfWork | None = None
+        self.__savepoint = None
+        self.__after_commit_callbacks: List[Callable[[], None]] = []
+
+    def __enter__(self) -> "UnitOfWork":
+        self.__outer = self.__db_session.info.get(_UNIT_OF_WORK_KEY)
+        if self.__outer is not None:
+            self.__savepoint = self.__db_session.begin_nested()
+        self.__db_session.info[_UNIT_OF_WORK_KEY] = self
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> bool:
+        self.__db_session.info[_UNIT_OF_WORK_KEY] = self.__outer
+        if self.__outer is not None:
+            if exc_type is None:
+                self.__savepoint.commit()
+                # Nothing is durable before the outermost commit, the callbacks wait for it.
+                self.__outer.__after_commit_callbacks.extend(self.__after_commit_callbacks)
+            else:
+                self.__savepoint.rollback()
+            return False
+        if exc_type is None:
+            self.__db_session.commit()
+            for callback in self.__after_commit_callbacks:
+                callback()
+        else:
+            self.__db_session.rollback()
+        return False
+
+    def after_commit(self, callback: Callable[[], None]) -> None:
+        self.__after_commit_callbacks.append(callback)
+
+
+def after_commit(db_session: Session, callback: Callable[[], None]) -> None:
+    # Cache invalidations run once the writes are visible to other sessions, a reader in between would put the old
+    # rows back into the cache otherwise. Outside of a unit of work the writes are already committed.
+    unit_of_work = db_session.info.get(_UNIT_OF_WORK_KEY)
+    if unit_of_work is None:
+        callback()
+    else:
+        unit_of_work.after_commit(callback)
+
+
+def end_read_transaction(db_session: Session) -> None:
+    # Ends a transaction that has only read, before work outside of the database that would hold its connection
+    # meanwhile. A transaction of a unit of work or with writes staged by the caller is the caller's, it stays open.
+    if db_session.info.get(_UNIT_OF_WORK_KEY) is not None or db_session.in_nested_transaction():
+        return
+    if has_staged_writes(db_session) or db_session.new or db_session.dirty or db_session.deleted:
+        return
+    db_session.rollback()
@@ -0,0 +1,76 @@
+#Author: Vodohleb04
+from datetime import date
+import pytest
+from sqlalchemy.orm import sessionmaker
+from backend.data_layer.sqlite_stand_in import create_sqlite_stand_in_engine
+from backend.data_layer.mapped_database import KnowledgeStatus
+from backend.data_access_layer.user_dal.user_dal import SQLAlchemyUserDAL
+from backend.data_access_layer.user_dal.save_user_dto import SaveUserDTO
+from backend.data_access_layer.knowledge_dal.knowledge_dal import SQLAlchemyKnowledgeDAL
+from backend.data_access_layer.knowledge_dal.save_knowledge_dto import SaveKnowledgeDTO
+from backend.data_access_layer.search.trigram_index import TrigramIndex, trigrams
+
+
+def test_trigrams_match_pg_trgm():
+    assert trigrams("Cat") == {"  c", " ca", "cat", "at "}
+
+
+@pytest.fixture
+def trigram_index():
+    trigram_index = TrigramIndex()
+    for title in ["Postgres indexes", "Postgres replication", "Python packaging", "Pytest fixtures"]:
+        trigram_index.add(title)
+    return trigram_index
+
+
+def test_typo_tolerance(trigram_index):
+    assert trigram_index.find_similar("postgres indxes", 5)[0] == "Postgres indexes"
+    assert trigram_index.find_similar("pyton packging", 5) == ["Python packaging"]
+
+
+def test_prefix_matches_below_threshold(trigram_index):
+    assert trigram_index.find_similar("Py", 5) == ["Pytest fixtures", "Python packaging"]
+    assert trigram_index.find_similar("Postgres", 1) == ["Postgres indexes"]
+
+
+def test_removed_titles_are_not_returned(trigram_index):
+    trigram_index.remove("Python packaging")
+    assert trigram_index.find_similar("pyton packging", 5) == []
+    trigram_index.add("Python packaging")
+    assert trigram_index.find_similar("pyton packging", 5) == ["Python packaging"]
+    assert len(trigram_index) == 4
+
+
+def test_knowledge_dal_filters_by_status():
+    engine = create_sqlite_stand_in_engine()
+    with sessionmaker(engine, expire_on_commit=False)() as session:
+        SQLAlchemyUserDAL().save(SaveUserDTO(False, "user", "user name", "hash", "user@mail.ru", date.today()), session)
+        knowledge_dal = SQLAlchemyKnowledgeDAL()
+        for title in ["Fready fazber", "Fready fazbear", "Databases"]:
+            knowledge_dal.save(SaveKnowledgeDTO(title, "description", "link", "category", "user"), session)
+        knowledge_dal.accept_publishing("Fready fazbear", session)
+        assert knowledge_dal.find_similar_titles("freddy fazber", session) == ["Fready fazber", "Fready fazbear"]
+        assert knowledge_dal.find_similar_titles(
+            "freddy fazber", session, status=KnowledgeStatus.PUBLISHED
+        ) == ["Fready fazbear"]
+        assert knowledge_dal.find_similar_titles("   ", session) == []
+    engine.dispose()
+
+
+def test_postgres_trigram_lookup(postgres_search_engine):
+    with sessionmaker(postgres_search_engine, expire_on_commit=False)() as session:
+        SQLAlchemyUserDAL().save(SaveUserDTO(False, "user", "user name", "hash", "user@mail.ru", date.today()), session)
+        knowledge_dal = SQLAlchemyKnowledgeDAL()
+        for title in ["Fready fazber", "Fready fazbear", "Databases", "Data modelling"]:
+            knowledge_dal.save(SaveKnowledgeDTO(title, "description", "link", "category", "user"), session)
+        knowledge_dal.accept_publishing("Fready fazbear", session)
+        session.commit()
+        assert knowledge_dal.find_similar_titles("freddy fazber", session) == ["Fready fazber", "Fready fazbear"]
+        assert knowledge_dal.find_similar_titles("freddy fazber", session, limit=1) == ["Fready fazber"]
+        assert knowledge_dal.find_similar_titles(
+            "freddy fazber", session, status=KnowledgeStatus.PUBLISHED
+        ) == ["Fready fazbear"]
+        # Short prefixes are below the similarity threshold, they are matched by ILIKE and still ranked by similarity.
+        assert knowledge_dal.find_similar_titles("Dat", session) == ["Databases", "Data modelling"]
+        # The wildcards of LIKE in the text are matched literally.
+        assert knowledge_dal.find_similar_titles("_at", session) == []
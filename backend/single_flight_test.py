@@ -0,0 +1,121 @@
+#Author: Vodohleb04
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from backend.service_layer.cache.single_flight import SingleFlight, SingleFlightStatistics
+from backend.service_layer.cache.in_memory_cache_backend import InMemoryCacheBackend
+
+CALLERS = 8
+
+
+class BlockingLoad:
+
+    def __init__(self, value="value"):
+        self.value = value
+        self.calls = 0
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def __call__(self):
+        self.calls += 1
+        self.started.set()
+        assert self.release.wait(5)
+        if isinstance(self.value, Exception):
+            raise self.value
+        return self.value
+
+
+def call_concurrently(function, load, coalesced_calls):
+    # The first call holds the flight until the others have joined it, they wait for its result then.
+    with ThreadPoolExecutor(CALLERS) as executor:
+        expected_coalesced_calls = coalesced_calls() + CALLERS - 1
+        leader = executor.submit(function)
+        assert load.started.wait(5)
+        followers = [executor.submit(function) for _ in range(CALLERS - 1)]
+        while coalesced_calls() < expected_coalesced_calls:
+            time.sleep(0.001)
+        load.release.set()
+        return [future.exception() or future.result() for future in [leader, *followers]]
+
+
+def test_concurrent_calls_share_one_execution():
+    single_flight = SingleFlight()
+    load = BlockingLoad()
+
+    def coalesced_calls():
+        return single_flight.statistics().coalesced
+
+    assert call_concurrently(lambda: single_flight.call("key", load), load, coalesced_calls) == ["value"] * CALLERS
+    assert load.calls == 1
+    failing_load = BlockingLoad(ValueError("failed"))
+    results = call_concurrently(lambda: single_flight.call("key", failing_load), failing_load, coalesced_calls)
+    assert [type(result) for result in results] == [ValueError] * CALLERS
+    # A finished flight is not reused, the next call executes again.
+    assert single_flight.call("key", lambda: "next value") == "next value"
+    assert single_flight.statistics() == SingleFlightStatistics(executions=3, coalesced=2 * (CALLERS - 1))
+
+
+def test_cache_misses_are_coalesced():
+    cache = InMemoryCacheBackend(ttl_seconds=60, max_entries=10)
+    load = BlockingLoad()
+    results = call_concurrently(lambda: cache.get_or_load("key", load), load, lambda: cache.statistics().coalesced)
+    assert results == ["value"] * CALLERS
+    assert load.calls == 1
+    assert cache.get_or_load("key", load) == "value"
+    statistics = cache.statistics()
+    assert (statistics.hits, statistics.coalesced) == (1, CALLERS - 1)
+
+
+def test_redis_cache_misses_are_coalesced_across_processes():
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+    from backend.service_layer.cache.redis_cache_backend import RedisCacheBackend
+    server = fakeredis.FakeServer()
+    # Each backend stands for another worker process, they share the redis server only.
+    loading_process, waiting_process = (
+        RedisCacheBackend(fakeredis.FakeRedis(server=server), ttl_seconds=60, poll_interval_seconds=0.001)
+        for _ in range(2)
+    )
+    for key, value in (("key", "value"), ("failing key", ValueError("failed"))):
+        load = BlockingLoad(value)
+        with ThreadPoolExecutor(1) as executor:
+            leader = executor.submit(loading_process.get_or_load, key, load)
+            assert load.started.wait(5)
+            threading.Timer(0.05, load.release.set).start()
+            follower_result = waiting_process.get_or_load(key, lambda: "loaded again")
+            assert leader.exception() or leader.result() == value
+        # A failed load releases the lock without an entry, the waiting process loads by itself then.
+        assert follower_result == ("value" if key == "key" else "loaded again")
+    assert waiting_process.statistics().coalesced == 1
+
+
+def test_gateway_coalesces_identical_reads():
+    pytest.importorskip("celery")
+    from frontend.task_gateway import TaskGateway, GatewaySettings, IN_PROCESS_READS, task_call
+
+    class ReadTask:
+        name = "broker.knowledge_tasks.get_knowledge_by_title_task"
+
+        def __init__(self):
+            self.load = BlockingLoad()
+
+        def __call__(self, title, status=None):
+            return self.load(), title, status
+
+    task = ReadTask()
+    gateway = TaskGateway(GatewaySettings(read_path=IN_PROCESS_READS, read_concurrency=CALLERS))
+    results = call_concurrently(
+        lambda: gateway.read(task, "title", status="published"), task.load,
+        lambda: gateway.single_flight_statistics().coalesced
+    )
+    assert results == [("value", "title", "published")] * CALLERS
+    assert task.load.calls == 1
+    assert gateway.single_flight_statistics() == SingleFlightStatistics(executions=1, coalesced=CALLERS - 1)
+    # Different arguments are different reads.
+    other_task = ReadTask()
+    other_task.load.release.set()
+    assert gateway.read_all(task_call(other_task, "title"), task_call(other_task, "other title")) == (
+        ("value", "title", None), ("value", "other title", None)
+    )
+    assert other_task.load.calls == 2
@@ -0,0 +1,141 @@
+#Author: Vodohleb04
+import os
+import pytest
+from sqlalchemy import create_engine, text, select, func
+from sqlalchemy.orm import sessionmaker
+from backend.data_layer.mapped_database import Comment
+from backend.data_access_layer.batch_write import WriteOutcome
+from backend.data_access_layer.load_profile import LoadProfile
+from backend.data_access_layer.knowledge_dal.knowledge_dal import SQLAlchemyKnowledgeDAL
+from backend.data_access_layer.knowledge_dal.save_knowledge_dto import SaveKnowledgeDTO
+from backend.data_access_layer.discussion_dal.discussion_dal import SQLAlchemyDiscussionDAL
+from backend.data_access_layer.discussion_dal.patch_discussion_dto import PatchDiscussionDTO
+from backend.data_access_layer.comment_dal.comment_dal import SQLAlchemyCommentDAL
+from backend.data_access_layer.comment_dal.save_comment_dto import SaveCommentDTO
+from backend.migrate_to_surrogate_keys import expand, switch, contract
+
+DISCUSSIONS = 7
+COMMENTS_PER_DISCUSSION = 3
+BATCH_SIZE = 4
+
+# The omis2 schema as it was created before the surrogate keys.
+TITLE_KEYED_SCHEMA = """
+CREATE TYPE omis2.knowledgestatus AS ENUM ('IN_PROCESSING', 'PUBLISHED');
+CREATE TABLE omis2.general_user (
+    login VARCHAR NOT NULL PRIMARY KEY, username VARCHAR NOT NULL, hashed_password VARCHAR NOT NULL,
+    email VARCHAR NOT NULL, birthdate DATE NOT NULL, stack VARCHAR NOT NULL, _role VARCHAR NOT NULL,
+    CONSTRAINT unique_username UNIQUE (username)
+);
+CREATE TABLE omis2.admin (
+    login VARCHAR NOT NULL PRIMARY KEY REFERENCES omis2.general_user (login) ON DELETE CASCADE
+);
+CREATE TABLE omis2."user" (
+    login VARCHAR NOT NULL PRIMARY KEY REFERENCES omis2.general_user (login) ON DELETE CASCADE
+);
+CREATE TABLE omis2.knowledge_category (
+    category VARCHAR NOT NULL PRIMARY KEY, in_processing_count INTEGER NOT NULL, published_count INTEGER NOT NULL
+);
+CREATE TABLE omis2.discussion_category (
+    category VARCHAR NOT NULL PRIMARY KEY, discussion_count INTEGER NOT NULL
+);
+CREATE TABLE omis2.knowledge (
+    status omis2.knowledgestatus NOT NULL, title VARCHAR NOT NULL, description VARCHAR NOT NULL,
+    link VARCHAR NOT NULL, category VARCHAR NOT NULL,
+    sender_login VARCHAR NOT NULL REFERENCES omis2."user" (login) ON DELETE CASCADE,
+    PRIMARY KEY (title)
+);
+CREATE TABLE omis2.discussion (
+    title VARCHAR NOT NULL, description VARCHAR NOT NULL, category VARCHAR NOT NULL,
+    sender_login VARCHAR NOT NULL REFERENCES omis2."user" (login) ON DELETE CASCADE,
+    PRIMARY KEY (title)
+);
+CREATE TABLE omis2.comment (
+    id SERIAL NOT NULL PRIMARY KEY,
+    discussion_title VARCHAR NOT NULL REFERENCES omis2.discussion (title) ON DELETE CASCADE,
+    description VARCHAR NOT NULL,
+    sender_login VARCHAR NOT NULL REFERENCES omis2."user" (login) ON DELETE CASCADE
+);
+"""
+
+
+@pytest.fixture
+def engine():
+    if "OMIS_TEST_DATABASE_URL" not in os.environ:
+        pytest.skip("OMIS_TEST_DATABASE_URL is not set")
+    engine = create_engine(os.environ["OMIS_TEST_DATABASE_URL"])
+    with engine.begin() as connection:
+        connection.execute(text("DROP SCHEMA IF EXISTS omis2 CASCADE"))
+        connection.execute(text("CREATE SCHEMA omis2"))
+        connection.execute(text(TITLE_KEYED_SCHEMA))
+        connection.execute(
+            text(
+                """
+                INSERT INTO omis2.general_user
+                    VALUES ('user', 'user name', 'hash', 'user@mail.ru', '2000-01-01', '', 'user');
+                INSERT INTO omis2."user" VALUES ('user');
+                INSERT INTO omis2.knowledge
+                    VALUES ('PUBLISHED', 'knowledge', 'description', 'link', 'category', 'user');
+                INSERT INTO omis2.knowledge_category VALUES ('category', 0, 1);
+                INSERT INTO omis2.discussion
+                    SELECT 'discussion ' || number, 'description', 'category', 'user'
+                    FROM generate_series(1, :discussions) AS number;
+                INSERT INTO omis2.discussion_category VALUES ('category', :discussions);
+                INSERT INTO omis2.comment (discussion_title, description, sender_login)
+                    SELECT 'discussion ' || number, 'comment', 'user'
+                    FROM generate_series(1, :discussions) AS number, generate_series(1, :comments);
+                """
+            ),
+            {"discussions": DISCUSSIONS, "comments": COMMENTS_PER_DISCUSSION}
+        )
+    yield engine
+    engine.dispose()
+
+
+def test_expand_keeps_title_keyed_writers_working(engine):
+    expand(engine, batch_size=BATCH_SIZE)
+    with engine.begin() as connection:
+        connection.execute(
+            text(
+                "INSERT INTO omis2.discussion (title, description, category, sender_login) "
+                "VALUES ('late discussion', 'description', 'category', 'user');"
+                "INSERT INTO omis2.comment (discussion_title, description, sender_login) "
+                "VALUES ('late discussion', 'comment', 'user');"
+            )
+        )
+        assert connection.scalar(text("SELECT count(*) FROM omis2.discussion WHERE id IS NULL")) == 0
+        assert connection.scalar(text("SELECT count(*) FROM omis2.comment WHERE discussion_id IS NULL")) == 0
+        assert connection.scalar(text("SELECT count(DISTINCT id) FROM omis2.discussion")) == DISCUSSIONS + 1
+    expand(engine, batch_size=BATCH_SIZE)
+
+
+def test_migrated_schema_serves_id_keyed_dals(engine):
+    expand(engine, batch_size=BATCH_SIZE)
+    switch(engine)
+    contract(engine)
+    switch(engine)
+    contract(engine)
+
+    session_maker = sessionmaker(engine, expire_on_commit=False)
+    knowledge_dal, discussion_dal = SQLAlchemyKnowledgeDAL(), SQLAlchemyDiscussionDAL()
+    comment_dal = SQLAlchemyCommentDAL()
+    with session_maker() as session:
+        knowledge = knowledge_dal.get_by_title("knowledge", session)
+        assert knowledge_dal.get_by_id(knowledge.id, session).title == "knowledge"
+        assert knowledge_dal.save(SaveKnowledgeDTO("new", "description", "link", "category", "user"), session) == \
+            WriteOutcome.WRITTEN
+        assert knowledge_dal.get_by_title("new", session).id > knowledge.id
+        assert knowledge_dal.save(SaveKnowledgeDTO("new", "description", "link", "category", "user"), session) == \
+            WriteOutcome.ALREADY_EXISTS
+
+        discussion = discussion_dal.get_by_title("discussion 1", session)
+        assert comment_dal.save(SaveCommentDTO("new comment", "user", "discussion 1"), session) == WriteOutcome.WRITTEN
+        assert discussion_dal.patch(PatchDiscussionDTO("discussion 1", new_title="renamed"), session) == \
+            WriteOutcome.WRITTEN
+        session.expunge_all()
+        renamed = discussion_dal.get_by_id(discussion.id, session, LoadProfile.WITH_COMMENTS)
+        assert renamed.title == "renamed"
+        assert len(renamed.connected_comments) == COMMENTS_PER_DISCUSSION + 1
+
+        discussion_dal.delete_by_id(discussion.id, session)
+        assert session.scalar(select(func.count()).where(Comment.discussion_id == discussion.id)) == 0
+        assert dict(discussion_dal.get_category_counts(session)) == {"category": DISCUSSIONS - 1}
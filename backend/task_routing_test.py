@@ -0,0 +1,40 @@
+#Author: Vodohleb04
+import pytest
+
+pytest.importorskip("celery")
+from broker import broker_app
+from broker.task_routing import (
+    QUEUES, AUTHENTICATION_QUEUE, BULK_QUEUE, READ_QUEUE, INTERACTIVE_PRIORITY, BULK_PRIORITY, TASK_ROUTES
+)
+from broker.worker_launcher import QueueWorkerSettings, DEFAULT_QUEUE_WORKER_SETTINGS, worker_command
+
+
+def route(task_name):
+    options = broker_app.amqp.router.route({}, task_name)
+    return options["queue"].name, options["priority"]
+
+
+def test_every_task_is_routed():
+    task_names = {name for name in broker_app.tasks if not name.startswith("celery.")}
+    assert task_names == set(TASK_ROUTES)
+    assert route("broker.authentication_tasks.login_task") == (AUTHENTICATION_QUEUE, INTERACTIVE_PRIORITY)
+    assert route("broker.knowledge_tasks.get_knowledge_by_category_task") == (READ_QUEUE, INTERACTIVE_PRIORITY)
+    assert route("broker.discussion_tasks.delete_discussion_by_title_task") == (BULK_QUEUE, BULK_PRIORITY)
+    assert route("broker.authentication_tasks.register_many_task") == (BULK_QUEUE, BULK_PRIORITY)
+    # A worker started without --queues still consumes all of them.
+    assert [queue.name for queue in broker_app.conf.task_queues] == list(QUEUES)
+
+
+def test_worker_settings_from_environment():
+    settings = QueueWorkerSettings.from_environment(
+        AUTHENTICATION_QUEUE, {"OMIS_WORKER_AUTH_CONCURRENCY": "16", "OMIS_WORKER_AUTH_POOL": "threads"}
+    )
+    assert settings == QueueWorkerSettings((AUTHENTICATION_QUEUE,), 16, 1, "threads")
+    assert QueueWorkerSettings.from_environment(BULK_QUEUE, {}) == DEFAULT_QUEUE_WORKER_SETTINGS[BULK_QUEUE]
+
+    command = worker_command(settings)
+    assert command[command.index("--queues") + 1] == AUTHENTICATION_QUEUE
+    assert command[command.index("--hostname") + 1] == "auth@%h"
+    assert command[command.index("--concurrency") + 1] == "16"
+    assert command[command.index("--prefetch-multiplier") + 1] == "1"
+    assert command[command.index("--pool") + 1] == "threads"
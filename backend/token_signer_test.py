@@ -0,0 +1,87 @@
+#Author: Vodohleb04
+import pytest
+from backend.service_layer.authentication_service.authorization_token import AuthorizationToken
+from backend.service_layer.authentication_service.revocation_list import InMemoryRevocationList
+from backend.service_layer.authentication_service.token_signer import TokenSigner
+from backend.conftest import TEST_SECRET_KEY, create_test_token_signer
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def forged(token: AuthorizationToken, **changes) -> AuthorizationToken:
+    return AuthorizationToken(**{**token.to_json(), **changes})
+
+
+def test_issued_tokens_are_verified_without_the_issuer():
+    signer = create_test_token_signer()
+    token = signer.issue("user", False)
+    assert (token.get_login(), token.is_admin) == ("user", False)
+    # The session keeps the token as a dict, the token rebuilt from it is still accepted by another process.
+    assert TokenSigner(TEST_SECRET_KEY, 3600, InMemoryRevocationList()).verify(forged(token))
+    assert signer.issue("user", False).token_id != token.token_id
+
+    assert not signer.verify(None)
+    assert not signer.verify(forged(token, is_admin=True))
+    assert not signer.verify(forged(token, login="admin"))
+    assert not signer.verify(forged(token, signature="0" * 64))
+    assert not TokenSigner(b"other key", 3600, InMemoryRevocationList()).verify(token)
+
+
+def test_tokens_expire_and_are_revoked():
+    clock = FakeClock()
+    signer = create_test_token_signer(clock)
+    token = signer.issue("user", False)
+    assert token.expires_at == 4600
+    assert not signer.verify(forged(token, expires_at=token.expires_at + 3600))
+    clock.now = token.expires_at - 1
+    assert signer.verify(token)
+    clock.now = token.expires_at
+    assert not signer.verify(token)
+
+    clock.now = 1000.0
+    other_token = signer.issue("user", False)
+    signer.revoke(other_token)
+    assert not signer.verify(other_token)
+    # A forged token can not revoke the tokens of somebody else.
+    victim_token = signer.issue("admin", True)
+    signer.revoke(forged(other_token, token_id=victim_token.token_id))
+    assert signer.verify(victim_token)
+
+
+def test_signer_is_not_created_without_a_shared_secret():
+    from backend.service_layer.authentication_service.token_settings import (
+        TokenSettings, IN_MEMORY_REVOCATION, create_token_signer
+    )
+    environment = {"OMIS_TOKEN_REVOCATION_BACKEND": IN_MEMORY_REVOCATION}
+    with pytest.raises(ValueError):
+        create_token_signer(TokenSettings.from_environment(environment))
+    signer = create_token_signer(TokenSettings.from_environment({**environment, "OMIS_TOKEN_SECRET": "secret"}))
+    assert TokenSigner(b"secret", 3600, InMemoryRevocationList()).verify(signer.issue("user", False))
+
+
+def test_redis_revocation_list_is_shared_and_fails_closed():
+    fakeredis = pytest.importorskip("fakeredis")
+    from redis.exceptions import ConnectionError
+    from backend.service_layer.authentication_service.redis_revocation_list import RedisRevocationList
+    server = fakeredis.FakeServer()
+    web_signer, worker_signer = (
+        TokenSigner(TEST_SECRET_KEY, 3600, RedisRevocationList(fakeredis.FakeRedis(server=server))) for _ in range(2)
+    )
+    token = web_signer.issue("user", False)
+    assert worker_signer.verify(token)
+    web_signer.revoke(token)
+    assert not worker_signer.verify(token)
+    assert fakeredis.FakeRedis(server=server).ttl(f"omis:revoked:{token.token_id}") > 0
+
+    # Without the revocation list a logged out token could be used again, so no token is accepted then.
+    other_token = web_signer.issue("user", False)
+    server.connected = False
+    with pytest.raises(ConnectionError):
+        fakeredis.FakeRedis(server=server).ping()
+    assert not worker_signer.verify(other_token)
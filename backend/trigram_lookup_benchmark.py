@@ -0,0 +1,85 @@
+#Author: Vodohleb04
+import random
+import statistics
+import sys
+import time
+from sqlalchemy import create_engine, insert, text, Table, Column, String, MetaData
+from sqlalchemy.orm import Session
+from backend.data_access_layer.search.similar_titles import fetch_similar_titles, DEFAULT_SIMILAR_TITLES_LIMIT
+from backend.data_access_layer.search.trigram_index import TrigramIndex
+
+SIZES = (10 ** 5, 10 ** 6)
+QUERIES = 200
+INSERT_BATCH = 10 ** 4
+WORDS = [
+    "python", "postgres", "index", "query", "cache", "broker", "celery", "flask", "session", "engine",
+    "knowledge", "discussion", "comment", "category", "search", "trigram", "replica", "schema", "table", "column",
+    "введение", "основы", "практика", "обзор", "алгоритм", "структура", "данных", "сеть", "система", "модель"
+]
+
+
+def generate_titles(count, random_generator):
+    titles = set()
+    while len(titles) < count:
+        words = random_generator.sample(WORDS, random_generator.randint(2, 4))
+        titles.add(f"{' '.join(words)} {random_generator.randint(0, 10 ** 6)}".capitalize())
+    return list(titles)
+
+
+def make_typo(title, random_generator):
+    position = random_generator.randrange(len(title) - 1)
+    return title[:position] + title[position + 1:]
+
+
+def report(name, size, latencies):
+    latencies = sorted(latencies)
+    print(
+        f"{name:<24} {size:>9} titles  median {statistics.median(latencies) * 1e3:>9.2f} ms  "
+        f"p95 {latencies[int(len(latencies) * 0.95)] * 1e3:>9.2f} ms"
+    )
+
+
+def measure_in_memory(titles, queries):
+    trigram_index = TrigramIndex()
+    start = time.perf_counter()
+    for title in titles:
+        trigram_index.add(title)
+    print(f"{'TrigramIndex build':<24} {len(titles):>9} titles  {time.perf_counter() - start:>9.2f} s")
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        trigram_index.find_similar(query, DEFAULT_SIMILAR_TITLES_LIMIT)
+        latencies.append(time.perf_counter() - start)
+    report("TrigramIndex lookup", len(titles), latencies)
+
+
+def measure_postgres(database_url, titles, queries):
+    engine = create_engine(database_url)
+    benchmark_table = Table("trigram_benchmark", MetaData(), Column("title", String), prefixes=["TEMPORARY"])
+    with Session(engine) as session:
+        session.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        benchmark_table.create(session.connection())
+        for start in range(0, len(titles), INSERT_BATCH):
+            session.execute(
+                insert(benchmark_table), [{"title": title} for title in titles[start:start + INSERT_BATCH]]
+            )
+        session.execute(text("CREATE INDEX ON trigram_benchmark USING GIN (title gin_trgm_ops)"))
+        session.execute(text("ANALYZE trigram_benchmark"))
+        latencies = []
+        for query in queries:
+            start = time.perf_counter()
+            fetch_similar_titles(benchmark_table.c.title, query, (), DEFAULT_SIMILAR_TITLES_LIMIT, session)
+            latencies.append(time.perf_counter() - start)
+        report("pg_trgm lookup", len(titles), latencies)
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    # Usage: python -m backend.trigram_lookup_benchmark [postgres database url]
+    random_generator = random.Random(42)
+    for size in SIZES:
+        titles = generate_titles(size, random_generator)
+        queries = [make_typo(title, random_generator) for title in random_generator.sample(titles, QUERIES)]
+        measure_in_memory(titles, queries)
+        if len(sys.argv) > 1:
+            measure_postgres(sys.argv[1], titles, queries)
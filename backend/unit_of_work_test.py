@@ -0,0 +1,197 @@
+#Author: Vodohleb04
+from datetime import date
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+from backend.data_layer.sqlite_stand_in import create_sqlite_stand_in_engine
+from backend.data_access_layer.batch_write import WriteOutcome
+from backend.data_access_layer.user_dal.user_dal import SQLAlchemyUserDAL
+from backend.data_access_layer.user_dal.save_user_dto import SaveUserDTO
+from backend.data_access_layer.knowledge_dal.knowledge_dal import SQLAlchemyKnowledgeDAL
+from backend.data_access_layer.knowledge_dal.save_knowledge_dto import SaveKnowledgeDTO
+from backend.service_layer.cache.cache_backend import MISSING
+from backend.service_layer.cache.in_memory_cache_backend import InMemoryCacheBackend
+from backend.service_layer.knowledge_service.cached_knowledge_service import CachedKnowledgeService
+from backend.service_layer.knowledge_service.knowledge_service_impl import KnowledgeServiceImpl
+from backend.service_layer.unit_of_work import UnitOfWork, after_commit, end_read_transaction
+from backend.conftest import create_test_token_signer
+
+
+def knowledge(title, sender_login="user"):
+    return SaveKnowledgeDTO(title, "description", "link", "category", sender_login)
+
+
+@pytest.fixture
+def session_maker():
+    engine = create_sqlite_stand_in_engine()
+    session_maker = sessionmaker(engine, expire_on_commit=False)
+    with session_maker() as session:
+        SQLAlchemyUserDAL().save(SaveUserDTO(False, "user", "user name", "hash", "user@mail.ru", date.today()), session)
+        session.commit()
+    yield session_maker
+    engine.dispose()
+
+
+@pytest.fixture
+def commits(session_maker):
+    commits = []
+    engine = session_maker.kw["bind"]
+
+    def count_commit(connection):
+        commits.append(connection)
+
+    event.listen(engine, "commit", count_commit)
+    yield commits
+    event.remove(engine, "commit", count_commit)
+
+
+@pytest.fixture
+def savepoints(session_maker):
+    savepoints = []
+    engine = session_maker.kw["bind"]
+
+    def count_savepoint(connection, cursor, statement, parameters, context, executemany):
+        if statement.startswith("SAVEPOINT"):
+            savepoints.append(statement)
+
+    event.listen(engine, "before_cursor_execute", count_savepoint)
+    yield savepoints
+    event.remove(engine, "before_cursor_execute", count_savepoint)
+
+
+def titles_in(session_maker):
+    knowledge_dal = SQLAlchemyKnowledgeDAL()
+    with session_maker() as session:
+        return {title for title in ("A", "B", "C") if knowledge_dal.get_by_title(title, session) is not None}
+
+
+def test_service_call_commits_once(session_maker, commits):
+    token_signer = create_test_token_signer()
+    service = KnowledgeServiceImpl(SQLAlchemyKnowledgeDAL(), token_signer)
+    with session_maker() as session:
+        outcomes = service.save_knowledge_many(
+            [knowledge("A"), knowledge("B"), knowledge("C", "ghost")], token_signer.issue("user", False), session
+        )
+        assert outcomes == [WriteOutcome.WRITTEN, WriteOutcome.WRITTEN, WriteOutcome.FORBIDDEN]
+        assert len(commits) == 1
+        service.delete_knowledge_by_title("A", token_signer.issue("user", False), session)
+        assert len(commits) == 2
+    assert titles_in(session_maker) == {"B"}
+
+
+def test_only_transactions_that_have_read_are_ended(session_maker, commits):
+    knowledge_dal = SQLAlchemyKnowledgeDAL()
+    with session_maker() as session:
+        assert knowledge_dal.get_by_title("A", session) is None
+        end_read_transaction(session)
+        assert not session.in_transaction()
+        with UnitOfWork(session):
+            assert knowledge_dal.save(knowledge("A"), session) == WriteOutcome.WRITTEN
+            end_read_transaction(session)
+            assert session.in_transaction()
+        # Writes staged outside of a unit of work are left to their caller as well.
+        assert knowledge_dal.save(knowledge("B"), session) == WriteOutcome.WRITTEN
+        end_read_transaction(session)
+        assert session.in_transaction()
+        session.rollback()
+    assert titles_in(session_maker) == {"A"}
+    assert len(commits) == 1
+
+
+def test_failed_write_keeps_the_staged_ones(session_maker):
+    knowledge_dal = SQLAlchemyKnowledgeDAL()
+    with session_maker() as session:
+        with UnitOfWork(session):
+            assert knowledge_dal.save(knowledge("A"), session) == WriteOutcome.WRITTEN
+            # The foreign key violation rolls back the savepoint of this write only.
+            assert knowledge_dal.save(knowledge("B", "ghost"), session) == WriteOutcome.FAILED
+            assert knowledge_dal.save(knowledge("C"), session) == WriteOutcome.WRITTEN
+    assert titles_in(session_maker) == {"A", "C"}
+
+
+def test_savepoints_only_keep_staged_writes(session_maker, savepoints):
+    knowledge_dal = SQLAlchemyKnowledgeDAL()
+    with session_maker() as session:
+        with UnitOfWork(session):
+            # The read begins the transaction, the first write still has nothing to keep.
+            assert knowledge_dal.get_by_title("A", session) is None
+            assert knowledge_dal.save(knowledge("A"), session) == WriteOutcome.WRITTEN
+            assert savepoints == []
+            assert knowledge_dal.save(knowledge("B"), session) == WriteOutcome.WRITTEN
+            assert len(savepoints) == 1
+        with UnitOfWork(session):
+            assert knowledge_dal.get_by_title("A", session) is not None
+            assert knowledge_dal.save(knowledge("C"), session) == WriteOutcome.WRITTEN
+        assert len(savepoints) == 1
+        with UnitOfWork(session):
+            with UnitOfWork(session):
+                assert knowledge_dal.save(knowledge("D"), session) == WriteOutcome.WRITTEN
+            # The write of the released nested unit of work is kept by the savepoint of the failing one.
+            assert knowledge_dal.save(knowledge("E", "ghost"), session) == WriteOutcome.FAILED
+        assert len(savepoints) == 4
+        assert knowledge_dal.get_by_title("D", session) is not None
+    assert titles_in(session_maker) == {"A", "B", "C"}
+
+
+def test_nested_unit_of_work_is_a_savepoint(session_maker, commits):
+    knowledge_dal = SQLAlchemyKnowledgeDAL()
+    with session_maker() as session:
+        with UnitOfWork(session):
+            knowledge_dal.save(knowledge("A"), session)
+            with pytest.raises(RuntimeError):
+                with UnitOfWork(session):
+                    knowledge_dal.save(knowledge("B"), session)
+                    raise RuntimeError("inner call failed")
+            with UnitOfWork(session):
+                knowledge_dal.save(knowledge("C"), session)
+            assert commits == []
+        assert len(commits) == 1
+    assert titles_in(session_maker) == {"A", "C"}
+
+
+def test_exception_rolls_back_the_whole_unit_of_work(session_maker, commits):
+    knowledge_dal = SQLAlchemyKnowledgeDAL()
+    with session_maker() as session:
+        with pytest.raises(RuntimeError):
+            with UnitOfWork(session):
+                knowledge_dal.save(knowledge("A"), session)
+                with UnitOfWork(session):
+                    knowledge_dal.save(knowledge("B"), session)
+                raise RuntimeError("call failed")
+    assert commits == []
+    assert titles_in(session_maker) == set()
+
+
+def test_after_commit_callbacks_wait_for_the_outer_commit(session_maker):
+    calls = []
+    with session_maker() as session:
+        after_commit(session, lambda: calls.append("outside"))
+        assert calls == ["outside"]
+        with UnitOfWork(session):
+            with UnitOfWork(session):
+                after_commit(session, lambda: calls.append("nested"))
+            with pytest.raises(RuntimeError):
+                with UnitOfWork(session):
+                    after_commit(session, lambda: calls.append("rolled back"))
+                    raise RuntimeError("inner call failed")
+            assert calls == ["outside"]
+        assert calls == ["outside", "nested"]
+        with pytest.raises(RuntimeError):
+            with UnitOfWork(session):
+                after_commit(session, lambda: calls.append("rolled back"))
+                raise RuntimeError("call failed")
+    assert calls == ["outside", "nested"]
+
+
+def test_cache_is_invalidated_after_the_outer_commit(session_maker):
+    cache = InMemoryCacheBackend(ttl_seconds=60, max_entries=100)
+    token_signer = create_test_token_signer()
+    service = CachedKnowledgeService(KnowledgeServiceImpl(SQLAlchemyKnowledgeDAL(), token_signer), cache)
+    with session_maker() as session:
+        assert service.get_knowledge_by_title("A", session) is None
+        with UnitOfWork(session):
+            service.save_knowledge(knowledge("A"), token_signer.issue("user", False), session)
+            # Other sessions do not see the row yet, the cached miss stays valid until the commit.
+            assert cache.get("knowledge:title:A") is None
+        assert cache.get("knowledge:title:A") is MISSING
+        assert service.get_knowledge_by_title("A", session).title == "A"
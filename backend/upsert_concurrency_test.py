@@ -0,0 +1,200 @@
+#Author: Vodohleb04
+import random
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from threading import Barrier
+import pytest
+from backend.data_layer.mapped_database import KnowledgeStatus
+from backend.data_access_layer.batch_write import WriteOutcome
+from backend.data_access_layer.user_dal.user_dal import SQLAlchemyUserDAL
+from backend.data_access_layer.user_dal.save_user_dto import SaveUserDTO
+from backend.data_access_layer.user_dal.patch_user_dto import PatchUserDTO
+from backend.data_access_layer.knowledge_dal.knowledge_dal import SQLAlchemyKnowledgeDAL
+from backend.data_access_layer.knowledge_dal.save_knowledge_dto import SaveKnowledgeDTO
+from backend.data_access_layer.knowledge_dal.patch_knowledge_dto import PatchKnowledgeDTO
+from backend.data_access_layer.discussion_dal.discussion_dal import SQLAlchemyDiscussionDAL
+from backend.data_access_layer.discussion_dal.save_discussion_dto import SaveDiscussionDTO
+from backend.data_access_layer.discussion_dal.patch_discussion_dto import PatchDiscussionDTO
+from backend.service_layer.unit_of_work import UnitOfWork
+
+WORKERS = 8
+TITLES = [f"Title {number}" for number in range(10)]
+
+
+@pytest.fixture
+def session_maker(empty_session_maker):
+    # The writers start from empty tables.
+    return empty_session_maker
+
+
+def hammer(session_maker, write):
+    barrier = Barrier(WORKERS)
+
+    def work(worker):
+        titles = random.Random(worker).sample(TITLES, len(TITLES))
+        outcomes = []
+        with session_maker() as session:
+            barrier.wait()
+            for title in titles:
+                # Every write is a service call of its own, committed by its unit of work.
+                with UnitOfWork(session):
+                    outcomes.append((title, write(title, worker, session)))
+        return outcomes
+
+    with ThreadPoolExecutor(WORKERS) as executor:
+        return [outcome for outcomes in executor.map(work, range(WORKERS)) for outcome in outcomes]
+
+
+def assert_one_winner_per_title(outcomes, loser_outcome):
+    assert Counter(outcome for title, outcome in outcomes) == {
+        WriteOutcome.WRITTEN: len(TITLES), loser_outcome: len(TITLES) * (WORKERS - 1)
+    }
+    assert {title for title, outcome in outcomes if outcome == WriteOutcome.WRITTEN} == set(TITLES)
+
+
+def test_same_users_registered_concurrently(session_maker):
+    outcomes = hammer(
+        session_maker,
+        lambda login, worker, session: SQLAlchemyUserDAL().save(
+            SaveUserDTO(worker % 2 == 0, login, f"{login} of {worker}", "hash", "mail@mail.ru", date.today()), session
+        )
+    )
+    assert_one_winner_per_title(outcomes, WriteOutcome.ALREADY_EXISTS)
+
+
+def test_same_titles_saved_and_published_concurrently(session_maker):
+    with session_maker() as session:
+        SQLAlchemyUserDAL().save(SaveUserDTO(False, "user", "user name", "hash", "user@mail.ru", date.today()), session)
+        session.commit()
+    knowledge_dal, discussion_dal = SQLAlchemyKnowledgeDAL(), SQLAlchemyDiscussionDAL()
+
+    outcomes = hammer(
+        session_maker,
+        lambda title, worker, session: knowledge_dal.save(
+            SaveKnowledgeDTO(title, "description", "link", f"category {worker}", "user"), session
+        )
+    )
+    assert_one_winner_per_title(outcomes, WriteOutcome.ALREADY_EXISTS)
+
+    outcomes = hammer(
+        session_maker,
+        lambda title, worker, session: discussion_dal.save(
+            SaveDiscussionDTO(title, "description", "category", "user"), session
+        )
+    )
+    assert_one_winner_per_title(outcomes, WriteOutcome.ALREADY_EXISTS)
+
+    outcomes = hammer(session_maker, lambda title, worker, session: knowledge_dal.accept_publishing(title, session))
+    assert_one_winner_per_title(outcomes, WriteOutcome.UNCHANGED)
+
+    with session_maker() as session:
+        published_counts = knowledge_dal.get_category_counts(session, status=KnowledgeStatus.PUBLISHED)
+        assert sum(count for category, count in published_counts) == len(TITLES)
+        assert knowledge_dal.get_category_counts(session, status=KnowledgeStatus.IN_PROCESSING) == []
+        assert discussion_dal.get_category_counts(session) == [("category", len(TITLES))]
+
+
+def test_renames_to_the_same_title_concurrently(session_maker):
+    # Every worker has a row of its own per title and renames it to the bare title, one rename per title wins.
+    user_dal, knowledge_dal, discussion_dal = SQLAlchemyUserDAL(), SQLAlchemyKnowledgeDAL(), SQLAlchemyDiscussionDAL()
+    with session_maker() as session:
+        user_dal.save_many(
+            [
+                SaveUserDTO(False, f"{title} of {worker}", f"{title} of {worker}", "hash", "mail@mail.ru", date.today())
+                for title in TITLES for worker in range(WORKERS)
+            ],
+            session
+        )
+        knowledge_dal.save_many(
+            [
+                SaveKnowledgeDTO(f"{title} of {worker}", "description", "link", "category", f"{title} of {worker}")
+                for title in TITLES for worker in range(WORKERS)
+            ],
+            session
+        )
+        discussion_dal.save_many(
+            [
+                SaveDiscussionDTO(f"{title} of {worker}", "description", "category", f"{title} of {worker}")
+                for title in TITLES for worker in range(WORKERS)
+            ],
+            session
+        )
+        session.commit()
+
+    outcomes = hammer(
+        session_maker,
+        lambda title, worker, session: user_dal.patch(PatchUserDTO(f"{title} of {worker}", username=title), session)
+    )
+    assert_one_winner_per_title(outcomes, WriteOutcome.ALREADY_EXISTS)
+
+    outcomes = hammer(
+        session_maker,
+        lambda title, worker, session: knowledge_dal.patch(
+            PatchKnowledgeDTO(f"{title} of {worker}", new_title=title), session
+        )
+    )
+    assert_one_winner_per_title(outcomes, WriteOutcome.ALREADY_EXISTS)
+
+    if session_maker.kw["bind"].dialect.name == "sqlite":
+        # SQLite answers "database is locked" to a transaction that reads before it writes while another one writes.
+        return
+    # The batch path: the category change makes the catalog read the replaced category under a lock.
+    outcomes = hammer(
+        session_maker,
+        lambda title, worker, session: discussion_dal.patch(
+            PatchDiscussionDTO(f"{title} of {worker}", new_title=title, category=f"category {worker}"), session
+        )
+    )
+    assert_one_winner_per_title(outcomes, WriteOutcome.ALREADY_EXISTS)
+    with session_maker() as session:
+        category_counts = dict(discussion_dal.get_category_counts(session))
+        assert sum(category_counts.values()) == len(TITLES) * WORKERS
+        assert category_counts["category"] == len(TITLES) * (WORKERS - 1)
+
+
+def test_one_rename_to_a_taken_title_does_not_fail_the_batch(session_maker):
+    user_dal, knowledge_dal, discussion_dal = SQLAlchemyUserDAL(), SQLAlchemyKnowledgeDAL(), SQLAlchemyDiscussionDAL()
+    with session_maker() as session:
+        user_dal.save_many(
+            [SaveUserDTO(False, title, title, "hash", "mail@mail.ru", date.today()) for title in TITLES[:5]], session
+        )
+        knowledge_dal.save_many(
+            [SaveKnowledgeDTO(title, "description", "link", "category", "Title 0") for title in TITLES[:5]], session
+        )
+        discussion_dal.save_many(
+            [SaveDiscussionDTO(title, "description", "category", "Title 0") for title in TITLES[:5]], session
+        )
+        session.commit()
+
+    # Taken by another row, renamed to itself, free, claimed by an earlier rename of the batch, not renamed.
+    renames = [
+        ("Title 0", "Title 1"), ("Title 1", "Title 1"), ("Title 2", "Free"), ("Title 3", "Free"), ("Title 4", None)
+    ]
+    expected = [
+        WriteOutcome.ALREADY_EXISTS, WriteOutcome.WRITTEN, WriteOutcome.WRITTEN, WriteOutcome.ALREADY_EXISTS,
+        WriteOutcome.WRITTEN
+    ]
+    with session_maker() as session:
+        assert knowledge_dal.patch_many(
+            [PatchKnowledgeDTO(old, new_title=new, description="patched") for old, new in renames], session
+        ) == expected
+        assert discussion_dal.patch_many(
+            [PatchDiscussionDTO(old, new_title=new, category="patched") for old, new in renames], session
+        ) == expected
+        assert user_dal.patch_many(
+            [PatchUserDTO(old, username=new, stack="patched") for old, new in renames], session
+        ) == expected
+        assert user_dal.patch(PatchUserDTO("Title 1", username="Free"), session) == WriteOutcome.ALREADY_EXISTS
+        assert knowledge_dal.patch(PatchKnowledgeDTO("Title 1", new_title="Free"), session) == (
+            WriteOutcome.ALREADY_EXISTS
+        )
+        session.commit()
+
+    with session_maker() as session:
+        assert sorted(knowledge.title for knowledge in knowledge_dal.get_by_category("category", session).items) == [
+            "Free", "Title 0", "Title 1", "Title 3", "Title 4"
+        ]
+        assert user_dal.get_by_login("Title 2", session).username == "Free"
+        assert user_dal.get_by_login("Title 0", session).username == "Title 0"
+        assert dict(discussion_dal.get_category_counts(session)) == {"category": 2, "patched": 3}
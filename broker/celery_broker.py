@@ -1,17 +1,59 @@
 #Author: Vodohleb04
+import logging
+import os
 from celery import Celery
+from kombu import Queue
+from celery.signals import worker_process_init, worker_process_shutdown, task_prerun
+from backend.data_layer.engine_registry import engine_registry
+from backend.data_layer.replica_routing import PRIMARY_READS_HEADER, set_primary_reads
+from backend.service_layer.cache.cache_settings import cache_backend
+from broker.message_codec import SERIALIZER_NAME, register_message_codec
+from broker.task_routing import QUEUES, READ_QUEUE, TASK_ROUTES, PRIORITY_STEPS
 
+logger = logging.getLogger(__name__)
 
+
+# Pickle is not accepted any more: a message from the broker can not run arbitrary code in a worker or the web app.
+register_message_codec()
 CELERY_SETTINGS = {
-    'CELERY_TASK_SERIALIZER': 'pickle',
-    'CELERY_RESULT_SERIALIZER': 'pickle',
-    'CELERY_ACCEPT_CONTENT': ['pickle', 'json'],
+    'CELERY_TASK_SERIALIZER': SERIALIZER_NAME,
+    'CELERY_RESULT_SERIALIZER': SERIALIZER_NAME,
+    'CELERY_ACCEPT_CONTENT': [SERIALIZER_NAME, 'json'],
+    # A worker started without -Q consumes every queue, see broker/worker_launcher.py for one pool per queue.
+    'CELERY_QUEUES': [Queue(queue, routing_key=queue) for queue in QUEUES],
+    'CELERY_DEFAULT_QUEUE': READ_QUEUE,
+    'CELERY_ROUTES': TASK_ROUTES,
+    'BROKER_TRANSPORT_OPTIONS': {
+        'priority_steps': PRIORITY_STEPS, 'sep': ':', 'queue_order_strategy': 'priority'
+    },
 }
 
 
-broker_app = Celery('broker', broker='redis://localhost:6379', backend='redis://localhost:6379')
+broker_app = Celery(
+    'broker',
+    broker=os.environ.get('OMIS_BROKER_URL', 'redis://localhost:6379'),
+    backend=os.environ.get('OMIS_RESULT_BACKEND_URL', 'redis://localhost:6379')
+)
 broker_app.conf.update(CELERY_SETTINGS)
 
 
+@worker_process_init.connect
+def dispose_inherited_connections(**kwargs):
+    # Connections opened by the parent before the prefork fork must not be shared by the children.
+    engine_registry.dispose(close=False)
+
+
+@task_prerun.connect
+def route_reads_of_recent_writers(task=None, **kwargs):
+    # The web process sets the header for a user who has just written, see frontend/task_gateway.py.
+    set_primary_reads(bool(task.request.get(PRIMARY_READS_HEADER)))
+
+
+@worker_process_shutdown.connect
+def log_statistics(**kwargs):
+    logger.info(f"Database pool statistics: {engine_registry.pool_statistics()}")
+    logger.info(f"Service cache statistics: {cache_backend.statistics()}")
+
+
 if __name__ == '__main__':
     broker_app.start()
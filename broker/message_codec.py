@@ -0,0 +1,145 @@
+#Author: Vodohleb04
+from dataclasses import dataclass, field, fields
+from datetime import date, datetime
+from typing import Any, Callable, Dict, List
+import msgpack
+from backend.data_layer.mapped_database import KnowledgeStatus
+from backend.data_access_layer.batch_write import WriteOutcome
+from backend.data_access_layer.page import Page
+from backend.data_access_layer.user_dal.save_user_dto import SaveUserDTO
+from backend.data_access_layer.user_dal.patch_user_dto import PatchUserDTO
+from backend.data_access_layer.user_dal.login_user_dto import LoginUserDTO
+from backend.data_access_layer.knowledge_dal.save_knowledge_dto import SaveKnowledgeDTO
+from backend.data_access_layer.knowledge_dal.patch_knowledge_dto import PatchKnowledgeDTO
+from backend.data_access_layer.discussion_dal.save_discussion_dto import SaveDiscussionDTO
+from backend.data_access_layer.discussion_dal.patch_discussion_dto import PatchDiscussionDTO
+from backend.data_access_layer.comment_dal.save_comment_dto import SaveCommentDTO
+from backend.data_access_layer.comment_dal.patch_comment_dto import PatchCommentDTO
+from backend.service_layer.authentication_service.authorization_token import AuthorizationToken
+from backend.service_layer.read_model.category_count_view import CategoryCountView
+from backend.service_layer.read_model.comment_view import CommentView, CommentSummaryView
+from backend.service_layer.read_model.discussion_view import DiscussionView, DiscussionSummaryView
+from backend.service_layer.read_model.knowledge_view import KnowledgeView, KnowledgeSummaryView
+from backend.service_layer.read_model.user_view import UserView
+
+SERIALIZER_NAME = "omis-msgpack"
+CONTENT_TYPE = "application/x-omis-msgpack"
+# Every message starts with the schema version. It is bumped when a type code is reused or the fields of a codec
+# change, so a worker of another release rejects the message instead of building objects from misplaced fields.
+SCHEMA_VERSION = 2
+
+
+class MessageSchemaError(ValueError):
+    pass
+
+
+@dataclass(frozen=True, slots=True)
+class TypeCodec:
+    code: int
+    type: type
+    encode: Callable[[Any], List]
+    decode: Callable[[List], Any]
+    marker: msgpack.ExtType = field(init=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, "marker", msgpack.ExtType(self.code, b""))
+
+
+def _fields_codec(code: int, cls: type, field_names) -> TypeCodec:
+    # Fields travel positionally in the order of the constructor parameters, their names are not sent.
+    return TypeCodec(
+        code, cls, lambda value: [getattr(value, name) for name in field_names], lambda values: cls(*values)
+    )
+
+
+def _dataclass_codec(code: int, cls: type) -> TypeCodec:
+    return _fields_codec(code, cls, [field.name for field in fields(cls)])
+
+
+def _value_codec(code: int, cls: type, to_value: Callable, from_value: Callable) -> TypeCodec:
+    return TypeCodec(code, cls, lambda value: [to_value(value)], lambda values: from_value(values[0]))
+
+
+CODECS = (
+    TypeCodec(1, tuple, list, tuple),
+    _value_codec(2, date, date.isoformat, date.fromisoformat),
+    _value_codec(3, datetime, datetime.isoformat, datetime.fromisoformat),
+    _value_codec(4, KnowledgeStatus, lambda member: member.value, KnowledgeStatus),
+    _value_codec(5, WriteOutcome, lambda member: member.value, WriteOutcome),
+    _dataclass_codec(6, Page),
+    TypeCodec(
+        10, AuthorizationToken,
+        lambda token: list(token.to_json().values()), lambda values: AuthorizationToken(*values)
+    ),
+    _fields_codec(11, LoginUserDTO, ("login", "hashed_password")),
+    _fields_codec(
+        12, SaveUserDTO, ("is_admin", "login", "username", "hashed_password", "email", "birthdate", "stack")
+    ),
+    _fields_codec(13, PatchUserDTO, ("login", "username", "new_hashed_password", "email", "birthdate", "stack")),
+    _fields_codec(14, SaveKnowledgeDTO, ("title", "description", "link", "category", "sender_login")),
+    _fields_codec(
+        15, PatchKnowledgeDTO, ("old_title", "status", "new_title", "description", "link", "category")
+    ),
+    _fields_codec(16, SaveDiscussionDTO, ("title", "description", "category", "sender_login")),
+    _fields_codec(
+        17, PatchDiscussionDTO, ("old_title", "new_title", "description", "category", "sender_login")
+    ),
+    _fields_codec(18, SaveCommentDTO, ("description", "sender_login", "discussion_title")),
+    _fields_codec(19, PatchCommentDTO, ("id", "description")),
+    _dataclass_codec(30, UserView),
+    _dataclass_codec(31, CategoryCountView),
+    _dataclass_codec(32, KnowledgeView),
+    _dataclass_codec(33, KnowledgeSummaryView),
+    _dataclass_codec(34, DiscussionView),
+    _dataclass_codec(35, DiscussionSummaryView),
+    _dataclass_codec(36, CommentView),
+    _dataclass_codec(37, CommentSummaryView)
+)
+CODECS_BY_TYPE: Dict[type, TypeCodec] = {codec.type: codec for codec in CODECS}
+CODECS_BY_CODE: Dict[int, TypeCodec] = {codec.code: codec for codec in CODECS}
+
+
+# A typed value is sent as an array that starts with the empty ext marker of its codec, followed by its fields.
+# The fields are packed by the same packer and rebuilt by the unpacker before the array holding them, so the whole
+# message is written and read in one pass without packing every object separately.
+def _to_marked_list(value) -> List:
+    codec = CODECS_BY_TYPE.get(type(value))
+    if codec is None:
+        raise TypeError(f"{type(value).__name__} has no message codec")
+    return [codec.marker, *codec.encode(value)]
+
+
+def _codec_for_marker(code: int, data: bytes) -> TypeCodec:
+    codec = CODECS_BY_CODE.get(code)
+    if codec is None:
+        raise MessageSchemaError(f"Unknown message type code {code}")
+    return codec
+
+
+def _from_marked_list(items: List):
+    if items and type(items[0]) is TypeCodec:
+        return items[0].decode(items[1:])
+    return items
+
+
+def encode_message(body) -> bytes:
+    # strict_types hands tuples and datetimes (a date subclass) to the codecs instead of packing them as their base.
+    # The body is nested as bytes, so the version is checked before any of its type codes are interpreted.
+    packed_body = msgpack.packb(body, default=_to_marked_list, strict_types=True, use_bin_type=True)
+    return msgpack.packb([SCHEMA_VERSION, packed_body], use_bin_type=True)
+
+
+def decode_message(data: bytes):
+    if isinstance(data, str):
+        data = data.encode("latin-1")
+    version, packed_body = msgpack.unpackb(data, raw=False)
+    if version != SCHEMA_VERSION:
+        raise MessageSchemaError(f"Message schema {version} is not supported, expected {SCHEMA_VERSION}")
+    return msgpack.unpackb(
+        packed_body, ext_hook=_codec_for_marker, list_hook=_from_marked_list, raw=False, strict_map_key=False
+    )
+
+
+def register_message_codec() -> None:
+    from kombu.serialization import register
+    register(SERIALIZER_NAME, encode_message, decode_message, content_type=CONTENT_TYPE, content_encoding="binary")
@@ -0,0 +1,69 @@
+#Author: Vodohleb04
+import pickle
+import timeit
+from dataclasses import fields, is_dataclass
+from enum import Enum
+from kombu.utils.json import dumps as json_dumps, loads as json_loads
+from sqlalchemy.orm import sessionmaker
+from backend.data_layer.sqlite_stand_in import create_sqlite_stand_in_engine
+from backend.data_access_layer.comment_dal.comment_dal import SQLAlchemyCommentDAL
+from backend.data_access_layer.discussion_dal.discussion_dal import SQLAlchemyDiscussionDAL
+from backend.data_access_layer.knowledge_dal.knowledge_dal import SQLAlchemyKnowledgeDAL
+from backend.service_layer.authentication_service.authorization_token import AuthorizationToken
+from backend.service_layer.discussion_service.discussion_service_impl import DiscussionServiceImpl
+from backend.service_layer.knowledge_service.knowledge_service_impl import KnowledgeServiceImpl
+from backend.read_model_benchmark import fill_database
+from backend.rebuild_category_catalog import rebuild_category_catalog
+from broker.message_codec import encode_message, decode_message
+
+ROUND_TRIPS = 200
+
+
+def to_plain(value):
+    # What the json serializer could carry: the same data as plain dicts, without the types to rebuild.
+    if is_dataclass(value):
+        return {field.name: to_plain(getattr(value, field.name)) for field in fields(value)}
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, dict):
+        return {key: to_plain(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_plain(item) for item in value]
+    if isinstance(value, AuthorizationToken):
+        return value.to_json()
+    return value
+
+
+def report(name, payload):
+    plain = to_plain(payload)
+    serializers = (
+        ("pickle", pickle.dumps, pickle.loads, payload),
+        ("json", json_dumps, json_loads, plain),
+        ("omis-msgpack", encode_message, decode_message, payload)
+    )
+    for serializer, dumps, loads, value in serializers:
+        dumped = dumps(value)
+        encode_seconds = timeit.timeit(lambda: dumps(value), number=ROUND_TRIPS) / ROUND_TRIPS
+        decode_seconds = timeit.timeit(lambda: loads(dumped), number=ROUND_TRIPS) / ROUND_TRIPS
+        print(
+            f"{name:<32} {serializer:<14} {len(dumped):>10} bytes {encode_seconds * 1e6:>10.1f} us encode "
+            f"{decode_seconds * 1e6:>10.1f} us decode"
+        )
+
+
+if __name__ == "__main__":
+    engine = create_sqlite_stand_in_engine()
+    session_maker = sessionmaker(engine, expire_on_commit=False)
+    with session_maker() as session:
+        fill_database(session)
+    rebuild_category_catalog(session_maker)
+
+    knowledge_service = KnowledgeServiceImpl(SQLAlchemyKnowledgeDAL())
+    discussion_service = DiscussionServiceImpl(SQLAlchemyDiscussionDAL(), SQLAlchemyCommentDAL())
+    with session_maker() as session:
+        report("Knowledge page", knowledge_service.get_knowledge_by_category("category 0", session))
+        report("Discussion summary page", discussion_service.get_discussions_by_category("category 0", session))
+        report("DiscussionView", discussion_service.get_discussion_by_title("discussion user_0 0", session))
+        report("Category counts", discussion_service.get_discussion_category_counts(session))
+        token = AuthorizationToken("user_0", False, 1714566600, "0" * 22, "0" * 64)
+        report("Task arguments", (("category 0",), {"token": token}, {}))
@@ -0,0 +1,65 @@
+#Author: Vodohleb04
+from typing import Dict, Tuple
+
+AUTHENTICATION_QUEUE = "omis.auth"
+READ_QUEUE = "omis.read"
+WRITE_QUEUE = "omis.write"
+BULK_QUEUE = "omis.bulk"
+QUEUES = (AUTHENTICATION_QUEUE, READ_QUEUE, WRITE_QUEUE, BULK_QUEUE)
+
+# The redis transport serves lower numbers first.
+INTERACTIVE_PRIORITY = 0
+BULK_PRIORITY = 9
+PRIORITY_STEPS = list(range(INTERACTIVE_PRIORITY, BULK_PRIORITY + 1))
+
+
+def _task_names(module: str, *task_names: str) -> Tuple[str, ...]:
+    return tuple(f"broker.{module}.{task_name}" for task_name in task_names)
+
+
+QUEUE_TASKS: Dict[str, Tuple[str, ...]] = {
+    AUTHENTICATION_QUEUE: _task_names(
+        "authentication_tasks", "login_task", "register_task", "logout_task", "get_user_by_login_task"
+    ),
+    READ_QUEUE: _task_names(
+        "knowledge_tasks",
+        "get_knowledge_categories_task", "get_knowledge_category_counts_task", "get_knowledge_by_title_task",
+        "get_knowledge_by_category_task", "get_knowledge_by_category_list_task", "search_knowledge_task",
+        "find_similar_knowledge_titles_task", "get_published_knowledge_task", "get_in_processing_knowledge_task",
+        "list_published_knowledge_titles_task", "list_in_processing_knowledge_titles_task"
+    ) + _task_names(
+        "discussion_tasks",
+        "get_discussion_categories_task", "get_discussion_category_counts_task", "get_all_discussions_task",
+        "get_discussion_by_title_task", "get_discussion_comments_task", "get_discussions_by_category_task",
+        "get_discussions_by_category_list_task", "search_discussions_task", "find_similar_discussion_titles_task",
+        "get_comment_by_id_task", "list_discussion_titles_task"
+    ),
+    WRITE_QUEUE: _task_names(
+        "knowledge_tasks", "save_knowledge_task", "accept_knowledge_publishing_task"
+    ) + _task_names(
+        "discussion_tasks", "save_discussion_task", "save_comment_task"
+    ),
+    # Batches and admin deletes, a delete cascades to comments and category counters and may run long.
+    BULK_QUEUE: _task_names(
+        "authentication_tasks", "register_many_task"
+    ) + _task_names(
+        "knowledge_tasks",
+        "save_knowledge_many_task", "patch_knowledge_many_task", "accept_knowledge_publishing_many_task",
+        "delete_knowledge_by_title_task"
+    ) + _task_names(
+        "discussion_tasks",
+        "save_discussion_many_task", "patch_discussion_many_task", "delete_discussion_by_title_task",
+        "save_comment_many_task", "delete_comment_by_id_task"
+    )
+}
+
+
+def queue_priority(queue: str) -> int:
+    return BULK_PRIORITY if queue == BULK_QUEUE else INTERACTIVE_PRIORITY
+
+
+# Celery applies the priority of the route to every message sent by delay, callers do not pass it.
+TASK_ROUTES = {
+    task_name: {"queue": queue, "routing_key": queue, "priority": queue_priority(queue)}
+    for queue, task_names in QUEUE_TASKS.items() for task_name in task_names
+}
@@ -0,0 +1,95 @@
+#Author: Vodohleb04
+import os
+import signal
+import subprocess
+import sys
+from dataclasses import dataclass
+from typing import Dict, List, Sequence, Tuple
+from broker.task_routing import QUEUES, AUTHENTICATION_QUEUE, READ_QUEUE, WRITE_QUEUE, BULK_QUEUE
+
+
+@dataclass(frozen=True, slots=True)
+class QueueWorkerSettings:
+    queues: Tuple[str, ...]
+    concurrency: int
+    prefetch_multiplier: int
+    pool: str = "prefork"
+
+    @property
+    def name(self) -> str:
+        return "-".join(queue.rsplit(".", 1)[-1] for queue in self.queues)
+
+    @classmethod
+    def from_environment(cls, queue: str, environment=os.environ) -> "QueueWorkerSettings":
+        defaults = DEFAULT_QUEUE_WORKER_SETTINGS[queue]
+        prefix = f"OMIS_WORKER_{defaults.name.upper()}"
+        return cls(
+            queues=defaults.queues,
+            concurrency=int(environment.get(f"{prefix}_CONCURRENCY", defaults.concurrency)),
+            prefetch_multiplier=int(environment.get(f"{prefix}_PREFETCH", defaults.prefetch_multiplier)),
+            pool=environment.get(f"{prefix}_POOL", defaults.pool)
+        )
+
+
+# Logins and single writes are short, prefetching one message per process keeps a slow one from holding them.
+# Login threads mostly wait for the database and for the password hashing pool, which bounds the CPU they take.
+# Reads are many and short. Bulk jobs run one at a time so they never take all database connections.
+DEFAULT_QUEUE_WORKER_SETTINGS: Dict[str, QueueWorkerSettings] = {
+    AUTHENTICATION_QUEUE: QueueWorkerSettings(
+        (AUTHENTICATION_QUEUE,), concurrency=8, prefetch_multiplier=1, pool="threads"
+    ),
+    READ_QUEUE: QueueWorkerSettings((READ_QUEUE,), concurrency=8, prefetch_multiplier=4),
+    WRITE_QUEUE: QueueWorkerSettings((WRITE_QUEUE,), concurrency=2, prefetch_multiplier=1),
+    BULK_QUEUE: QueueWorkerSettings((BULK_QUEUE,), concurrency=1, prefetch_multiplier=1)
+}
+
+
+def worker_command(settings: QueueWorkerSettings, log_level: str = "INFO") -> List[str]:
+    return [
+        sys.executable, "-m", "celery", "-A", "broker", "worker",
+        "--queues", ",".join(settings.queues),
+        "--hostname", f"{settings.name}@%h",
+        "--concurrency", str(settings.concurrency),
+        "--prefetch-multiplier", str(settings.prefetch_multiplier),
+        "--pool", settings.pool,
+        "--loglevel", log_level
+    ]
+
+
+def start_workers(settings_list: Sequence[QueueWorkerSettings], log_level: str = "INFO") -> List[subprocess.Popen]:
+    return [subprocess.Popen(worker_command(settings, log_level)) for settings in settings_list]
+
+
+def stop_workers(workers: Sequence[subprocess.Popen], timeout: float = 30) -> None:
+    # SIGTERM is the warm shutdown of celery, the tasks being executed are finished first.
+    for worker in workers:
+        if worker.poll() is None:
+            worker.terminate()
+    for worker in workers:
+        try:
+            worker.wait(timeout)
+        except subprocess.TimeoutExpired:
+            worker.kill()
+
+
+def run(queues: Sequence[str]) -> int:
+    workers = start_workers([QueueWorkerSettings.from_environment(queue) for queue in queues])
+
+    def forward_shutdown(signal_number, frame):
+        stop_workers(workers)
+        sys.exit(0)
+
+    signal.signal(signal.SIGTERM, forward_shutdown)
+    signal.signal(signal.SIGINT, forward_shutdown)
+    # One worker leaving stops the others: a supervisor restarts the launcher with the whole pool mix.
+    exit_code = os.wait()[1]
+    stop_workers(workers)
+    return os.waitstatus_to_exitcode(exit_code)
+
+
+if __name__ == "__main__":
+    # Usage: python -m broker.worker_launcher [queue ...], all queues by default.
+    unknown_queues = set(sys.argv[1:]) - set(QUEUES)
+    if unknown_queues:
+        sys.exit(f"Unknown queues {', '.join(sorted(unknown_queues))}, expected some of {', '.join(QUEUES)}")
+    sys.exit(run(sys.argv[1:] or QUEUES))
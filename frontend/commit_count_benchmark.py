@@ -0,0 +1,127 @@
+#Author: Vodohleb04
+import os
+import statistics
+import sys
+import time
+from datetime import date
+from hashlib import sha256
+
+REPETITIONS = 50
+BATCH_SIZE = 20
+
+
+def report(request, commits, statements, latencies):
+    latencies = sorted(latencies)
+    print(
+        f"{request:<28} {commits / len(latencies):>6.2f} commits  {statements / len(latencies):>6.2f} statements  "
+        f"p50 {statistics.median(latencies) * 1e3:>7.2f} ms  p95 {latencies[int(len(latencies) * 0.95)] * 1e3:>7.2f} ms"
+    )
+
+
+class StatementCounter:
+    # Counts COMMITs and all statements sent through the engine of the tasks, savepoints included.
+
+    def __init__(self, engine):
+        from sqlalchemy import event
+        self.commits = 0
+        self.statements = 0
+        event.listen(engine, "commit", self.count_commit)
+        event.listen(engine, "before_cursor_execute", self.count_statement)
+
+    def count_commit(self, connection):
+        self.commits += 1
+
+    def count_statement(self, connection, cursor, statement, parameters, context, executemany):
+        self.statements += 1
+
+
+def measure(counter, request, calls):
+    commits, statements, latencies = counter.commits, counter.statements, []
+    for call in calls:
+        start = time.perf_counter()
+        call()
+        latencies.append(time.perf_counter() - start)
+    report(request, counter.commits - commits, counter.statements - statements, latencies)
+
+
+def run():
+    from sqlalchemy import text
+    from backend.data_layer.engine_registry import engine_registry
+    from backend.data_layer.mapped_database import Base
+    from backend.data_access_layer.user_dal.save_user_dto import SaveUserDTO
+    from backend.data_access_layer.user_dal.login_user_dto import LoginUserDTO
+    from backend.data_access_layer.knowledge_dal.save_knowledge_dto import SaveKnowledgeDTO
+    from backend.data_access_layer.discussion_dal.save_discussion_dto import SaveDiscussionDTO
+    from backend.data_access_layer.comment_dal.save_comment_dto import SaveCommentDTO
+    from broker.authentication_tasks import AuthenticationTasks
+    from broker.knowledge_tasks import KnowledgeTasks
+    from broker.discussion_tasks import DiscussionTasks
+    with engine_registry.engine.begin() as connection:
+        connection.execute(text("DROP SCHEMA IF EXISTS omis2 CASCADE"))
+        connection.execute(text("CREATE SCHEMA omis2"))
+    Base.create_from_metadata(engine_registry.engine)
+    counter = StatementCounter(engine_registry.engine)
+    password = sha256(b"password").hexdigest()
+
+    def register(login, is_admin=False):
+        return AuthenticationTasks.register_task(
+            SaveUserDTO(is_admin, login, f"{login} name", password, f"{login}@mail.ru", date(2000, 1, 1))
+        )
+
+    admin_token = register("admin", is_admin=True)
+    token = register("user")
+    logins = [f"user {i}" for i in range(REPETITIONS)]
+    titles = [f"knowledge {i}" for i in range(REPETITIONS)]
+    measure(counter, "register", (lambda login=login: register(login) for login in logins))
+    measure(
+        counter, "login",
+        (lambda login=login: AuthenticationTasks.login_task(LoginUserDTO(login, password)) for login in logins)
+    )
+    measure(counter, "save knowledge", (
+        lambda title=title: KnowledgeTasks.save_knowledge_task(
+            SaveKnowledgeDTO(title, "description", "link", "category", "user"), token
+        ) for title in titles
+    ))
+    measure(counter, "accept knowledge publishing", (
+        lambda title=title: KnowledgeTasks.accept_knowledge_publishing_task(title, admin_token) for title in titles
+    ))
+    measure(counter, "save knowledge batch", (
+        lambda i=i: KnowledgeTasks.save_knowledge_many_task(
+            [SaveKnowledgeDTO(f"batch {i} {j}", "description", "link", "category", "user") for j in range(BATCH_SIZE)],
+            token
+        ) for i in range(REPETITIONS)
+    ))
+    measure(counter, "delete knowledge", (
+        lambda title=title: KnowledgeTasks.delete_knowledge_by_title_task(title, token) for title in titles
+    ))
+    measure(counter, "save discussion", (
+        lambda i=i: DiscussionTasks.save_discussion_task(
+            SaveDiscussionDTO(f"discussion {i}", "description", "category", "user"), token
+        ) for i in range(REPETITIONS)
+    ))
+    measure(counter, "save comment", (
+        lambda i=i: DiscussionTasks.save_comment_task(SaveCommentDTO("comment", "user", f"discussion {i}"), token)
+        for i in range(REPETITIONS)
+    ))
+    measure(counter, "delete discussion", (
+        lambda i=i: DiscussionTasks.delete_discussion_by_title_task(f"discussion {i}", token)
+        for i in range(REPETITIONS)
+    ))
+
+
+if __name__ == "__main__":
+    # Usage: python -m frontend.commit_count_benchmark <scratch postgres database url>
+    # The task bodies run in this process, so every COMMIT of a request is counted on one engine.
+    if len(sys.argv) != 2:
+        sys.exit("Usage: python -m frontend.commit_count_benchmark <scratch postgres database url>")
+    os.environ.update({
+        "OMIS_DATABASE_URL": sys.argv[1],
+        "OMIS_CACHE_BACKEND": "memory",
+        "OMIS_TOKEN_SECRET": "benchmark secret",
+        "OMIS_TOKEN_REVOCATION_BACKEND": "memory",
+        # The key derivation is kept cheap, the benchmark measures the database side of a request.
+        "OMIS_PASSWORD_SCRYPT_N": "16",
+        "OMIS_PASSWORD_SCRYPT_R": "1",
+        "OMIS_PASSWORD_HASH_WORKERS": "0"
+    })
+    run()
@@ -1,32 +1,79 @@
 #Author: Vodohleb04
 import os
+import time
 from datetime import date
 from logging import getLogger
 from hashlib import sha256
-from flask import render_template, request, redirect, Flask, url_for, session
+from flask import render_template, request, redirect, Flask, url_for, session, Response, abort, stream_with_context
 
+from backend.data_layer.engine_registry import engine_registry
+from backend.data_layer.replica_routing import set_primary_reads
+from backend.data_access_layer.catalog_export import (
+    ExportFilter, check_export, export_chunks, EXPORT_CONTENT_TYPES, EXPORT_FILE_EXTENSIONS, NDJSON
+)
 from backend.service_layer.authentication_service.authentication_service_impl import (
     LoginUserDTO, SaveUserDTO, AuthorizationToken
 )
+from backend.service_layer.authentication_service.token_signer import TokenSigner
 from backend.service_layer.discussion_service.discussion_service_impl import SaveCommentDTO, SaveDiscussionDTO
-from backend.service_layer.knowledge_service.knowledge_service_impl import SaveKnowledgeDTO, KnowledgeStatus
+from backend.service_layer.knowledge_service.knowledge_service_impl import (
+    SaveKnowledgeDTO, KnowledgeStatus, WriteOutcome
+)
 
 from broker.authentication_tasks import AuthenticationTasks
 from broker.discussion_tasks import DiscussionTasks
 from broker.knowledge_tasks import KnowledgeTasks
+from frontend.task_gateway import TaskGateway, GatewaySettings, task_call
 
 
 LOGIN_MAXLENGTH = 50
 PASSWORD_MAXLENGTH = 100
 ALL_CATEGORIES_ITEM = "Все категории"
+CATALOG_PAGE_SIZE = 50
+COMMENTS_PAGE_SIZE = 50
 
 
 logger = getLogger(__name__)
 
 
-def create_app():
+def session_secret_key() -> bytes:
+    # The session cookie is signed by this key, every web process behind the balancer needs the same one.
+    secret_key = os.environ.get("OMIS_SESSION_SECRET")
+    if secret_key is None:
+        logger.warning("OMIS_SESSION_SECRET is not set, sessions are accepted only by the process that created them.")
+        return os.urandom(128)
+    return secret_key.encode()
+
+
+def create_app(gateway: TaskGateway = None, export_sessionmaker=None, token_signer: TokenSigner = None):
+    if gateway is None:
+        gateway = TaskGateway(GatewaySettings.from_environment())
+    if token_signer is None:
+        from backend.service_layer.authentication_service.token_settings import token_signer
     app = Flask(__name__)
-    app.config['SECRET_KEY'] = os.urandom(128)
+    app.config['SECRET_KEY'] = session_secret_key()
+
+    @app.before_request
+    def drop_expired_authorization_token():
+        # Services refuse an expired token anyway, the pages stop showing the user as logged in then.
+        token = session.get("authorization_token")
+        # Tokens of sessions created before tokens were signed have no expiration time, they are dropped too.
+        if token is not None and token.get("expires_at", 0) <= time.time():
+            session.pop("authorization_token")
+
+    @app.before_request
+    def read_own_writes_from_primary():
+        # Set for every request, a thread of the web server serves many users one after another.
+        last_write_at = session.get("last_write_at", 0)
+        set_primary_reads(time.time() - last_write_at < gateway.settings.read_your_writes_seconds)
+
+    def write(task, *args, **kwargs):
+        session["last_write_at"] = time.time()
+        return gateway.write(task, *args, **kwargs)
+
+    def log_out():
+        token = session.pop("authorization_token")
+        gateway.write(AuthenticationTasks.logout_task, AuthorizationToken(**token))
 
     # General
     @app.get('/')
@@ -88,7 +135,8 @@ def create_app():
             birthdate, tech_stack, email, username, login, password, password_repeat = registrate_post_form_parser()
         except ValueError:
             return redirect(url_for('render_registration_page'))
-        authentication_token = AuthenticationTasks.register_task.delay(
+        authentication_token = write(
+            AuthenticationTasks.register_task,
             SaveUserDTO(
                 is_admin=False,
                 login=login,
@@ -98,7 +146,7 @@ def create_app():
                 birthdate=birthdate,
                 stack=tech_stack
             )
-        ).get()
+        )
         if authentication_token is None:
             return redirect(url_for('render_registration_page'))
         else:
@@ -122,9 +170,10 @@ def create_app():
         if login is None or password is None:
             return redirect(url_for('render_login_page'))
 
-        authentication_token = AuthenticationTasks.login_task.delay(
-                LoginUserDTO(login=login, hashed_password=sha256(password.encode()).hexdigest())
-        ).get()
+        authentication_token = write(
+            AuthenticationTasks.login_task,
+            LoginUserDTO(login=login, hashed_password=sha256(password.encode()).hexdigest())
+        )
         if authentication_token is None:
             return redirect(url_for('render_login_page'))
         else:
@@ -153,7 +202,7 @@ def create_app():
     def user_main_page_post():
         if session.get("authorization_token"):
             if "exit" in request.form.keys():
-                session.pop("authorization_token")
+                log_out()
                 return redirect(url_for("render_user_main_page"))
         else:
             if "login" in request.form.keys():
@@ -170,30 +219,41 @@ def create_app():
             add_discussion_url=url_for("render_add_discussion_page"),
             form_action_url=url_for("user_discussions_page_post"),
             all_categories_item=ALL_CATEGORIES_ITEM,
-            categories=DiscussionTasks.get_discussion_categories_task.delay().get(),
+            categories=gateway.read(DiscussionTasks.get_discussion_categories_task),
             current_selected_category=ALL_CATEGORIES_ITEM,
             user_authorized=session.get("authorization_token")
         )
 
     def discussion_search():
         not_found_discussion_title = None
+        similar_titles = None
+        next_cursor = None
         category = request.form.get("categories_list")
-        if request.form.get("title").replace(" ", "") == "":
-            if category == ALL_CATEGORIES_ITEM:
-                discussions = [
-                    disc.title for disc in DiscussionTasks.get_all_discussions_task.delay().get()
-                ]
-            else:
-                discussions = [
-                    disc.title for disc in DiscussionTasks.get_discussions_by_category_task.delay(category).get()
-                ]
+        cursor = request.form.get("cursor") or None
+        search_title = request.form.get("title").strip(" ")
+        if search_title == "":
+            # Catalog pages read titles only, search results are summaries.
+            page_call = task_call(
+                DiscussionTasks.list_discussion_titles_task,
+                None if category == ALL_CATEGORIES_ITEM else category, cursor, CATALOG_PAGE_SIZE
+            )
         else:
-            discussion = DiscussionTasks.get_discussion_by_title_task.delay(request.form.get("title").strip(" ")).get()
-            if discussion is None:
-                discussions = None
-                not_found_discussion_title = request.form.get("title").strip(" ")
-            else:
-                discussions = [discussion.title]
+            page_call = task_call(DiscussionTasks.search_discussions_task, search_title, cursor, CATALOG_PAGE_SIZE)
+        try:
+            categories, page = gateway.read_all(task_call(DiscussionTasks.get_discussion_categories_task), page_call)
+        except ValueError as ex:
+            # A tampered or outdated cursor of the form.
+            abort(400, str(ex))
+        if search_title == "":
+            discussions = list(page.items)
+            next_cursor = page.next_cursor
+        elif page.items:
+            discussions = [disc.title for disc in page.items]
+            next_cursor = page.next_cursor
+        else:
+            discussions = None
+            not_found_discussion_title = search_title
+            similar_titles = gateway.read(DiscussionTasks.find_similar_discussion_titles_task, search_title)
 
         return render_template(
             "user/discussions_search_index.html",
@@ -202,10 +262,13 @@ def create_app():
             add_discussion_url=url_for("render_add_discussion_page"),
             form_action_url=url_for("user_discussions_page_post"),
             all_categories_item=ALL_CATEGORIES_ITEM,
-            categories=DiscussionTasks.get_discussion_categories_task.delay().get(),
+            categories=categories,
             current_selected_category=category,
             discussions_titles=discussions,
+            current_search_title=search_title,
+            next_cursor=next_cursor,
             not_found_discussion_title=not_found_discussion_title,
+            similar_titles=similar_titles,
             user_authorized=session.get("authorization_token")
         )
 
@@ -220,7 +283,7 @@ def create_app():
 
         if session.get("authorization_token"):
             if "exit" in request.form.keys():
-                session.pop("authorization_token")
+                log_out()
                 return redirect(url_for("render_main_page"))
         else:
             if "login" in request.form.keys():
@@ -229,15 +292,26 @@ def create_app():
     def parse_comments_to_list(comments):
         return [
             {
-                "sender_username": comment.comment_sender.username,
+                "sender_username": comment.sender_username,
                 "description": comment.description
             } for comment in comments
         ]
 
+    def next_comments_url(discussion_title, next_comments_cursor):
+        if next_comments_cursor is None:
+            return None
+        return url_for(
+            "render_discussion_page", discussion_title=discussion_title, comments_cursor=next_comments_cursor
+        )
+
     @app.get("/user/discussions/<discussion_title>")
     def render_discussion_page(discussion_title):
-        discussion = DiscussionTasks.get_discussion_by_title_task.delay(discussion_title).get()
+        discussion = gateway.read(DiscussionTasks.get_discussion_by_title_task, discussion_title)
         if discussion is None:
+            categories, similar_titles = gateway.read_all(
+                task_call(DiscussionTasks.get_discussion_categories_task),
+                task_call(DiscussionTasks.find_similar_discussion_titles_task, discussion_title)
+            )
             return render_template(
                 "user/discussions_search_index.html",
                 discussions_url=url_for("render_user_discussions_page"),
@@ -245,21 +319,34 @@ def create_app():
                 add_discussion_url=url_for("render_add_discussion_page"),
                 form_action_url=url_for("user_discussions_page_post"),
                 all_categories_item=ALL_CATEGORIES_ITEM,
-                categories=DiscussionTasks.get_discussion_categories_task.delay().get(),
+                categories=categories,
                 current_selected_category=ALL_CATEGORIES_ITEM,
                 not_found_discussion_title=discussion_title,
+                similar_titles=similar_titles,
                 user_authorized=session.get("authorization_token")
             )
         else:
+            comments, next_comments_cursor = discussion.comments, discussion.next_comments_cursor
+            if request.args.get("comments_cursor"):
+                try:
+                    page = gateway.read(
+                        DiscussionTasks.get_discussion_comments_task,
+                        discussion.id, request.args.get("comments_cursor"), COMMENTS_PAGE_SIZE
+                    )
+                except ValueError as ex:
+                    abort(400, str(ex))
+                comments, next_comments_cursor = page.items, page.next_cursor
             return render_template(
                 "user/discussion_opened_index.html",
                 discussions_url=url_for("render_user_discussions_page"),
                 knowledge_url=url_for("render_user_knowledge_catalog_page"),
                 form_action_url=url_for("discussion_page_post", discussion_title=discussion.title),
                 discussion_title=discussion.title,
-                sender_username=discussion.discussion_sender.username,
+                sender_username=discussion.sender_username,
                 discussion_description=discussion.description,
-                comments=parse_comments_to_list(discussion.connected_comments),
+                comments=parse_comments_to_list(comments),
+                comment_count=discussion.comment_count,
+                next_comments_url=next_comments_url(discussion.title, next_comments_cursor),
                 user_authorized=session.get("authorization_token")
             )
 
@@ -267,17 +354,18 @@ def create_app():
     def discussion_page_post(discussion_title):
         if session.get("authorization_token"):
             if "exit" in request.form.keys():
-                session.pop("authorization_token")
+                log_out()
                 return redirect(url_for("render_main_page"))
             elif "add_comment" in request.form.keys():
-                DiscussionTasks.save_comment_task.delay(
+                write(
+                    DiscussionTasks.save_comment_task,
                     SaveCommentDTO(
                         description=request.form.get("comment_description"),
                         sender_login=session.get("authorization_token").get("login"),
                         discussion_title=discussion_title
                     ),
                     AuthorizationToken(**session.get("authorization_token"))
-                ).get()
+                )
                 return redirect(url_for("render_discussion_page", discussion_title=discussion_title))
         else:
             if "login" in request.form.keys():
@@ -347,15 +435,9 @@ def create_app():
                 old_description=request.form.get("discussion_description"),
                 error_message="Категория обсуждения должна быть не пустой."
             )
-        elif DiscussionTasks.get_discussion_by_title_task.delay(request.form.get("discussion_title").strip(" ")).get():
-            return add_discussion_page_wrong_title(
-                old_description=request.form.get("discussion_description").strip(" "),
-                old_category=request.form.get("discussion_category"),
-                error_message=f"Заголовок обсуждения должен быть уникальным. Обсуждение с заголовком"
-                              f" \"{request.form.get('discussion_title').strip(' ')}\" уже опубликован."
-            )
         else:
-            DiscussionTasks.save_discussion_task.delay(
+            outcome = write(
+                DiscussionTasks.save_discussion_task,
                 SaveDiscussionDTO(
                     title=request.form.get("discussion_title").strip(" "),
                     description=request.form.get("discussion_description"),
@@ -363,14 +445,21 @@ def create_app():
                     sender_login=session.get("authorization_token").get("login")
                 ),
                 AuthorizationToken(**session.get("authorization_token"))
-            ).get()
+            )
+            if outcome == WriteOutcome.ALREADY_EXISTS:
+                return add_discussion_page_wrong_title(
+                    old_description=request.form.get("discussion_description").strip(" "),
+                    old_category=request.form.get("discussion_category"),
+                    error_message=f"Заголовок обсуждения должен быть уникальным. Обсуждение с заголовком"
+                                  f" \"{request.form.get('discussion_title').strip(' ')}\" уже опубликован."
+                )
             return redirect(url_for("render_user_discussions_page"))
 
     @app.post("/user/discussions/add_discussion")
     def add_discussion_page_post():
         if session.get("authorization_token"):
             if "exit" in request.form.keys():
-                session.pop("authorization_token")
+                log_out()
                 return redirect(url_for("render_main_page"))
             elif "add_discussion" in request.form.keys():
                 return add_new_discussion()
@@ -388,31 +477,48 @@ def create_app():
             add_knowledge_url=url_for("render_add_knowledge_page"),
             form_action_url=url_for("user_knowledge_catalog_page_post"),
             all_categories_item=ALL_CATEGORIES_ITEM,
-            categories=KnowledgeTasks.get_knowledge_categories_task.delay(status=KnowledgeStatus.PUBLISHED).get(),
+            categories=gateway.read(KnowledgeTasks.get_knowledge_categories_task, status=KnowledgeStatus.PUBLISHED),
             current_selected_category=ALL_CATEGORIES_ITEM,
             user_authorized=session.get("authorization_token")
         )
 
     def published_knowledge_search():
         not_found_knowledge_title = None
+        similar_titles = None
+        next_cursor = None
         category = request.form.get("categories_list")
-        if request.form.get("title").replace(" ", "") == "":
-            if category == ALL_CATEGORIES_ITEM:
-                knowledge_titles = [
-                    knowledge.title for knowledge in KnowledgeTasks.get_published_knowledge_task.delay().get()
-                ]
-            else:
-                knowledge_titles = [
-                    knowledge.title for knowledge in
-                    KnowledgeTasks.get_knowledge_by_category_task.delay(category, KnowledgeStatus.PUBLISHED).get()
-                ]
+        cursor = request.form.get("cursor") or None
+        search_title = request.form.get("title").strip(" ")
+        if search_title == "":
+            page_call = task_call(
+                KnowledgeTasks.list_published_knowledge_titles_task,
+                None if category == ALL_CATEGORIES_ITEM else category, cursor, CATALOG_PAGE_SIZE
+            )
         else:
-            knowledge = KnowledgeTasks.get_knowledge_by_title_task.delay(request.form.get("title").strip(" ")).get()
-            if knowledge is None:
-                knowledge_titles = None
-                not_found_knowledge_title = request.form.get("title").strip(" ")
-            else:
-                knowledge_titles = [knowledge.title]
+            page_call = task_call(
+                KnowledgeTasks.search_knowledge_task,
+                search_title, KnowledgeStatus.PUBLISHED, cursor, CATALOG_PAGE_SIZE
+            )
+        try:
+            categories, page = gateway.read_all(
+                task_call(KnowledgeTasks.get_knowledge_categories_task, status=KnowledgeStatus.PUBLISHED), page_call
+            )
+        except ValueError as ex:
+            # A tampered or outdated cursor of the form.
+            abort(400, str(ex))
+        if search_title == "":
+            knowledge_titles = list(page.items)
+            next_cursor = page.next_cursor
+        elif page.items:
+            knowledge_titles = [knowledge.title for knowledge in page.items]
+            next_cursor = page.next_cursor
+        else:
+            knowledge_titles = None
+            not_found_knowledge_title = search_title
+            similar_titles = gateway.read(
+                KnowledgeTasks.find_similar_knowledge_titles_task,
+                search_title, KnowledgeStatus.PUBLISHED
+            )
 
         return render_template(
             "user/knowledge_search_index.html",
@@ -421,10 +527,13 @@ def create_app():
             add_knowledge_url=url_for("render_add_knowledge_page"),
             form_action_url=url_for("user_knowledge_catalog_page_post"),
             all_categories_item=ALL_CATEGORIES_ITEM,
-            categories=KnowledgeTasks.get_knowledge_categories_task.delay(status=KnowledgeStatus.PUBLISHED).get(),
+            categories=categories,
             current_selected_category=category,
             knowledge_titles=knowledge_titles,
+            current_search_title=search_title,
+            next_cursor=next_cursor,
             not_found_knowledge_title=not_found_knowledge_title,
+            similar_titles=similar_titles,
             user_authorized=session.get("authorization_token")
         )
 
@@ -439,7 +548,7 @@ def create_app():
 
         if session.get("authorization_token"):
             if "exit" in request.form.keys():
-                session.pop("authorization_token")
+                log_out()
                 return redirect(url_for("render_main_page"))
         else:
             if "login" in request.form.keys():
@@ -447,8 +556,12 @@ def create_app():
 
     @app.get("/user/knowledge_catalog/<knowledge_title>")
     def render_user_knowledge_page(knowledge_title):
-        knowledge = KnowledgeTasks.get_knowledge_by_title_task.delay(knowledge_title).get()
+        knowledge = gateway.read(KnowledgeTasks.get_knowledge_by_title_task, knowledge_title)
         if knowledge is None:
+            categories, similar_titles = gateway.read_all(
+                task_call(KnowledgeTasks.get_knowledge_categories_task, status=KnowledgeStatus.PUBLISHED),
+                task_call(KnowledgeTasks.find_similar_knowledge_titles_task, knowledge_title, KnowledgeStatus.PUBLISHED)
+            )
             return render_template(
                 "user/knowledge_search_index.html",
                 discussions_url=url_for("render_user_discussions_page"),
@@ -456,9 +569,10 @@ def create_app():
                 add_knowledge_url=url_for("render_add_knowledge_page"),
                 form_action_url=url_for("user_knowledge_catalog_page_post"),
                 all_categories_item=ALL_CATEGORIES_ITEM,
-                categories=KnowledgeTasks.get_knowledge_categories_task.delay(status=KnowledgeStatus.PUBLISHED).get(),
+                categories=categories,
                 current_selected_category=ALL_CATEGORIES_ITEM,
                 not_found_knowledge_title=knowledge_title,
+                similar_titles=similar_titles,
                 user_authorized=session.get("authorization_token")
             )
         else:
@@ -468,7 +582,7 @@ def create_app():
                 knowledge_url=url_for("render_user_knowledge_catalog_page"),
                 form_action_url=url_for("knowledge_page_post", knowledge_title=knowledge_title),
                 knowledge_title=knowledge.title,
-                sender_username=knowledge.knowledge_sender.username,
+                sender_username=knowledge.sender_username,
                 knowledge_description=knowledge.description,
                 knowledge_link=knowledge.link,
                 user_authorized=session.get("authorization_token")
@@ -478,7 +592,7 @@ def create_app():
     def knowledge_page_post(knowledge_title):
         if session.get("authorization_token"):
             if "exit" in request.form.keys():
-                session.pop("authorization_token")
+                log_out()
                 return redirect(url_for("render_main_page"))
         else:
             if "login" in request.form.keys():
@@ -573,16 +687,9 @@ def create_app():
                 old_category=request.form.get("knowledge_category"),
                 error_message="Ссылка на источник знания должна быть не пустой."
             )
-        elif KnowledgeTasks.get_knowledge_by_title_task.delay(request.form.get("knowledge_title").strip(" ")).get():
-            return add_knowledge_page_wrong_title(
-                old_description=request.form.get("knowledge_description"),
-                old_category=request.form.get("knowledge_category"),
-                old_link=request.form.get("knowledge_link"),
-                error_message=f"Заголовок знания должен быть уникальным. Знание с заголовком"
-                              f" \"{request.form.get('knowledge_title').strip(' ')}\" уже существует в каталоге."
-            )
         else:
-            KnowledgeTasks.save_knowledge_task.delay(
+            outcome = write(
+                KnowledgeTasks.save_knowledge_task,
                 SaveKnowledgeDTO(
                     title=request.form.get("knowledge_title").strip(" "),
                     description=request.form.get("knowledge_description"),
@@ -591,14 +698,22 @@ def create_app():
                     sender_login=session.get("authorization_token").get("login")
                 ),
                 AuthorizationToken(**session.get("authorization_token"))
-            ).get()
+            )
+            if outcome == WriteOutcome.ALREADY_EXISTS:
+                return add_knowledge_page_wrong_title(
+                    old_description=request.form.get("knowledge_description"),
+                    old_category=request.form.get("knowledge_category"),
+                    old_link=request.form.get("knowledge_link"),
+                    error_message=f"Заголовок знания должен быть уникальным. Знание с заголовком"
+                                  f" \"{request.form.get('knowledge_title').strip(' ')}\" уже существует в каталоге."
+                )
             return redirect(url_for("render_user_knowledge_catalog_page"))
 
     @app.post("/user/knowledge_catalog/add_knowledge")
     def add_knowledge_page_post():
         if session.get("authorization_token"):
             if "exit" in request.form.keys():
-                session.pop("authorization_token")
+                log_out()
                 return redirect(url_for("render_main_page"))
             elif "add_knowledge" in request.form.keys():
                 return add_new_knowledge()
@@ -625,20 +740,29 @@ def create_app():
         else:
             return redirect(url_for("render_login_page"))
 
+    def next_admin_page_url(page):
+        if page.next_cursor is None:
+            return None
+        return url_for("render_knowledge_list_admin_page", cursor=page.next_cursor)
+
     @app.get("/admin/inspect_knowledge_catalog/")
     def render_knowledge_list_admin_page():
         if session.get("authorization_token") and session.get("authorization_token").get("is_admin"):
-            knowledge_list = (
-                KnowledgeTasks
-                .get_in_processing_knowledge_task
-                .delay(AuthorizationToken(**session.get("authorization_token")))
-                .get()
-            )
+            try:
+                page = gateway.read(
+                    KnowledgeTasks.list_in_processing_knowledge_titles_task,
+                    AuthorizationToken(**session.get("authorization_token")),
+                    request.args.get("cursor") or None,
+                    CATALOG_PAGE_SIZE
+                )
+            except ValueError as ex:
+                abort(400, str(ex))
             return render_template(
                 "admin/knowledge_list_admin_index.html",
                 inspect_knowledge_url=url_for("render_admin_main_page"),
                 form_action_url=url_for("knowledge_list_admin_post"),
-                knowledge_titles=[knowledge.title for knowledge in knowledge_list]
+                knowledge_titles=list(page.items),
+                next_page_url=next_admin_page_url(page)
             )
         else:
             return redirect(url_for("render_login_page"))
@@ -647,7 +771,7 @@ def create_app():
     def knowledge_list_admin_post():
         if session.get("authorization_token") and session.get("authorization_token").get("is_admin"):
             if "exit" in request.form.keys():
-                session.pop("authorization_token")
+                log_out()
                 return redirect(url_for("render_main_page"))
             elif "inspect_knowledge" in request.form.keys():
                 return redirect(
@@ -659,24 +783,25 @@ def create_app():
             return redirect(url_for("render_login_page"))
 
     def knowledge_to_inspect_error(error_message):
-        knowledge_list = (
-            KnowledgeTasks
-            .get_in_processing_knowledge_task
-            .delay(AuthorizationToken(**session.get("authorization_token")))
-            .get()
+        page = gateway.read(
+            KnowledgeTasks.list_in_processing_knowledge_titles_task,
+            AuthorizationToken(**session.get("authorization_token")),
+            None,
+            CATALOG_PAGE_SIZE
         )
         return render_template(
             "admin/knowledge_list_admin_index.html",
             inspect_knowledge_url=url_for("render_admin_main_page"),
             form_action_url=url_for("knowledge_list_admin_post"),
-            knowledge_titles=[knowledge.title for knowledge in knowledge_list],
+            knowledge_titles=list(page.items),
+            next_page_url=next_admin_page_url(page),
             error_message=error_message
         )
 
     @app.get("/admin/inspect_knowledge_catalog/<knowledge_title>")
     def render_knowledge_to_inspect(knowledge_title):
         if session.get("authorization_token") and session.get("authorization_token").get("is_admin"):
-            knowledge = KnowledgeTasks.get_knowledge_by_title_task.delay(knowledge_title).get()
+            knowledge = gateway.read(KnowledgeTasks.get_knowledge_by_title_task, knowledge_title)
             if knowledge is None:
                 return knowledge_to_inspect_error(
                     error_message=f"Знание с заголовком \"{knowledge_title}\" не обнаружено."
@@ -693,7 +818,7 @@ def create_app():
                     knowledge_title=knowledge.title,
                     knowledge_description=knowledge.description,
                     knowledge_link=knowledge.link,
-                    sender_username=knowledge.knowledge_sender.username
+                    sender_username=knowledge.sender_username
                 )
         else:
             return redirect(url_for("render_login_page"))
@@ -703,27 +828,58 @@ def create_app():
         print(request.form)
         if session.get("authorization_token") and session.get("authorization_token").get("is_admin"):
             if "exit" in request.form.keys():
-                session.pop("authorization_token")
+                log_out()
                 return redirect(url_for("render_main_page"))
             elif "accept" in request.form.keys():
-                (
-                    KnowledgeTasks
-                    .accept_knowledge_publishing_task
-                    .delay(knowledge_title, AuthorizationToken(**session.get("authorization_token")))
-                    .get()
+                write(
+                    KnowledgeTasks.accept_knowledge_publishing_task,
+                    knowledge_title,
+                    AuthorizationToken(**session.get("authorization_token"))
                 )
                 return redirect(url_for("render_knowledge_list_admin_page"))
             elif "delete" in request.form.keys():
-                (
-                    KnowledgeTasks
-                    .delete_knowledge_by_title_task
-                    .delay(knowledge_title, AuthorizationToken(**session.get("authorization_token")))
-                    .get()
+                write(
+                    KnowledgeTasks.delete_knowledge_by_title_task,
+                    knowledge_title,
+                    AuthorizationToken(**session.get("authorization_token"))
                 )
                 return redirect(url_for("render_knowledge_list_admin_page"))
         else:
             return redirect(url_for("render_login_page"))
 
+    @app.get("/admin/export/<entity>")
+    def export_catalog_admin(entity):
+        # Streamed by the web process from its own database session: a dump never passes through the broker.
+        # An interrupted download is continued by after_id, the id of the last row received.
+        token = session.get("authorization_token")
+        if not (token and token.get("is_admin") and token_signer.verify(AuthorizationToken(**token))):
+            return redirect(url_for("render_login_page"))
+        export_format = request.args.get("format", NDJSON)
+        try:
+            status = request.args.get("status")
+            export_filter = ExportFilter(
+                request.args.get("category"), None if status is None else KnowledgeStatus(status)
+            )
+            after_id = int(request.args.get("after_id", 0))
+            check_export(entity, export_format, export_filter)
+        except ValueError as ex:
+            abort(400, str(ex))
+
+        def generate():
+            with (export_sessionmaker or engine_registry.read_sessionmaker)() as db_session:
+                for _, _, text in export_chunks(
+                        entity, db_session, export_format, export_filter, after_id, include_header=after_id == 0
+                ):
+                    yield text
+
+        return Response(
+            stream_with_context(generate()),
+            mimetype=EXPORT_CONTENT_TYPES[export_format],
+            headers={
+                "Content-Disposition": f"attachment; filename={entity}.{EXPORT_FILE_EXTENSIONS[export_format]}"
+            }
+        )
+
     return app
 
 
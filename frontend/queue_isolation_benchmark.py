@@ -0,0 +1,127 @@
+#Author: Vodohleb04
+import os
+import statistics
+import sys
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from frontend.read_path_benchmark import start_fake_redis
+
+LOGIN_CLIENTS = 4
+LOGINS_PER_CLIENT = 50
+BULK_JOBS = 30
+BULK_JOB_SIZE = 2000
+WORKER_START_TIMEOUT = 60
+
+
+def report(scenario, phase, latencies):
+    latencies = sorted(latencies)
+    print(
+        f"{scenario:<24} {phase:<28} p50 {statistics.median(latencies) * 1e3:>8.2f} ms  "
+        f"p99 {latencies[int(len(latencies) * 0.99)] * 1e3:>8.2f} ms"
+    )
+
+
+def prepare_database():
+    from sqlalchemy import text
+    from backend.data_layer.engine_registry import engine_registry
+    from backend.data_layer.mapped_database import Base
+    from backend.data_access_layer.user_dal.user_dal import SQLAlchemyUserDAL
+    from backend.data_access_layer.user_dal.save_user_dto import SaveUserDTO
+    from backend.service_layer.authentication_service.authentication_service_impl import AuthenticationServiceImpl
+    with engine_registry.engine.begin() as connection:
+        connection.execute(text("DROP SCHEMA IF EXISTS omis2 CASCADE"))
+        connection.execute(text("CREATE SCHEMA omis2"))
+    Base.create_from_metadata(engine_registry.engine)
+    with engine_registry.sessionmaker() as session:
+        return AuthenticationServiceImpl(SQLAlchemyUserDAL()).register(
+            SaveUserDTO(False, "user", "user name", "0" * 64, "user@mail.ru", date(2000, 1, 1)), session
+        )
+
+
+def measure_logins():
+    from backend.data_access_layer.user_dal.login_user_dto import LoginUserDTO
+    from broker.authentication_tasks import AuthenticationTasks
+
+    def login_repeatedly():
+        latencies = []
+        for _ in range(LOGINS_PER_CLIENT):
+            start = time.perf_counter()
+            token = AuthenticationTasks.login_task.delay(LoginUserDTO("user", "0" * 64)).get(timeout=60)
+            latencies.append(time.perf_counter() - start)
+            assert token is not None
+        return latencies
+
+    with ThreadPoolExecutor(LOGIN_CLIENTS) as executor:
+        futures = [executor.submit(login_repeatedly) for _ in range(LOGIN_CLIENTS)]
+        return [latency for future in futures for latency in future.result()]
+
+
+def start_bulk_jobs(scenario, token):
+    from backend.data_access_layer.knowledge_dal.save_knowledge_dto import SaveKnowledgeDTO
+    from broker.knowledge_tasks import KnowledgeTasks
+    return [
+        KnowledgeTasks.save_knowledge_many_task.delay(
+            [
+                SaveKnowledgeDTO(f"{scenario} {job} {i}", "description " * 20, "link", f"category {i % 10}", "user")
+                for i in range(BULK_JOB_SIZE)
+            ],
+            token
+        ) for job in range(BULK_JOBS)
+    ]
+
+
+def run_scenario(scenario, worker_settings_list, token):
+    from broker.worker_launcher import start_workers, stop_workers
+    workers = start_workers(worker_settings_list, log_level="WARNING")
+    try:
+        from backend.data_access_layer.user_dal.login_user_dto import LoginUserDTO
+        from broker.authentication_tasks import AuthenticationTasks
+        # The first login waits until the workers have started, one unreported round warms up their processes.
+        AuthenticationTasks.login_task.delay(LoginUserDTO("user", "0" * 64)).get(timeout=WORKER_START_TIMEOUT)
+        measure_logins()
+        report(scenario, "login", measure_logins())
+        bulk_jobs = start_bulk_jobs(scenario, token)
+        report(scenario, "login during bulk job", measure_logins())
+        print(f"{scenario:<24} bulk jobs finished while measuring: {sum(job.ready() for job in bulk_jobs)}/{BULK_JOBS}")
+        for job in bulk_jobs:
+            job.get(timeout=600)
+    finally:
+        stop_workers(workers)
+
+
+def run(redis_url):
+    from broker import broker_app
+    from broker.task_routing import QUEUES
+    from broker.worker_launcher import DEFAULT_QUEUE_WORKER_SETTINGS, QueueWorkerSettings
+    broker_app.conf.update(broker_url=redis_url, result_backend=redis_url)
+    token = prepare_database()
+    dedicated = [DEFAULT_QUEUE_WORKER_SETTINGS[queue] for queue in QUEUES]
+    # The same number of processes in one pool that consumes every queue, as "celery -A broker worker" does.
+    shared = QueueWorkerSettings(
+        QUEUES, concurrency=sum(settings.concurrency for settings in dedicated), prefetch_multiplier=4
+    )
+    run_scenario("dedicated queues", dedicated, token)
+    run_scenario("one shared pool", [shared], token)
+
+
+if __name__ == "__main__":
+    # Usage: python -m frontend.queue_isolation_benchmark <scratch postgres database url> [redis url]
+    # The omis2 schema of the given database is dropped and filled with generated data. The workers are separate
+    # processes started by broker/worker_launcher.py, they reach the redis stand-in served by this process.
+    if len(sys.argv) < 2:
+        sys.exit("Usage: python -m frontend.queue_isolation_benchmark <scratch postgres database url> [redis url]")
+    os.environ["OMIS_DATABASE_URL"] = sys.argv[1]
+    os.environ["OMIS_CACHE_BACKEND"] = "none"
+    fake_redis, redis_url = start_fake_redis() if len(sys.argv) < 3 else (None, sys.argv[2])
+    os.environ["OMIS_BROKER_URL"] = os.environ["OMIS_RESULT_BACKEND_URL"] = redis_url
+    exit_code = 0
+    try:
+        run(redis_url)
+    except Exception:
+        traceback.print_exc()
+        exit_code = 1
+    if fake_redis is not None:
+        fake_redis.shutdown()
+    os._exit(exit_code)
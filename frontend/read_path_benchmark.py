@@ -0,0 +1,133 @@
+#Author: Vodohleb04
+import os
+import socket
+import statistics
+import sys
+import threading
+import time
+import traceback
+from urllib.parse import quote
+
+REQUESTS_PER_PAGE = 100
+FAKE_REDIS_ADDRESS = ("127.0.0.1", 6390)
+
+
+def report(mode, page, latencies):
+    latencies = sorted(latencies)
+    print(
+        f"{mode:<24} {page:<28} p50 {statistics.median(latencies) * 1e3:>8.2f} ms  "
+        f"p99 {latencies[int(len(latencies) * 0.99)] * 1e3:>8.2f} ms"
+    )
+
+
+def start_fake_redis():
+    try:
+        from fakeredis import TcpFakeServer
+    except ImportError:
+        sys.exit("Pass a redis url or install fakeredis (with lupa) to run the benchmark against a stand-in.")
+
+    class NoDelayFakeServer(TcpFakeServer):
+        # Redis disables Nagle's algorithm, without it every reply of the stand-in waits for a delayed ACK.
+        def get_request(self):
+            connection, address = super().get_request()
+            connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            return connection, address
+
+    server = NoDelayFakeServer(FAKE_REDIS_ADDRESS, server_type="redis")
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"redis://{FAKE_REDIS_ADDRESS[0]}:{FAKE_REDIS_ADDRESS[1]}"
+
+
+def prepare_database():
+    from sqlalchemy import text, update
+    from backend.data_layer.engine_registry import engine_registry
+    from backend.data_layer.mapped_database import Base, Knowledge, KnowledgeStatus
+    from backend.read_model_benchmark import fill_database
+    from backend.rebuild_category_catalog import rebuild_category_catalog
+    with engine_registry.engine.begin() as connection:
+        connection.execute(text("DROP SCHEMA IF EXISTS omis2 CASCADE"))
+        connection.execute(text("CREATE SCHEMA omis2"))
+    Base.create_from_metadata(engine_registry.engine)
+    with engine_registry.sessionmaker() as session:
+        fill_database(session)
+        session.execute(update(Knowledge).values(status=KnowledgeStatus.PUBLISHED))
+        session.commit()
+    rebuild_category_catalog(engine_registry.sessionmaker)
+
+
+def create_sequential_gateway(settings):
+    from frontend.task_gateway import TaskGateway
+
+    class SequentialTaskGateway(TaskGateway):
+        # The gateway as it was before read_all, every call waits for the previous one.
+        def read_all(self, *calls):
+            return tuple(self.read(call.task, *call.args, **call.kwargs) for call in calls)
+
+    return SequentialTaskGateway(settings)
+
+
+def measure(mode, gateway, pages):
+    from frontend.controller import create_app
+    client = create_app(gateway).test_client()
+    for page, method, path, form in pages:
+        client.open(path, method=method, data=form)
+        latencies = []
+        for _ in range(REQUESTS_PER_PAGE):
+            start = time.perf_counter()
+            response = client.open(path, method=method, data=form)
+            latencies.append(time.perf_counter() - start)
+            assert response.status_code == 200, response.status_code
+        report(mode, page, latencies)
+
+
+def run(redis_url):
+    from celery.contrib.testing.worker import start_worker
+    from broker import broker_app
+    from frontend.controller import ALL_CATEGORIES_ITEM
+    from frontend.task_gateway import TaskGateway, GatewaySettings, CELERY_READS, IN_PROCESS_READS
+    broker_app.conf.update(broker_url=redis_url, result_backend=redis_url)
+    prepare_database()
+    pages = [
+        ("discussion list", "GET", "/user/discussions/", None),
+        ("discussion", "GET", f"/user/discussions/{quote('discussion user_0 0')}", None),
+        ("missing discussion", "GET", f"/user/discussions/{quote('discusion user_0 0')}", None),
+        (
+            "discussion search", "POST", "/user/discussions/",
+            {"search": "", "title": "discussion", "categories_list": ALL_CATEGORIES_ITEM}
+        ),
+        ("knowledge list", "GET", "/user/knowledge_catalog/", None),
+        (
+            "knowledge search", "POST", "/user/knowledge_catalog/",
+            {"search": "", "title": "knowledge", "categories_list": ALL_CATEGORIES_ITEM}
+        ),
+        (
+            "knowledge search not found", "POST", "/user/knowledge_catalog/",
+            {"search": "", "title": "knowlege user_0", "categories_list": ALL_CATEGORIES_ITEM}
+        )
+    ]
+    with start_worker(broker_app, pool="threads", concurrency=4, perform_ping_check=False, loglevel="WARNING"):
+        for read_path in (CELERY_READS, IN_PROCESS_READS):
+            settings = GatewaySettings(read_path=read_path)
+            measure(f"{read_path} sequential", create_sequential_gateway(settings), pages)
+            measure(f"{read_path} gathered", TaskGateway(settings), pages)
+
+
+if __name__ == "__main__":
+    # Usage: python -m frontend.read_path_benchmark <scratch postgres database url> [redis url]
+    # The omis2 schema of the given database is dropped and filled with generated data.
+    if len(sys.argv) < 2:
+        sys.exit("Usage: python -m frontend.read_path_benchmark <scratch postgres database url> [redis url]")
+    os.environ["OMIS_DATABASE_URL"] = sys.argv[1]
+    # Without the service cache both paths run the same queries, only the broker hop differs.
+    os.environ["OMIS_CACHE_BACKEND"] = "none"
+    fake_redis, redis_url = start_fake_redis() if len(sys.argv) < 3 else (None, sys.argv[2])
+    exit_code = 0
+    try:
+        run(redis_url)
+    except Exception:
+        traceback.print_exc()
+        exit_code = 1
+    if fake_redis is not None:
+        fake_redis.shutdown()
+    # The worker leaves non-daemon threads blocked on the broker connection behind, even after a failure.
+    os._exit(exit_code)
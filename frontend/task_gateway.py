@@ -0,0 +1,108 @@
+#Author: Vodohleb04
+import os
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from dataclasses import dataclass, field
+from hashlib import sha256
+from typing import Tuple, Any
+from celery import Task
+from backend.data_layer.replica_routing import PRIMARY_READS_HEADER, reads_from_primary
+from backend.service_layer.cache.single_flight import SingleFlight, SingleFlightStatistics
+from broker.message_codec import encode_message
+
+CELERY_READS = "celery"
+IN_PROCESS_READS = "in_process"
+
+
+def _read_bool(value: str) -> bool:
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+@dataclass(frozen=True, slots=True)
+class GatewaySettings:
+    # In-process reads run on the web process's own engine pool and service cache, so with the in-memory cache
+    # backend the web tier would not see invalidations made by workers. Writes always go through celery.
+    read_path: str = CELERY_READS
+    # Threads of the web process that run gathered reads. In-process each of them holds its own db connection,
+    # through celery they only wait for results.
+    read_concurrency: int = 4
+    # Identical reads in flight at the same time in this process share one task execution.
+    coalesce_reads: bool = True
+    # After a write the reads of the same user go to the primary database for this long, the replicas may lag.
+    read_your_writes_seconds: float = 5.0
+
+    @classmethod
+    def from_environment(cls, environment=os.environ) -> "GatewaySettings":
+        defaults = cls()
+        return cls(
+            read_path=environment.get("OMIS_READ_PATH", defaults.read_path),
+            read_concurrency=int(environment.get("OMIS_READ_CONCURRENCY", defaults.read_concurrency)),
+            coalesce_reads=_read_bool(environment.get("OMIS_COALESCE_READS", str(defaults.coalesce_reads))),
+            read_your_writes_seconds=float(
+                environment.get("OMIS_READ_YOUR_WRITES_SECONDS", defaults.read_your_writes_seconds)
+            )
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class TaskCall:
+    task: Task
+    args: Tuple = ()
+    kwargs: dict = field(default_factory=dict)
+
+
+def task_call(task: Task, *args, **kwargs) -> TaskCall:
+    return TaskCall(task, args, kwargs)
+
+
+def flight_key(task: Task, args: Tuple, kwargs: dict) -> str:
+    # The message codec packs equal arguments to equal bytes, dict order aside.
+    return f"{task.name}:{sha256(encode_message([list(args), sorted(kwargs.items())])).hexdigest()}"
+
+
+class TaskGateway:
+
+    def __init__(self, settings: GatewaySettings):
+        if settings.read_path not in (CELERY_READS, IN_PROCESS_READS):
+            raise ValueError(f"Unsupported read path: {settings.read_path}")
+        self.__settings = settings
+        self.__executor = ThreadPoolExecutor(settings.read_concurrency, thread_name_prefix="omis-read")
+        self.__single_flight = SingleFlight() if settings.coalesce_reads else None
+
+    @property
+    def settings(self) -> GatewaySettings:
+        return self.__settings
+
+    def single_flight_statistics(self) -> SingleFlightStatistics:
+        if self.__single_flight is None:
+            return SingleFlightStatistics(executions=0, coalesced=0)
+        return self.__single_flight.statistics()
+
+    def __run_read(self, task: Task, args: Tuple, kwargs: dict):
+        if self.__settings.read_path == IN_PROCESS_READS:
+            # Calling a task runs its body in the caller, the broker and the worker hop are skipped.
+            return task(*args, **kwargs)
+        if reads_from_primary():
+            return task.apply_async(args, kwargs, headers={PRIMARY_READS_HEADER: True}).get()
+        return task.delay(*args, **kwargs).get()
+
+    def read(self, task: Task, *args, **kwargs):
+        if self.__single_flight is None:
+            return self.__run_read(task, args, kwargs)
+        key = flight_key(task, args, kwargs)
+        if reads_from_primary():
+            # A replica read in flight may not see the write of this user yet, it is not shared with this read.
+            key = f"primary:{key}"
+        return self.__single_flight.call(key, lambda: self.__run_read(task, args, kwargs))
+
+    def read_all(self, *calls: TaskCall) -> Tuple[Any, ...]:
+        # Independent reads of one page are started together, so the page waits for the slowest of them only.
+        # Each read runs in a copy of the caller's context, which tells whether it has to read from the primary.
+        futures = [
+            self.__executor.submit(copy_context().run, self.read, call.task, *call.args, **call.kwargs)
+            for call in calls
+        ]
+        return tuple(future.result() for future in futures)
+
+    def write(self, task: Task, *args, **kwargs):
+        return task.delay(*args, **kwargs).get()